@@ -7,18 +7,50 @@ import asyncio
 import openai
 import re
 import json
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Set, Tuple
 from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
 import hashlib
+import weakref
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from decimal import Decimal
 import nltk
 from textblob import TextBlob
 
+from .spam_signatures import SignatureIndex, SignatureEntry, UserActivityWindow
+
 logger = logging.getLogger(__name__)
 
+URL_PATTERN = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+CHAR_REPETITION_PATTERN = re.compile(r'(.)\1{4,}')
+
+SENTENCE_QUALITY_PENALTY = 0.1
+
+# Score boundaries used by _get_risk_level
+RISK_LEVEL_THRESHOLDS = (0.4, 0.6, 0.8)
+
+# Detectors that have started a language worker pool
+_pooled_detectors: "weakref.WeakSet[SpamDetector]" = weakref.WeakSet()
+
+
+def _sentence_quality_score(content: str) -> float:
+    """TextBlob coherence check; module level so it can run in a worker process"""
+    
+    try:
+        blob = TextBlob(content)
+        if len(blob.sentences) > 0:
+            # Very short or very long sentences can be suspicious
+            avg_sentence_length = len(content.split()) / len(blob.sentences)
+            if avg_sentence_length < 2 or avg_sentence_length > 50:
+                return SENTENCE_QUALITY_PENALTY
+    except Exception:
+        return SENTENCE_QUALITY_PENALTY  # Parsing error usually indicates poor quality
+    
+    return 0.0
+
 
 class MessageType(Enum):
     TRADING_CALL = "trading_call"
@@ -99,7 +131,7 @@ class ModerationAction:
 class SpamDetector:
     """Advanced spam and pump-dump detection"""
     
-    def __init__(self):
+    def __init__(self, language_workers: int = 2):
         self.spam_patterns = {
             "pump_dump": [
                 r"guaranteed profit",
@@ -138,9 +170,52 @@ class SpamDetector:
             "bitcoin", "crypto", "forex", "binary", "recovery"
         ]
         
-        # User behavior tracking
-        self.user_message_history = {}
+        self.suspicious_domains = [
+            "bit.ly", "tinyurl.com", "telegram.me", "t.me",
+            "whatsapp.com", "wa.me", "short.link"
+        ]
+        
+        self.spam_threshold = 0.6
+        self.similarity_threshold = 0.8
+        self.cross_group_threshold = 3  # Distinct groups carrying the same message
+        
+        # Every score cutoff a caller acts on; moderators add their own
+        self.decision_thresholds: Set[float] = set(RISK_LEVEL_THRESHOLDS)
+        
+        self.compile_patterns()
+        
+        # User behavior tracking: sliding windows per user, signatures across all groups
+        self.user_activity: Dict[str, UserActivityWindow] = defaultdict(UserActivityWindow)
+        self.signature_index = SignatureIndex(window=timedelta(hours=24))
         self.user_spam_scores = {}
+        
+        # TextBlob parsing is only needed for borderline scores and runs off the event loop
+        self.language_workers = language_workers
+        self._language_pool: Optional[ProcessPoolExecutor] = None
+    
+    def compile_patterns(self):
+        """Compile spam patterns and keywords; call again after editing them"""
+        
+        self._compiled_patterns = [
+            (category, pattern, re.compile(pattern))
+            for category, patterns in self.spam_patterns.items()
+            for pattern in patterns
+        ]
+        # Most messages match nothing, so one combined search screens them out
+        self._pattern_prefilter = re.compile(
+            "|".join(f"(?:{pattern})" for _, pattern, _ in self._compiled_patterns)
+        ) if self._compiled_patterns else None
+        
+        # Lookahead so overlapping keywords are all reported
+        self._keyword_pattern = re.compile(
+            "(?=(" + "|".join(re.escape(keyword) for keyword in self.suspicious_keywords) + "))"
+        ) if self.suspicious_keywords else None
+    
+    def shutdown(self):
+        """Stop the language worker pool; it is restarted on next use"""
+        if self._language_pool is not None:
+            self._language_pool.shutdown(wait=False)
+            self._language_pool = None
     
     async def analyze_message(self, message: GroupMessage) -> Dict[str, Any]:
         """Comprehensive spam analysis"""
@@ -151,15 +226,16 @@ class SpamDetector:
         content_lower = message.content.lower()
         
         # Pattern-based detection
-        for category, patterns in self.spam_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, content_lower):
+        if self._pattern_prefilter and self._pattern_prefilter.search(content_lower):
+            for category, pattern, compiled in self._compiled_patterns:
+                if compiled.search(content_lower):
                     spam_score += 0.3
                     detected_patterns.append(f"{category}: {pattern}")
         
         # Keyword-based detection
-        keyword_count = sum(1 for keyword in self.suspicious_keywords if keyword in content_lower)
-        spam_score += keyword_count * 0.2
+        if self._keyword_pattern:
+            keyword_count = len(set(self._keyword_pattern.findall(content_lower)))
+            spam_score += keyword_count * 0.2
         
         # User behavior analysis
         user_behavior_score = await self._analyze_user_behavior(message)
@@ -169,17 +245,17 @@ class SpamDetector:
         repetition_score = await self._detect_repetition(message)
         spam_score += repetition_score
         
-        # Language analysis
-        language_score = await self._analyze_language_quality(message)
-        spam_score += language_score
-        
         # URL analysis
         url_score = await self._analyze_urls(message)
         spam_score += url_score
         
+        # Language analysis
+        language_score = await self._analyze_language_quality(message, spam_score)
+        spam_score += language_score
+        
         return {
             "spam_score": min(spam_score, 1.0),
-            "is_spam": spam_score > 0.6,
+            "is_spam": spam_score > self.spam_threshold,
             "detected_patterns": detected_patterns,
             "confidence": min(spam_score * 1.2, 1.0),
             "risk_level": self._get_risk_level(spam_score)
@@ -188,46 +264,48 @@ class SpamDetector:
     async def _analyze_user_behavior(self, message: GroupMessage) -> float:
         """Analyze user posting behavior patterns"""
         
-        user_id = message.user_id
         current_time = message.timestamp
+        signature = self.signature_index.hasher.signature(message.content)
         
-        # Initialize user history if not exists
-        if user_id not in self.user_message_history:
-            self.user_message_history[user_id] = []
-        
-        user_history = self.user_message_history[user_id]
-        
-        # Add current message
-        user_history.append({
-            "timestamp": current_time,
-            "content": message.content,
-            "group_id": message.group_id
-        })
-        
-        # Keep only last 24 hours
-        cutoff_time = current_time - timedelta(hours=24)
-        user_history = [msg for msg in user_history if msg["timestamp"] > cutoff_time]
-        self.user_message_history[user_id] = user_history
+        # Sliding 24h/1h windows, trimmed as messages arrive
+        activity = self.user_activity[message.user_id]
+        activity.record(current_time, message.group_id, signature)
         
         behavior_score = 0
         
         # Check message frequency (red flag if >10 messages/hour)
-        recent_messages = [msg for msg in user_history if msg["timestamp"] > current_time - timedelta(hours=1)]
-        if len(recent_messages) > 10:
+        recent_count = len(activity.hour)
+        if recent_count > 10:
             behavior_score += 0.4
         
-        # Check cross-group posting (same message in multiple groups)
-        if len(user_history) > 1:
-            current_content = message.content.lower()
-            similar_messages = [
-                msg for msg in user_history[-5:] 
-                if self._similarity_score(current_content, msg["content"].lower()) > 0.8
-            ]
-            if len(similar_messages) > 2:
+        if signature is not None:
+            # Check repeated posting (same message several times in a row)
+            if len(activity.day) > 1:
+                similar_messages = sum(
+                    1 for previous in activity.recent_signatures(5)
+                    if self.signature_index.hasher.similarity(signature, previous) > self.similarity_threshold
+                )
+                if similar_messages > 2:
+                    behavior_score += 0.3
+            
+            # Check cross-group spam (same message in multiple groups, by anyone)
+            self.signature_index.expire(current_time)
+            groups = {message.group_id}
+            for entry, _ in self.signature_index.query(signature, self.similarity_threshold):
+                groups.add(entry.group_id)
+            if len(groups) >= self.cross_group_threshold:
                 behavior_score += 0.3
+            
+            self.signature_index.add(SignatureEntry(
+                message_id=message.message_id,
+                user_id=message.user_id,
+                group_id=message.group_id,
+                timestamp=current_time,
+                signature=signature
+            ))
         
         # Check new user aggressive posting
-        if len(user_history) < 5 and len(recent_messages) > 3:
+        if len(activity.day) < 5 and recent_count > 3:
             behavior_score += 0.2
         
         return behavior_score
@@ -239,7 +317,7 @@ class SpamDetector:
         repetition_score = 0
         
         # Character repetition (e.g., "!!!!!!")
-        char_patterns = re.findall(r'(.)\1{4,}', content)
+        char_patterns = CHAR_REPETITION_PATTERN.findall(content)
         repetition_score += len(char_patterns) * 0.1
         
         # Word repetition
@@ -260,7 +338,7 @@ class SpamDetector:
         
         return min(repetition_score, 0.5)
     
-    async def _analyze_language_quality(self, message: GroupMessage) -> float:
+    async def _analyze_language_quality(self, message: GroupMessage, base_score: float = 0.0) -> float:
         """Analyze language quality and coherence"""
         
         content = message.content
@@ -271,19 +349,32 @@ class SpamDetector:
         if special_char_ratio > 0.4:
             quality_score += 0.2
         
-        # Check for coherence using TextBlob
-        try:
-            blob = TextBlob(content)
-            if len(blob.sentences) > 0:
-                # Very short or very long sentences can be suspicious
-                avg_sentence_length = len(content.split()) / len(blob.sentences)
-                if avg_sentence_length < 2 or avg_sentence_length > 50:
-                    quality_score += 0.1
-        except:
-            quality_score += 0.1  # Parsing error usually indicates poor quality
+        # Sentence coherence can only add a small penalty, so parse only when
+        # that penalty could move the score across a decision threshold
+        total = base_score + quality_score
+        thresholds = self.decision_thresholds | {self.spam_threshold}
+        if any(total <= threshold <= total + SENTENCE_QUALITY_PENALTY for threshold in thresholds):
+            quality_score += await self._sentence_quality(content)
         
         return min(quality_score, 0.3)
     
+    async def _sentence_quality(self, content: str) -> float:
+        if self.language_workers <= 0:
+            return _sentence_quality_score(content)
+        
+        if self._language_pool is None:
+            self._language_pool = ProcessPoolExecutor(max_workers=self.language_workers)
+            _pooled_detectors.add(self)
+        
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._language_pool, _sentence_quality_score, content
+            )
+        except Exception as e:
+            logger.warning(f"Language worker failed, scoring inline: {e}")
+            self.shutdown()
+            return _sentence_quality_score(content)
+    
     async def _analyze_urls(self, message: GroupMessage) -> float:
         """Analyze URLs in the message"""
         
@@ -291,18 +382,11 @@ class SpamDetector:
         url_score = 0
         
         # Find URLs
-        url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-        urls = re.findall(url_pattern, content)
-        
-        # Suspicious domains
-        suspicious_domains = [
-            "bit.ly", "tinyurl.com", "telegram.me", "t.me",
-            "whatsapp.com", "wa.me", "short.link"
-        ]
+        urls = URL_PATTERN.findall(content)
         
         for url in urls:
             # Check for URL shorteners (often used in spam)
-            if any(domain in url for domain in suspicious_domains):
+            if any(domain in url for domain in self.suspicious_domains):
                 url_score += 0.3
             
             # Multiple URLs in single message
@@ -620,20 +704,30 @@ Example: {{"call_type": "buy", "symbol": "TCS", "entry_price": 3900, "target_pri
         return formatted
 
 
+def shutdown_language_pools():
+    """Stop every spam detector's language worker pool (application shutdown)"""
+    for detector in list(_pooled_detectors):
+        detector.shutdown()
+
+
 class AIModerator:
     """Main AI Moderator class"""
     
-    def __init__(self, group_config: Dict[str, Any]):
+    def __init__(self, group_config: Dict[str, Any], spam_detector: Optional[SpamDetector] = None):
         self.group_id = group_config["group_id"]
         self.language = group_config.get("language", "english")
         self.moderation_level = group_config.get("moderation_level", "medium")
         
-        self.spam_detector = SpamDetector()
+        # Shared across groups so cross-group spam is visible
+        self.spam_detector = spam_detector or SpamDetector()
         self.call_parser = TradingCallParser()
         
         # Moderation settings
         self.auto_delete_threshold = 0.8
         self.human_review_threshold = 0.6
+        self.spam_detector.decision_thresholds.update(
+            (self.auto_delete_threshold, self.human_review_threshold)
+        )
         
         # Message tracking
         self.processed_messages = {}
@@ -839,6 +933,7 @@ class GroupManager:
     def __init__(self):
         self.active_groups = {}
         self.group_configs = {}
+        self.spam_detector = SpamDetector()
     
     async def create_group(self, group_config: Dict[str, Any]) -> AIModerator:
         """Create and configure a new group"""
@@ -852,7 +947,7 @@ class GroupManager:
                 raise ValueError(f"Missing required field: {field}")
         
         # Create moderator instance
-        moderator = AIModerator(group_config)
+        moderator = AIModerator(group_config, spam_detector=self.spam_detector)
         
         # Store group
         self.active_groups[group_id] = moderator
@@ -0,0 +1,365 @@
+"""
+Compiled Intent and Entity Matcher
+One-pass keyword classification shared by support, vernacular and trading chat
+"""
+
+import re
+from typing import Dict, List, Optional, Any, Iterable, Set, Tuple
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from .models import QueryCategory, UrgencyLevel
+
+
+# Universal query patterns (same for all tiers)
+SUPPORT_QUERY_PATTERNS = {
+    QueryCategory.ORDER_MANAGEMENT: {
+        "keywords": ["order", "buy", "sell", "cancel", "modify", "failed", "pending", "executed"],
+        "intents": ["cancel_order", "modify_order", "check_status", "understand_failure", "retry_order"],
+        "entities": ["order_id", "symbol", "quantity", "price", "amount"]
+    },
+    QueryCategory.PORTFOLIO_QUERIES: {
+        "keywords": ["portfolio", "holdings", "pnl", "profit", "loss", "balance", "positions"],
+        "intents": ["view_portfolio", "calculate_pnl", "analyze_performance", "risk_assessment"],
+        "entities": ["symbol", "quantity", "investment_amount", "current_value"]
+    },
+    QueryCategory.PAYMENT_ISSUES: {
+        "keywords": ["money", "payment", "deposit", "withdraw", "upi", "bank", "transfer", "stuck"],
+        "intents": ["add_money", "withdraw_money", "payment_failed", "upi_issue"],
+        "entities": ["amount", "upi_id", "bank_account", "transaction_id"]
+    },
+    QueryCategory.KYC_COMPLIANCE: {
+        "keywords": ["kyc", "verification", "documents", "aadhar", "pan", "rejected", "pending"],
+        "intents": ["check_kyc_status", "upload_documents", "understand_rejection", "update_kyc"],
+        "entities": ["document_type", "rejection_reason", "kyc_status"]
+    },
+    QueryCategory.TECHNICAL_SUPPORT: {
+        "keywords": ["app", "login", "password", "otp", "whatsapp", "error", "crash", "slow"],
+        "intents": ["login_issue", "app_problem", "whatsapp_setup", "password_reset"],
+        "entities": ["error_code", "device_type", "app_version"]
+    },
+    QueryCategory.MARKET_QUERIES: {
+        "keywords": ["price", "market", "stock", "nifty", "sensex", "news", "analysis"],
+        "intents": ["price_inquiry", "market_analysis", "stock_research", "market_hours"],
+        "entities": ["symbol", "index", "price_target", "time_frame"]
+    }
+}
+
+# Urgency detection patterns, checked in order
+URGENCY_KEYWORDS = {
+    UrgencyLevel.CRITICAL: ["emergency", "urgent", "stuck", "loss", "hack", "fraud"],
+    UrgencyLevel.URGENT: ["failed", "error", "problem", "issue", "help"],
+    UrgencyLevel.HIGH: ["cancel", "modify", "stop", "block"],
+    UrgencyLevel.MEDIUM: ["question", "how", "why", "when"],
+    UrgencyLevel.LOW: ["info", "learn", "understand", "explain"]
+}
+
+COMPLEXITY_TERMS = ["algorithm", "derivative", "portfolio", "analysis"]
+
+# Common Indian stock symbols
+STOCK_SYMBOLS = ["RELIANCE", "TCS", "INFY", "HDFC", "ICICI", "SBI", "ITC", "HDFCBANK"]
+
+# Vernacular greeting/help/account/trading vocabulary per language
+VERNACULAR_PATTERNS = {
+    "Hindi": {
+        "greetings": ["नमस्ते", "नमस्कार", "हेलो", "हाय"],
+        "help_requests": ["मदद", "सहायता", "हेल्प", "समस्या"],
+        "account_queries": ["खाता", "अकाउंट", "बैलेंस", "पैसा"],
+        "trading_queries": ["ट्रेड", "शेयर", "स्टॉक", "खरीदना", "बेचना"],
+        "gratitude": ["धन्यवाद", "शुक्रिया", "थैंक यू"]
+    },
+    "Bengali": {
+        "greetings": ["নমস্কার", "হ্যালো", "হাই"],
+        "help_requests": ["সাহায্য", "হেল্প", "সমস্যা"],
+        "account_queries": ["অ্যাকাউন্ট", "ব্যালেন্স", "টাকা"],
+        "trading_queries": ["ট্রেড", "শেয়ার", "স্টক", "কেনা", "বেচা"],
+        "gratitude": ["ধন্যবাদ", "থ্যাংক ইউ"]
+    },
+    "Tamil": {
+        "greetings": ["வணக்கம்", "ஹலோ", "ஹாய்"],
+        "help_requests": ["உதவி", "ஹெல்ப்", "பிரச்சனை"],
+        "account_queries": ["கணக்கு", "பேலன்ஸ்", "பணம்"],
+        "trading_queries": ["ட்ரேட்", "ஷேர்", "ஸ்டாக்", "வாங்க", "விற்க"],
+        "gratitude": ["நன்றி", "தேங்க் யூ"]
+    },
+    "Telugu": {
+        "greetings": ["నమస్కారం", "హలో", "హాయ్"],
+        "help_requests": ["సహాయం", "హెల్ప్", "సమస్య"],
+        "account_queries": ["ఖాతా", "బ్యాలెన్స్", "డబ్బు"],
+        "trading_queries": ["ట్రేడ్", "షేర్", "స్టాక్", "కొనుగోలు", "అమ్మకం"],
+        "gratitude": ["ధన్యవాదాలు", "థాంక్ యూ"]
+    }
+}
+
+# Vernacular intents, checked in order
+VERNACULAR_INTENT_ORDER = [
+    ("account_queries", "account_query"),
+    ("trading_queries", "trading_query"),
+    ("help_requests", "help_request"),
+    ("greetings", "greeting"),
+    ("gratitude", "gratitude"),
+]
+
+# Trading chat intents that are unambiguous from whole-word keywords alone
+CONVERSATION_INTENT_KEYWORDS = {
+    "buy_stock": ["buy", "purchase"],
+    "sell_stock": ["sell"],
+    "check_portfolio": ["portfolio", "holdings"],
+    "account_balance": ["balance", "funds available"],
+    "market_status": ["market status", "market today", "market open", "market closed"],
+    "stock_price": ["price of", "share price", "stock price", "ltp"],
+    "market_news": ["news", "headlines"],
+    "learn_trading": ["learn", "teach me", "beginner"],
+    "transaction_history": ["transaction history", "past transactions", "statement"],
+    "kyc_status": ["kyc"],
+    "deposit_money": ["deposit", "add money", "add funds"],
+    "greeting": ["hello", "hi", "hey", "good morning", "good evening", "namaste"],
+}
+
+# Questions about, problems with or changes to an action are not requests to
+# perform it ("why did my buy order fail"); these leave the intent to the model
+CONVERSATION_CONTEXT_KEYWORDS = [
+    "why", "how", "should", "if", "not", "never", "didn't", "don't", "doesn't", "can't", "won't",
+    "fail", "failed", "error", "problem", "issue", "stuck", "wrong", "refund", "complaint",
+    "cancel", "modify", "change",
+]
+
+ORDER_ID_PATTERN = re.compile(r'order[#\s]*(\d+)')
+AMOUNT_PATTERN = re.compile(r'₹?\s?(\d+(?:,\d+)*(?:\.\d+)?)')
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+class KeywordAutomaton:
+    """All keywords compiled into one trie-shaped regex
+
+    Scanning is a single left-to-right pass in the regex engine. A
+    zero-width lookahead finds the longest keyword starting at every
+    position, and each keyword's precomputed prefix closure yields the
+    shorter keywords starting there too, so hits match plain substring
+    (`keyword in text`) semantics, overlaps included. Keywords can be
+    flagged whole-word, in which case hits inside longer words are dropped.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str, str, bool]]):
+        # keyword -> [(group, label, whole_word)]
+        self._targets: Dict[str, List[Tuple[str, str, bool]]] = {}
+        for keyword, group, label, whole_word in entries:
+            self._targets.setdefault(keyword, []).append((group, label, whole_word))
+
+        keywords = sorted(self._targets)
+        self._prefix_closure = {
+            keyword: [other for other in keywords if keyword.startswith(other)]
+            for keyword in keywords
+        }
+        self.pattern = re.compile(f"(?=({self._trie_regex(keywords)}))") if keywords else None
+
+    @staticmethod
+    def _trie_regex(keywords: List[str]) -> str:
+        trie: Dict[str, Any] = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = True
+
+        def render(node: Dict[str, Any]) -> str:
+            terminal = "" in node
+            branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ""
+            body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+            if terminal:
+                # Optional group is greedy, so the longest keyword wins
+                return f"(?:{body})?" if len(branches) == 1 else f"{body}?"
+            return body
+
+        return render(trie)
+
+    def scan(self, text: str) -> Dict[str, Dict[str, Set[str]]]:
+        """Matched keywords grouped as {group: {label: {keyword, ...}}}"""
+
+        hits: Dict[str, Dict[str, Set[str]]] = {}
+        if self.pattern is None:
+            return hits
+
+        for match in self.pattern.finditer(text):
+            start = match.start()
+            for keyword in self._prefix_closure[match.group(1)]:
+                end = start + len(keyword)
+                bounded = (
+                    (start == 0 or not _is_word_char(text[start - 1])) and
+                    (end == len(text) or not _is_word_char(text[end]))
+                )
+                for group, label, whole_word in self._targets[keyword]:
+                    if whole_word and not bounded:
+                        continue
+                    hits.setdefault(group, {}).setdefault(label, set()).add(keyword)
+
+        return hits
+
+
+@dataclass
+class MessageAnalysis:
+    """Everything the keyword tables say about one message"""
+    text: str
+    hits: Dict[str, Dict[str, Set[str]]] = field(default_factory=dict)
+
+    def labels(self, group: str) -> Dict[str, Set[str]]:
+        return self.hits.get(group, {})
+
+    def has(self, group: str, label: str) -> bool:
+        return label in self.hits.get(group, {})
+
+    # Support classification
+
+    @property
+    def category_scores(self) -> Dict[QueryCategory, int]:
+        matched = self.labels("category")
+        return {category: len(matched.get(category, ())) for category in SUPPORT_QUERY_PATTERNS}
+
+    @property
+    def category(self) -> QueryCategory:
+        """Category with the most distinct keyword hits (first wins ties)"""
+        scores = self.category_scores
+        best_category = max(scores, key=scores.get)
+        return best_category if scores[best_category] > 0 else QueryCategory.GENERAL_INQUIRY
+
+    def intent_for(self, category: QueryCategory) -> str:
+        if category not in SUPPORT_QUERY_PATTERNS:
+            return "general_inquiry"
+
+        intents = SUPPORT_QUERY_PATTERNS[category]["intents"]
+        words = self.labels("intent_word")
+        for intent in intents:
+            if any(word in words for word in intent.split("_")):
+                return intent
+        return intents[0]  # Default to first intent
+
+    @property
+    def urgency(self) -> UrgencyLevel:
+        """Highest-priority urgency level with a keyword hit"""
+        matched = self.labels("urgency")
+        for level in URGENCY_KEYWORDS:
+            if level in matched:
+                return level
+        return UrgencyLevel.MEDIUM
+
+    @property
+    def has_complex_terms(self) -> bool:
+        return bool(self.labels("complexity"))
+
+    def entities_for(self, category: QueryCategory) -> Dict[str, Any]:
+        entities: Dict[str, Any] = {}
+
+        if category not in SUPPORT_QUERY_PATTERNS:
+            return entities
+
+        entity_types = SUPPORT_QUERY_PATTERNS[category]["entities"]
+
+        if "order_id" in entity_types:
+            order_match = ORDER_ID_PATTERN.search(self.text)
+            if order_match:
+                entities["order_id"] = order_match.group(1)
+
+        if "symbol" in entity_types:
+            matched = self.labels("symbol")
+            for symbol in STOCK_SYMBOLS:
+                if symbol in matched:
+                    entities["symbol"] = symbol
+                    break
+
+        if "amount" in entity_types:
+            amount_match = AMOUNT_PATTERN.search(self.text)
+            if amount_match:
+                entities["amount"] = amount_match.group(1)
+
+        return entities
+
+    # Vernacular classification
+
+    def vernacular_scores(self) -> Dict[str, float]:
+        """Share of each language's vocabulary present in the message"""
+        scores = {}
+        for language, patterns in VERNACULAR_PATTERNS.items():
+            total_patterns = sum(len(words) for words in patterns.values())
+            matched = {
+                word
+                for category in patterns
+                for word in self.labels("vernacular").get((language, category), ())
+            }
+            if total_patterns > 0:
+                scores[language] = len(matched) / total_patterns
+        return scores
+
+    def vernacular_intent(self, language: str) -> str:
+        matched = self.labels("vernacular")
+        for category, intent in VERNACULAR_INTENT_ORDER:
+            if (language, category) in matched:
+                return intent
+        return "general_query"
+
+    # Trading chat
+
+    @property
+    def conversation_candidates(self) -> List[str]:
+        """Every trading-chat intent with a keyword hit"""
+        return sorted(self.labels("conversation"))
+
+    @property
+    def conversation_intent(self) -> Optional[str]:
+        """Intent when exactly one trading-chat intent matched in a plain request, else None"""
+        matched = self.labels("conversation")
+        if len(matched) != 1 or self.labels("conversation_context"):
+            return None
+        return next(iter(matched))
+
+
+class MessageClassifier:
+    """Shared one-pass classifier over every keyword table"""
+
+    def __init__(self):
+        entries: List[Tuple[str, str, Any, bool]] = []
+
+        for category, patterns in SUPPORT_QUERY_PATTERNS.items():
+            for keyword in patterns["keywords"]:
+                entries.append((keyword, "category", category, False))
+            for intent in patterns["intents"]:
+                for word in intent.split("_"):
+                    entries.append((word, "intent_word", word, False))
+
+        for level, keywords in URGENCY_KEYWORDS.items():
+            for keyword in keywords:
+                entries.append((keyword, "urgency", level, False))
+
+        for term in COMPLEXITY_TERMS:
+            entries.append((term, "complexity", term, False))
+
+        for symbol in STOCK_SYMBOLS:
+            entries.append((symbol.lower(), "symbol", symbol, False))
+
+        for language, patterns in VERNACULAR_PATTERNS.items():
+            for category, words in patterns.items():
+                for word in words:
+                    entries.append((word.lower(), "vernacular", (language, category), False))
+
+        for intent, keywords in CONVERSATION_INTENT_KEYWORDS.items():
+            for keyword in keywords:
+                entries.append((keyword, "conversation", intent, True))
+        for keyword in CONVERSATION_CONTEXT_KEYWORDS:
+            entries.append((keyword, "conversation_context", keyword, True))
+
+        self.automaton = KeywordAutomaton(entries)
+
+    def analyze(self, text: str) -> MessageAnalysis:
+        """Scan a message once and return every keyword hit"""
+        lowered = text.lower()
+        return MessageAnalysis(text=lowered, hits=self.automaton.scan(lowered))
+
+
+@lru_cache(maxsize=1)
+def get_message_classifier() -> MessageClassifier:
+    """Process-wide classifier, compiled on first use"""
+    return MessageClassifier()
@@ -0,0 +1,430 @@
+"""
+LLM Gateway
+Shared access to the model provider: one pooled client, per-tier concurrency
+and token budgets, a normalised-prompt response cache and coalescing of
+identical in-flight requests
+"""
+
+import abc
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Union
+import httpx
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+
+# Words that don't change the answer to an FAQ-style question
+CACHE_FILLER_WORDS = {
+    "a", "an", "the", "please", "pls", "plz", "kindly", "can", "could", "would",
+    "you", "u", "me", "i", "my", "tell", "hi", "hello", "hey", "thanks", "thank"
+}
+
+
+class LLMUnavailableError(Exception):
+    """No completion within the caller's timeout or the tier's budget
+
+    Callers treat this like any provider failure and fall back to their
+    template answers.
+    """
+
+    def __init__(self, reason: str, detail: str = ""):
+        super().__init__(f"{reason}: {detail}" if detail else reason)
+        self.reason = reason
+
+
+@dataclass
+class LLMRequest:
+    """One chat completion request"""
+    messages: List[Dict[str, str]]
+    model: str = "gpt-3.5-turbo"
+    max_tokens: int = 300
+    temperature: float = 0.7
+    tier: str = "default"
+    timeout: Optional[float] = None  # seconds; the tier's timeout when unset
+    cache_ttl: Optional[float] = None  # seconds; responses are only cached when set
+    options: Dict[str, Any] = field(default_factory=dict)  # response_format, penalties, ...
+
+    def _settings(self) -> str:
+        return json.dumps(
+            {"model": self.model, "max_tokens": self.max_tokens,
+             "temperature": self.temperature, "options": self.options},
+            sort_keys=True
+        )
+
+    def exact_key(self) -> str:
+        """Identity of the request, used to coalesce in-flight duplicates
+
+        Includes the tier, so a caller never rides on another tier's budget
+        and timeout.
+        """
+        payload = self.tier + self._settings() + json.dumps(self.messages, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def semantic_key(self) -> str:
+        """Cache key that ignores case, punctuation and filler in the final user turn"""
+        *context, last = self.messages
+        words = [
+            word for word in re.findall(r"\w+", last.get("content", "").lower())
+            if word not in CACHE_FILLER_WORDS
+        ]
+        payload = self._settings() + json.dumps(context, sort_keys=True) + last.get("role", "") + " ".join(words)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class LLMResponse:
+    """Completion text plus usage and how it was served"""
+    content: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0
+    cached: bool = False
+    coalesced: bool = False
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+def estimate_tokens(messages: List[Dict[str, str]]) -> int:
+    """Rough prompt size (~4 characters per token plus per-message overhead)"""
+    return sum(len(m.get("content", "")) // 4 + 4 for m in messages)
+
+
+class LLMProvider(abc.ABC):
+    """Model provider interface: one chat completion per call"""
+
+    @abc.abstractmethod
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        """Run one chat completion"""
+
+    async def aclose(self):
+        pass
+
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI-compatible chat completions over one pooled (HTTP/2 when available) client"""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: str = OPENAI_BASE_URL,
+        max_connections: int = 100,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.api_key = api_key or os.environ.get("OPENAI_API_KEY")
+        self.base_url = base_url
+        self.max_connections = max_connections
+
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared pooled client, created on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE and self._transport is None,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                timeout=httpx.Timeout(60.0, connect=10.0),
+                transport=self._transport
+            )
+        return self._client
+
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        if not self.api_key:
+            raise LLMUnavailableError("no_credentials", "OPENAI_API_KEY is not configured")
+
+        payload = {
+            "model": request.model,
+            "messages": request.messages,
+            "max_tokens": request.max_tokens,
+            "temperature": request.temperature,
+            **request.options
+        }
+        response = await self.client.post(
+            f"{self.base_url}/chat/completions",
+            json=payload,
+            headers={"Authorization": f"Bearer {self.api_key}"}
+        )
+        if response.status_code != 200:
+            raise LLMUnavailableError("provider_error", f"HTTP {response.status_code}: {response.text[:200]}")
+
+        data = response.json()
+        usage = data.get("usage") or {}
+        return LLMResponse(
+            content=data["choices"][0]["message"]["content"],
+            model=data.get("model", request.model),
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0)
+        )
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+
+
+class FakeLLMProvider(LLMProvider):
+    """In-process provider for tests and local development"""
+
+    def __init__(
+        self,
+        responder: Union[str, Callable[[LLMRequest], str]] = "OK",
+        latency: float = 0.0,
+        error: Optional[Exception] = None,
+    ):
+        self.responder = responder
+        self.latency = latency
+        self.error = error
+        self.calls: List[LLMRequest] = []
+
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        self.calls.append(request)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.error is not None:
+            raise self.error
+
+        content = self.responder(request) if callable(self.responder) else self.responder
+        return LLMResponse(
+            content=content,
+            model=request.model,
+            prompt_tokens=estimate_tokens(request.messages),
+            completion_tokens=len(content) // 4
+        )
+
+
+@dataclass
+class TierLimits:
+    """Provider access allowed to one tier"""
+    max_concurrency: int
+    tokens_per_minute: int
+    timeout: float  # seconds, including time spent waiting for a slot
+
+
+DEFAULT_TIER_LIMITS = {
+    "LITE": TierLimits(max_concurrency=16, tokens_per_minute=60_000, timeout=8.0),
+    "PRO": TierLimits(max_concurrency=32, tokens_per_minute=150_000, timeout=10.0),
+    "ELITE": TierLimits(max_concurrency=32, tokens_per_minute=300_000, timeout=12.0),
+    "BLACK": TierLimits(max_concurrency=64, tokens_per_minute=600_000, timeout=20.0),
+    "default": TierLimits(max_concurrency=32, tokens_per_minute=200_000, timeout=15.0),
+}
+
+
+class TokenBudget:
+    """Per-minute token allowance refilled continuously
+
+    Requests over budget are refused rather than queued, so the caller can
+    answer from a template straight away.
+    """
+
+    def __init__(self, tokens_per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = tokens_per_minute
+        self.rate = tokens_per_minute / 60
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    @property
+    def available(self) -> float:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return self._tokens
+
+    def try_consume(self, tokens: float) -> bool:
+        if tokens > self.available:
+            return False
+        self._tokens -= tokens
+        return True
+
+    def adjust(self, tokens: float):
+        """Return (positive) or charge (negative) the difference from an estimate"""
+        self._tokens = min(self.capacity, self.available + tokens)
+
+
+class ResponseCache:
+    """LRU of completed responses with a per-entry TTL"""
+
+    def __init__(self, max_entries: int = 5000, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, response)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= self._clock():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: str, response: LLMResponse, ttl: float):
+        self._entries[key] = (self._clock() + ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class LLMGateway:
+    """Single entry point for chat completions across the platform
+
+    Each request is served, in order of preference, from the response cache
+    (when the caller opts in with a TTL), by joining an identical request
+    already in flight, or by the provider under its tier's concurrency
+    limit, token budget and timeout. Failures of any kind surface as
+    LLMUnavailableError.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        tier_limits: Optional[Dict[str, TierLimits]] = None,
+        cache_size: int = 5000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.provider = provider
+        self.tier_limits = {**DEFAULT_TIER_LIMITS, **(tier_limits or {})}
+        self.cache = ResponseCache(cache_size, clock)
+
+        self._clock = clock
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._budgets: Dict[str, TokenBudget] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+        self.stats = {
+            "requests": 0, "cache_hits": 0, "coalesced": 0, "provider_calls": 0,
+            "timeouts": 0, "over_budget": 0, "errors": 0,
+            "prompt_tokens": 0, "completion_tokens": 0
+        }
+
+    def limits(self, tier: str) -> TierLimits:
+        return self.tier_limits.get(tier, self.tier_limits["default"])
+
+    def _tier_key(self, tier: str) -> str:
+        return tier if tier in self.tier_limits else "default"
+
+    def _semaphore(self, tier: str) -> asyncio.Semaphore:
+        key = self._tier_key(tier)
+        if key not in self._semaphores:
+            self._semaphores[key] = asyncio.Semaphore(self.limits(tier).max_concurrency)
+        return self._semaphores[key]
+
+    def _budget(self, tier: str) -> TokenBudget:
+        key = self._tier_key(tier)
+        if key not in self._budgets:
+            self._budgets[key] = TokenBudget(self.limits(tier).tokens_per_minute, self._clock)
+        return self._budgets[key]
+
+    async def complete(self, request: LLMRequest) -> LLMResponse:
+        """Serve a completion from cache, an identical in-flight request, or the provider"""
+
+        self.stats["requests"] += 1
+
+        cache_key = request.semantic_key() if request.cache_ttl else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                return replace(cached, cached=True, coalesced=False, latency=0.0)
+
+        key = request.exact_key()
+        leader = self._in_flight.get(key)
+        if leader is not None:
+            self.stats["coalesced"] += 1
+            # Shielded so one caller giving up doesn't cancel the shared call
+            response = await asyncio.shield(leader)
+            return replace(response, coalesced=True)
+
+        future = asyncio.get_running_loop().create_future()
+        # Mark the outcome as observed even if nobody joined
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[key] = future
+
+        try:
+            response = await self._call_provider(request)
+        except asyncio.CancelledError:
+            # Followers were not cancelled; they fail like any unserved call
+            future.set_exception(LLMUnavailableError("cancelled", "the shared request was cancelled"))
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(response)
+            if cache_key is not None:
+                self.cache.put(cache_key, response, request.cache_ttl)
+            return response
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def _call_provider(self, request: LLMRequest) -> LLMResponse:
+        limits = self.limits(request.tier)
+        budget = self._budget(request.tier)
+
+        estimate = estimate_tokens(request.messages) + request.max_tokens
+        if not budget.try_consume(estimate):
+            self.stats["over_budget"] += 1
+            raise LLMUnavailableError("over_budget", f"tier {request.tier} token budget exhausted")
+
+        async def bounded() -> LLMResponse:
+            async with self._semaphore(request.tier):
+                self.stats["provider_calls"] += 1
+                return await self.provider.complete(request)
+
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(bounded(), request.timeout or limits.timeout)
+        except asyncio.TimeoutError:
+            # The provider may still bill for the abandoned call, so the estimate stays charged
+            self.stats["timeouts"] += 1
+            raise LLMUnavailableError("timeout", f"no completion within {request.timeout or limits.timeout}s")
+        except LLMUnavailableError:
+            budget.adjust(estimate)
+            self.stats["errors"] += 1
+            raise
+        except Exception as e:
+            budget.adjust(estimate)
+            self.stats["errors"] += 1
+            logger.error(f"LLM provider call failed: {e}")
+            raise LLMUnavailableError("provider_error", str(e)) from e
+
+        budget.adjust(estimate - (response.total_tokens or estimate))
+        response.latency = time.perf_counter() - started
+        self.stats["prompt_tokens"] += response.prompt_tokens
+        self.stats["completion_tokens"] += response.completion_tokens
+        return response
+
+    async def aclose(self):
+        await self.provider.aclose()
+
+
+@lru_cache(maxsize=8)
+def get_llm_gateway(api_key: Optional[str] = None) -> LLMGateway:
+    """Process-wide gateway per API key, so every engine shares one pool and budget"""
+    return LLMGateway(OpenAIProvider(api_key))
@@ -0,0 +1,371 @@
+"""
+Metric Rollup Store
+Pre-aggregated Redis time-series rollups for monitoring and SLA tracking
+"""
+
+import asyncio
+import math
+import time
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+from dataclasses import dataclass, field
+from collections import defaultdict
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RollupResolution:
+    """Bucket width and how long buckets of that width are retained"""
+    seconds: int
+    retention: int  # seconds
+
+
+DEFAULT_RESOLUTIONS: Tuple[RollupResolution, ...] = (
+    RollupResolution(seconds=10, retention=7200),          # 10s buckets for 2 hours
+    RollupResolution(seconds=60, retention=93600),         # 1m buckets for 26 hours
+    RollupResolution(seconds=3600, retention=8 * 86400),   # 1h buckets for 8 days
+)
+
+# Log-scale histogram: each bin spans a factor of SKETCH_GAMMA, so quantiles
+# read back from a rollup carry roughly 2.5% relative error.
+SKETCH_GAMMA = 1.05
+_LOG_GAMMA = math.log(SKETCH_GAMMA)
+_ZERO_BIN = "z"
+
+
+def _sketch_bin(value: float) -> str:
+    """Histogram bin for a value"""
+    if value <= 0:
+        return _ZERO_BIN
+    return str(math.ceil(math.log(value) / _LOG_GAMMA))
+
+
+def _bin_value(bin_key: str) -> float:
+    """Representative value of a histogram bin"""
+    if bin_key == _ZERO_BIN:
+        return 0.0
+    index = int(bin_key)
+    return 2 * SKETCH_GAMMA ** index / (SKETCH_GAMMA + 1)
+
+
+def _threshold_field(threshold: float) -> str:
+    return f"le:{threshold!r}"
+
+
+@dataclass
+class RollupSummary:
+    """Aggregate of every sample in a set of rollup buckets"""
+    count: int = 0
+    total: float = 0.0
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    bins: Dict[str, int] = field(default_factory=dict)
+    at_or_below: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, value: float, thresholds: Iterable[float] = ()):
+        """Fold a single sample into the summary"""
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+        bin_key = _sketch_bin(value)
+        self.bins[bin_key] = self.bins.get(bin_key, 0) + 1
+        for threshold in thresholds:
+            key = _threshold_field(threshold)
+            self.at_or_below[key] = self.at_or_below.get(key, 0) + (value <= threshold)
+
+    def merge(self, other: "RollupSummary"):
+        """Fold another summary into this one"""
+        self.count += other.count
+        self.total += other.total
+        if other.minimum is not None:
+            self.minimum = other.minimum if self.minimum is None else min(self.minimum, other.minimum)
+        if other.maximum is not None:
+            self.maximum = other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+        for bin_key, count in other.bins.items():
+            self.bins[bin_key] = self.bins.get(bin_key, 0) + count
+        for key, count in other.at_or_below.items():
+            self.at_or_below[key] = self.at_or_below.get(key, 0) + count
+
+    def count_at_or_below(self, threshold: float) -> int:
+        """Samples <= threshold, exact when the threshold was tracked on write"""
+        key = _threshold_field(threshold)
+        if key in self.at_or_below or not self.bins:
+            return self.at_or_below.get(key, 0)
+        return sum(c for b, c in self.bins.items() if _bin_value(b) <= threshold)
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile from the log-scale histogram"""
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = 0
+        for bin_key in sorted(self.bins, key=lambda b: -math.inf if b == _ZERO_BIN else int(b)):
+            seen += self.bins[bin_key]
+            if seen > rank:
+                value = _bin_value(bin_key)
+                if self.minimum is not None:
+                    value = max(value, self.minimum)
+                if self.maximum is not None:
+                    value = min(value, self.maximum)
+                return value
+        return self.maximum if self.maximum is not None else 0.0
+
+
+class MetricRollupWriter:
+    """Pipelined writer and reader for pre-aggregated metric rollups
+
+    Samples are folded into in-process accumulators per (metric, resolution,
+    bucket) and flushed to Redis in a single non-transactional pipeline, so
+    Redis work scales with the number of live buckets rather than the number
+    of samples. Each bucket is a hash of count/sum/histogram counters plus a
+    small sorted set carrying min/max (ZADD LT/GT keeps concurrent writers
+    correct without Lua). Windows are read back in O(buckets).
+
+    Session activity is tracked with one HyperLogLog per minute so active
+    session counts never need a KEYS scan.
+    """
+
+    def __init__(
+        self,
+        redis_client: Any,
+        namespace: str = "rollup",
+        resolutions: Iterable[RollupResolution] = DEFAULT_RESOLUTIONS,
+        flush_interval: float = 1.0,
+        max_read_buckets: int = 60,
+    ):
+        self.redis = redis_client
+        self.namespace = namespace
+        self.resolutions = tuple(sorted(resolutions, key=lambda r: r.seconds))
+        self.flush_interval = flush_interval
+        self.max_read_buckets = max_read_buckets
+
+        self._pending: Dict[Tuple[str, int, int], RollupSummary] = defaultdict(RollupSummary)
+        self._pending_sessions: Dict[int, set] = defaultdict(set)
+        self._pending_gauges: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._pending_counters: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._expiry_set: Dict[str, float] = {}
+        self._flush_lock = asyncio.Lock()
+        self.running = False
+
+    # Keys
+
+    def _bucket_key(self, metric: str, resolution: int, bucket_start: int) -> str:
+        return f"{self.namespace}:{metric}:{resolution}:{bucket_start}"
+
+    def _session_key(self, minute_start: int) -> str:
+        return f"{self.namespace}:sessions:{minute_start}"
+
+    # Writing
+
+    def record(
+        self,
+        metric: str,
+        value: float,
+        timestamp: Optional[float] = None,
+        thresholds: Iterable[float] = (),
+        session_id: Optional[str] = None,
+    ):
+        """Buffer a sample; it reaches Redis on the next flush"""
+
+        ts = timestamp if timestamp is not None else time.time()
+        thresholds = tuple(thresholds)
+
+        for resolution in self.resolutions:
+            bucket_start = int(ts // resolution.seconds) * resolution.seconds
+            self._pending[(metric, resolution.seconds, bucket_start)].add(value, thresholds)
+
+        if session_id:
+            self.track_session(session_id, ts)
+
+    def track_session(self, session_id: str, timestamp: Optional[float] = None):
+        """Mark a session as active in the current minute"""
+        ts = timestamp if timestamp is not None else time.time()
+        self._pending_sessions[int(ts // 60) * 60].add(session_id)
+
+    def set_gauge(self, hash_key: str, field_name: str, value: float):
+        """Buffer a last-value write to a Redis hash"""
+        self._pending_gauges[hash_key][field_name] = value
+
+    def incr_counter(self, hash_key: str, field_name: str, amount: int = 1):
+        """Buffer a counter increment on a Redis hash"""
+        self._pending_counters[hash_key][field_name] += amount
+
+    async def flush(self):
+        """Write all buffered accumulators to Redis in one pipeline"""
+
+        async with self._flush_lock:
+            if not (self._pending or self._pending_sessions or
+                    self._pending_gauges or self._pending_counters):
+                return
+
+            batch, self._pending = self._pending, defaultdict(RollupSummary)
+            sessions, self._pending_sessions = self._pending_sessions, defaultdict(set)
+            gauges, self._pending_gauges = self._pending_gauges, defaultdict(dict)
+            counters, self._pending_counters = (
+                self._pending_counters, defaultdict(lambda: defaultdict(int))
+            )
+            retention = {r.seconds: r.retention for r in self.resolutions}
+            now = time.time()
+            new_expiries: Dict[str, float] = {}
+
+            try:
+                pipe = self.redis.pipeline(transaction=False)
+
+                for (metric, resolution, bucket_start), summary in batch.items():
+                    key = self._bucket_key(metric, resolution, bucket_start)
+                    pipe.hincrby(key, "count", summary.count)
+                    pipe.hincrbyfloat(key, "sum", summary.total)
+                    for field_name, count in summary.bins.items():
+                        pipe.hincrby(key, f"b:{field_name}", count)
+                    for field_name, count in summary.at_or_below.items():
+                        pipe.hincrby(key, field_name, count)
+                    pipe.zadd(f"{key}:ext", {"min": summary.minimum}, lt=True)
+                    pipe.zadd(f"{key}:ext", {"max": summary.maximum}, gt=True)
+
+                    expires_at = bucket_start + resolution + retention[resolution]
+                    if key not in self._expiry_set:
+                        ttl = max(int(expires_at - now), 1)
+                        pipe.expire(key, ttl)
+                        pipe.expire(f"{key}:ext", ttl)
+                        new_expiries[key] = expires_at
+
+                for minute_start, session_ids in sessions.items():
+                    key = self._session_key(minute_start)
+                    pipe.pfadd(key, *session_ids)
+                    if key not in self._expiry_set:
+                        pipe.expire(key, 3600)
+                        new_expiries[key] = minute_start + 3600
+
+                for hash_key, values in gauges.items():
+                    pipe.hset(hash_key, mapping=values)
+                for hash_key, increments in counters.items():
+                    for field_name, amount in increments.items():
+                        pipe.hincrby(hash_key, field_name, amount)
+
+                await pipe.execute()
+
+            except Exception as e:
+                logger.error(f"Rollup flush failed: {e}")
+                # Put the batch back so the samples are retried on the next flush
+                for key, summary in batch.items():
+                    self._pending[key].merge(summary)
+                for minute_start, session_ids in sessions.items():
+                    self._pending_sessions[minute_start].update(session_ids)
+                for hash_key, values in gauges.items():
+                    self._pending_gauges[hash_key] = {**values, **self._pending_gauges[hash_key]}
+                for hash_key, increments in counters.items():
+                    for field_name, amount in increments.items():
+                        self._pending_counters[hash_key][field_name] += amount
+                return
+
+            self._expiry_set.update(new_expiries)
+            self._expiry_set = {k: t for k, t in self._expiry_set.items() if t > now}
+
+    async def run(self):
+        """Flush buffered samples every flush_interval until stopped"""
+
+        self.running = True
+        while self.running:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def stop(self):
+        self.running = False
+        await self.flush()
+
+    # Reading
+
+    def _read_resolution(self, window_seconds: int) -> RollupResolution:
+        """Finest resolution covering the window within max_read_buckets"""
+        for resolution in self.resolutions:
+            if (resolution.retention >= window_seconds and
+                    window_seconds / resolution.seconds <= self.max_read_buckets):
+                return resolution
+        return self.resolutions[-1]
+
+    async def read_window(
+        self,
+        metric: str,
+        window_seconds: int,
+        now: Optional[float] = None,
+    ) -> RollupSummary:
+        """Aggregate of all samples in the trailing window (bucket-aligned)"""
+
+        now = now if now is not None else time.time()
+        resolution = self._read_resolution(window_seconds).seconds
+        first = int((now - window_seconds) // resolution) * resolution
+        last = int(now // resolution) * resolution
+        starts = list(range(first, last + 1, resolution))
+
+        summary = RollupSummary()
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for bucket_start in starts:
+                key = self._bucket_key(metric, resolution, bucket_start)
+                pipe.hgetall(key)
+                pipe.zrange(f"{key}:ext", 0, -1, withscores=True)
+            results = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Rollup read failed: {e}")
+            results = []
+
+        for i in range(0, len(results), 2):
+            fields, extremes = results[i], results[i + 1]
+            if fields:
+                summary.merge(self._decode_bucket(fields, extremes))
+
+        # Samples recorded since the last flush
+        for bucket_start in starts:
+            pending = self._pending.get((metric, resolution, bucket_start))
+            if pending:
+                summary.merge(pending)
+
+        return summary
+
+    @staticmethod
+    def _decode_bucket(fields: Dict[Any, Any], extremes: List[Tuple[Any, float]]) -> RollupSummary:
+        summary = RollupSummary()
+        for raw_name, raw_value in fields.items():
+            name = raw_name.decode() if isinstance(raw_name, bytes) else raw_name
+            if name == "count":
+                summary.count = int(raw_value)
+            elif name == "sum":
+                summary.total = float(raw_value)
+            elif name.startswith("b:"):
+                summary.bins[name[2:]] = int(raw_value)
+            elif name.startswith("le:"):
+                summary.at_or_below[name] = int(raw_value)
+        for raw_name, score in extremes:
+            name = raw_name.decode() if isinstance(raw_name, bytes) else raw_name
+            if name == "min":
+                summary.minimum = float(score)
+            elif name == "max":
+                summary.maximum = float(score)
+        return summary
+
+    async def count_active_sessions(self, window_seconds: int = 300, now: Optional[float] = None) -> int:
+        """Approximate distinct sessions seen in the trailing window"""
+
+        now = now if now is not None else time.time()
+        first = int((now - window_seconds) // 60) * 60
+        minutes = range(first, int(now // 60) * 60 + 1, 60)
+
+        try:
+            remote = await self.redis.pfcount(*[self._session_key(m) for m in minutes])
+        except Exception as e:
+            logger.error(f"Session count failed: {e}")
+            remote = 0
+
+        pending = set()
+        for minute_start in minutes:
+            pending.update(self._pending_sessions.get(minute_start, ()))
+
+        # Unflushed sessions may already be in the HLL; this is an upper estimate
+        return int(remote) + len(pending)
@@ -4,6 +4,7 @@ Real-time monitoring and SLA tracking for support system
 """
 
 import asyncio
+import math
 import time
 import json
 from typing import Dict, List, Optional, Any
@@ -11,13 +12,29 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
-import redis
+import redis.asyncio as aioredis
 from collections import defaultdict, deque
 
 from .models import SupportTier
+from .metrics_rollup import MetricRollupWriter, RollupSummary
 
 logger = logging.getLogger(__name__)
 
+# Per-tier time targets in milliseconds, shared with the request scheduler
+RESPONSE_TIME_SLA_MS = {
+    SupportTier.LITE: 30000,    # 30 seconds
+    SupportTier.PRO: 15000,     # 15 seconds
+    SupportTier.ELITE: 10000,   # 10 seconds
+    SupportTier.BLACK: 5000     # 5 seconds
+}
+
+QUEUE_WAIT_SLA_MS = {
+    SupportTier.LITE: 7200000,  # 2 hours
+    SupportTier.PRO: 1800000,   # 30 minutes
+    SupportTier.ELITE: 300000,  # 5 minutes
+    SupportTier.BLACK: 60000    # 1 minute
+}
+
 
 class MetricType(Enum):
     """Types of performance metrics"""
@@ -66,11 +83,16 @@ class PerformanceMonitor:
     """Real-time performance monitoring for AI support system"""
     
     def __init__(self):
-        self.redis = redis.Redis(decode_responses=True)
+        self.redis = aioredis.Redis(decode_responses=True)
         self.metrics_buffer = defaultdict(lambda: deque(maxlen=1000))
         self.sla_targets = self._load_sla_targets()
         self.current_sla_status = {}
         
+        # Pre-aggregated rollups replace the per-sample JSON time series
+        self.rollups = MetricRollupWriter(self.redis, namespace="metrics")
+        self.sla_check_interval = 10  # seconds between per-key compliance checks
+        self._last_sla_check: Dict[str, float] = {}
+        
         # Start monitoring tasks
         asyncio.create_task(self._start_monitoring())
         
@@ -80,12 +102,7 @@ class PerformanceMonitor:
         targets = {}
         
         # Response time SLAs
-        for tier, target_ms in [
-            (SupportTier.LITE, 30000),    # 30 seconds
-            (SupportTier.PRO, 15000),     # 15 seconds  
-            (SupportTier.ELITE, 10000),   # 10 seconds
-            (SupportTier.BLACK, 5000)     # 5 seconds
-        ]:
+        for tier, target_ms in RESPONSE_TIME_SLA_MS.items():
             key = f"{tier.value}_{MetricType.RESPONSE_TIME.value}"
             targets[key] = SLATarget(
                 tier=tier,
@@ -107,12 +124,7 @@ class PerformanceMonitor:
             )
         
         # Queue wait time SLAs  
-        for tier, target_ms in [
-            (SupportTier.LITE, 7200000),  # 2 hours
-            (SupportTier.PRO, 1800000),   # 30 minutes
-            (SupportTier.ELITE, 300000),  # 5 minutes
-            (SupportTier.BLACK, 60000)    # 1 minute
-        ]:
+        for tier, target_ms in QUEUE_WAIT_SLA_MS.items():
             key = f"{tier.value}_{MetricType.QUEUE_WAIT_TIME.value}"
             targets[key] = SLATarget(
                 tier=tier,
@@ -166,26 +178,34 @@ class PerformanceMonitor:
         except Exception as e:
             logger.error(f"Metric recording failed: {e}")
     
+    def _rollup_name(self, tier: SupportTier, metric_type: MetricType) -> str:
+        """Rollup series name for a tier/metric pair"""
+        return f"{tier.value}:{metric_type.value}"
+    
+    def _is_ceiling_target(self, sla_target: SLATarget) -> bool:
+        """Time-based targets are a maximum; everything else is a minimum"""
+        return sla_target.metric in [MetricType.RESPONSE_TIME, MetricType.QUEUE_WAIT_TIME]
+    
+    def _sla_boundary(self, sla_target: SLATarget) -> float:
+        """Value whose at-or-below count splits compliant from breaching samples"""
+        if self._is_ceiling_target(sla_target):
+            return sla_target.target_value
+        # Largest float strictly below the minimum target
+        return math.nextafter(sla_target.target_value, -math.inf)
+    
     async def _store_metric(self, metric: PerformanceMetric):
-        """Store metric in Redis"""
+        """Fold metric into the Redis rollups (flushed in batches)"""
         
         try:
-            # Time-series key
-            ts_key = f"metrics:{metric.tier.value}:{metric.metric_type.value}"
-            
-            # Store with timestamp as score for time-based queries
-            metric_data = {
-                "value": metric.value,
-                "timestamp": metric.timestamp.isoformat(),
-                "metadata": metric.metadata
-            }
-            
-            timestamp_score = metric.timestamp.timestamp()
-            await self.redis.zadd(ts_key, {json.dumps(metric_data): timestamp_score})
-            
-            # Keep only last 24 hours of data
-            cutoff_time = time.time() - 86400
-            await self.redis.zremrangebyscore(ts_key, 0, cutoff_time)
+            sla_target = self.sla_targets.get(f"{metric.tier.value}_{metric.metric_type.value}")
+            
+            # Track the SLA boundary exactly so compliance never relies on the sketch
+            self.rollups.record(
+                self._rollup_name(metric.tier, metric.metric_type),
+                metric.value,
+                timestamp=metric.timestamp.timestamp(),
+                thresholds=(self._sla_boundary(sla_target),) if sla_target else ()
+            )
             
         except Exception as e:
             logger.error(f"Metric storage failed: {e}")
@@ -200,18 +220,24 @@ class PerformanceMonitor:
             if not sla_target:
                 return
             
-            # Get recent metrics for compliance calculation
-            recent_metrics = await self._get_recent_metrics(
+            # Bound Redis reads: at most one compliance check per key per interval
+            now = time.time()
+            if now - self._last_sla_check.get(sla_key, 0) < self.sla_check_interval:
+                return
+            self._last_sla_check[sla_key] = now
+            
+            # Read rollups for the measurement window
+            summary = await self._get_recent_summary(
                 metric.tier,
                 metric.metric_type,
                 sla_target.measurement_window
             )
             
-            if not recent_metrics:
+            if not summary.count:
                 return
             
             # Calculate compliance
-            compliance_result = await self._calculate_compliance(recent_metrics, sla_target)
+            compliance_result = await self._calculate_compliance(summary, sla_target)
             
             # Update SLA status
             self.current_sla_status[sla_key] = compliance_result
@@ -223,56 +249,32 @@ class PerformanceMonitor:
         except Exception as e:
             logger.error(f"SLA compliance check failed: {e}")
     
-    async def _get_recent_metrics(
+    async def _get_recent_summary(
         self,
         tier: SupportTier,
         metric_type: MetricType,
         window_seconds: int
-    ) -> List[PerformanceMetric]:
-        """Get recent metrics within time window"""
+    ) -> RollupSummary:
+        """Get aggregated metrics within time window"""
         
         try:
-            ts_key = f"metrics:{tier.value}:{metric_type.value}"
-            
-            # Get metrics from last window_seconds
-            cutoff_time = time.time() - window_seconds
-            
-            raw_metrics = await self.redis.zrangebyscore(
-                ts_key,
-                cutoff_time,
-                time.time(),
-                withscores=True
+            return await self.rollups.read_window(
+                self._rollup_name(tier, metric_type),
+                window_seconds
             )
             
-            metrics = []
-            for metric_json, timestamp_score in raw_metrics:
-                try:
-                    metric_data = json.loads(metric_json)
-                    metric = PerformanceMetric(
-                        metric_type=metric_type,
-                        tier=tier,
-                        value=metric_data["value"],
-                        timestamp=datetime.fromisoformat(metric_data["timestamp"]),
-                        metadata=metric_data["metadata"]
-                    )
-                    metrics.append(metric)
-                except Exception as e:
-                    logger.warning(f"Failed to parse metric: {e}")
-            
-            return metrics
-            
         except Exception as e:
             logger.error(f"Recent metrics retrieval failed: {e}")
-            return []
+            return RollupSummary()
     
     async def _calculate_compliance(
         self,
-        metrics: List[PerformanceMetric],
+        summary: RollupSummary,
         sla_target: SLATarget
     ) -> SLAStatus:
-        """Calculate SLA compliance for metrics"""
+        """Calculate SLA compliance for aggregated metrics"""
         
-        if not metrics:
+        if not summary.count:
             return SLAStatus(
                 tier=sla_target.tier,
                 metric=sla_target.metric,
@@ -284,30 +286,18 @@ class PerformanceMonitor:
                 last_updated=datetime.utcnow()
             )
         
-        values = [m.value for m in metrics]
+        at_or_below = summary.count_at_or_below(self._sla_boundary(sla_target))
+        current_value = summary.mean  # Average
         
-        if sla_target.metric in [MetricType.RESPONSE_TIME, MetricType.QUEUE_WAIT_TIME]:
+        if self._is_ceiling_target(sla_target):
             # For time-based metrics, target is maximum allowed
-            compliant_count = sum(1 for v in values if v <= sla_target.target_value)
-            current_value = sum(values) / len(values)  # Average
-            
-        elif sla_target.metric == MetricType.RESOLUTION_RATE:
-            # For resolution rate, target is minimum required
-            compliant_count = sum(1 for v in values if v >= sla_target.target_value)
-            current_value = sum(values) / len(values)  # Average
-            
-        elif sla_target.metric == MetricType.USER_SATISFACTION:
-            # For satisfaction, target is minimum required
-            compliant_count = sum(1 for v in values if v >= sla_target.target_value)
-            current_value = sum(values) / len(values)  # Average
-            
+            compliant_count = at_or_below
         else:
-            # Default: target is minimum required
-            compliant_count = sum(1 for v in values if v >= sla_target.target_value)
-            current_value = sum(values) / len(values)
+            # Resolution rate, satisfaction and the rest: target is minimum required
+            compliant_count = summary.count - at_or_below
         
-        compliance_percentage = (compliant_count / len(values)) * 100
-        breach_count = len(values) - compliant_count
+        compliance_percentage = (compliant_count / summary.count) * 100
+        breach_count = summary.count - compliant_count
         
         # Determine status
         if compliance_percentage >= (100 - sla_target.breach_threshold):
@@ -456,15 +446,16 @@ class PerformanceMonitor:
             recent_metrics = {}
             
             for metric_type in MetricType:
-                metrics = await self._get_recent_metrics(tier, metric_type, 3600)
-                if metrics:
-                    values = [m.value for m in metrics]
+                summary = await self._get_recent_summary(tier, metric_type, 3600)
+                if summary.count:
+                    latest = self.metrics_buffer[f"{tier.value}_{metric_type.value}"]
                     recent_metrics[metric_type.value] = {
-                        "count": len(values),
-                        "average": round(sum(values) / len(values), 2),
-                        "min": round(min(values), 2),
-                        "max": round(max(values), 2),
-                        "latest": round(values[-1], 2)
+                        "count": summary.count,
+                        "average": round(summary.mean, 2),
+                        "min": round(summary.minimum, 2),
+                        "max": round(summary.maximum, 2),
+                        "p95": round(summary.quantile(0.95), 2),
+                        "latest": round(latest[-1].value, 2) if latest else None
                     }
             
             return recent_metrics
@@ -484,21 +475,17 @@ class PerformanceMonitor:
             
             for tier in SupportTier:
                 # Get recent response times
-                response_metrics = await self._get_recent_metrics(
+                response_summary = await self._get_recent_summary(
                     tier, MetricType.RESPONSE_TIME, 3600
                 )
-                
-                if response_metrics:
-                    total_requests += len(response_metrics)
-                    total_response_time += sum(m.value for m in response_metrics)
+                total_requests += response_summary.count
+                total_response_time += response_summary.total
                 
                 # Get escalation metrics
-                escalation_metrics = await self._get_recent_metrics(
+                escalation_summary = await self._get_recent_summary(
                     tier, MetricType.ESCALATION_RATE, 3600
                 )
-                
-                if escalation_metrics:
-                    escalation_count += sum(m.value for m in escalation_metrics)
+                escalation_count += escalation_summary.total
             
             avg_response_time = total_response_time / total_requests if total_requests > 0 else 0
             
@@ -538,6 +525,9 @@ class PerformanceMonitor:
         """Start background monitoring tasks"""
         
         try:
+            # Start rollup flusher
+            asyncio.create_task(self.rollups.run())
+            
             # Start SLA monitoring loop
             asyncio.create_task(self._sla_monitoring_loop())
             
@@ -558,14 +548,14 @@ class PerformanceMonitor:
                 
                 # Check all SLA targets
                 for sla_key, sla_target in self.sla_targets.items():
-                    recent_metrics = await self._get_recent_metrics(
+                    summary = await self._get_recent_summary(
                         sla_target.tier,
                         sla_target.metric,
                         sla_target.measurement_window
                     )
                     
-                    if recent_metrics:
-                        compliance = await self._calculate_compliance(recent_metrics, sla_target)
+                    if summary.count:
+                        compliance = await self._calculate_compliance(summary, sla_target)
                         self.current_sla_status[sla_key] = compliance
                         
                         if compliance.status in ["warning", "breach"]:
@@ -581,15 +571,7 @@ class PerformanceMonitor:
             try:
                 await asyncio.sleep(3600)  # Cleanup every hour
                 
-                # Clean up old metrics (keep 24 hours)
-                cutoff_time = time.time() - 86400
-                
-                for tier in SupportTier:
-                    for metric_type in MetricType:
-                        ts_key = f"metrics:{tier.value}:{metric_type.value}"
-                        await self.redis.zremrangebyscore(ts_key, 0, cutoff_time)
-                
-                # Clean up old alerts (keep 1000 most recent)
+                # Metric rollups expire on their own; clean up old alerts (keep 1000 most recent)
                 await self.redis.ltrim("sla_alerts", 0, 999)
                 
                 logger.info("Metrics cleanup completed")
@@ -3,6 +3,7 @@ Zero-Knowledge Proof Engine for Support Transparency
 Cryptographic proof of support interactions without revealing sensitive data
 """
 
+import bisect
 import hashlib
 import json
 import time
@@ -42,14 +43,36 @@ class SupportAuditTrail:
     current_hash: str
 
 
+@dataclass
+class MerkleCheckpoint:
+    """Signed Merkle root published after a fixed number of audit leaves"""
+    leaf_count: int
+    root: str
+    timestamp: int
+    signature: str
+
+
 class ZKSupportProofEngine:
     """Generate zero-knowledge proofs for support interactions"""
     
-    def __init__(self, secret_key: str = None):
+    def __init__(
+        self,
+        secret_key: str = None,
+        checkpoint_interval: int = 1000,
+        checkpoint_path: Optional[str] = None
+    ):
         self.secret_key = secret_key or secrets.token_hex(32)
         self.proof_chain = []  # Blockchain-like audit trail
+        self.chain_index: Dict[str, int] = {}  # proof_id -> position in chain
         self.merkle_tree = MerkleTree()
         
+        # Roots are checkpointed every `checkpoint_interval` leaves and
+        # appended to `checkpoint_path` (JSON lines) for public auditors
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_path = checkpoint_path
+        self.checkpoints: List[MerkleCheckpoint] = []
+        self._checkpoint_sizes: List[int] = []
+        
     async def generate_interaction_proof(
         self,
         ticket_id: str,
@@ -186,14 +209,82 @@ class ZKSupportProofEngine:
             )
             
             # Add to chain
+            self.chain_index.setdefault(proof.proof_id, len(self.proof_chain))
             self.proof_chain.append(audit_entry)
             
             # Add to Merkle tree for batch verification
-            self.merkle_tree.add_leaf(current_hash)
+            leaf_count = self.merkle_tree.add_leaf(current_hash) + 1
+            
+            if self.checkpoint_interval and leaf_count % self.checkpoint_interval == 0:
+                self.create_checkpoint()
             
         except Exception as e:
             logger.error(f"Audit trail addition failed: {e}")
     
+    def create_checkpoint(self) -> Optional[MerkleCheckpoint]:
+        """Sign and persist the current Merkle root"""
+        
+        root = self.merkle_tree.get_root()
+        if root is None:
+            return None
+        
+        leaf_count = len(self.merkle_tree)
+        if self.checkpoints and self.checkpoints[-1].leaf_count == leaf_count:
+            return self.checkpoints[-1]
+        
+        checkpoint = MerkleCheckpoint(
+            leaf_count=leaf_count,
+            root=root,
+            timestamp=int(time.time()),
+            signature=self._sign_proof(f"{leaf_count}:{root}")
+        )
+        self.checkpoints.append(checkpoint)
+        self._checkpoint_sizes.append(leaf_count)
+        
+        if self.checkpoint_path:
+            try:
+                with open(self.checkpoint_path, "a") as f:
+                    f.write(json.dumps(asdict(checkpoint), sort_keys=True) + "\n")
+            except OSError as e:
+                logger.error(f"Merkle checkpoint persistence failed: {e}")
+        
+        logger.info(f"Merkle checkpoint at {leaf_count} leaves: {root[:16]}")
+        return checkpoint
+    
+    def _merkle_inclusion(self, proof_id: str) -> Optional[Dict[str, Any]]:
+        """Inclusion proof for a proof's audit leaf under its first covering checkpoint"""
+        
+        position = self.chain_index.get(proof_id)
+        if position is None:
+            return None
+        
+        leaf_hash = self.proof_chain[position].current_hash
+        leaf_index = self.merkle_tree.index_of(leaf_hash)
+        if leaf_index is None:
+            return None
+        
+        checkpoint_index = bisect.bisect_right(self._checkpoint_sizes, leaf_index)
+        
+        if checkpoint_index < len(self.checkpoints):
+            checkpoint = self.checkpoints[checkpoint_index]
+            return {
+                "leaf_hash": leaf_hash,
+                "leaf_index": leaf_index,
+                "checkpoint": asdict(checkpoint),
+                "proof_path": self.merkle_tree.get_proof_path(leaf_hash, checkpoint.leaf_count),
+                "status": "CHECKPOINTED"
+            }
+        
+        # Not yet covered by a published checkpoint; prove against the live root
+        return {
+            "leaf_hash": leaf_hash,
+            "leaf_index": leaf_index,
+            "root": self.merkle_tree.get_root(),
+            "leaf_count": len(self.merkle_tree),
+            "proof_path": self.merkle_tree.get_proof_path(leaf_hash),
+            "status": "PENDING_CHECKPOINT"
+        }
+    
     async def _store_proof(self, proof: ZKSupportProof):
         """Store proof for future verification"""
         
@@ -308,13 +399,7 @@ class ZKSupportProofEngine:
         
         try:
             # Find proof in audit chain
-            proof_entry = None
-            for entry in self.proof_chain:
-                if entry.interaction_id == proof_id:
-                    proof_entry = entry
-                    break
-            
-            if not proof_entry:
+            if proof_id not in self.chain_index:
                 return False
             
             # Verify chain integrity (simplified)
@@ -346,6 +431,7 @@ class ZKSupportProofEngine:
                     "no_tampering_detected": True
                 },
                 "verification_level": "CRYPTOGRAPHIC",
+                "merkle_inclusion": self._merkle_inclusion(proof_id),
                 "issuer": "GridWorks ZK Proof Engine",
                 "verification_url": proof.verification_url,
                 "qr_code": f"https://proofs.gridworks.ai/qr/{proof_id}",
@@ -360,64 +446,139 @@ class ZKSupportProofEngine:
 
 
 class MerkleTree:
-    """Simple Merkle tree for batch proof verification"""
+    """Append-only Merkle accumulator for batch proof verification
+    
+    Every level is kept so proof paths can be served for any leaf, but an
+    append only rehashes the new leaves' ancestors along the right edge of
+    the tree: O(log n) per leaf rather than a full rebuild. As before, an
+    odd node at the end of a level is paired with itself, so roots and
+    proof paths are unchanged.
+    """
     
     def __init__(self):
-        self.leaves = []
-        self.tree = []
+        self.levels: List[List[str]] = [[]]
+        self._leaf_index: Dict[str, int] = {}
+    
+    @property
+    def leaves(self) -> List[str]:
+        return self.levels[0]
+    
+    @property
+    def tree(self) -> List[List[str]]:
+        return self.levels if self.leaves else []
+    
+    def __len__(self) -> int:
+        return len(self.leaves)
+    
+    @staticmethod
+    def _hash_pair(left: str, right: str) -> str:
+        return hashlib.sha256(f"{left}{right}".encode()).hexdigest()
     
-    def add_leaf(self, data_hash: str):
-        """Add leaf to Merkle tree"""
-        self.leaves.append(data_hash)
-        self._build_tree()
+    def add_leaf(self, data_hash: str) -> int:
+        """Add leaf to Merkle tree, returning its index"""
+        self.add_leaves([data_hash])
+        return len(self.leaves) - 1
     
-    def _build_tree(self):
-        """Build Merkle tree from leaves"""
+    def add_leaves(self, data_hashes: List[str]):
+        """Append a batch of leaves, rehashing each affected node once"""
         
-        if not self.leaves:
+        if not data_hashes:
             return
         
-        current_level = self.leaves[:]
-        self.tree = [current_level]
+        first = len(self.leaves)
+        for offset, data_hash in enumerate(data_hashes):
+            self._leaf_index.setdefault(data_hash, first + offset)
+        self.leaves.extend(data_hashes)
         
-        while len(current_level) > 1:
-            next_level = []
-            
-            # Pair up hashes and hash them together
-            for i in range(0, len(current_level), 2):
-                left = current_level[i]
-                right = current_level[i + 1] if i + 1 < len(current_level) else left
-                
-                combined = hashlib.sha256(f"{left}{right}".encode()).hexdigest()
-                next_level.append(combined)
-            
-            current_level = next_level
-            self.tree.append(current_level)
+        # Parents from `dirty // 2` onwards include a new leaf (or a node that
+        # was previously paired with itself) and are recomputed
+        level = 0
+        dirty = first
+        while len(self.levels[level]) > 1:
+            nodes = self.levels[level]
+            if level + 1 == len(self.levels):
+                self.levels.append([])
+            parents = self.levels[level + 1]
+            
+            start = dirty // 2
+            del parents[start:]
+            for i in range(start * 2, len(nodes), 2):
+                right = nodes[i + 1] if i + 1 < len(nodes) else nodes[i]
+                parents.append(self._hash_pair(nodes[i], right))
+            
+            dirty = start
+            level += 1
+    
+    def index_of(self, leaf_hash: str) -> Optional[int]:
+        """Position of the first occurrence of a leaf"""
+        return self._leaf_index.get(leaf_hash)
     
     def get_root(self) -> Optional[str]:
         """Get Merkle root hash"""
-        return self.tree[-1][0] if self.tree and self.tree[-1] else None
+        return self.levels[-1][0] if self.leaves else None
+    
+    def _level_widths(self, size: int) -> List[int]:
+        widths = [size]
+        while widths[-1] > 1:
+            widths.append((widths[-1] + 1) // 2)
+        return widths
+    
+    def _right_edge(self, size: int) -> Dict[int, str]:
+        """Last node of every level as it was when the tree had `size` leaves"""
+        
+        edge: Dict[int, str] = {}
+        if size == len(self.leaves):
+            return edge  # Current nodes are already correct
+        
+        widths = self._level_widths(size)
+        for level in range(1, len(widths)):
+            child = (widths[level] - 1) * 2
+            left = self._node_at(level - 1, child, size, edge)
+            right = (
+                self._node_at(level - 1, child + 1, size, edge)
+                if child + 1 < widths[level - 1] else left
+            )
+            edge[level] = self._hash_pair(left, right)
+        return edge
     
-    def get_proof_path(self, leaf_hash: str) -> List[str]:
-        """Get proof path for leaf verification"""
+    def _node_at(self, level: int, index: int, size: int, edge: Dict[int, str]) -> str:
+        # Nodes whose leaves were all present at `size` have not changed since
+        if (index + 1) << level <= size or level not in edge:
+            return self.levels[level][index]
+        return edge[level]
+    
+    def get_root_at(self, size: int) -> Optional[str]:
+        """Root of the tree as it was after the first `size` leaves"""
+        
+        if size <= 0 or size > len(self.leaves):
+            return None
         
-        if leaf_hash not in self.leaves:
+        edge = self._right_edge(size)
+        top = len(self._level_widths(size)) - 1
+        return self._node_at(top, 0, size, edge)
+    
+    def get_proof_path(self, leaf_hash: str, tree_size: Optional[int] = None) -> List[str]:
+        """Get proof path for leaf verification
+        
+        With `tree_size`, the path proves inclusion under the root the tree
+        had at that size (e.g. a published checkpoint).
+        """
+        
+        index = self._leaf_index.get(leaf_hash)
+        size = len(self.leaves) if tree_size is None else tree_size
+        
+        if index is None or index >= size or size > len(self.leaves):
             return []
         
+        edge = self._right_edge(size)
         proof_path = []
-        index = self.leaves.index(leaf_hash)
-        
-        for level in self.tree[:-1]:
-            # Find sibling
-            if index % 2 == 0:
-                # Left node, sibling is right
-                sibling_index = index + 1
-            else:
-                # Right node, sibling is left
-                sibling_index = index - 1
-            
-            if sibling_index < len(level):
-                proof_path.append(level[sibling_index])
+        
+        for level, width in enumerate(self._level_widths(size)[:-1]):
+            # Left node's sibling is on the right and vice versa
+            sibling_index = index ^ 1
+            
+            if sibling_index < width:
+                proof_path.append(self._node_at(level, sibling_index, size, edge))
             
             index = index // 2
         
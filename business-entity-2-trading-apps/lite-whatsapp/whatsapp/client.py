@@ -6,11 +6,11 @@ Handles all WhatsApp message sending and media operations
 import asyncio
 import logging
 from typing import Dict, Any, List, Optional
-import httpx
 import json
 from datetime import datetime
 
 from app.core.config import settings
+from app.whatsapp.dispatcher import get_dispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +27,13 @@ class WhatsAppClient:
             "Authorization": f"Bearer {self.access_token}",
             "Content-Type": "application/json"
         }
+        
+        # Connection pool and rate limiter shared by every client on this number
+        self.dispatcher = get_dispatcher(
+            self.phone_number_id,
+            self.access_token,
+            throughput_mps=settings.WHATSAPP_THROUGHPUT_MPS
+        )
     
     async def send_text_message(
         self,
@@ -58,6 +65,19 @@ class WhatsAppClient:
     ) -> Dict[str, Any]:
         """Send interactive message with buttons"""
         
+        payload = self._build_interactive_payload(phone_number, message, buttons, header, footer)
+        return await self._send_message(payload)
+    
+    def _build_interactive_payload(
+        self,
+        phone_number: str,
+        message: str,
+        buttons: List[Dict[str, str]],
+        header: Optional[str] = None,
+        footer: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build interactive button message payload"""
+        
         # Build interactive payload
         interactive_payload = {
             "type": "button",
@@ -84,14 +104,12 @@ class WhatsAppClient:
             ]
         }
         
-        payload = {
+        return {
             "messaging_product": "whatsapp",
             "to": phone_number,
             "type": "interactive",
             "interactive": interactive_payload
         }
-        
-        return await self._send_message(payload)
     
     async def send_list_message(
         self,
@@ -227,50 +245,45 @@ class WhatsAppClient:
         
         url = f"{self.base_url}/{self.phone_number_id}/messages"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url,
-                headers=self.headers,
-                json=payload,
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            else:
-                logger.error(f"❌ Failed to mark message as read: {response.text}")
-                return {"error": response.text}
+        # Read receipts don't count against messaging throughput
+        response = await self.dispatcher.request("POST", url, paced=False, json=payload)
+        
+        if response.status_code == 200:
+            return response.json()
+        else:
+            logger.error(f"❌ Failed to mark message as read: {response.text}")
+            return {"error": response.text}
     
     async def get_media_url(self, media_id: str) -> str:
         """Get media URL from media ID"""
         
         url = f"{self.base_url}/{media_id}"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self.headers, timeout=30)
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("url", "")
-            else:
-                logger.error(f"❌ Failed to get media URL: {response.text}")
-                return ""
+        response = await self.dispatcher.request("GET", url, paced=False)
+        
+        if response.status_code == 200:
+            data = response.json()
+            return data.get("url", "")
+        else:
+            logger.error(f"❌ Failed to get media URL: {response.text}")
+            return ""
     
     async def download_media(self, media_url: str) -> bytes:
         """Download media content"""
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                media_url,
-                headers={"Authorization": f"Bearer {self.access_token}"},
-                timeout=60
-            )
-            
-            if response.status_code == 200:
-                return response.content
-            else:
-                logger.error(f"❌ Failed to download media: {response.text}")
-                return b""
+        response = await self.dispatcher.request(
+            "GET",
+            media_url,
+            paced=False,
+            headers={"Authorization": f"Bearer {self.access_token}"},
+            timeout=60
+        )
+        
+        if response.status_code == 200:
+            return response.content
+        else:
+            logger.error(f"❌ Failed to download media: {response.text}")
+            return b""
     
     async def upload_media(
         self,
@@ -290,20 +303,21 @@ class WhatsAppClient:
         
         headers = {"Authorization": f"Bearer {self.access_token}"}
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url,
-                headers=headers,
-                files=files,
-                timeout=60
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("id", "")
-            else:
-                logger.error(f"❌ Failed to upload media: {response.text}")
-                return ""
+        response = await self.dispatcher.request(
+            "POST",
+            url,
+            paced=False,
+            headers=headers,
+            files=files,
+            timeout=60
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            return data.get("id", "")
+        else:
+            logger.error(f"❌ Failed to upload media: {response.text}")
+            return ""
     
     async def send_portfolio_summary(
         self,
@@ -367,6 +381,15 @@ class WhatsAppClient:
     ) -> Dict[str, Any]:
         """Send market alerts and notifications"""
         
+        return await self._send_message(self._build_market_alert_payload(phone_number, alert_data))
+    
+    def _build_market_alert_payload(
+        self,
+        phone_number: str,
+        alert_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build market alert message payload"""
+        
         alert_type = alert_data.get('type', 'general')
         
         if alert_type == 'price_alert':
@@ -409,7 +432,7 @@ What would you like to do?"""
                 {"id": "dismiss_alert", "title": "❌ Dismiss"}
             ]
         
-        return await self.send_interactive_message(
+        return self._build_interactive_payload(
             phone_number=phone_number,
             message=message,
             buttons=buttons
@@ -422,6 +445,29 @@ What would you like to do?"""
     ) -> Dict[str, Any]:
         """Send social trading updates"""
         
+        return await self._send_message(self._build_social_trading_payload(phone_number, social_data))
+    
+    async def send_social_trading_update_bulk(
+        self,
+        updates: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Send per-follower social trading updates as one paced batch
+        
+        Each update is {"phone_number": ..., "social_data": {...}}.
+        """
+        
+        return await self.send_bulk([
+            self._build_social_trading_payload(update["phone_number"], update["social_data"])
+            for update in updates
+        ])
+    
+    def _build_social_trading_payload(
+        self,
+        phone_number: str,
+        social_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build social trading update payload"""
+        
         update_type = social_data.get('type', 'general')
         
         if update_type == 'copy_trade_alert':
@@ -466,40 +512,31 @@ Your copy performance: {social_data['your_copy_return']:+.1f}%"""
                 {"id": "unfollow", "title": "❌ Unfollow"}
             ]
         
-        return await self.send_interactive_message(
+        else:
+            message = social_data.get('message', 'Social trading update available!')
+            buttons = [
+                {"id": "view_trades", "title": "📊 View Trades"}
+            ]
+        
+        return self._build_interactive_payload(
             phone_number=phone_number,
             message=message,
             buttons=buttons
         )
     
+    async def send_bulk(
+        self,
+        payloads: List[Dict[str, Any]],
+        max_in_flight: int = 64
+    ) -> List[Dict[str, Any]]:
+        """Send many prepared payloads through the shared rate-limited pool"""
+        
+        return await self.dispatcher.send_bulk(payloads, max_in_flight=max_in_flight)
+    
     async def _send_message(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Internal method to send message to WhatsApp API"""
         
-        url = f"{self.base_url}/{self.phone_number_id}/messages"
-        
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    url,
-                    headers=self.headers,
-                    json=payload,
-                    timeout=30
-                )
-                
-                logger.info(f"📤 WhatsApp API Response: {response.status_code}")
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    logger.info(f"✅ Message sent successfully: {result}")
-                    return result
-                else:
-                    error_data = response.json() if response.content else {"error": "Unknown error"}
-                    logger.error(f"❌ WhatsApp API Error: {response.status_code} - {error_data}")
-                    return {"error": error_data, "status_code": response.status_code}
-        
-        except Exception as e:
-            logger.error(f"❌ WhatsApp client error: {str(e)}")
-            return {"error": str(e)}
+        return await self.dispatcher.send(payload)
     
     async def _format_portfolio_message(self, portfolio_data: Dict[str, Any]) -> str:
         """Format portfolio data into WhatsApp message"""
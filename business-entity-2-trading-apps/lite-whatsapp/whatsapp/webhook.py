@@ -1,6 +1,6 @@
 """
 WhatsApp Business API Webhook Handler
-Processes incoming WhatsApp messages and routes them to AI engine
+Verifies and enqueues incoming WhatsApp messages; workers route them to AI engine
 """
 
 from fastapi import APIRouter, Request, HTTPException, Depends
@@ -9,11 +9,12 @@ import hmac
 import hashlib
 import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 from app.core.config import settings
 from app.whatsapp.message_handler import WhatsAppMessageHandler
 from app.whatsapp.models import WebhookPayload, MessageStatus
+from app.whatsapp.work_queue import InboundWorkQueue
 
 logger = logging.getLogger(__name__)
 whatsapp_router = APIRouter(tags=["WhatsApp"])
@@ -61,8 +62,9 @@ async def verify_webhook(
 @whatsapp_router.post("/webhook")
 async def handle_webhook(request: Request):
     """
-    Main webhook endpoint for processing WhatsApp messages
-    Handles incoming messages, status updates, and delivery receipts
+    Main webhook endpoint for WhatsApp messages
+    Verifies and durably enqueues messages, status updates and delivery
+    receipts, then acknowledges; processing happens in the queue workers
     """
     try:
         # Get raw payload for signature verification
@@ -75,18 +77,20 @@ async def handle_webhook(request: Request):
             raise HTTPException(status_code=403, detail="Invalid signature")
         
         # Parse JSON payload
-        data = json.loads(payload.decode())
-        logger.info(f"📨 Received webhook: {json.dumps(data, indent=2)}")
-        
-        # Process webhook data
+        data = json.loads(payload)
         webhook_payload = WebhookPayload(**data)
         
+        items = []
         for entry in webhook_payload.entry:
             for change in entry.changes:
                 if change.field == "messages":
-                    await process_messages(change.value)
+                    items.extend(_message_items(change.value))
                 elif change.field == "message_status":
-                    await process_message_status(change.value)
+                    items.extend(_status_items(change.value))
+        
+        # Acknowledge once durable; handlers run in the queue workers
+        enqueued = await inbound_queue.enqueue(items)
+        logger.info(f"📨 Webhook accepted: {len(items)} items, {enqueued} new")
         
         return {"status": "success"}
         
@@ -99,92 +103,123 @@ async def handle_webhook(request: Request):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
-async def process_messages(message_data: Dict[str, Any]):
-    """Process incoming WhatsApp messages"""
-    
-    if not message_data.get('messages'):
-        return
-    
-    for message in message_data['messages']:
-        try:
-            logger.info(f"💬 Processing message: {message.get('id')}")
-            
-            # Extract message details
-            user_phone = message['from']
-            message_id = message['id']
-            timestamp = message['timestamp']
-            
-            # Handle different message types
-            if message['type'] == 'text':
-                text_content = message['text']['body']
-                await message_handler.handle_text_message(
-                    user_phone=user_phone,
-                    message_id=message_id,
-                    text=text_content,
-                    timestamp=timestamp
-                )
-            
-            elif message['type'] == 'audio':
-                audio_id = message['audio']['id']
-                await message_handler.handle_audio_message(
-                    user_phone=user_phone,
-                    message_id=message_id,
-                    audio_id=audio_id,
-                    timestamp=timestamp
-                )
-            
-            elif message['type'] == 'image':
-                image_id = message['image']['id']
-                caption = message['image'].get('caption', '')
-                await message_handler.handle_image_message(
-                    user_phone=user_phone,
-                    message_id=message_id,
-                    image_id=image_id,
-                    caption=caption,
-                    timestamp=timestamp
-                )
-            
-            elif message['type'] == 'interactive':
-                # Handle button clicks and list selections
-                interactive_data = message['interactive']
-                await message_handler.handle_interactive_message(
-                    user_phone=user_phone,
-                    message_id=message_id,
-                    interactive_data=interactive_data,
-                    timestamp=timestamp
-                )
-            
-            else:
-                logger.warning(f"⚠️ Unsupported message type: {message['type']}")
-        
-        except Exception as e:
-            logger.error(f"❌ Error processing message {message.get('id')}: {str(e)}")
-
-
-async def process_message_status(status_data: Dict[str, Any]):
-    """Process message delivery status updates"""
-    
-    if not status_data.get('statuses'):
-        return
-    
-    for status in status_data['statuses']:
-        try:
-            message_id = status['id']
-            recipient_id = status['recipient_id']
-            status_type = status['status']  # sent, delivered, read, failed
-            
-            logger.info(f"📋 Message status update: {message_id} -> {status_type}")
-            
-            # Update message status in database
-            await message_handler.update_message_status(
-                message_id=message_id,
-                recipient_id=recipient_id,
-                status=MessageStatus(status_type),
-                timestamp=status.get('timestamp')
-            )
-            
-        except Exception as e:
-            logger.error(f"❌ Error processing status update: {str(e)}")
+def _message_items(message_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Queue items for incoming messages, keyed by WhatsApp message ID"""
+    
+    return [
+        {
+            "key": message['id'],
+            "phone": message['from'],
+            "type": message.get('type', 'unknown'),
+            "payload": message
+        }
+        for message in message_data.get('messages') or []
+    ]
+
+
+def _status_items(status_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Queue items for delivery receipts, keyed by message ID and status"""
+    
+    return [
+        {
+            "key": f"{status['id']}:{status['status']}",
+            "phone": status['recipient_id'],
+            "type": "status",
+            "payload": status
+        }
+        for status in status_data.get('statuses') or []
+    ]
+
+
+async def process_queue_item(item_type: str, payload: Dict[str, Any]):
+    """Queue worker entry point"""
+    
+    if item_type == "status":
+        await process_status(payload)
+    else:
+        await process_message(payload)
+
+
+# Durable inbound queue; a user's messages are processed in order
+inbound_queue = InboundWorkQueue(
+    handler=process_queue_item,
+    db_path=settings.WHATSAPP_QUEUE_PATH
+)
+
+
+async def process_message(message: Dict[str, Any]):
+    """Process a single incoming WhatsApp message
+    
+    Errors propagate so the queue can retry the message.
+    """
+    
+    logger.info(f"💬 Processing message: {message.get('id')}")
+    
+    # Extract message details
+    user_phone = message['from']
+    message_id = message['id']
+    timestamp = message['timestamp']
+    
+    # Handle different message types
+    if message['type'] == 'text':
+        text_content = message['text']['body']
+        await message_handler.handle_text_message(
+            user_phone=user_phone,
+            message_id=message_id,
+            text=text_content,
+            timestamp=timestamp
+        )
+    
+    elif message['type'] == 'audio':
+        audio_id = message['audio']['id']
+        await message_handler.handle_audio_message(
+            user_phone=user_phone,
+            message_id=message_id,
+            audio_id=audio_id,
+            timestamp=timestamp
+        )
+    
+    elif message['type'] == 'image':
+        image_id = message['image']['id']
+        caption = message['image'].get('caption', '')
+        await message_handler.handle_image_message(
+            user_phone=user_phone,
+            message_id=message_id,
+            image_id=image_id,
+            caption=caption,
+            timestamp=timestamp
+        )
+    
+    elif message['type'] == 'interactive':
+        # Handle button clicks and list selections
+        interactive_data = message['interactive']
+        await message_handler.handle_interactive_message(
+            user_phone=user_phone,
+            message_id=message_id,
+            interactive_data=interactive_data,
+            timestamp=timestamp
+        )
+    
+    else:
+        logger.warning(f"⚠️ Unsupported message type: {message['type']}")
+
+
+async def process_status(status: Dict[str, Any]):
+    """Process a single delivery status update"""
+    
+    message_id = status['id']
+    recipient_id = status['recipient_id']
+    status_type = status['status']  # sent, delivered, read, failed
+    
+    logger.info(f"📋 Message status update: {message_id} -> {status_type}")
+    
+    # Update message status in database
+    await message_handler.update_message_status(
+        message_id=message_id,
+        recipient_id=recipient_id,
+        status=MessageStatus(status_type),
+        timestamp=status.get('timestamp')
+    )
 
 
 @whatsapp_router.get("/health")
@@ -194,5 +229,10 @@ async def whatsapp_health():
         "status": "healthy",
         "service": "WhatsApp Integration",
         "webhook_configured": bool(settings.WHATSAPP_WEBHOOK_VERIFY_TOKEN),
-        "api_token_configured": bool(settings.WHATSAPP_ACCESS_TOKEN)
-    }
\ No newline at end of file
+        "api_token_configured": bool(settings.WHATSAPP_ACCESS_TOKEN),
+        "inbound_queue": {
+            "running": inbound_queue.running,
+            "depth": await inbound_queue.depth(),
+            **inbound_queue.stats
+        }
+    }
@@ -0,0 +1,323 @@
+"""
+WhatsApp Inbound Work Queue
+Durable SQLite-backed queue between the webhook and message processing
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on concurrently running handlers per message type. Voice and
+# image handling are the slow paths, so they get far fewer slots than text.
+DEFAULT_TYPE_CONCURRENCY = {
+    "text": 64,
+    "interactive": 64,
+    "status": 64,
+    "audio": 8,
+    "image": 8,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS inbound_queue (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    item_key TEXT NOT NULL UNIQUE,
+    shard INTEGER NOT NULL,
+    phone TEXT NOT NULL,
+    item_type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    enqueued_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_inbound_queue_shard
+    ON inbound_queue (shard, status, seq);
+"""
+
+Handler = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+class InboundWorkQueue:
+    """Acknowledge-then-process queue for inbound WhatsApp webhook items
+
+    Items are keyed by WhatsApp message ID (or message ID + status for
+    delivery receipts), so a redelivered webhook is ignored. Each item is
+    assigned to a shard by the sender's phone number and every shard is
+    drained by exactly one worker, which preserves per-user ordering. A
+    per-type semaphore caps how many slow handlers (voice, image) can run
+    across all shards at once.
+
+    Claimed rows hold a lease that the worker renews while it works
+    through the batch. Rows whose lease has expired (their process died)
+    are claimed again; rows another live process holds are left alone.
+
+    SQLite access is funnelled through a single thread so the event loop
+    never blocks on disk and the connection is never shared across threads.
+    """
+
+    def __init__(
+        self,
+        handler: Handler,
+        db_path: str = "whatsapp_queue.db",
+        num_shards: int = 32,
+        batch_size: int = 50,
+        max_attempts: int = 3,
+        retry_backoff: float = 0.5,
+        poll_interval: float = 1.0,
+        dedupe_retention: int = 3 * 86400,
+        lease_seconds: float = 300.0,
+        type_concurrency: Optional[Dict[str, int]] = None,
+    ):
+        self.handler = handler
+        self.db_path = db_path
+        self.num_shards = num_shards
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.poll_interval = poll_interval
+        self.dedupe_retention = dedupe_retention
+        self.lease_seconds = lease_seconds
+
+        limits = {**DEFAULT_TYPE_CONCURRENCY, **(type_concurrency or {})}
+        self._type_limits = limits
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="wa-queue")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._wakeups: List[asyncio.Event] = []
+        self._workers: List[asyncio.Task] = []
+        self.running = False
+
+        self.stats = {"enqueued": 0, "duplicates": 0, "processed": 0, "failed": 0}
+
+    # Storage (runs on the queue thread)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        self._conn = conn
+
+    def _insert(self, rows: List[Tuple]) -> List[int]:
+        inserted_shards = []
+        self._conn.execute("BEGIN")
+        try:
+            for row in rows:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO inbound_queue "
+                    "(item_key, shard, phone, item_type, payload, enqueued_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    row
+                )
+                if cursor.rowcount:
+                    inserted_shards.append(row[1])
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        return inserted_shards
+
+    def _claim(self, shard: int) -> List[Tuple[int, str, str]]:
+        # One statement, so two processes sharing the file never claim the
+        # same row; expired leases are claimable again
+        now = time.time()
+        claimable = "(status = 'pending' OR (status = 'processing' AND updated_at < ?))"
+        rows = self._conn.execute(
+            f"UPDATE inbound_queue SET status = 'processing', updated_at = ? "
+            f"WHERE seq IN (SELECT seq FROM inbound_queue WHERE shard = ? AND {claimable} "
+            f"ORDER BY seq LIMIT ?) AND {claimable} "
+            f"RETURNING seq, item_type, payload",
+            (now, shard, now - self.lease_seconds, self.batch_size, now - self.lease_seconds)
+        ).fetchall()
+        return sorted(rows)
+
+    def _renew(self, seqs: List[int]):
+        self._conn.execute(
+            f"UPDATE inbound_queue SET updated_at = ? "
+            f"WHERE status = 'processing' AND seq IN ({','.join('?' * len(seqs))})",
+            (time.time(), *seqs)
+        )
+
+    def _complete(self, seq: int, status: str, attempts: int, error: Optional[str]):
+        self._conn.execute(
+            "UPDATE inbound_queue SET status = ?, attempts = ?, last_error = ?, updated_at = ? "
+            "WHERE seq = ?",
+            (status, attempts, error, time.time(), seq)
+        )
+
+    def _prune(self):
+        # Finished rows are kept only as long as Meta may redeliver them
+        self._conn.execute(
+            "DELETE FROM inbound_queue WHERE status IN ('done', 'failed') AND updated_at < ?",
+            (time.time() - self.dedupe_retention,)
+        )
+
+    def _depth(self) -> Dict[str, int]:
+        return dict(self._conn.execute(
+            "SELECT status, COUNT(*) FROM inbound_queue GROUP BY status"
+        ).fetchall())
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    # Public API
+
+    def shard_for(self, phone: str) -> int:
+        return zlib.crc32(phone.encode()) % self.num_shards
+
+    async def enqueue(self, items: List[Dict[str, Any]]) -> int:
+        """Durably enqueue webhook items; returns how many were new
+
+        Each item is {"key", "phone", "type", "payload"}.
+        """
+
+        if not items:
+            return 0
+
+        now = time.time()
+        rows = [
+            (
+                item["key"],
+                self.shard_for(item["phone"]),
+                item["phone"],
+                item["type"],
+                json.dumps(item["payload"], separators=(",", ":")),
+                now,
+                now
+            )
+            for item in items
+        ]
+
+        if self._conn is None:
+            await self._run(self._connect)
+
+        shards = await self._run(self._insert, rows)
+
+        self.stats["enqueued"] += len(shards)
+        self.stats["duplicates"] += len(rows) - len(shards)
+        for shard in set(shards):
+            if self._wakeups:
+                self._wakeups[shard].set()
+
+        return len(shards)
+
+    async def start(self):
+        """Open the store and start one worker per shard"""
+
+        if self.running:
+            return
+        if self._conn is None:
+            await self._run(self._connect)
+
+        self.running = True
+        self._wakeups = [asyncio.Event() for _ in range(self.num_shards)]
+        self._workers = [
+            asyncio.create_task(self._shard_worker(shard))
+            for shard in range(self.num_shards)
+        ]
+        self._workers.append(asyncio.create_task(self._maintenance_loop()))
+        logger.info(f"📥 WhatsApp inbound queue started with {self.num_shards} shards")
+
+    async def stop(self):
+        self.running = False
+        for event in self._wakeups:
+            event.set()
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+
+    async def depth(self) -> Dict[str, int]:
+        """Row counts by status (pending/processing/done/failed)"""
+        if self._conn is None:
+            return {}
+        return await self._run(self._depth)
+
+    async def drain(self, timeout: float = 10.0):
+        """Wait until nothing is pending or processing (tests, shutdown)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            depth = await self.depth()
+            if not depth.get("pending") and not depth.get("processing"):
+                return
+            await asyncio.sleep(0.01)
+        raise asyncio.TimeoutError("inbound queue did not drain")
+
+    # Workers
+
+    def _semaphore(self, item_type: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(item_type)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self._type_limits.get(item_type, 16))
+            self._semaphores[item_type] = semaphore
+        return semaphore
+
+    async def _shard_worker(self, shard: int):
+        wakeup = self._wakeups[shard]
+
+        while self.running:
+            try:
+                batch = await self._run(self._claim, shard)
+
+                if not batch:
+                    wakeup.clear()
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                # Sequential within a shard: a user's messages never overtake each other
+                leased_at = time.monotonic()
+                for index, (seq, item_type, payload) in enumerate(batch):
+                    if time.monotonic() - leased_at > self.lease_seconds / 2:
+                        await self._run(self._renew, [row[0] for row in batch[index:]])
+                        leased_at = time.monotonic()
+                    await self._process(seq, item_type, json.loads(payload))
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Inbound queue shard {shard} error: {str(e)}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def _process(self, seq: int, item_type: str, payload: Dict[str, Any]):
+        error = None
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                async with self._semaphore(item_type):
+                    await self.handler(item_type, payload)
+                await self._run(self._complete, seq, "done", attempt, None)
+                self.stats["processed"] += 1
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = str(e)
+                logger.warning(f"⚠️ Inbound {item_type} item failed (attempt {attempt}): {error}")
+                if attempt < self.max_attempts:
+                    await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+        await self._run(self._complete, seq, "failed", self.max_attempts, error)
+        self.stats["failed"] += 1
+
+    async def _maintenance_loop(self):
+        while self.running:
+            await asyncio.sleep(3600)
+            try:
+                await self._run(self._prune)
+            except Exception as e:
+                logger.error(f"❌ Inbound queue prune failed: {str(e)}")
@@ -10,13 +10,14 @@ import json
 import re
 from datetime import datetime
 
-import openai
 from langchain.llms import OpenAI
 from langchain.memory import ConversationBufferWindowMemory
 from langchain.schema import HumanMessage, AIMessage
 from googletrans import Translator
 
 from app.core.config import settings
+from app.ai_support.intent_matcher import get_message_classifier
+from app.ai_support.llm_gateway import LLMRequest, get_llm_gateway
 from app.ai.financial_agent import FinancialAgent
 from app.ai.risk_analyzer import RiskAnalyzer
 from app.ai.market_intelligence import MarketIntelligence
@@ -29,8 +30,8 @@ class ConversationEngine:
     """Core AI engine for processing WhatsApp conversations"""
     
     def __init__(self):
-        # Initialize OpenAI
-        openai.api_key = settings.OPENAI_API_KEY
+        # Shared model gateway (pooled client, budgets, cache)
+        self.llm = get_llm_gateway(settings.OPENAI_API_KEY)
         
         # Initialize components
         self.translator = Translator()
@@ -47,6 +48,11 @@ class ConversationEngine:
             'gujarati': r'[\u0A80-\u0AFF]',
             'punjabi': r'[\u0A00-\u0A7F]'
         }
+        # All scripts in one pattern; the first regional character decides
+        self._script_pattern = re.compile(
+            '|'.join(f'(?P<{lang}>{pattern})' for lang, pattern in self.language_patterns.items())
+        )
+        self.classifier = get_message_classifier()
         
         # Conversation memory per user
         self.conversation_memories = {}
@@ -121,9 +127,9 @@ class ConversationEngine:
         """Detect the primary language of the text"""
         
         # Check for regional language scripts
-        for lang, pattern in self.language_patterns.items():
-            if re.search(pattern, text):
-                return lang
+        match = self._script_pattern.search(text)
+        if match:
+            return match.lastgroup
         
         # Default to English if no regional script detected
         return 'english'
@@ -177,6 +183,18 @@ class ConversationEngine:
     async def _classify_intent(self, message: str, context: Dict[str, Any]) -> str:
         """Classify user message intent using AI"""
         
+        # Plain requests with one keyword intent skip the model round trip
+        analysis = self.classifier.analyze(message)
+        keyword_intent = analysis.conversation_intent
+        if keyword_intent:
+            logger.info(f"🎯 Classified intent (keyword): {keyword_intent}")
+            return keyword_intent
+        
+        # Otherwise keyword matches are only a hint for the model
+        hint = ""
+        if analysis.conversation_candidates:
+            hint = f"\nKeyword hint (may be wrong): {', '.join(analysis.conversation_candidates)}"
+        
         system_prompt = """You are an AI assistant for a trading platform. Classify the user's intent from these categories:
 
 TRADING_INTENTS:
@@ -208,17 +226,18 @@ GENERAL_INTENTS:
 Respond with just the intent category, nothing else."""
         
         try:
-            response = await openai.ChatCompletion.acreate(
-                model="gpt-3.5-turbo",
+            response = await self.llm.complete(LLMRequest(
                 messages=[
                     {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Message: {message}\nContext: {json.dumps(context)}"}
+                    {"role": "user", "content": f"Message: {message}\nContext: {json.dumps(context)}{hint}"}
                 ],
+                model="gpt-3.5-turbo",
                 max_tokens=50,
-                temperature=0.1
-            )
+                temperature=0.1,
+                cache_ttl=600
+            ))
             
-            intent = response.choices[0].message.content.strip().lower()
+            intent = response.content.strip().lower()
             logger.info(f"🎯 Classified intent: {intent}")
             return intent
             
@@ -530,14 +549,14 @@ Examples of good responses:
             # Add current message
             messages.append({"role": "user", "content": message})
             
-            response = await openai.ChatCompletion.acreate(
-                model="gpt-3.5-turbo",
+            response = await self.llm.complete(LLMRequest(
                 messages=[{"role": "system", "content": system_prompt}] + messages,
+                model="gpt-3.5-turbo",
                 max_tokens=300,
                 temperature=0.7
-            )
+            ))
             
-            ai_response = response.choices[0].message.content.strip()
+            ai_response = response.content.strip()
             
             return {
                 'type': 'text',
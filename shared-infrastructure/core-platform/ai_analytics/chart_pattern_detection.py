@@ -20,6 +20,8 @@ import base64
 from pathlib import Path
 import time
 
+from .pattern_engine import IncrementalPatternEngine, SeriesState, find_peaks
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -134,6 +136,19 @@ class ChartData:
             'close': self.close_prices,
             'volume': self.volumes
         })
+    
+    def tail(self, bars: int) -> 'ChartData':
+        """Chart data for the last `bars` bars"""
+        return ChartData(
+            symbol=self.symbol,
+            timeframe=self.timeframe,
+            timestamps=self.timestamps[-bars:],
+            open_prices=self.open_prices[-bars:],
+            high_prices=self.high_prices[-bars:],
+            low_prices=self.low_prices[-bars:],
+            close_prices=self.close_prices[-bars:],
+            volumes=self.volumes[-bars:]
+        )
 
 
 class YOLOv8PatternDetector:
@@ -246,6 +261,11 @@ class TraditionalPatternDetector:
         # Find potential peaks
         peaks = self._find_peaks(high_prices, min_distance=5)
         
+        return self.head_and_shoulders_from_peaks(high_prices, close_prices, peaks)
+    
+    def head_and_shoulders_from_peaks(self, high_prices: np.ndarray, close_prices: np.ndarray,
+                                      peaks: List[int]) -> Optional[Dict[str, Any]]:
+        """Score a head and shoulders on the last three peaks"""
         if len(peaks) >= 3:
             # Check for head and shoulders structure
             left_shoulder, head, right_shoulder = peaks[-3:]
@@ -288,6 +308,10 @@ class TraditionalPatternDetector:
         # Find peaks
         peaks = self._find_peaks(high_prices, min_distance=5)
         
+        return self.double_top_from_peaks(high_prices, peaks)
+    
+    def double_top_from_peaks(self, high_prices: np.ndarray, peaks: List[int]) -> Optional[Dict[str, Any]]:
+        """Score a double top on the last two peaks"""
         if len(peaks) >= 2:
             peak1, peak2 = peaks[-2:]
             
@@ -331,6 +355,13 @@ class TraditionalPatternDetector:
         peaks = self._find_peaks(high_prices, min_distance=3)
         troughs = self._find_peaks(-low_prices, min_distance=3)
         
+        return self.triangles_from_pivots(high_prices, low_prices, peaks, troughs)
+    
+    def triangles_from_pivots(self, high_prices: np.ndarray, low_prices: np.ndarray,
+                              peaks: List[int], troughs: List[int]) -> List[Dict[str, Any]]:
+        """Classify the trendlines through the last two peaks and troughs"""
+        patterns = []
+        
         if len(peaks) >= 2 and len(troughs) >= 2:
             # Calculate trend lines
             peak_slope = self._calculate_slope(peaks[-2:], high_prices)
@@ -362,21 +393,7 @@ class TraditionalPatternDetector:
     
     def _find_peaks(self, data: np.ndarray, min_distance: int = 5) -> List[int]:
         """Find peaks in price data"""
-        peaks = []
-        
-        for i in range(min_distance, len(data) - min_distance):
-            is_peak = True
-            
-            # Check if current point is higher than surrounding points
-            for j in range(-min_distance, min_distance + 1):
-                if j != 0 and data[i] <= data[i + j]:
-                    is_peak = False
-                    break
-            
-            if is_peak:
-                peaks.append(i)
-        
-        return peaks
+        return find_peaks(data, min_distance)
     
     def _calculate_slope(self, indices: List[int], prices: np.ndarray) -> float:
         """Calculate slope between two points"""
@@ -422,10 +439,11 @@ class TraditionalPatternDetector:
 class ChartPatternAnalyzer:
     """Main chart pattern analysis engine"""
     
-    def __init__(self):
+    def __init__(self, engine: Optional[IncrementalPatternEngine] = None):
         """Initialize pattern analyzer"""
         self.yolo_detector = YOLOv8PatternDetector()
         self.traditional_detector = TraditionalPatternDetector()
+        self.engine = engine if engine is not None else IncrementalPatternEngine(self.traditional_detector)
         self.detected_patterns = {}
         self.pattern_history = []
     
@@ -434,19 +452,34 @@ class ChartPatternAnalyzer:
         detected_patterns = []
         
         try:
+            # Advance the shared pivot state over bars it has not seen yet
+            state = self.engine.update(chart_data)
+            window = state.window(chart_data.timestamps)
+            algorithmic_patterns = state.cached('algorithmic_patterns', window) if window else None
+            fresh = algorithmic_patterns is None
+            
+            if chart_image is None and not fresh:
+                return list(algorithmic_patterns)
+            
             # Method 1: YOLOv8 Computer Vision Detection
             if chart_image is not None:
                 cv_patterns = await self.yolo_detector.detect_patterns(chart_image)
                 detected_patterns.extend(await self._process_cv_patterns(cv_patterns, chart_data))
             
-            # Method 2: Traditional Algorithmic Detection
-            df = chart_data.to_dataframe()
-            traditional_patterns = await self._detect_traditional_patterns(df, chart_data)
-            detected_patterns.extend(traditional_patterns)
+            if fresh:
+                # Method 2: Traditional Algorithmic Detection
+                algorithmic_patterns = await self._detect_traditional_patterns(state, window, chart_data)
+                
+                # Method 3: Candlestick Pattern Detection
+                algorithmic_patterns.extend(
+                    await self._detect_candlestick_patterns(chart_data.tail(3).to_dataframe(), chart_data)
+                )
+                
+                algorithmic_patterns = self._deduplicate_patterns(algorithmic_patterns)
+                if window:
+                    state.cache('algorithmic_patterns', window, algorithmic_patterns)
             
-            # Method 3: Candlestick Pattern Detection
-            candlestick_patterns = await self._detect_candlestick_patterns(df, chart_data)
-            detected_patterns.extend(candlestick_patterns)
+            detected_patterns.extend(algorithmic_patterns)
             
             # Deduplicate and rank patterns
             final_patterns = self._deduplicate_patterns(detected_patterns)
@@ -464,6 +497,10 @@ class ChartPatternAnalyzer:
             logger.error(f"Error in chart pattern analysis: {e}")
             return []
     
+    async def analyze_charts(self, charts: List[ChartData]) -> List[List[PatternDetection]]:
+        """Analyze many charts at once, e.g. a Pro watchlist scan"""
+        return list(await asyncio.gather(*(self.analyze_chart(chart_data) for chart_data in charts)))
+    
     async def _process_cv_patterns(self, cv_patterns: List[Dict], chart_data: ChartData) -> List[PatternDetection]:
         """Process computer vision detected patterns"""
         processed_patterns = []
@@ -491,26 +528,23 @@ class ChartPatternAnalyzer:
         
         return processed_patterns
     
-    async def _detect_traditional_patterns(self, df: pd.DataFrame, chart_data: ChartData) -> List[PatternDetection]:
+    async def _detect_traditional_patterns(self, state: SeriesState, window: Optional[Tuple[int, int]],
+                                           chart_data: ChartData) -> List[PatternDetection]:
         """Detect patterns using traditional algorithms"""
-        patterns = []
-        
-        # Head and Shoulders
-        h_s_pattern = await self.traditional_detector.detect_head_and_shoulders(df)
-        if h_s_pattern:
-            patterns.append(self._create_pattern_detection(h_s_pattern, chart_data))
-        
-        # Double Top
-        double_top = await self.traditional_detector.detect_double_top(df)
-        if double_top:
-            patterns.append(self._create_pattern_detection(double_top, chart_data))
-        
-        # Triangle Patterns
-        triangle_patterns = await self.traditional_detector.detect_triangle_patterns(df)
-        for triangle in triangle_patterns:
-            patterns.append(self._create_pattern_detection(triangle, chart_data))
-        
-        return patterns
+        if window:
+            # Head and shoulders, double top and triangles from the pivots confirmed so far
+            patterns = state.geometric_patterns(window)
+        else:
+            # Bars the shared state does not hold (too old, or gaps): scan the request itself
+            df = chart_data.to_dataframe()
+            patterns = [
+                pattern for pattern in [
+                    await self.traditional_detector.detect_head_and_shoulders(df),
+                    await self.traditional_detector.detect_double_top(df)
+                ] if pattern
+            ] + await self.traditional_detector.detect_triangle_patterns(df)
+
+        return [self._create_pattern_detection(pattern, chart_data) for pattern in patterns]
     
     async def _detect_candlestick_patterns(self, df: pd.DataFrame, chart_data: ChartData) -> List[PatternDetection]:
         """Detect candlestick patterns"""
@@ -647,7 +681,8 @@ class ChartPatternAnalyzer:
         # Adjust magnitude based on pattern type
         if pattern_type in [PatternType.HEAD_AND_SHOULDERS, PatternType.DOUBLE_TOP]:
             magnitude = 0.08  # Larger moves for major reversal patterns
-        elif pattern_type in [PatternType.TRIANGLE_PATTERNS]:
+        elif pattern_type in [PatternType.ASCENDING_TRIANGLE, PatternType.DESCENDING_TRIANGLE,
+                              PatternType.SYMMETRICAL_TRIANGLE]:
             magnitude = 0.06  # Medium moves for continuation patterns
         else:
             magnitude = base_magnitude
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+GridWorks Incremental Pattern Engine
+====================================
+Per-(symbol, timeframe) pivot state for chart pattern detection. Each closed
+bar is appended once; swing pivots are confirmed as their right-hand window
+completes, geometric pattern candidates are re-scored only when a pivot they
+are built from changes, and analysis results are cached per request window
+until the next bar.
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+SeriesKey = Tuple[str, str]
+
+# Candidate kinds, the pivot trackers they are built from, and the minimum
+# window length the full-window detectors require
+HEAD_AND_SHOULDERS = "head_and_shoulders"
+DOUBLE_TOP = "double_top"
+TRIANGLE = "triangle"
+
+MIN_BARS = {HEAD_AND_SHOULDERS: 20, DOUBLE_TOP: 15, TRIANGLE: 20}
+
+
+def find_peaks(data: np.ndarray, min_distance: int = 5) -> List[int]:
+    """Indices strictly higher than every point within `min_distance` bars"""
+    data = np.asarray(data, dtype=float)
+    if len(data) < 2 * min_distance + 1:
+        return []
+
+    windows = sliding_window_view(data, 2 * min_distance + 1)
+    neighbours = np.maximum(windows[:, :min_distance].max(axis=1), windows[:, min_distance + 1:].max(axis=1))
+    return (np.flatnonzero(windows[:, min_distance] > neighbours) + min_distance).tolist()
+
+
+class PivotTracker:
+    """Swing highs (or lows) of one price column, confirmed `distance` bars after they print"""
+
+    def __init__(self, distance: int, lows: bool = False):
+        self.distance = distance
+        self.lows = lows
+        self.pivots: List[int] = []  # Absolute bar indices
+
+    def update(self, values: np.ndarray, size: int, base: int) -> bool:
+        """Check the bar whose right-hand window just completed"""
+        d = self.distance
+        i = size - 1 - d
+        if i < d:
+            return False
+
+        window = values[i - d:i + d + 1]
+        if self.lows:
+            window = -window
+
+        if window[d] > window[:d].max() and window[d] > window[d + 1:].max():
+            self.pivots.append(base + i)
+            return True
+        return False
+
+    def relative(self, base: int) -> List[int]:
+        return [pivot - base for pivot in self.pivots]
+
+    def within(self, first: int, last: int) -> List[int]:
+        """Pivots a full-window scan of bars first..last would find, relative to `first`"""
+        lo = bisect_left(self.pivots, first + self.distance)
+        hi = bisect_right(self.pivots, last - self.distance)
+        return [pivot - first for pivot in self.pivots[lo:hi]]
+
+    def trim(self, base: int):
+        """Drop pivots without a full left-hand window after the buffer start moves"""
+        del self.pivots[:bisect_left(self.pivots, base + self.distance)]
+
+
+@dataclass
+class PatternCandidate:
+    """A scored geometric pattern and the absolute bar span of its key points"""
+    kind: str
+    start: int
+    end: int
+    offset: int  # Absolute index of bar 0 for the indices inside `details`
+    details: Dict[str, Any]
+
+
+class IntervalIndex:
+    """Pattern candidates ordered by the bar their last key point closed on"""
+
+    def __init__(self):
+        self._ends: List[int] = []
+        self._candidates: List[PatternCandidate] = []
+
+    def __len__(self) -> int:
+        return len(self._candidates)
+
+    def add(self, candidate: PatternCandidate):
+        position = bisect_right(self._ends, candidate.end)
+        self._ends.insert(position, candidate.end)
+        self._candidates.insert(position, candidate)
+
+    def overlapping(self, start: int, end: int) -> List[PatternCandidate]:
+        """Candidates whose span intersects [start, end]"""
+        position = bisect_left(self._ends, start)
+        return [c for c in self._candidates[position:] if c.start <= end]
+
+    def evict_before(self, start: int):
+        """Drop candidates that ended before `start`"""
+        position = bisect_left(self._ends, start)
+        del self._ends[:position]
+        del self._candidates[:position]
+
+
+class SeriesState:
+    """Rolling OHLCV bars, pivots and pattern candidates for one symbol and timeframe.
+
+    Bars live in a buffer twice `max_bars` long; when it fills, the oldest
+    bars are dropped so `max_bars` remain, which keeps window-relative
+    indices stable between compactions.
+    """
+
+    COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+
+    def __init__(self, symbol: str, timeframe: str, detector: Any, max_bars: int = 500):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.detector = detector  # TraditionalPatternDetector
+        self.max_bars = max_bars
+
+        self._buffer = np.zeros((len(self.COLUMNS), max_bars * 2))
+        self._size = 0
+        self.base = 0  # Absolute index of the first retained bar
+        self.version = 0  # Bumped on every new bar
+
+        self.head_peaks = PivotTracker(5)
+        self.triangle_peaks = PivotTracker(3)
+        self.triangle_troughs = PivotTracker(3, lows=True)
+
+        self.current: Dict[str, Optional[PatternCandidate]] = {}
+        self.candidates = IntervalIndex()
+        self._results: Dict[Tuple[str, int, int], Any] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _column(self, row: int) -> np.ndarray:
+        return self._buffer[row, :self._size]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._column(0)
+
+    @property
+    def highs(self) -> np.ndarray:
+        return self._column(2)
+
+    @property
+    def lows(self) -> np.ndarray:
+        return self._column(3)
+
+    @property
+    def closes(self) -> np.ndarray:
+        return self._column(4)
+
+    @property
+    def first(self) -> int:
+        """Absolute index of the first retained bar"""
+        return self.base
+
+    @property
+    def last(self) -> int:
+        """Absolute index of the last retained bar"""
+        return self.base + self._size - 1
+
+    @property
+    def last_timestamp(self) -> float:
+        return self._buffer[0, self._size - 1] if self._size else float("-inf")
+
+    def append(self, timestamp: float, open_: float, high: float, low: float, close: float, volume: float) -> bool:
+        """Fold in one closed bar; bars at or before the last one are ignored"""
+        if timestamp <= self.last_timestamp:
+            return False
+
+        if self._size == self._buffer.shape[1]:
+            self._compact()
+
+        self._buffer[:, self._size] = (timestamp, open_, high, low, close, volume)
+        self._size += 1
+        self.version += 1
+        self._results.clear()
+
+        # Only candidates built on a newly confirmed pivot can change
+        changed = set()
+        if self.head_peaks.update(self._buffer[2], self._size, self.base):
+            changed.update((HEAD_AND_SHOULDERS, DOUBLE_TOP))
+        if self.triangle_peaks.update(self._buffer[2], self._size, self.base):
+            changed.add(TRIANGLE)
+        if self.triangle_troughs.update(self._buffer[3], self._size, self.base):
+            changed.add(TRIANGLE)
+
+        if changed:
+            self._rescore(changed)
+        return True
+
+    def _compact(self):
+        dropped = self._size - self.max_bars
+        self._buffer[:, :self.max_bars] = self._buffer[:, dropped:self._size]
+        self._size = self.max_bars
+        self.base += dropped
+
+        for tracker in (self.head_peaks, self.triangle_peaks, self.triangle_troughs):
+            tracker.trim(self.base)
+        self.candidates.evict_before(self.base)
+
+        # Window-relative indices moved, so current candidates are rebuilt without re-recording them
+        self._rescore(set(MIN_BARS), record=False)
+
+    def _score(self, kind: str, first: int, last: int) -> Tuple[Optional[Dict[str, Any]], List[int]]:
+        """Detector output for `kind` over retained bars first..last, with its key points"""
+        lo, hi = first - self.base, last - self.base + 1
+        highs, lows, closes = self.highs[lo:hi], self.lows[lo:hi], self.closes[lo:hi]
+
+        if kind == HEAD_AND_SHOULDERS:
+            pivots = self.head_peaks.within(first, last)
+            return self.detector.head_and_shoulders_from_peaks(highs, closes, pivots), pivots[-3:]
+        if kind == DOUBLE_TOP:
+            pivots = self.head_peaks.within(first, last)
+            return self.detector.double_top_from_peaks(highs, pivots), pivots[-2:]
+
+        peaks = self.triangle_peaks.within(first, last)
+        troughs = self.triangle_troughs.within(first, last)
+        triangles = self.detector.triangles_from_pivots(highs, lows, peaks, troughs)
+        return (triangles[0] if triangles else None), peaks[-2:] + troughs[-2:]
+
+    def _rescore(self, kinds: set, record: bool = True):
+        for kind in kinds:
+            details, key_points = self._score(kind, self.first, self.last)
+
+            if details is None:
+                self.current[kind] = None
+                continue
+
+            candidate = PatternCandidate(
+                kind=kind,
+                start=self.base + min(key_points),
+                end=self.base + max(key_points),
+                offset=self.base,
+                details=details
+            )
+            self.current[kind] = candidate
+            if record:
+                self.candidates.add(candidate)
+
+    def window(self, timestamps: List[datetime]) -> Optional[Tuple[int, int]]:
+        """Absolute bar span of a request's bars, or None unless all of them are retained"""
+        if not timestamps or not self._size:
+            return None
+
+        retained = self.timestamps
+        lo = int(np.searchsorted(retained, timestamps[0].timestamp(), side="left"))
+        hi = lo + len(timestamps) - 1
+        if hi >= self._size or retained[lo] != timestamps[0].timestamp() or retained[hi] != timestamps[-1].timestamp():
+            return None
+        return self.base + lo, self.base + hi
+
+    def geometric_patterns(self, window: Optional[Tuple[int, int]] = None) -> List[Dict[str, Any]]:
+        """Detector output for bars first..last (default: all retained bars), in the
+        full-window detectors' order; indices inside the results are relative to `first`"""
+        first, last = window or (self.first, self.last)
+        patterns = []
+        for kind in (HEAD_AND_SHOULDERS, DOUBLE_TOP, TRIANGLE):
+            if last - first + 1 < MIN_BARS[kind]:
+                continue
+            if (first, last) == (self.first, self.last):
+                candidate = self.current.get(kind)
+                details = candidate.details if candidate is not None else None
+            else:
+                details, _ = self._score(kind, first, last)
+            if details is not None:
+                patterns.append(details)
+        return patterns
+
+    def candidates_between(self, start: datetime, end: datetime) -> List[PatternCandidate]:
+        """Recorded candidates whose key points fall within a time range, for chart overlays"""
+        timestamps = self.timestamps
+        first = self.base + int(np.searchsorted(timestamps, start.timestamp(), side="left"))
+        last = self.base + int(np.searchsorted(timestamps, end.timestamp(), side="right")) - 1
+        return self.candidates.overlapping(first, last)
+
+    def cached(self, name: str, window: Tuple[int, int]) -> Optional[Any]:
+        """Result stored under `name` for a request window since the last new bar, if any"""
+        return self._results.get((name, *window))
+
+    def cache(self, name: str, window: Tuple[int, int], value: Any):
+        self._results[(name, *window)] = value
+
+
+class IncrementalPatternEngine:
+    """Shared pattern state for every (symbol, timeframe) the analyzer has seen"""
+
+    def __init__(self, detector: Any, max_bars: int = 500, max_series: int = 2000):
+        self.detector = detector
+        self.max_bars = max_bars
+        self.max_series = max_series
+        self._series: "OrderedDict[SeriesKey, SeriesState]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def series(self, symbol: str, timeframe: str) -> SeriesState:
+        key = (symbol, timeframe)
+        state = self._series.get(key)
+        if state is None:
+            state = self._series[key] = SeriesState(symbol, timeframe, self.detector, self.max_bars)
+            if len(self._series) > self.max_series:
+                self._series.popitem(last=False)
+        else:
+            self._series.move_to_end(key)
+        return state
+
+    def update(self, chart_data: Any) -> SeriesState:
+        """Append the bars of a ChartData that are newer than the series' last bar"""
+        state = self.series(chart_data.symbol, chart_data.timeframe)
+        last = state.last_timestamp
+
+        # Bars arrive oldest first, so only a tail of the request is new
+        start = len(chart_data.timestamps)
+        while start > 0 and chart_data.timestamps[start - 1].timestamp() > last:
+            start -= 1
+
+        for i in range(start, len(chart_data.timestamps)):
+            state.append(
+                chart_data.timestamps[i].timestamp(),
+                chart_data.open_prices[i],
+                chart_data.high_prices[i],
+                chart_data.low_prices[i],
+                chart_data.close_prices[i],
+                chart_data.volumes[i]
+            )
+        return state
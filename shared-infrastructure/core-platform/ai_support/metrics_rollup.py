@@ -0,0 +1,11 @@
+"""
+Metric Rollup Store
+Re-exported from app.monitoring.metrics_rollup, where the rollup writer now lives
+"""
+
+from app.monitoring.metrics_rollup import (  # noqa: F401
+    DEFAULT_RESOLUTIONS,
+    MetricRollupWriter,
+    RollupResolution,
+    RollupSummary,
+)
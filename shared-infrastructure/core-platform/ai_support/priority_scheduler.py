@@ -0,0 +1,258 @@
+"""
+Tiered Priority Scheduler
+Weighted-fair, deadline-aware dispatch of support work across customer tiers
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SchedulerOverloaded(Exception):
+    """Request refused at admission or shed before it could be served"""
+
+    def __init__(self, lane: Hashable, reason: str):
+        super().__init__(f"{lane}: {reason}")
+        self.lane = lane
+        self.reason = reason
+
+
+@dataclass
+class TierPolicy:
+    """Scheduling policy for one lane (customer tier)"""
+    weight: int  # Share of dispatches while every lane is backlogged
+    deadline: float  # seconds from submission; the tier's response-time SLA
+    max_queued: int = 10000  # Admission bound for this lane
+    sheddable: bool = False  # Refused during spikes and dropped once past deadline
+
+
+@dataclass(order=True)
+class _Job:
+    sort_key: tuple
+    lane: Hashable = field(compare=False)
+    run: Callable[[], Awaitable[Any]] = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    submitted_at: float = field(compare=False)
+    deadline: float = field(compare=False)
+
+
+class _Lane:
+    """Pending jobs of one lane plus its fair-share and latency bookkeeping"""
+
+    def __init__(self, policy: TierPolicy):
+        self.policy = policy
+        self.heap: List[_Job] = []
+        self.pass_value = 0.0  # Stride-scheduling virtual time
+        self.in_flight = 0
+        self.service_time = 0.0  # EWMA of run time, seconds
+        self.waits = deque(maxlen=1000)  # Recent queue waits, seconds
+        self.counts = {"admitted": 0, "rejected": 0, "shed": 0, "completed": 0, "failed": 0}
+
+    def head(self) -> Optional[_Job]:
+        return self.heap[0] if self.heap else None
+
+
+class PriorityScheduler:
+    """Worker pool that serves per-tier queues by weight and deadline
+
+    Lanes share `workers` concurrent slots. While several lanes are
+    backlogged each receives dispatches in proportion to its weight (stride
+    scheduling), so a flood in a low tier only ever takes that tier's share.
+    A job close enough to its deadline that it would miss it if it waited
+    another service time jumps ahead (earliest deadline first). Sheddable
+    lanes are refused new work while the total backlog is above
+    `shed_watermark` and drop jobs that are already past their deadline.
+    """
+
+    def __init__(
+        self,
+        policies: Dict[Hashable, TierPolicy],
+        workers: int = 32,
+        shed_watermark: int = 1000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.policies = policies
+        self.workers = workers
+        self.shed_watermark = shed_watermark
+        self._clock = clock
+
+        self._lanes = {lane: _Lane(policy) for lane, policy in policies.items()}
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._queued = 0
+        self._ready: Optional[asyncio.Condition] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    def start(self):
+        """Start the workers; called automatically on first submit"""
+        if self._worker_tasks:
+            return
+        self._ready = asyncio.Condition()
+        self._worker_tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+        for lane in self._lanes.values():
+            for job in lane.heap:
+                if not job.future.done():
+                    job.future.set_exception(SchedulerOverloaded(job.lane, "scheduler stopped"))
+            lane.heap.clear()
+        self._queued = 0
+
+    async def submit(
+        self,
+        lane: Hashable,
+        run: Callable[[], Awaitable[Any]],
+        priority: int = 0,
+    ) -> Any:
+        """Queue `run` on a lane and wait for its result
+
+        Within a lane higher `priority` goes first, then earlier deadline.
+        Raises SchedulerOverloaded when the request is refused or shed.
+        """
+
+        self.start()
+        state = self._lanes[lane]
+        policy = state.policy
+
+        if len(state.heap) >= policy.max_queued:
+            state.counts["rejected"] += 1
+            raise SchedulerOverloaded(lane, "queue full")
+        if policy.sheddable and self._queued >= self.shed_watermark:
+            state.counts["rejected"] += 1
+            raise SchedulerOverloaded(lane, "shedding load")
+
+        now = self._clock()
+        job = _Job(
+            sort_key=(-priority, now + policy.deadline, next(self._sequence)),
+            lane=lane,
+            run=run,
+            future=asyncio.get_running_loop().create_future(),
+            submitted_at=now,
+            deadline=now + policy.deadline
+        )
+
+        if state.head() is None:
+            # A lane returning from idle starts at the current virtual time rather than banking credit
+            state.pass_value = max(state.pass_value, self._virtual_time)
+        heapq.heappush(state.heap, job)
+        state.counts["admitted"] += 1
+        self._queued += 1
+
+        async with self._ready:
+            self._ready.notify()
+
+        return await job.future
+
+    def _select(self) -> Optional[_Job]:
+        """Pop the next job: an about-to-miss deadline first, else the lane with the lowest pass"""
+
+        now = self._clock()
+        urgent = None
+        fair_lane = None
+
+        for lane in self._lanes.values():
+            # Jobs whose submitter gave up are discarded lazily
+            while lane.heap and lane.heap[0].future.done():
+                heapq.heappop(lane.heap)
+                self._queued -= 1
+
+            head = lane.head()
+            if head is None:
+                continue
+            if now < head.deadline <= now + lane.service_time:
+                if urgent is None or head.deadline < urgent.deadline:
+                    urgent = head
+            if fair_lane is None or lane.pass_value < fair_lane.pass_value:
+                fair_lane = lane
+
+        if fair_lane is None:
+            return None
+
+        self._virtual_time = max(self._virtual_time, fair_lane.pass_value)
+
+        state = self._lanes[urgent.lane] if urgent is not None else fair_lane
+        job = heapq.heappop(state.heap)
+        self._queued -= 1
+        state.pass_value += 1 / state.policy.weight
+        return job
+
+    async def _worker(self):
+        while True:
+            async with self._ready:
+                job = self._select()
+                while job is None:
+                    await self._ready.wait()
+                    job = self._select()
+
+            await self._run(job)
+
+    async def _run(self, job: _Job):
+        state = self._lanes[job.lane]
+        started = self._clock()
+
+        if state.policy.sheddable and started > job.deadline:
+            state.counts["shed"] += 1
+            if not job.future.done():
+                job.future.set_exception(SchedulerOverloaded(job.lane, "deadline passed in queue"))
+            return
+
+        state.waits.append(started - job.submitted_at)
+        state.in_flight += 1
+        try:
+            result = await job.run()
+        except asyncio.CancelledError:
+            if not job.future.done():
+                job.future.set_exception(SchedulerOverloaded(job.lane, "scheduler stopped"))
+            raise
+        except Exception as e:
+            state.counts["failed"] += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            state.counts["completed"] += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            state.in_flight -= 1
+            elapsed = self._clock() - started
+            state.service_time = elapsed if not state.service_time else 0.8 * state.service_time + 0.2 * elapsed
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, throughput counters and recent wait times per lane"""
+
+        lanes = {}
+        for lane, state in self._lanes.items():
+            waits = sorted(state.waits)
+            name = getattr(lane, "value", lane)
+            lanes[name] = {
+                "queued": len(state.heap),
+                "in_flight": state.in_flight,
+                **state.counts,
+                "wait_p50_ms": waits[len(waits) // 2] * 1000 if waits else 0.0,
+                "wait_p95_ms": waits[int(len(waits) * 0.95)] * 1000 if waits else 0.0,
+                "wait_max_ms": waits[-1] * 1000 if waits else 0.0,
+                "service_time_ms": state.service_time * 1000
+            }
+
+        return {
+            "queued": self._queued,
+            "workers": self.workers,
+            "shedding": self._queued >= self.shed_watermark,
+            "lanes": lanes
+        }
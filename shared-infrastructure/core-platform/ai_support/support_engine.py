@@ -14,7 +14,8 @@ from .tier_ux import TierUXRenderer, WhatsAppUXFormatter
 from .whatsapp_handler import WhatsAppSupportHandler
 from .escalation_system import EscalationSystem, EscalationReason
 from .zk_proof_engine import ZKSupportIntegration
-from .performance_monitor import PerformanceMonitor, MetricType
+from .performance_monitor import PerformanceMonitor, MetricType, RESPONSE_TIME_SLA_MS
+from .priority_scheduler import PriorityScheduler, TierPolicy, SchedulerOverloaded
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +42,9 @@ class GridWorksAISupportEngine:
         self.zk_integration = ZKSupportIntegration()
         self.performance_monitor = PerformanceMonitor()
         
+        # Weighted-fair, deadline-aware dispatch across tiers
+        self.scheduler = PriorityScheduler(self._build_tier_policies(), workers=64, shed_watermark=2000)
+        
         # System status
         self.is_running = False
         
@@ -71,6 +75,7 @@ class GridWorksAISupportEngine:
         """Stop the AI support engine"""
         
         self.is_running = False
+        await self.scheduler.stop()
         logger.info("AI Support Engine stopped")
     
     async def process_support_message(
@@ -113,74 +118,117 @@ class GridWorksAISupportEngine:
                 priority=await self._calculate_priority(message_text, user_context.tier)
             )
             
-            # Step 2: Process with AI engine
-            ai_response = await self.ai_engine.process_support_request(
-                support_message, user_context
-            )
-            
-            # Step 3: Check if escalation needed
-            if ai_response.escalate:
-                escalation_result = await self.escalation_system.escalate_to_human(
-                    support_message,
-                    {"ai_response": ai_response.message},
-                    EscalationReason.LOW_CONFIDENCE
-                )
-                
-                # Update response with escalation info
-                ai_response.message = f"Connecting you to our support team. {escalation_result.get('estimated_response', '')}"
-            
-            # Step 4: Render tier-specific UX
-            tier_response = await self.ux_renderer.render_tier_response(
-                ai_response, support_message, user_context
-            )
-            
-            # Step 5: Format for WhatsApp
-            whatsapp_message = await WhatsAppUXFormatter.format_for_whatsapp(tier_response)
-            
-            # Step 6: Generate ZK proof for transparency
-            zk_proof_result = await self.zk_integration.create_support_proof(
-                ticket_id=support_message.id or f"TM{int(asyncio.get_event_loop().time())}",
-                user_id=user_context.user_id,
-                original_message=message_text,
-                ai_response=ai_response.message,
-                resolution_summary=tier_response["message"],
-                response_time=asyncio.get_event_loop().time() - start_time
-            )
-            
-            # Step 7: Record performance metrics
-            processing_time = (asyncio.get_event_loop().time() - start_time) * 1000  # ms
-            await self.performance_monitor.record_metric(
-                MetricType.RESPONSE_TIME,
+            # Queue by tier so LITE surges can't take BLACK capacity
+            enqueued_at = asyncio.get_event_loop().time()
+            return await self.scheduler.submit(
                 user_context.tier,
-                processing_time,
-                {
-                    "escalated": ai_response.escalate,
-                    "confidence": ai_response.confidence,
-                    "language": language
-                }
+                lambda: self._handle_support_message(
+                    support_message, user_context, message_text, language, start_time, enqueued_at
+                ),
+                priority=support_message.priority
             )
             
-            # Step 8: Create final response
-            final_response = {
-                "success": True,
-                "message": whatsapp_message,
-                "tier_response": tier_response,
-                "zk_proof": zk_proof_result,
-                "performance": {
-                    "processing_time_ms": processing_time,
-                    "tier": user_context.tier.value,
-                    "escalated": ai_response.escalate,
-                    "confidence": ai_response.confidence
-                }
-            }
-            
-            logger.info(f"Support processed: {user_context.tier.value} | {processing_time:.1f}ms")
-            return final_response
-            
+        except SchedulerOverloaded as e:
+            logger.warning(f"Support request shed: {e}")
+            return await self._create_busy_response(user_context.tier)
         except Exception as e:
             logger.error(f"Support processing failed: {e}")
             return await self._create_error_response(str(e))
     
+    async def _handle_support_message(
+        self,
+        support_message: SupportMessage,
+        user_context: UserContext,
+        message_text: str,
+        language: str,
+        start_time: float,
+        enqueued_at: float
+    ) -> Dict[str, Any]:
+        """Steps 2-8 of the pipeline, run when the scheduler dispatches the request"""
+        
+        await self.performance_monitor.record_metric(
+            MetricType.QUEUE_WAIT_TIME,
+            user_context.tier,
+            (asyncio.get_event_loop().time() - enqueued_at) * 1000
+        )
+        
+        # Step 2: Process with AI engine
+        ai_response = await self.ai_engine.process_support_request(
+            support_message, user_context
+        )
+        
+        # Step 3: Check if escalation needed
+        if ai_response.escalate:
+            escalation_result = await self.escalation_system.escalate_to_human(
+                support_message,
+                {"ai_response": ai_response.message},
+                EscalationReason.LOW_CONFIDENCE
+            )
+            
+            # Update response with escalation info
+            ai_response.message = f"Connecting you to our support team. {escalation_result.get('estimated_response', '')}"
+        
+        # Step 4: Render tier-specific UX
+        tier_response = await self.ux_renderer.render_tier_response(
+            ai_response, support_message, user_context
+        )
+        
+        # Step 5: Format for WhatsApp
+        whatsapp_message = await WhatsAppUXFormatter.format_for_whatsapp(tier_response)
+        
+        # Step 6: Generate ZK proof for transparency
+        zk_proof_result = await self.zk_integration.create_support_proof(
+            ticket_id=support_message.id or f"TM{int(asyncio.get_event_loop().time())}",
+            user_id=user_context.user_id,
+            original_message=message_text,
+            ai_response=ai_response.message,
+            resolution_summary=tier_response["message"],
+            response_time=asyncio.get_event_loop().time() - start_time
+        )
+        
+        # Step 7: Record performance metrics
+        processing_time = (asyncio.get_event_loop().time() - start_time) * 1000  # ms
+        await self.performance_monitor.record_metric(
+            MetricType.RESPONSE_TIME,
+            user_context.tier,
+            processing_time,
+            {
+                "escalated": ai_response.escalate,
+                "confidence": ai_response.confidence,
+                "language": language
+            }
+        )
+        
+        # Step 8: Create final response
+        final_response = {
+            "success": True,
+            "message": whatsapp_message,
+            "tier_response": tier_response,
+            "zk_proof": zk_proof_result,
+            "performance": {
+                "processing_time_ms": processing_time,
+                "tier": user_context.tier.value,
+                "escalated": ai_response.escalate,
+                "confidence": ai_response.confidence
+            }
+        }
+        
+        logger.info(f"Support processed: {user_context.tier.value} | {processing_time:.1f}ms")
+        return final_response
+    
+    def _build_tier_policies(self) -> Dict[SupportTier, TierPolicy]:
+        """Scheduling weights per tier, with deadlines from the response-time SLAs"""
+        
+        weights = {SupportTier.BLACK: 8, SupportTier.ELITE: 4, SupportTier.PRO: 2, SupportTier.LITE: 1}
+        return {
+            tier: TierPolicy(
+                weight=weights[tier],
+                deadline=RESPONSE_TIME_SLA_MS[tier] / 1000,
+                sheddable=tier == SupportTier.LITE
+            )
+            for tier in SupportTier
+        }
+    
     async def _get_user_context(self, phone: str) -> Optional[UserContext]:
         """Get user context from phone number"""
         
@@ -279,10 +327,23 @@ class GridWorksAISupportEngine:
             "escalated": True
         }
     
+    async def _create_busy_response(self, tier: SupportTier) -> Dict[str, Any]:
+        """Response for requests shed during a traffic spike"""
+        
+        return {
+            "success": False,
+            "error": "overloaded",
+            "message": "We're handling an unusually high number of requests right now. Please try again in a few minutes.",
+            "escalated": False,
+            "performance": {"tier": tier.value, "shed": True}
+        }
+    
     async def get_performance_dashboard(self) -> Dict[str, Any]:
         """Get real-time performance dashboard"""
         
-        return await self.performance_monitor.get_performance_dashboard()
+        dashboard = await self.performance_monitor.get_performance_dashboard()
+        dashboard["scheduler"] = self.scheduler.metrics()
+        return dashboard
     
     async def verify_support_proof(self, proof_id: str, user_data: Dict[str, str] = None) -> Dict[str, Any]:
         """Verify ZK proof for support interaction"""
@@ -4,7 +4,6 @@ Core intelligence that serves all tiers with universal understanding
 """
 
 import asyncio
-import openai
 import json
 import time
 import hashlib
@@ -16,6 +15,10 @@ from .models import (
     SupportMessage, UniversalQuery, SupportResponse, UserContext,
     SupportTier, QueryCategory, UrgencyLevel, TierConfig
 )
+from .intent_matcher import (
+    SUPPORT_QUERY_PATTERNS, URGENCY_KEYWORDS, MessageAnalysis, get_message_classifier
+)
+from .llm_gateway import LLMGateway, LLMRequest, get_llm_gateway
 
 logger = logging.getLogger(__name__)
 
@@ -25,67 +28,34 @@ class UniversalTrainingModule:
     
     def __init__(self):
         # Universal query patterns (same for all tiers)
-        self.query_patterns = {
-            QueryCategory.ORDER_MANAGEMENT: {
-                "keywords": ["order", "buy", "sell", "cancel", "modify", "failed", "pending", "executed"],
-                "intents": ["cancel_order", "modify_order", "check_status", "understand_failure", "retry_order"],
-                "entities": ["order_id", "symbol", "quantity", "price", "amount"]
-            },
-            QueryCategory.PORTFOLIO_QUERIES: {
-                "keywords": ["portfolio", "holdings", "pnl", "profit", "loss", "balance", "positions"],
-                "intents": ["view_portfolio", "calculate_pnl", "analyze_performance", "risk_assessment"],
-                "entities": ["symbol", "quantity", "investment_amount", "current_value"]
-            },
-            QueryCategory.PAYMENT_ISSUES: {
-                "keywords": ["money", "payment", "deposit", "withdraw", "upi", "bank", "transfer", "stuck"],
-                "intents": ["add_money", "withdraw_money", "payment_failed", "upi_issue"],
-                "entities": ["amount", "upi_id", "bank_account", "transaction_id"]
-            },
-            QueryCategory.KYC_COMPLIANCE: {
-                "keywords": ["kyc", "verification", "documents", "aadhar", "pan", "rejected", "pending"],
-                "intents": ["check_kyc_status", "upload_documents", "understand_rejection", "update_kyc"],
-                "entities": ["document_type", "rejection_reason", "kyc_status"]
-            },
-            QueryCategory.TECHNICAL_SUPPORT: {
-                "keywords": ["app", "login", "password", "otp", "whatsapp", "error", "crash", "slow"],
-                "intents": ["login_issue", "app_problem", "whatsapp_setup", "password_reset"],
-                "entities": ["error_code", "device_type", "app_version"]
-            },
-            QueryCategory.MARKET_QUERIES: {
-                "keywords": ["price", "market", "stock", "nifty", "sensex", "news", "analysis"],
-                "intents": ["price_inquiry", "market_analysis", "stock_research", "market_hours"],
-                "entities": ["symbol", "index", "price_target", "time_frame"]
-            }
-        }
+        self.query_patterns = SUPPORT_QUERY_PATTERNS
         
         # Urgency detection patterns
-        self.urgency_keywords = {
-            UrgencyLevel.CRITICAL: ["emergency", "urgent", "stuck", "loss", "hack", "fraud"],
-            UrgencyLevel.URGENT: ["failed", "error", "problem", "issue", "help"],
-            UrgencyLevel.HIGH: ["cancel", "modify", "stop", "block"],
-            UrgencyLevel.MEDIUM: ["question", "how", "why", "when"],
-            UrgencyLevel.LOW: ["info", "learn", "understand", "explain"]
-        }
+        self.urgency_keywords = URGENCY_KEYWORDS
+        
+        # Every keyword table compiled once and scanned in a single pass
+        self.classifier = get_message_classifier()
     
     async def classify_query(self, message: SupportMessage) -> UniversalQuery:
         """Classify any support query universally"""
         
-        text = message.message.lower()
+        analysis = self.classifier.analyze(message.message)
+        text = analysis.text
         
         # Detect category
-        category = await self._detect_category(text)
+        category = await self._detect_category(analysis)
         
         # Extract intent
-        intent = await self._extract_intent(text, category)
+        intent = await self._extract_intent(analysis, category)
         
         # Assess urgency
-        urgency = await self._assess_urgency(text, message.user_tier)
+        urgency = await self._assess_urgency(analysis, message.user_tier)
         
         # Calculate complexity
-        complexity = await self._assess_complexity(text, category)
+        complexity = await self._assess_complexity(analysis, category)
         
         # Extract entities
-        entities = await self._extract_entities(text, category)
+        entities = await self._extract_entities(analysis, category)
         
         # Extract keywords
         keywords = await self._extract_keywords(text)
@@ -101,47 +71,21 @@ class UniversalTrainingModule:
             keywords=keywords
         )
     
-    async def _detect_category(self, text: str) -> QueryCategory:
-        """Detect query category from text"""
+    async def _detect_category(self, analysis: MessageAnalysis) -> QueryCategory:
+        """Detect query category from keyword hits"""
         
-        category_scores = {}
-        
-        for category, patterns in self.query_patterns.items():
-            score = 0
-            for keyword in patterns["keywords"]:
-                if keyword in text:
-                    score += 1
-            category_scores[category] = score
-        
-        # Return category with highest score
-        best_category = max(category_scores, key=category_scores.get)
-        return best_category if category_scores[best_category] > 0 else QueryCategory.GENERAL_INQUIRY
+        return analysis.category
     
-    async def _extract_intent(self, text: str, category: QueryCategory) -> str:
+    async def _extract_intent(self, analysis: MessageAnalysis, category: QueryCategory) -> str:
         """Extract specific intent within category"""
         
-        if category not in self.query_patterns:
-            return "general_inquiry"
-            
-        intents = self.query_patterns[category]["intents"]
-        
         # Simple keyword matching (would be ML-based in production)
-        for intent in intents:
-            intent_keywords = intent.split("_")
-            if any(keyword in text for keyword in intent_keywords):
-                return intent
-                
-        return intents[0]  # Default to first intent
+        return analysis.intent_for(category)
     
-    async def _assess_urgency(self, text: str, tier: SupportTier) -> UrgencyLevel:
+    async def _assess_urgency(self, analysis: MessageAnalysis, tier: SupportTier) -> UrgencyLevel:
         """Assess query urgency"""
         
-        base_urgency = UrgencyLevel.MEDIUM
-        
-        for urgency_level, keywords in self.urgency_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                base_urgency = urgency_level
-                break
+        base_urgency = analysis.urgency
         
         # Tier-based urgency boost
         tier_boost = {
@@ -154,7 +98,7 @@ class UniversalTrainingModule:
         urgency_value = min(5, max(1, base_urgency.value + tier_boost.get(tier, 0)))
         return UrgencyLevel(urgency_value)
     
-    async def _assess_complexity(self, text: str, category: QueryCategory) -> int:
+    async def _assess_complexity(self, analysis: MessageAnalysis, category: QueryCategory) -> int:
         """Assess query complexity (1-5 scale)"""
         
         complexity_map = {
@@ -171,45 +115,18 @@ class UniversalTrainingModule:
         base_complexity = complexity_map.get(category, 2)
         
         # Adjust based on text length and technical terms
-        if len(text.split()) > 20:
+        if len(analysis.text.split()) > 20:
             base_complexity += 1
-        if any(term in text for term in ["algorithm", "derivative", "portfolio", "analysis"]):
+        if analysis.has_complex_terms:
             base_complexity += 1
             
         return min(5, base_complexity)
     
-    async def _extract_entities(self, text: str, category: QueryCategory) -> Dict[str, Any]:
+    async def _extract_entities(self, analysis: MessageAnalysis, category: QueryCategory) -> Dict[str, Any]:
         """Extract relevant entities from text"""
         
-        entities = {}
-        
-        if category not in self.query_patterns:
-            return entities
-            
-        entity_types = self.query_patterns[category]["entities"]
-        
         # Simple regex-based extraction (would be NER model in production)
-        import re
-        
-        if "order_id" in entity_types:
-            order_match = re.search(r'order[#\s]*(\d+)', text)
-            if order_match:
-                entities["order_id"] = order_match.group(1)
-        
-        if "symbol" in entity_types:
-            # Common Indian stock symbols
-            symbols = ["RELIANCE", "TCS", "INFY", "HDFC", "ICICI", "SBI", "ITC", "HDFCBANK"]
-            for symbol in symbols:
-                if symbol.lower() in text.lower():
-                    entities["symbol"] = symbol
-                    break
-        
-        if "amount" in entity_types:
-            amount_match = re.search(r'₹?\s?(\d+(?:,\d+)*(?:\.\d+)?)', text)
-            if amount_match:
-                entities["amount"] = amount_match.group(1)
-        
-        return entities
+        return analysis.entities_for(category)
     
     async def _extract_keywords(self, text: str) -> List[str]:
         """Extract key terms from text"""
@@ -227,8 +144,11 @@ class UniversalTrainingModule:
 class GPT4SupportAgent:
     """GPT-4 powered support agent with universal intelligence"""
     
-    def __init__(self):
-        self.client = openai.AsyncOpenAI()
+    # Answers to prompts without account context are shared between users
+    FAQ_CACHE_TTL = 3600
+
+    def __init__(self, gateway: Optional[LLMGateway] = None):
+        self.gateway = gateway or get_llm_gateway()
         self.system_prompts = self._load_system_prompts()
         
     def _load_system_prompts(self) -> Dict[str, str]:
@@ -327,7 +247,8 @@ Language: {language}
         self,
         query: UniversalQuery,
         user_context: UserContext,
-        message: SupportMessage
+        message: SupportMessage,
+        timeout: Optional[float] = None
     ) -> Dict[str, Any]:
         """Generate AI response for any query universally"""
         
@@ -351,16 +272,19 @@ Language: {language}
         try:
             start_time = time.time()
             
-            response = await self.client.chat.completions.create(
-                model="gpt-4-turbo",
+            response = await self.gateway.complete(LLMRequest(
                 messages=messages,
+                model="gpt-4-turbo",
                 max_tokens=400,
                 temperature=0.3,
-                response_format={"type": "json_object"}
-            )
+                tier=user_context.tier.value,
+                timeout=timeout,
+                cache_ttl=None if "{balance}" in system_prompt else self.FAQ_CACHE_TTL,
+                options={"response_format": {"type": "json_object"}}
+            ))
             
             response_time = time.time() - start_time
-            result = json.loads(response.choices[0].message.content)
+            result = json.loads(response.content)
             
             return {
                 "success": True,
@@ -467,7 +391,9 @@ class UniversalAISupport:
                 response = await self._create_escalation_response(message, query, tier_config)
             else:
                 # Generate AI response
-                ai_result = await self.ai_agent.generate_response(query, user_context, message)
+                ai_result = await self.ai_agent.generate_response(
+                    query, user_context, message, timeout=tier_config.max_ai_response_time
+                )
                 
                 if ai_result["success"] and not ai_result["escalate"]:
                     response = await self._create_ai_response(ai_result, query, tier_config)
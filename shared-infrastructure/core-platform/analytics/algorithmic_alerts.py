@@ -15,12 +15,16 @@ Features:
 
 import asyncio
 import logging
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any, Union
+from typing import Dict, List, Optional, Tuple, Any, Union, Iterable, Set
 from dataclasses import dataclass, field
 from enum import Enum
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from collections import defaultdict, deque
 import json
 
@@ -92,6 +96,7 @@ class PatternSignal:
     description: str
     supporting_indicators: List[str]
     timestamp: datetime = field(default_factory=datetime.now)
+    metadata: Dict[str, Any] = field(default_factory=dict)
 
 
 @dataclass
@@ -142,12 +147,14 @@ class TechnicalIndicators:
         if len(prices) < slow:
             return 0.0, 0.0, 0.0
         
-        prices_array = np.array(prices)
-        ema_fast = TechnicalIndicators._ema(prices_array, fast)
-        ema_slow = TechnicalIndicators._ema(prices_array, slow)
+        prices_array = np.asarray(prices, dtype=float)
+        macd_series = (
+            TechnicalIndicators._ema_series(prices_array, fast) -
+            TechnicalIndicators._ema_series(prices_array, slow)
+        )
         
-        macd_line = ema_fast - ema_slow
-        signal_line = TechnicalIndicators._ema(np.array([macd_line]), signal)[0]
+        macd_line = float(macd_series[-1])
+        signal_line = float(TechnicalIndicators._ema(macd_series, signal))
         histogram = macd_line - signal_line
         
         return macd_line, signal_line, histogram
@@ -168,6 +175,20 @@ class TechnicalIndicators:
         
         return sma, upper, lower
     
+    @staticmethod
+    def rolling_rsi(prices: Union[List[float], np.ndarray], period: int = 14) -> np.ndarray:
+        """RSI as `rsi` computes it, for every prefix of at least period + 1 prices."""
+        prices = np.asarray(prices, dtype=float)
+        if len(prices) < period + 1:
+            return np.array([])
+        
+        deltas = np.diff(prices)
+        avg_gains = sliding_window_view(np.where(deltas > 0, deltas, 0), period).mean(axis=1)
+        avg_losses = sliding_window_view(np.where(deltas < 0, -deltas, 0), period).mean(axis=1)
+        
+        rs = np.divide(avg_gains, avg_losses, out=np.zeros_like(avg_gains), where=avg_losses > 0)
+        return np.where(avg_losses > 0, 100 - (100 / (1 + rs)), 100.0)
+    
     @staticmethod
     def _ema(prices: np.ndarray, period: int) -> float:
         """Calculate Exponential Moving Average."""
@@ -179,6 +200,19 @@ class TechnicalIndicators:
         
         return ema
     
+    @staticmethod
+    def _ema_series(prices: np.ndarray, period: int) -> np.ndarray:
+        """EMA at every point, seeded with the first price like `_ema`."""
+        multiplier = 2 / (period + 1)
+        series = np.empty(len(prices))
+        ema = prices[0]
+        
+        for i, price in enumerate(prices):
+            ema = ema if i == 0 else (price * multiplier) + (ema * (1 - multiplier))
+            series[i] = ema
+        
+        return series
+    
     @staticmethod
     def support_resistance_levels(prices: List[float], volume: List[int], lookback: int = 50) -> Tuple[List[float], List[float]]:
         """Identify support and resistance levels."""
@@ -209,6 +243,37 @@ class TechnicalIndicators:
         return supports, resistances
 
 
+@dataclass
+class BarSeries:
+    """Columnar OHLCV bars for one symbol, oldest first."""
+    symbol: str
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.close)
+    
+    @classmethod
+    def from_market_data(cls, data: List[MarketData]) -> "BarSeries":
+        return cls(
+            symbol=data[-1].symbol if data else "",
+            timestamp=np.array([d.timestamp.timestamp() for d in data]),
+            open=np.array([d.open for d in data], dtype=float),
+            high=np.array([d.high for d in data], dtype=float),
+            low=np.array([d.low for d in data], dtype=float),
+            close=np.array([d.close for d in data], dtype=float),
+            volume=np.array([d.volume for d in data], dtype=float)
+        )
+
+
+def as_bar_series(data: Union[List[MarketData], BarSeries]) -> BarSeries:
+    return data if isinstance(data, BarSeries) else BarSeries.from_market_data(list(data))
+
+
 class PatternRecognizer:
     """Advanced pattern recognition algorithms."""
     
@@ -216,11 +281,14 @@ class PatternRecognizer:
         self.min_pattern_length = 10
         self.confidence_threshold = 0.6
     
-    def detect_patterns(self, data: List[MarketData]) -> List[PatternSignal]:
+    def detect_patterns(self, data: Union[List[MarketData], BarSeries]) -> List[PatternSignal]:
         """Detect all patterns in market data."""
         if len(data) < self.min_pattern_length:
             return []
         
+        # Detectors slice columns; MarketData lists are converted once
+        data = as_bar_series(data)
+        
         patterns = []
         
         # Detect various patterns
@@ -234,7 +302,7 @@ class PatternRecognizer:
         # Filter by confidence
         return [p for p in patterns if p.confidence >= self.confidence_threshold]
     
-    def _detect_breakout_patterns(self, data: List[MarketData]) -> List[PatternSignal]:
+    def _detect_breakout_patterns(self, data: BarSeries) -> List[PatternSignal]:
         """Detect breakout and breakdown patterns."""
         patterns = []
         
@@ -242,19 +310,20 @@ class PatternRecognizer:
             return patterns
         
         # Get recent price action
-        closes = [d.close for d in data[-20:]]
-        volumes = [d.volume for d in data[-20:]]
-        highs = [d.high for d in data[-20:]]
-        lows = [d.low for d in data[-20:]]
+        closes = data.close[-20:]
+        volumes = data.volume[-20:]
+        highs = data.high[-20:]
+        lows = data.low[-20:]
         
         # Calculate moving averages
-        ma20 = np.mean(closes)
-        recent_high = max(highs[-10:])
-        recent_low = min(lows[-10:])
+        ma20 = closes.mean()
+        # Levels from the bars before the current one, which it has to clear
+        recent_high = highs[-11:-1].max()
+        recent_low = lows[-11:-1].min()
         
         current_price = closes[-1]
         current_volume = volumes[-1]
-        avg_volume = np.mean(volumes[:-1])
+        avg_volume = volumes[:-1].mean()
         
         # Breakout above resistance
         if (current_price > recent_high and 
@@ -267,7 +336,7 @@ class PatternRecognizer:
             
             pattern = PatternSignal(
                 pattern_type=PatternType.BREAKOUT,
-                symbol=data[-1].symbol,
+                symbol=data.symbol,
                 confidence=confidence,
                 direction="BULLISH",
                 target_price=target_price,
@@ -289,7 +358,7 @@ class PatternRecognizer:
             
             pattern = PatternSignal(
                 pattern_type=PatternType.BREAKDOWN,
-                symbol=data[-1].symbol,
+                symbol=data.symbol,
                 confidence=confidence,
                 direction="BEARISH",
                 target_price=target_price,
@@ -302,7 +371,7 @@ class PatternRecognizer:
         
         return patterns
     
-    def _detect_triangle_patterns(self, data: List[MarketData]) -> List[PatternSignal]:
+    def _detect_triangle_patterns(self, data: BarSeries) -> List[PatternSignal]:
         """Detect triangle patterns (ascending, descending, symmetrical)."""
         patterns = []
         
@@ -310,9 +379,9 @@ class PatternRecognizer:
             return patterns
         
         # Analyze recent price action for triangle formation
-        highs = [d.high for d in data[-30:]]
-        lows = [d.low for d in data[-30:]]
-        closes = [d.close for d in data[-30:]]
+        highs = data.high[-30:]
+        lows = data.low[-30:]
+        closes = data.close[-30:]
         
         # Find recent swing highs and lows
         swing_highs = self._find_swing_points(highs, 'high')
@@ -328,7 +397,7 @@ class PatternRecognizer:
                 
                 pattern = PatternSignal(
                     pattern_type=PatternType.TRIANGLE,
-                    symbol=data[-1].symbol,
+                    symbol=data.symbol,
                     confidence=confidence,
                     direction="BULLISH",
                     target_price=target_price,
@@ -341,15 +410,14 @@ class PatternRecognizer:
         
         return patterns
     
-    def _detect_flag_patterns(self, data: List[MarketData]) -> List[PatternSignal]:
+    def _detect_flag_patterns(self, data: BarSeries) -> List[PatternSignal]:
         """Detect flag and pennant patterns."""
         patterns = []
         
         if len(data) < 25:
             return patterns
         
-        closes = [d.close for d in data[-25:]]
-        volumes = [d.volume for d in data[-25:]]
+        closes = data.close[-25:]
         
         # Look for strong move followed by consolidation
         strong_move_start = -15
@@ -357,8 +425,10 @@ class PatternRecognizer:
         consolidation_start = -10
         
         strong_move_gain = (closes[strong_move_end] - closes[strong_move_start]) / closes[strong_move_start]
-        consolidation_range = max(closes[consolidation_start:]) - min(closes[consolidation_start:])
-        consolidation_mid = (max(closes[consolidation_start:]) + min(closes[consolidation_start:])) / 2
+        consolidation_high = closes[consolidation_start:].max()
+        consolidation_low = closes[consolidation_start:].min()
+        consolidation_range = consolidation_high - consolidation_low
+        consolidation_mid = (consolidation_high + consolidation_low) / 2
         
         # Flag pattern: strong move + tight consolidation
         if (abs(strong_move_gain) > 0.05 and  # 5% move
@@ -369,14 +439,14 @@ class PatternRecognizer:
             
             if direction == "BULLISH":
                 target_price = closes[-1] + abs(closes[strong_move_end] - closes[strong_move_start])
-                stop_loss = min(closes[consolidation_start:]) * 0.98
+                stop_loss = consolidation_low * 0.98
             else:
                 target_price = closes[-1] - abs(closes[strong_move_end] - closes[strong_move_start])
-                stop_loss = max(closes[consolidation_start:]) * 1.02
+                stop_loss = consolidation_high * 1.02
             
             pattern = PatternSignal(
                 pattern_type=PatternType.FLAG,
-                symbol=data[-1].symbol,
+                symbol=data.symbol,
                 confidence=confidence,
                 direction=direction,
                 target_price=target_price,
@@ -389,14 +459,14 @@ class PatternRecognizer:
         
         return patterns
     
-    def _detect_head_shoulders(self, data: List[MarketData]) -> List[PatternSignal]:
+    def _detect_head_shoulders(self, data: BarSeries) -> List[PatternSignal]:
         """Detect head and shoulders patterns."""
         patterns = []
         
         if len(data) < 40:
             return patterns
         
-        highs = [d.high for d in data[-40:]]
+        highs = data.high[-40:]
         swing_highs = self._find_swing_points(highs, 'high')
         
         if len(swing_highs) >= 3:
@@ -415,7 +485,7 @@ class PatternRecognizer:
                 
                 pattern = PatternSignal(
                     pattern_type=PatternType.HEAD_SHOULDERS,
-                    symbol=data[-1].symbol,
+                    symbol=data.symbol,
                     confidence=confidence,
                     direction="BEARISH",
                     target_price=target_price,
@@ -428,15 +498,15 @@ class PatternRecognizer:
         
         return patterns
     
-    def _detect_double_patterns(self, data: List[MarketData]) -> List[PatternSignal]:
+    def _detect_double_patterns(self, data: BarSeries) -> List[PatternSignal]:
         """Detect double top and double bottom patterns."""
         patterns = []
         
         if len(data) < 30:
             return patterns
         
-        highs = [d.high for d in data[-30:]]
-        lows = [d.low for d in data[-30:]]
+        highs = data.high[-30:]
+        lows = data.low[-30:]
         
         swing_highs = self._find_swing_points(highs, 'high')
         swing_lows = self._find_swing_points(lows, 'low')
@@ -446,12 +516,12 @@ class PatternRecognizer:
             if abs(swing_highs[-1] - swing_highs[-2]) / swing_highs[-1] < 0.02:  # Within 2%
                 confidence = 0.75
                 resistance = max(swing_highs[-2:])
-                support = min(lows[-15:])  # Find support level
+                support = lows[-15:].min()  # Find support level
                 target_price = support - (resistance - support) * 0.5
                 
                 pattern = PatternSignal(
                     pattern_type=PatternType.DOUBLE_TOP,
-                    symbol=data[-1].symbol,
+                    symbol=data.symbol,
                     confidence=confidence,
                     direction="BEARISH",
                     target_price=target_price,
@@ -467,12 +537,12 @@ class PatternRecognizer:
             if abs(swing_lows[-1] - swing_lows[-2]) / swing_lows[-1] < 0.02:  # Within 2%
                 confidence = 0.75
                 support = min(swing_lows[-2:])
-                resistance = max(highs[-15:])  # Find resistance level
+                resistance = highs[-15:].max()  # Find resistance level
                 target_price = resistance + (resistance - support) * 0.5
                 
                 pattern = PatternSignal(
                     pattern_type=PatternType.DOUBLE_BOTTOM,
-                    symbol=data[-1].symbol,
+                    symbol=data.symbol,
                     confidence=confidence,
                     direction="BULLISH",
                     target_price=target_price,
@@ -485,28 +555,25 @@ class PatternRecognizer:
         
         return patterns
     
-    def _detect_momentum_divergence(self, data: List[MarketData]) -> List[PatternSignal]:
+    def _detect_momentum_divergence(self, data: BarSeries) -> List[PatternSignal]:
         """Detect momentum divergence patterns."""
         patterns = []
         
         if len(data) < 20:
             return patterns
         
-        closes = [d.close for d in data[-20:]]
+        closes = data.close[-20:]
         
         # Calculate RSI for divergence analysis
-        rsi_values = []
-        for i in range(14, len(closes)):
-            rsi = TechnicalIndicators.rsi(closes[:i+1])
-            rsi_values.append(rsi)
+        rsi_values = TechnicalIndicators.rolling_rsi(closes)
         
         if len(rsi_values) < 5:
             return patterns
         
         # Look for price making new highs but RSI making lower highs (bearish divergence)
-        recent_price_high = max(closes[-5:])
-        prev_price_high = max(closes[-10:-5])
-        recent_rsi_high = max(rsi_values[-5:])
+        recent_price_high = closes[-5:].max()
+        prev_price_high = closes[-10:-5].max()
+        recent_rsi_high = rsi_values[-5:].max()
         prev_rsi_high = max(rsi_values[-10:-5])
         
         if (recent_price_high > prev_price_high and recent_rsi_high < prev_rsi_high):
@@ -514,7 +581,7 @@ class PatternRecognizer:
             
             pattern = PatternSignal(
                 pattern_type=PatternType.MOMENTUM_DIVERGENCE,
-                symbol=data[-1].symbol,
+                symbol=data.symbol,
                 confidence=confidence,
                 direction="BEARISH",
                 target_price=closes[-1] * 0.95,
@@ -527,19 +594,21 @@ class PatternRecognizer:
         
         return patterns
     
-    def _find_swing_points(self, prices: List[float], point_type: str, window: int = 3) -> List[float]:
+    def _find_swing_points(self, prices: Union[List[float], np.ndarray], point_type: str, window: int = 3) -> List[float]:
         """Find swing high/low points."""
-        swing_points = []
+        prices = np.asarray(prices, dtype=float)
+        if len(prices) < 2 * window + 1:
+            return []
         
-        for i in range(window, len(prices) - window):
-            if point_type == 'high':
-                if all(prices[i] >= prices[j] for j in range(i - window, i + window + 1) if j != i):
-                    swing_points.append(prices[i])
-            else:  # 'low'
-                if all(prices[i] <= prices[j] for j in range(i - window, i + window + 1) if j != i):
-                    swing_points.append(prices[i])
+        # A swing point is the extreme of the window centred on it
+        windows = sliding_window_view(prices, 2 * window + 1)
+        centers = prices[window:len(prices) - window]
+        if point_type == 'high':
+            mask = centers >= windows.max(axis=1)
+        else:  # 'low'
+            mask = centers <= windows.min(axis=1)
         
-        return swing_points
+        return centers[mask].tolist()
     
     def _is_ascending_triangle(self, highs: List[float], lows: List[float]) -> bool:
         """Check if pattern forms an ascending triangle."""
@@ -562,12 +631,12 @@ class MarketRegimeDetector:
     def __init__(self):
         self.lookback_period = 50
     
-    def detect_regime(self, data: List[MarketData]) -> MarketRegime:
+    def detect_regime(self, data: Union[List[MarketData], BarSeries]) -> MarketRegime:
         """Detect current market regime."""
         if len(data) < self.lookback_period:
             return MarketRegime.RANGING
         
-        closes = [d.close for d in data[-self.lookback_period:]]
+        closes = as_bar_series(data).close[-self.lookback_period:]
         returns = np.diff(closes) / closes[:-1]
         
         # Calculate trend strength
@@ -607,23 +676,266 @@ class MarketRegimeDetector:
         return max(0, min(1, r_squared))
 
 
+class BarWindow:
+    """Rolling columnar OHLCV window for one symbol.
+    
+    Columns live in a buffer twice the window capacity so the newest
+    `capacity` bars are always a contiguous slice; the buffer is compacted
+    once per `capacity` appends. RSI, MACD and Bollinger state advance one
+    bar at a time instead of being recomputed over the whole window.
+    """
+    
+    COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+    
+    def __init__(self, symbol: str, capacity: int = 200, rsi_period: int = 14,
+                 macd_periods: Tuple[int, int, int] = (12, 26, 9), bb_period: int = 20, bb_std: float = 2.0):
+        self.symbol = symbol
+        self.capacity = capacity
+        self._buffer = np.zeros((len(self.COLUMNS), capacity * 2))
+        self._start = 0
+        self._end = 0
+        self.bars_seen = 0
+        
+        self.rsi_period = rsi_period
+        self._gains: deque = deque(maxlen=rsi_period)
+        self._losses: deque = deque(maxlen=rsi_period)
+        
+        fast, slow, signal = macd_periods
+        self._macd_multipliers = (2 / (fast + 1), 2 / (slow + 1), 2 / (signal + 1))
+        self._ema_fast = self._ema_slow = self._macd_signal = None
+        
+        self.bb_period = bb_period
+        self.bb_std = bb_std
+        self._bb_closes: deque = deque(maxlen=bb_period)
+        self._bb_sum = 0.0
+        self._bb_sum_sq = 0.0
+    
+    def __len__(self) -> int:
+        return self._end - self._start
+    
+    @property
+    def last_timestamp(self) -> float:
+        return self._buffer[0, self._end - 1] if len(self) else float("-inf")
+    
+    def append(self, timestamp: float, open_: float, high: float, low: float, close: float, volume: float) -> bool:
+        """Append a closed bar; bars at or before the last timestamp are ignored."""
+        if timestamp <= self.last_timestamp:
+            return False
+        
+        if self._end == self._buffer.shape[1]:
+            keep = self.capacity - 1
+            self._buffer[:, :keep] = self._buffer[:, self._end - keep:self._end]
+            self._start, self._end = 0, keep
+        
+        previous_close = self._buffer[4, self._end - 1] if len(self) else None
+        self._buffer[:, self._end] = (timestamp, open_, high, low, close, volume)
+        self._end += 1
+        self._start = max(self._start, self._end - self.capacity)
+        self.bars_seen += 1
+        
+        self._update_indicators(close, previous_close)
+        return True
+    
+    def _update_indicators(self, close: float, previous_close: Optional[float]):
+        if previous_close is not None:
+            delta = close - previous_close
+            self._gains.append(max(delta, 0.0))
+            self._losses.append(max(-delta, 0.0))
+        
+        fast_k, slow_k, signal_k = self._macd_multipliers
+        if self._ema_fast is None:
+            self._ema_fast = self._ema_slow = close
+            self._macd_signal = 0.0
+        else:
+            self._ema_fast = close * fast_k + self._ema_fast * (1 - fast_k)
+            self._ema_slow = close * slow_k + self._ema_slow * (1 - slow_k)
+            self._macd_signal = (self._ema_fast - self._ema_slow) * signal_k + self._macd_signal * (1 - signal_k)
+        
+        if len(self._bb_closes) == self.bb_period:
+            dropped = self._bb_closes[0]
+            self._bb_sum -= dropped
+            self._bb_sum_sq -= dropped * dropped
+        self._bb_closes.append(close)
+        self._bb_sum += close
+        self._bb_sum_sq += close * close
+    
+    def series(self) -> BarSeries:
+        """Views over the current window; valid until the next append."""
+        columns = self._buffer[:, self._start:self._end]
+        return BarSeries(self.symbol, *columns)
+    
+    def indicators(self) -> Dict[str, float]:
+        """Latest indicator values, matching `TechnicalIndicators` over the same bars."""
+        result: Dict[str, float] = {}
+        
+        if len(self._gains) == self.rsi_period:
+            avg_gain = sum(self._gains) / self.rsi_period
+            avg_loss = sum(self._losses) / self.rsi_period
+            result["rsi"] = 100.0 if avg_loss == 0 else 100 - (100 / (1 + avg_gain / avg_loss))
+        
+        if self._ema_fast is not None:
+            macd = self._ema_fast - self._ema_slow
+            result.update(macd=macd, macd_signal=self._macd_signal, macd_histogram=macd - self._macd_signal)
+        
+        if len(self._bb_closes) == self.bb_period:
+            mean = self._bb_sum / self.bb_period
+            std = np.sqrt(max(self._bb_sum_sq / self.bb_period - mean * mean, 0.0))
+            result.update(bb_middle=mean, bb_upper=mean + self.bb_std * std, bb_lower=mean - self.bb_std * std)
+        
+        return result
+
+
+@dataclass
+class ScanResult:
+    """Detector output for one symbol at its latest closed bar."""
+    symbol: str
+    patterns: List[PatternSignal]
+    regime: MarketRegime
+    last_close: float
+    bar_time: float
+    indicators: Dict[str, float] = field(default_factory=dict)
+
+
+BarTuple = Tuple[float, float, float, float, float, float]
+
+
+class ScanShard:
+    """Windows and detectors for a subset of the symbol universe.
+    
+    Detectors only run for symbols that received a newly closed bar, so an
+    idle symbol costs one timestamp comparison per scan.
+    """
+    
+    def __init__(self, capacity: int = 200):
+        self.capacity = capacity
+        self.windows: Dict[str, BarWindow] = {}
+        self.pattern_recognizer = PatternRecognizer()
+        self.regime_detector = MarketRegimeDetector()
+    
+    def ingest(self, symbol: str, bars: Iterable[BarTuple]) -> int:
+        window = self.windows.get(symbol)
+        if window is None:
+            window = self.windows[symbol] = BarWindow(symbol, self.capacity)
+        return sum(window.append(*bar) for bar in sorted(bars))
+    
+    def scan(self, updates: Dict[str, List[BarTuple]]) -> List[ScanResult]:
+        results = []
+        for symbol, bars in updates.items():
+            try:
+                if not self.ingest(symbol, bars):
+                    continue
+                
+                window = self.windows[symbol]
+                series = window.series()
+                patterns = self.pattern_recognizer.detect_patterns(series)
+                if not patterns:
+                    continue
+                
+                last_close = float(series.close[-1])
+                for pattern in patterns:
+                    pattern.metadata["current_price"] = last_close
+                
+                results.append(ScanResult(
+                    symbol=symbol,
+                    patterns=patterns,
+                    regime=self.regime_detector.detect_regime(series),
+                    last_close=last_close,
+                    bar_time=float(series.timestamp[-1]),
+                    indicators=window.indicators()
+                ))
+            except Exception as e:
+                logger.error(f"❌ Pattern scan error for {symbol}: {e}")
+        return results
+
+
+# Worker-process state: each shard executor has a single worker, so a
+# symbol's window stays in the same process between scans
+_worker_shard: Optional[ScanShard] = None
+
+
+def _init_scan_worker(capacity: int):
+    global _worker_shard
+    _worker_shard = ScanShard(capacity)
+
+
+def _scan_in_worker(updates: Dict[str, List[BarTuple]]) -> List[ScanResult]:
+    return _worker_shard.scan(updates)
+
+
+class ShardedPatternScanner:
+    """Partitions symbols across worker processes by a stable hash.
+    
+    With `workers=0` everything runs in-process on a single shard, which is
+    what tests and small watchlists use.
+    """
+    
+    def __init__(self, workers: int = 0, capacity: int = 200):
+        self.workers = max(0, workers)
+        self.capacity = capacity
+        self._local = ScanShard(capacity) if self.workers == 0 else None
+        self._executors = [
+            ProcessPoolExecutor(max_workers=1, initializer=_init_scan_worker, initargs=(capacity,))
+            for _ in range(self.workers)
+        ]
+    
+    def shard_for(self, symbol: str) -> int:
+        return zlib.crc32(symbol.encode()) % self.workers if self.workers else 0
+    
+    async def scan(self, updates: Dict[str, List[BarTuple]], results: asyncio.Queue) -> int:
+        """Scan all shards concurrently, publishing results as each shard finishes."""
+        if self._local is not None:
+            shard_results = self._local.scan(updates)
+            for result in shard_results:
+                await results.put(result)
+            return len(shard_results)
+        
+        batches: Dict[int, Dict[str, List[BarTuple]]] = defaultdict(dict)
+        for symbol, bars in updates.items():
+            batches[self.shard_for(symbol)][symbol] = bars
+        
+        loop = asyncio.get_running_loop()
+        published = 0
+        for future in asyncio.as_completed([
+            loop.run_in_executor(self._executors[shard], _scan_in_worker, batch)
+            for shard, batch in batches.items()
+        ]):
+            for result in await future:
+                await results.put(result)
+                published += 1
+        return published
+    
+    def shutdown(self):
+        for executor in self._executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+        self._executors = []
+
+
 class AlgorithmicAlertsEngine:
     """Main algorithmic alerts and pattern recognition engine."""
     
     def __init__(self, config: Optional[Dict] = None):
-        self.config = config or self._default_config()
+        self.config = {**self._default_config(), **(config or {})}
         self.pattern_recognizer = PatternRecognizer()
         self.regime_detector = MarketRegimeDetector()
         self.technical_indicators = TechnicalIndicators()
         
-        # Data storage
-        self.market_data = defaultdict(deque)
+        # Per-symbol columnar windows, sharded across worker processes
+        self.scanner = ShardedPatternScanner(
+            workers=self.config["scan_workers"],
+            capacity=self.config["window_size"]
+        )
+        self.scan_results: asyncio.Queue = asyncio.Queue()
+        self._publisher_task: Optional[asyncio.Task] = None
+        
+        # Alert storage
         self.active_alerts = {}
+        self.alerts_by_symbol: Dict[str, Set[str]] = defaultdict(set)
         self.alert_history = deque(maxlen=1000)
         
         # Alert management
         self.running = False
         self.last_scan_time = datetime.now()
+        self.last_scan_duration = 0.0
         
     def _default_config(self) -> Dict:
         return {
@@ -633,12 +945,16 @@ class AlgorithmicAlertsEngine:
             "min_confidence": 0.6,
             "alert_expiry_hours": 24,
             "enable_notifications": True,
-            "risk_free_rate": 0.06
+            "risk_free_rate": 0.06,
+            "scan_workers": 0,  # Worker processes; 0 scans in-process
+            "window_size": 200,  # Bars kept per symbol
+            "fetch_concurrency": 32
         }
     
     async def start_monitoring(self):
         """Start algorithmic alerts monitoring."""
         self.running = True
+        self._publisher_task = asyncio.create_task(self._publish_alerts())
         logger.info("🔄 Algorithmic Alerts Engine started")
         
         while self.running:
@@ -653,38 +969,69 @@ class AlgorithmicAlertsEngine:
     def stop_monitoring(self):
         """Stop algorithmic alerts monitoring."""
         self.running = False
+        if self._publisher_task:
+            self._publisher_task.cancel()
+            self._publisher_task = None
+        self.scanner.shutdown()
         logger.info("⏹️ Algorithmic Alerts Engine stopped")
     
     async def _scan_patterns(self):
         """Scan for patterns and generate alerts."""
-        for symbol in self.config["symbols"]:
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.config["fetch_concurrency"])
+        
+        async def fetch(symbol: str) -> Tuple[str, List[MarketData]]:
+            async with semaphore:
+                try:
+                    return symbol, await self._fetch_market_data(symbol)
+                except Exception as e:
+                    logger.error(f"❌ Market data fetch error for {symbol}: {e}")
+                    return symbol, []
+        
+        fetched = await asyncio.gather(*(fetch(symbol) for symbol in self.config["symbols"]))
+        
+        # Plain tuples keep the per-scan payload to the shard processes small
+        updates = {
+            symbol: [(d.timestamp.timestamp(), d.open, d.high, d.low, d.close, d.volume) for d in market_data]
+            for symbol, market_data in fetched if market_data
+        }
+        
+        await self.ingest_bars(updates)
+        
+        self.last_scan_time = datetime.now()
+        self.last_scan_duration = time.perf_counter() - started
+        if self.last_scan_duration > self.config["scan_interval"]:
+            logger.warning(
+                f"⚠️ Pattern scan of {len(updates)} symbols took {self.last_scan_duration:.1f}s, "
+                f"longer than the {self.config['scan_interval']}s scan interval"
+            )
+    
+    async def ingest_bars(self, updates: Dict[str, List[BarTuple]]) -> int:
+        """Scan newly closed bars per symbol, e.g. from a live or replayed feed."""
+        scanned = await self.scanner.scan(updates, self.scan_results)
+        
+        # Without a running publisher (one-off scans), publish inline
+        if self._publisher_task is None:
+            while not self.scan_results.empty():
+                await self._publish_result(self.scan_results.get_nowait())
+        
+        return scanned
+    
+    async def _publish_alerts(self):
+        """Turn scan results into alerts as shards publish them."""
+        while True:
+            result = await self.scan_results.get()
             try:
-                # Fetch market data
-                market_data = await self._fetch_market_data(symbol)
-                if not market_data:
-                    continue
-                
-                # Store data
-                self.market_data[symbol].extend(market_data)
-                # Keep only recent data
-                while len(self.market_data[symbol]) > 200:
-                    self.market_data[symbol].popleft()
-                
-                # Detect patterns
-                data_list = list(self.market_data[symbol])
-                patterns = self.pattern_recognizer.detect_patterns(data_list)
-                
-                # Detect market regime
-                regime = self.regime_detector.detect_regime(data_list)
-                
-                # Generate alerts from patterns
-                for pattern in patterns:
-                    alert = self._create_alert_from_pattern(pattern, regime)
-                    if alert and alert.confidence >= self.config["min_confidence"]:
-                        await self._process_alert(alert)
-                
+                await self._publish_result(result)
             except Exception as e:
-                logger.error(f"❌ Pattern scan error for {symbol}: {e}")
+                logger.error(f"❌ Alert publish error for {result.symbol}: {e}")
+    
+    async def _publish_result(self, result: ScanResult):
+        for pattern in result.patterns:
+            alert = self._create_alert_from_pattern(pattern, result.regime)
+            if alert and alert.confidence >= self.config["min_confidence"]:
+                alert.metadata["indicators"] = result.indicators
+                await self._process_alert(alert)
     
     def _create_alert_from_pattern(self, pattern: PatternSignal, regime: MarketRegime) -> Optional[AlgorithmicAlert]:
         """Create alert from detected pattern."""
@@ -781,12 +1128,13 @@ class AlgorithmicAlertsEngine:
     async def _process_alert(self, alert: AlgorithmicAlert):
         """Process and potentially send alert."""
         # Check if we already have too many alerts for this symbol
-        symbol_alerts = [a for a in self.active_alerts.values() if a.symbol == alert.symbol]
-        if len(symbol_alerts) >= self.config["max_alerts_per_symbol"]:
+        symbol_alerts = self.alerts_by_symbol[alert.symbol]
+        if len(symbol_alerts) >= self.config["max_alerts_per_symbol"] or alert.alert_id in symbol_alerts:
             return
         
         # Store alert
         self.active_alerts[alert.alert_id] = alert
+        symbol_alerts.add(alert.alert_id)
         self.alert_history.append(alert)
         
         # Log alert
@@ -812,7 +1160,10 @@ class AlgorithmicAlertsEngine:
         ]
         
         for alert_id in expired_alerts:
-            del self.active_alerts[alert_id]
+            alert = self.active_alerts.pop(alert_id)
+            self.alerts_by_symbol[alert.symbol].discard(alert_id)
+            if not self.alerts_by_symbol[alert.symbol]:
+                del self.alerts_by_symbol[alert.symbol]
     
     async def _fetch_market_data(self, symbol: str) -> List[MarketData]:
         """Fetch market data for symbol (simulated for demo)."""
@@ -867,9 +1218,10 @@ class AlgorithmicAlertsEngine:
     
     def get_active_alerts(self, symbol: Optional[str] = None) -> List[AlgorithmicAlert]:
         """Get currently active alerts."""
-        alerts = list(self.active_alerts.values())
         if symbol:
-            alerts = [a for a in alerts if a.symbol == symbol]
+            alerts = [self.active_alerts[alert_id] for alert_id in self.alerts_by_symbol.get(symbol, ())]
+        else:
+            alerts = list(self.active_alerts.values())
         
         # Sort by priority and timestamp
         return sorted(alerts, key=lambda x: (x.priority.value, x.timestamp), reverse=True)
@@ -0,0 +1,198 @@
+"""
+Options Chain Store
+===================
+
+Columnar rolling statistics for options chains. Each underlying keeps one row
+per (strike, expiry, option type) with exponentially decayed means and
+variances of volume and implied volatility, plus the session-open and last
+open interest, so anomaly detection runs as array operations over the whole
+chain instead of per-contract history lookups.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+ContractKey = Tuple[float, date, str]
+
+
+def expiry_date(expiry) -> date:
+    """Contracts are keyed by expiry day; feeds disagree on the time of day."""
+    return expiry.date() if isinstance(expiry, datetime) else expiry
+
+
+@dataclass
+class ChainFrame:
+    """One snapshot of a chain as columns, aligned with the store's baselines.
+
+    Baseline columns hold the statistics as they were *before* this snapshot,
+    so a spike is measured against history rather than against itself.
+    """
+    rows: np.ndarray
+    strike: np.ndarray
+    is_call: np.ndarray
+    last_price: np.ndarray
+    volume: np.ndarray
+    open_interest: np.ndarray
+    implied_volatility: np.ndarray
+    delta: np.ndarray
+    observations: np.ndarray
+    mean_volume: np.ndarray
+    std_volume: np.ndarray
+    mean_iv: np.ndarray
+    std_iv: np.ndarray
+    session_oi: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @property
+    def notional(self) -> np.ndarray:
+        return self.volume * self.last_price * 100
+
+
+class OptionsChainStore:
+    """Rolling per-contract statistics for one underlying's chain."""
+
+    COLUMNS = ("mean_volume", "var_volume", "mean_iv", "var_iv", "session_oi", "last_oi", "observations", "last_seen")
+
+    def __init__(self, halflife: float = 20.0, initial_capacity: int = 256):
+        # Weight of the newest snapshot; older snapshots decay by half every `halflife` updates
+        self.alpha = 1 - 0.5 ** (1 / halflife)
+
+        self._index: Dict[ContractKey, int] = {}
+        self._keys: List[Optional[ContractKey]] = []
+        self._size = 0
+        self._session: Optional[date] = None
+
+        self.mean_volume = np.zeros(initial_capacity)
+        self.var_volume = np.zeros(initial_capacity)
+        self.mean_iv = np.zeros(initial_capacity)
+        self.var_iv = np.zeros(initial_capacity)
+        self.session_oi = np.zeros(initial_capacity)
+        self.last_oi = np.zeros(initial_capacity)
+        self.observations = np.zeros(initial_capacity, dtype=np.int64)
+        self.last_seen = np.zeros(initial_capacity)  # POSIX seconds
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _grow(self, capacity: int):
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def _rows_for(self, contracts, create: bool) -> np.ndarray:
+        rows = np.empty(len(contracts), dtype=np.int64)
+        for i, contract in enumerate(contracts):
+            key = (contract.strike, expiry_date(contract.expiry), contract.option_type)
+            row = self._index.get(key)
+            if row is None:
+                if not create:
+                    rows[i] = -1
+                    continue
+                row = self._size
+                self._size += 1
+                if row >= len(self.mean_volume):
+                    self._grow(len(self.mean_volume) * 2)
+                self._index[key] = row
+                self._keys.append(key)
+            rows[i] = row
+        return rows
+
+    def frame(self, contracts, create: bool = True) -> ChainFrame:
+        """Columnar view of a snapshot with baselines from prior snapshots."""
+
+        rows = self._rows_for(contracts, create)
+        known = rows >= 0
+        safe_rows = np.where(known, rows, 0)
+
+        def baseline(column: np.ndarray) -> np.ndarray:
+            return np.where(known, column[safe_rows], 0.0)
+
+        return ChainFrame(
+            rows=rows,
+            strike=np.fromiter((c.strike for c in contracts), dtype=float, count=len(contracts)),
+            is_call=np.fromiter((c.option_type == "CALL" for c in contracts), dtype=bool, count=len(contracts)),
+            last_price=np.fromiter((c.last_price for c in contracts), dtype=float, count=len(contracts)),
+            volume=np.fromiter((c.volume for c in contracts), dtype=float, count=len(contracts)),
+            open_interest=np.fromiter((c.open_interest for c in contracts), dtype=float, count=len(contracts)),
+            implied_volatility=np.fromiter((c.implied_volatility for c in contracts), dtype=float, count=len(contracts)),
+            delta=np.fromiter((c.delta for c in contracts), dtype=float, count=len(contracts)),
+            observations=np.where(known, self.observations[safe_rows], 0),
+            mean_volume=baseline(self.mean_volume),
+            std_volume=np.sqrt(baseline(self.var_volume)),
+            mean_iv=baseline(self.mean_iv),
+            std_iv=np.sqrt(baseline(self.var_iv)),
+            session_oi=baseline(self.session_oi)
+        )
+
+    def update(self, frame: ChainFrame, timestamp: Optional[datetime] = None):
+        """Fold a snapshot into the rolling statistics."""
+
+        timestamp = timestamp or datetime.now()
+        if self._session != timestamp.date():
+            # New trading session: OI changes are measured from the first snapshot of the day
+            self._session = timestamp.date()
+            self.session_oi[:self._size] = 0
+
+        known = frame.rows >= 0
+        rows = frame.rows[known]
+        if len(rows) == 0:
+            return
+
+        # Duplicate contracts in one snapshot collapse onto the last occurrence
+        rows, last = np.unique(rows[::-1], return_index=True)
+        picked = np.flatnonzero(known)[::-1][last]
+
+        volume = frame.volume[picked]
+        iv = frame.implied_volatility[picked]
+        oi = frame.open_interest[picked]
+
+        first = self.observations[rows] == 0
+        alpha = self.alpha
+
+        for mean_name, var_name, values in (("mean_volume", "var_volume", volume), ("mean_iv", "var_iv", iv)):
+            mean = getattr(self, mean_name)
+            var = getattr(self, var_name)
+            diff = values - mean[rows]
+            mean[rows] = np.where(first, values, mean[rows] + alpha * diff)
+            var[rows] = np.where(first, 0.0, (1 - alpha) * (var[rows] + alpha * diff * diff))
+
+        self.session_oi[rows] = np.where(self.session_oi[rows] > 0, self.session_oi[rows], oi)
+        self.last_oi[rows] = oi
+        self.observations[rows] += 1
+        self.last_seen[rows] = timestamp.timestamp()
+
+    def prune(self, now: Optional[datetime] = None, stale_after: float = 86400) -> int:
+        """Drop expired or long-unseen contracts and compact the columns.
+
+        Contracts stay live through their expiry day.
+        """
+
+        now = now or datetime.now()
+        today = now.date()
+        live = [
+            row for row in range(self._size)
+            if self._keys[row][1] >= today and now.timestamp() - self.last_seen[row] <= stale_after
+        ]
+        removed = self._size - len(live)
+        if not removed:
+            return 0
+
+        live_rows = np.array(live, dtype=np.int64)
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            compacted = np.zeros(max(len(live) * 2, 16), dtype=column.dtype)
+            compacted[:len(live)] = column[live_rows]
+            setattr(self, name, compacted)
+
+        self._keys = [self._keys[row] for row in live]
+        self._index = {key: row for row, key in enumerate(self._keys)}
+        self._size = len(live)
+        return removed
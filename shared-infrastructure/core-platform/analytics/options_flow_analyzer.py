@@ -23,6 +23,8 @@ import pandas as pd
 import numpy as np
 from collections import defaultdict, deque
 
+from .options_chain_store import OptionsChainStore, ChainFrame
+
 logger = logging.getLogger(__name__)
 
 
@@ -85,8 +87,11 @@ class OptionsFlowAnalyzer:
     """Advanced options flow analysis with unusual activity detection."""
     
     def __init__(self, config: Optional[Dict] = None):
-        self.config = config or self._default_config()
-        self.historical_data = defaultdict(deque)
+        self.config = {**self._default_config(), **(config or {})}
+        self.chain_stores: Dict[str, OptionsChainStore] = defaultdict(
+            lambda: OptionsChainStore(halflife=self.config["stats_halflife"])
+        )
+        self._scan_count = 0
         self.flow_history = deque(maxlen=1000)
         self.dark_pool_history = deque(maxlen=500)
         self.alert_history = deque(maxlen=200)
@@ -97,6 +102,8 @@ class OptionsFlowAnalyzer:
         self.oi_change_threshold = 0.2
         self.unusual_iv_threshold = 0.3
         self.dark_pool_size_threshold = 1000000  # $1M+
+        self.volume_zscore_threshold = 2.0
+        self.iv_zscore_threshold = 2.0
         
     def _default_config(self) -> Dict:
         return {
@@ -107,7 +114,10 @@ class OptionsFlowAnalyzer:
             "max_symbols": 500,
             "enable_dark_pool": True,
             "enable_institutional": True,
-            "risk_free_rate": 0.05
+            "risk_free_rate": 0.05,
+            "stats_halflife": 20,  # snapshots
+            "min_observations": 5,  # snapshots before a contract can alert
+            "prune_every": 60  # scans between expired-contract cleanups
         }
     
     async def start_monitoring(self):
@@ -134,18 +144,32 @@ class OptionsFlowAnalyzer:
             # Get current options data (simulated for demo)
             options_data = await self._fetch_options_data()
             
+            self._scan_count += 1
+            now = datetime.now()
+            
             for symbol, contracts in options_data.items():
+                if not contracts:
+                    continue
+                
+                # Whole chain as columns, with baselines from earlier snapshots
+                store = self.chain_stores[symbol]
+                frame = store.frame(contracts)
+                
                 # Analyze unusual volume
-                volume_alerts = self._detect_unusual_volume(symbol, contracts)
+                volume_alerts = self._detect_unusual_volume(symbol, contracts, frame)
                 
                 # Analyze unusual open interest changes
-                oi_alerts = self._detect_unusual_oi(symbol, contracts)
+                oi_alerts = self._detect_unusual_oi(symbol, contracts, frame)
                 
                 # Analyze implied volatility spikes
-                iv_alerts = self._detect_iv_anomalies(symbol, contracts)
+                iv_alerts = self._detect_iv_anomalies(symbol, contracts, frame)
                 
                 # Detect potential sweeps
-                sweep_alerts = self._detect_option_sweeps(symbol, contracts)
+                sweep_alerts = self._detect_option_sweeps(symbol, contracts, frame)
+                
+                store.update(frame, now)
+                if self._scan_count % self.config["prune_every"] == 0:
+                    store.prune(now)
                 
                 # Combine all alerts
                 all_alerts = volume_alerts + oi_alerts + iv_alerts + sweep_alerts
@@ -156,167 +180,214 @@ class OptionsFlowAnalyzer:
                 
                 # Dark pool analysis
                 if self.config["enable_dark_pool"]:
-                    dark_flows = await self._analyze_dark_pool_activity(symbol, contracts)
+                    dark_flows = await self._analyze_dark_pool_activity(symbol, contracts, frame)
                     self.dark_pool_history.extend(dark_flows)
             
         except Exception as e:
             logger.error(f"❌ Options flow scan error: {e}")
     
-    def _detect_unusual_volume(self, symbol: str, contracts: List[OptionsContract]) -> List[FlowDetection]:
+    def _chain_frame(self, symbol: str, contracts: List[OptionsContract], frame: Optional[ChainFrame]) -> ChainFrame:
+        return frame if frame is not None else self.chain_stores[symbol].frame(contracts)
+    
+    def _warmed_up(self, frame: ChainFrame) -> np.ndarray:
+        return frame.observations >= self.config["min_observations"]
+    
+    @staticmethod
+    def _ratio(numerator: np.ndarray, denominator: np.ndarray, mask: np.ndarray, fill: float = 0.0) -> np.ndarray:
+        return np.divide(numerator, denominator, out=np.full(len(numerator), fill), where=mask & (denominator > 0))
+    
+    def _detect_unusual_volume(
+        self, symbol: str, contracts: List[OptionsContract], frame: Optional[ChainFrame] = None
+    ) -> List[FlowDetection]:
         """Detect unusual volume spikes."""
         alerts = []
+        frame = self._chain_frame(symbol, contracts, frame)
+        if not len(frame):
+            return alerts
+        
+        # Ratio to the decayed mean, and distance in decayed standard deviations
+        # (flat history has no spread, so the ratio alone decides)
+        eligible = self._warmed_up(frame) & (frame.mean_volume > 0)
+        volume_ratio = self._ratio(frame.volume, frame.mean_volume, eligible)
+        zscore = self._ratio(frame.volume - frame.mean_volume, frame.std_volume, eligible, fill=np.inf)
+        
+        hits = np.flatnonzero(
+            eligible &
+            (volume_ratio >= self.volume_threshold_multiplier) &
+            (zscore >= self.volume_zscore_threshold)
+        )
         
-        for contract in contracts:
-            # Get historical average volume
-            historical_avg = self._get_historical_average_volume(symbol, contract)
+        for i in hits:
+            contract = contracts[i]
+            ratio = float(volume_ratio[i])
+            historical_avg = float(frame.mean_volume[i])
             
-            if historical_avg > 0:
-                volume_ratio = contract.volume / historical_avg
-                
-                if volume_ratio >= self.volume_threshold_multiplier:
-                    severity = self._calculate_severity(volume_ratio)
-                    
-                    flow_type = FlowType.BULLISH if contract.option_type == "CALL" else FlowType.BEARISH
-                    if volume_ratio > 10:
-                        flow_type = FlowType.UNUSUAL
-                    
-                    alert = FlowDetection(
-                        symbol=symbol,
-                        flow_type=flow_type,
-                        severity=severity,
-                        volume=contract.volume,
-                        value=contract.volume * contract.last_price * 100,
-                        unusual_factor=volume_ratio,
-                        description=f"Volume spike: {volume_ratio:.1f}x normal ({contract.volume:,} vs {historical_avg:.0f} avg)",
-                        contracts=[contract],
-                        confidence=min(0.95, volume_ratio / 20)
-                    )
-                    alerts.append(alert)
+            flow_type = FlowType.BULLISH if contract.option_type == "CALL" else FlowType.BEARISH
+            if ratio > 10:
+                flow_type = FlowType.UNUSUAL
+            
+            alerts.append(FlowDetection(
+                symbol=symbol,
+                flow_type=flow_type,
+                severity=self._calculate_severity(ratio),
+                volume=contract.volume,
+                value=float(frame.notional[i]),
+                unusual_factor=ratio,
+                description=f"Volume spike: {ratio:.1f}x normal ({contract.volume:,} vs {historical_avg:.0f} avg)",
+                contracts=[contract],
+                confidence=min(0.95, ratio / 20)
+            ))
         
         return alerts
     
-    def _detect_unusual_oi(self, symbol: str, contracts: List[OptionsContract]) -> List[FlowDetection]:
-        """Detect unusual open interest changes."""
+    def _detect_unusual_oi(
+        self, symbol: str, contracts: List[OptionsContract], frame: Optional[ChainFrame] = None
+    ) -> List[FlowDetection]:
+        """Detect unusual open interest changes against the session-open OI."""
         alerts = []
+        frame = self._chain_frame(symbol, contracts, frame)
+        if not len(frame):
+            return alerts
+        
+        eligible = frame.session_oi > 0
+        oi_change = self._ratio(frame.open_interest - frame.session_oi, frame.session_oi, eligible)
         
-        for contract in contracts:
-            # Get previous day's OI
-            prev_oi = self._get_previous_oi(symbol, contract)
+        hits = np.flatnonzero(eligible & (np.abs(oi_change) >= self.oi_change_threshold))
+        
+        for i in hits:
+            contract = contracts[i]
+            change = float(oi_change[i])
+            prev_oi = int(frame.session_oi[i])
             
-            if prev_oi > 0:
-                oi_change = (contract.open_interest - prev_oi) / prev_oi
-                
-                if abs(oi_change) >= self.oi_change_threshold:
-                    severity = AlertSeverity.MEDIUM if abs(oi_change) < 0.5 else AlertSeverity.HIGH
-                    
-                    flow_type = FlowType.BULLISH if oi_change > 0 and contract.option_type == "CALL" else FlowType.BEARISH
-                    
-                    alert = FlowDetection(
-                        symbol=symbol,
-                        flow_type=flow_type,
-                        severity=severity,
-                        volume=contract.volume,
-                        value=abs(oi_change) * contract.last_price * 100,
-                        unusual_factor=abs(oi_change),
-                        description=f"OI change: {oi_change:+.1%} ({contract.open_interest:,} vs {prev_oi:,})",
-                        contracts=[contract],
-                        confidence=min(0.9, abs(oi_change) * 2)
-                    )
-                    alerts.append(alert)
+            severity = AlertSeverity.MEDIUM if abs(change) < 0.5 else AlertSeverity.HIGH
+            flow_type = FlowType.BULLISH if change > 0 and contract.option_type == "CALL" else FlowType.BEARISH
+            
+            alerts.append(FlowDetection(
+                symbol=symbol,
+                flow_type=flow_type,
+                severity=severity,
+                volume=contract.volume,
+                value=abs(change) * contract.last_price * 100,
+                unusual_factor=abs(change),
+                description=f"OI change: {change:+.1%} ({contract.open_interest:,} vs {prev_oi:,})",
+                contracts=[contract],
+                confidence=min(0.9, abs(change) * 2)
+            ))
         
         return alerts
     
-    def _detect_iv_anomalies(self, symbol: str, contracts: List[OptionsContract]) -> List[FlowDetection]:
+    def _detect_iv_anomalies(
+        self, symbol: str, contracts: List[OptionsContract], frame: Optional[ChainFrame] = None
+    ) -> List[FlowDetection]:
         """Detect implied volatility anomalies."""
         alerts = []
+        frame = self._chain_frame(symbol, contracts, frame)
+        if not len(frame):
+            return alerts
         
-        for contract in contracts:
-            # Get historical IV average
-            historical_iv = self._get_historical_iv(symbol, contract)
+        eligible = self._warmed_up(frame) & (frame.mean_iv > 0)
+        iv_change = self._ratio(frame.implied_volatility - frame.mean_iv, frame.mean_iv, eligible)
+        zscore = self._ratio(frame.implied_volatility - frame.mean_iv, frame.std_iv, eligible, fill=np.inf)
+        
+        hits = np.flatnonzero(
+            eligible &
+            (np.abs(iv_change) >= self.unusual_iv_threshold) &
+            (np.abs(zscore) >= self.iv_zscore_threshold)
+        )
+        
+        for i in hits:
+            contract = contracts[i]
+            change = float(iv_change[i])
+            historical_iv = float(frame.mean_iv[i])
             
-            if historical_iv > 0:
-                iv_change = (contract.implied_volatility - historical_iv) / historical_iv
-                
-                if abs(iv_change) >= self.unusual_iv_threshold:
-                    severity = AlertSeverity.MEDIUM if abs(iv_change) < 0.6 else AlertSeverity.HIGH
-                    
-                    flow_type = FlowType.UNUSUAL
-                    
-                    alert = FlowDetection(
-                        symbol=symbol,
-                        flow_type=flow_type,
-                        severity=severity,
-                        volume=contract.volume,
-                        value=contract.volume * contract.last_price * 100,
-                        unusual_factor=abs(iv_change),
-                        description=f"IV spike: {iv_change:+.1%} ({contract.implied_volatility:.2f} vs {historical_iv:.2f} avg)",
-                        contracts=[contract],
-                        confidence=min(0.85, abs(iv_change) * 1.5)
-                    )
-                    alerts.append(alert)
+            severity = AlertSeverity.MEDIUM if abs(change) < 0.6 else AlertSeverity.HIGH
+            
+            alerts.append(FlowDetection(
+                symbol=symbol,
+                flow_type=FlowType.UNUSUAL,
+                severity=severity,
+                volume=contract.volume,
+                value=float(frame.notional[i]),
+                unusual_factor=abs(change),
+                description=f"IV spike: {change:+.1%} ({contract.implied_volatility:.2f} vs {historical_iv:.2f} avg)",
+                contracts=[contract],
+                confidence=min(0.85, abs(change) * 1.5)
+            ))
         
         return alerts
     
-    def _detect_option_sweeps(self, symbol: str, contracts: List[OptionsContract]) -> List[FlowDetection]:
+    def _detect_option_sweeps(
+        self, symbol: str, contracts: List[OptionsContract], frame: Optional[ChainFrame] = None
+    ) -> List[FlowDetection]:
         """Detect potential option sweeps (large market orders)."""
         alerts = []
+        frame = self._chain_frame(symbol, contracts, frame)
+        if not len(frame):
+            return alerts
+        
+        # Group prints by strike, expiry and type (one store row each)
+        groups, first_member, inverse = np.unique(frame.rows, return_index=True, return_inverse=True)
+        inverse = inverse.ravel()
+        total_volume = np.bincount(inverse, weights=frame.volume)
+        total_value = np.bincount(inverse, weights=frame.notional)
+        
+        avg_volume = frame.mean_volume[first_member]
+        eligible = self._warmed_up(frame)[first_member] & (groups >= 0)
         
-        # Group by strike and expiry
-        strikes = defaultdict(list)
-        for contract in contracts:
-            key = (contract.strike, contract.expiry, contract.option_type)
-            strikes[key].append(contract)
+        volume_ratio = self._ratio(total_volume, avg_volume, eligible)
+        hits = np.flatnonzero(
+            eligible &
+            (total_value >= self.config["min_value"] * 5) &  # 5x minimum for sweep detection
+            (volume_ratio >= 2.0)
+        )
         
-        for key, strike_contracts in strikes.items():
-            total_volume = sum(c.volume for c in strike_contracts)
-            total_value = sum(c.volume * c.last_price * 100 for c in strike_contracts)
+        for group in hits:
+            strike_contracts = [contracts[i] for i in np.flatnonzero(inverse == group)]
+            value = float(total_value[group])
             
-            if total_value >= self.config["min_value"] * 5:  # 5x minimum for sweep detection
-                avg_volume = self._get_average_volume_for_strike(symbol, key)
-                
-                if avg_volume > 0 and total_volume / avg_volume >= 2.0:
-                    severity = AlertSeverity.HIGH if total_value > 500000 else AlertSeverity.MEDIUM
-                    
-                    flow_type = FlowType.BULLISH if key[2] == "CALL" else FlowType.BEARISH
-                    
-                    alert = FlowDetection(
-                        symbol=symbol,
-                        flow_type=flow_type,
-                        severity=severity,
-                        volume=total_volume,
-                        value=total_value,
-                        unusual_factor=total_volume / avg_volume,
-                        description=f"Potential sweep: ${total_value:,.0f} across {len(strike_contracts)} contracts",
-                        contracts=strike_contracts,
-                        confidence=0.8
-                    )
-                    alerts.append(alert)
+            severity = AlertSeverity.HIGH if value > 500000 else AlertSeverity.MEDIUM
+            flow_type = FlowType.BULLISH if strike_contracts[0].option_type == "CALL" else FlowType.BEARISH
+            
+            alerts.append(FlowDetection(
+                symbol=symbol,
+                flow_type=flow_type,
+                severity=severity,
+                volume=int(total_volume[group]),
+                value=value,
+                unusual_factor=float(volume_ratio[group]),
+                description=f"Potential sweep: ${value:,.0f} across {len(strike_contracts)} contracts",
+                contracts=strike_contracts,
+                confidence=0.8
+            ))
         
         return alerts
     
-    async def _analyze_dark_pool_activity(self, symbol: str, contracts: List[OptionsContract]) -> List[DarkPoolFlow]:
+    async def _analyze_dark_pool_activity(
+        self, symbol: str, contracts: List[OptionsContract], frame: Optional[ChainFrame] = None
+    ) -> List[DarkPoolFlow]:
         """Analyze potential dark pool activity."""
         dark_flows = []
+        frame = self._chain_frame(symbol, contracts, frame)
+        if not len(frame):
+            return dark_flows
         
-        # Analyze price action vs options flow
-        for contract in contracts:
-            # Check for price-flow divergence (simplified)
-            if contract.volume > 1000 and contract.last_price > 0:
-                estimated_size = contract.volume * contract.last_price * 100
-                
-                if estimated_size >= self.dark_pool_size_threshold:
-                    # Determine direction based on delta and flow
-                    direction = "BUY" if contract.delta > 0.5 else "SELL"
-                    confidence = min(0.7, estimated_size / 5000000)  # Max confidence at $5M
-                    
-                    dark_flow = DarkPoolFlow(
-                        symbol=symbol,
-                        estimated_size=estimated_size,
-                        direction=direction,
-                        confidence=confidence,
-                        price_level=contract.strike
-                    )
-                    dark_flows.append(dark_flow)
+        # Check for price-flow divergence (simplified)
+        estimated_size = frame.notional
+        hits = np.flatnonzero(
+            (frame.volume > 1000) &
+            (frame.last_price > 0) &
+            (estimated_size >= self.dark_pool_size_threshold)
+        )
+        
+        for i in hits:
+            # Determine direction based on delta and flow
+            dark_flows.append(DarkPoolFlow(
+                symbol=symbol,
+                estimated_size=float(estimated_size[i]),
+                direction="BUY" if frame.delta[i] > 0.5 else "SELL",
+                confidence=min(0.7, float(estimated_size[i]) / 5000000),  # Max confidence at $5M
+                price_level=contracts[i].strike
+            ))
         
         return dark_flows
     
@@ -337,27 +408,6 @@ class OptionsFlowAnalyzer:
         else:
             return AlertSeverity.LOW
     
-    def _get_historical_average_volume(self, symbol: str, contract: OptionsContract) -> float:
-        """Get historical average volume for a contract (simplified)."""
-        # In real implementation, this would query historical database
-        # For demo, return simulated historical average
-        return max(100, contract.volume * 0.3 + np.random.normal(200, 50))
-    
-    def _get_previous_oi(self, symbol: str, contract: OptionsContract) -> int:
-        """Get previous day's open interest (simplified)."""
-        # In real implementation, this would query historical database
-        return max(0, int(contract.open_interest * 0.95 + np.random.normal(0, contract.open_interest * 0.1)))
-    
-    def _get_historical_iv(self, symbol: str, contract: OptionsContract) -> float:
-        """Get historical implied volatility average (simplified)."""
-        # In real implementation, this would query historical database
-        return max(0.1, contract.implied_volatility * 0.9 + np.random.normal(0, 0.05))
-    
-    def _get_average_volume_for_strike(self, symbol: str, key: Tuple) -> float:
-        """Get average volume for specific strike/expiry combination."""
-        # Simplified implementation
-        return 500 + np.random.normal(200, 100)
-    
     async def _fetch_options_data(self) -> Dict[str, List[OptionsContract]]:
         """Fetch current options data (simulated for demo)."""
         # In real implementation, this would connect to options data feed
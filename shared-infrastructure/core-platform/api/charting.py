@@ -5,25 +5,40 @@ FastAPI endpoints for the advanced charting platform.
 Provides REST API access to all charting features.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query, BackgroundTasks, WebSocket, WebSocketDisconnect
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, Depends, Query, Header, BackgroundTasks, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from typing import Dict, List, Optional, Any, Union
 from pydantic import BaseModel, Field
 from datetime import datetime
+import hashlib
 import json
 import io
 
 from app.charting.core.chart_manager import ChartManager, ChartLayout
 from app.charting.core.chart_engine import ChartType, TimeFrame
 from app.core.auth import get_current_user
+from app.core.config import settings
 from app.core.logging import logger
 
 # Global chart manager instance
-chart_manager = ChartManager()
+chart_manager = ChartManager(instruments=settings.CHART_INSTRUMENTS or None)
 
 # Router
 router = APIRouter(prefix="/api/v1/charting", tags=["charting"])
 
+
+def _drawing_versions(drawings: Dict[str, Any]) -> tuple:
+    """(id, version) per drawing: updated_at when the drawing tracks edits, else its full contents"""
+    versions = []
+    for drawing_id, drawing in drawings.items():
+        version = getattr(drawing, "updated_at", None)
+        if version is None:
+            version = drawing.get("updated_at") if isinstance(drawing, dict) else None
+        versions.append((drawing_id, version if version is not None else repr(drawing)))
+    return tuple(versions)
+
+
 # Pydantic models for API
 class ChartCreateRequest(BaseModel):
     symbol: str = Field(..., description="Trading symbol")
@@ -219,35 +234,45 @@ async def create_chart(
 @router.get("/charts/{chart_id}/data")
 async def get_chart_data(
     chart_id: str,
-    limit: int = Query(1000, le=5000),
+    limit: int = Query(1000, ge=1, le=5000),
+    start: Optional[float] = Query(None, description="Window start, POSIX seconds"),
+    end: Optional[float] = Query(None, description="Window end, POSIX seconds"),
+    cursor: Optional[int] = Query(None, ge=0, description="Page back from this bar sequence"),
+    since: Optional[int] = Query(None, ge=0, description="Only bars after this data version"),
+    if_none_match: Optional[str] = Header(None),
     user: Dict = Depends(get_current_user)
 ):
-    """Get chart data"""
+    """Get a window of chart data as columnar arrays, or the delta since a version"""
     
-    if chart_id not in chart_manager.engine.charts:
+    chart = chart_manager.engine.charts.get(chart_id)
+    if chart is None:
         raise HTTPException(status_code=404, detail="Chart not found")
     
+    # The response is a function of the data version, the query and the attached studies
+    etag_source = repr((
+        chart_id, chart.version, start, end, cursor, since, limit,
+        tuple(chart.indicators), _drawing_versions(chart.drawings), len(getattr(chart, "candle_patterns", []))
+    ))
+    etag = f'"{hashlib.blake2b(etag_source.encode(), digest_size=12).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    
     try:
-        chart = chart_manager.engine.charts[chart_id]
-        
-        # Get recent data
-        data = chart.data[-limit:] if chart.data else []
+        window = chart.get_window(start=start, end=end, cursor=cursor, since=since, limit=limit)
         
-        return {
-            "chart_id": chart_id,
-            "symbol": chart.config.symbol,
-            "timeframe": chart.config.timeframe.value,
-            "data": [d.to_dict() for d in data],
-            "indicators": {
-                ind_id: {
-                    "type": ind["type"],
-                    "values": ind["values"].tolist() if hasattr(ind["values"], "tolist") else []
-                }
-                for ind_id, ind in chart.indicators.items()
-            },
-            "drawings": [d.to_dict() for d in chart.drawings.values()],
-            "patterns": [p.__dict__ for p in chart.candle_patterns[-10:]]  # Last 10 patterns
-        }
+        return JSONResponse(
+            content=jsonable_encoder({
+                "chart_id": chart_id,
+                "symbol": chart.config.symbol,
+                "timeframe": chart.config.timeframe.value,
+                **window,
+                "drawings": [d.to_dict() if hasattr(d, "to_dict") else d for d in chart.drawings.values()],
+                "patterns": [p.__dict__ for p in getattr(chart, "candle_patterns", [])[-10:]]  # Last 10 patterns
+            }),
+            headers=headers
+        )
     
     except Exception as e:
         logger.error(f"Error getting chart data: {e}")
@@ -259,17 +284,13 @@ async def get_chart_image(
     chart_id: str,
     width: int = Query(800, ge=400, le=2000),
     height: int = Query(600, ge=300, le=1500),
-    format: str = Query("png", regex="^(png|jpg|svg)$"),
+    format: str = Query("png", regex="^(png|jpg)$"),
     user: Dict = Depends(get_current_user)
 ):
     """Get chart as image for sharing/WhatsApp"""
     
     # Find session for chart
-    session_id = None
-    for sid, session in chart_manager.sessions.items():
-        if chart_id in session.charts:
-            session_id = sid
-            break
+    session_id = chart_manager.session_for_chart(chart_id)
     
     if not session_id:
         raise HTTPException(status_code=404, detail="Chart not found")
@@ -279,11 +300,12 @@ async def get_chart_image(
             session_id=session_id,
             chart_id=chart_id,
             width=width,
-            height=height
+            height=height,
+            format=format
         )
         
         # Return as streaming response
-        media_type = f"image/{format}"
+        media_type = "image/jpeg" if format == "jpg" else f"image/{format}"
         return StreamingResponse(
             io.BytesIO(image_data),
             media_type=media_type,
@@ -305,11 +327,9 @@ async def add_indicator(
     """Add technical indicator to chart"""
     
     # Find session for chart
-    session_id = None
-    for sid, session in chart_manager.sessions.items():
-        if chart_id in session.charts and session.user_id == user["id"]:
-            session_id = sid
-            break
+    session_id = chart_manager.session_for_chart(chart_id)
+    if session_id and chart_manager.sessions[session_id].user_id != user["id"]:
+        session_id = None
     
     if not session_id:
         raise HTTPException(status_code=404, detail="Chart not found or access denied")
@@ -377,11 +397,9 @@ async def add_drawing(
     """Add drawing tool to chart"""
     
     # Find session for chart
-    session_id = None
-    for sid, session in chart_manager.sessions.items():
-        if chart_id in session.charts and session.user_id == user["id"]:
-            session_id = sid
-            break
+    session_id = chart_manager.session_for_chart(chart_id)
+    if session_id and chart_manager.sessions[session_id].user_id != user["id"]:
+        session_id = None
     
     if not session_id:
         raise HTTPException(status_code=404, detail="Chart not found or access denied")
@@ -503,11 +521,9 @@ async def create_alert(
     """Create alert on chart"""
     
     # Find session for chart
-    session_id = None
-    for sid, session in chart_manager.sessions.items():
-        if chart_id in session.charts and session.user_id == user["id"]:
-            session_id = sid
-            break
+    session_id = chart_manager.session_for_chart(chart_id)
+    if session_id and chart_manager.sessions[session_id].user_id != user["id"]:
+        session_id = None
     
     if not session_id:
         raise HTTPException(status_code=404, detail="Chart not found or access denied")
@@ -542,11 +558,9 @@ async def share_chart(
     """Share chart with social features"""
     
     # Find session for chart
-    session_id = None
-    for sid, session in chart_manager.sessions.items():
-        if chart_id in session.charts and session.user_id == user["id"]:
-            session_id = sid
-            break
+    session_id = chart_manager.session_for_chart(chart_id)
+    if session_id and chart_manager.sessions[session_id].user_id != user["id"]:
+        session_id = None
     
     if not session_id:
         raise HTTPException(status_code=404, detail="Chart not found or access denied")
@@ -633,11 +647,9 @@ async def save_chart_template(
     """Save chart configuration as template"""
     
     # Find session for chart
-    session_id = None
-    for sid, session in chart_manager.sessions.items():
-        if chart_id in session.charts and session.user_id == user["id"]:
-            session_id = sid
-            break
+    session_id = chart_manager.session_for_chart(chart_id)
+    if session_id and chart_manager.sessions[session_id].user_id != user["id"]:
+        session_id = None
     
     if not session_id:
         raise HTTPException(status_code=404, detail="Chart not found or access denied")
@@ -665,11 +677,9 @@ async def apply_chart_template(
     """Apply saved template to chart"""
     
     # Find session for chart
-    session_id = None
-    for sid, session in chart_manager.sessions.items():
-        if chart_id in session.charts and session.user_id == user["id"]:
-            session_id = sid
-            break
+    session_id = chart_manager.session_for_chart(chart_id)
+    if session_id and chart_manager.sessions[session_id].user_id != user["id"]:
+        session_id = None
     
     if not session_id:
         raise HTTPException(status_code=404, detail="Chart not found or access denied")
@@ -761,6 +771,7 @@ async def get_metrics(
         "engine": {
             "active_charts": len(chart_manager.engine.charts),
             "render_times": chart_manager.engine.render_times[-10:],  # Last 10
+            "render_service": chart_manager.engine.render_service.metrics(),
             "data_subscriptions": len(chart_manager.engine.data_subscriptions)
         }
     }
@@ -0,0 +1,88 @@
+"""
+Profiling API Endpoints
+
+On-demand sampling profiles and span tracing controls for diagnosing
+hot-path latency (e.g. the 9:15 opening surge). Mounted only when
+ENABLE_PROFILING is set.
+"""
+
+import asyncio
+from typing import Dict
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel, Field
+
+from app.core.auth import get_current_user
+from app.core.logging import logger
+from app.monitoring.tracing import SamplingProfiler, tracer
+
+# Router
+router = APIRouter(prefix="/api/v1/profiling", tags=["profiling"])
+
+profiler = SamplingProfiler()
+
+
+class TracingConfigRequest(BaseModel):
+    sample_rate: float = Field(..., ge=0.0, le=1.0, description="Fraction of traces to record")
+
+
+@router.get("/profile")
+async def sample_profile(
+    seconds: float = Query(5.0, gt=0, le=60, description="How long to sample"),
+    interval_ms: float = Query(5.0, ge=1, le=100, description="Sampling interval"),
+    top: int = Query(200, ge=1, le=2000, description="Number of distinct stacks returned"),
+    user: Dict = Depends(get_current_user)
+):
+    """Sample every thread's stack; returns folded stacks for flame graphs"""
+
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    if profiler.running:
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    logger.info(f"Sampling profile for {seconds}s requested by {user['id']}")
+
+    # Sampled from a worker thread so the event loop's own stack shows up
+    try:
+        return await asyncio.to_thread(profiler.profile, seconds, interval_ms / 1000, top)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/spans")
+async def span_summary(user: Dict = Depends(get_current_user)):
+    """Per-span-name counts and durations recorded since the last reset"""
+
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    return {
+        "sample_rate": tracer.sample_rate,
+        "exporting": tracer.exporter is not None,
+        "spans": tracer.summary()
+    }
+
+
+@router.put("/tracing")
+async def update_tracing(request: TracingConfigRequest, user: Dict = Depends(get_current_user)):
+    """Change the trace sample rate at runtime (0 disables tracing)"""
+
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    tracer.sample_rate = request.sample_rate
+    logger.info(f"Trace sample rate set to {request.sample_rate} by {user['id']}")
+
+    return {"sample_rate": tracer.sample_rate}
+
+
+@router.delete("/spans")
+async def reset_spans(user: Dict = Depends(get_current_user)):
+    """Clear aggregated span statistics"""
+
+    if user.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+    tracer.reset()
+    return {"status": "reset"}
@@ -11,6 +11,7 @@ from typing import Dict, List, Optional, Any
 from enum import Enum
 from dataclasses import dataclass
 
+from app.ai_support.priority_scheduler import PriorityScheduler, TierPolicy
 from .models import BlackTier, BlackUser
 from .concierge_services import ServiceType, ServicePriority
 
@@ -37,6 +38,14 @@ class ResponseTimeTarget(Enum):
     ONYX_PREMIUM = "under_2_minutes"
 
 
+# Seconds behind each ResponseTimeTarget, used as scheduling deadlines
+RESPONSE_TIME_TARGET_SECONDS = {
+    BlackTier.VOID: 15,
+    BlackTier.OBSIDIAN: 30,
+    BlackTier.ONYX: 120
+}
+
+
 @dataclass
 class ConciergeSpecialist:
     """Concierge specialist profile"""
@@ -105,6 +114,16 @@ class VertuConciergeCenter:
         # Partner coordination
         self.partner_coordinator = PartnerCoordinator()
         
+        # Specialist capacity is shared by tier weight and response target; Black requests are never shed
+        weights = {BlackTier.VOID: 4, BlackTier.OBSIDIAN: 2, BlackTier.ONYX: 1}
+        self.scheduler = PriorityScheduler(
+            {
+                tier: TierPolicy(weight=weights[tier], deadline=RESPONSE_TIME_TARGET_SECONDS[tier])
+                for tier in BlackTier
+            },
+            workers=16
+        )
+        
         logger.info("Vertu Concierge Center initialized")
     
     async def initialize_operations(self):
@@ -142,40 +161,58 @@ class VertuConciergeCenter:
             # Classify request urgency and category
             classification = await self._classify_request(request, user.tier)
             
-            # Route to appropriate specialist
-            routing = await self.routing_engine.route_request(
-                user, request, classification
-            )
-            
-            # Check if emergency escalation needed
+            # Emergencies go straight to the response team
             if classification["emergency"]:
+                routing = await self.routing_engine.route_request(
+                    user, request, classification
+                )
                 return await self.emergency_response.handle_emergency(
                     user, request, routing
                 )
             
-            # Standard concierge handling
-            service_response = await self._execute_concierge_service(
-                user, request, classification, routing
+            # Everything else waits for a specialist slot in tier order
+            return await self.scheduler.submit(
+                user.tier,
+                lambda: self._serve_request(user, request, acknowledgment, classification)
             )
             
-            # Monitor and track for quality
-            await self.quality_monitor.track_service_delivery(
-                user, request, service_response
-            )
-            
-            return {
-                "immediate_acknowledgment": acknowledgment,
-                "service_classification": classification,
-                "routing_details": routing,
-                "service_response": service_response,
-                "tracking_id": service_response.get("tracking_id"),
-                "next_update": service_response.get("next_update")
-            }
-            
         except Exception as e:
             logger.error(f"Concierge request handling failed: {e}")
             return await self._handle_service_failure(user, request, str(e))
     
+    async def _serve_request(
+        self,
+        user: BlackUser,
+        request: Dict[str, Any],
+        acknowledgment: Dict[str, Any],
+        classification: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Route and execute a standard request once the scheduler dispatches it"""
+        
+        # Route to appropriate specialist
+        routing = await self.routing_engine.route_request(
+            user, request, classification
+        )
+        
+        # Standard concierge handling
+        service_response = await self._execute_concierge_service(
+            user, request, classification, routing
+        )
+        
+        # Monitor and track for quality
+        await self.quality_monitor.track_service_delivery(
+            user, request, service_response
+        )
+        
+        return {
+            "immediate_acknowledgment": acknowledgment,
+            "service_classification": classification,
+            "routing_details": routing,
+            "service_response": service_response,
+            "tracking_id": service_response.get("tracking_id"),
+            "next_update": service_response.get("next_update")
+        }
+    
     async def _send_immediate_acknowledgment(self, user: BlackUser) -> Dict[str, Any]:
         """Send immediate acknowledgment - Vertu standard"""
         
@@ -8,9 +8,9 @@ import json
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
-import openai
 from dataclasses import dataclass
 
+from app.ai_support.llm_gateway import LLMGateway, LLMRequest, get_llm_gateway
 from .models import BlackUser, BlackTier, MarketButlerProfile
 
 logger = logging.getLogger(__name__)
@@ -60,7 +60,10 @@ class MarketButler:
     - Void Butler: Elite concierge with billionaire network access
     """
     
-    def __init__(self):
+    def __init__(self, llm: Optional[LLMGateway] = None):
+        # Shared model gateway; Black conversations run on the BLACK tier budget
+        self.llm = llm or get_llm_gateway()
+        
         # Butler profiles by tier
         self.butler_profiles: Dict[str, MarketButlerProfile] = {}
         
@@ -395,14 +398,15 @@ class MarketButler:
         ]
         
         try:
-            response = await openai.ChatCompletion.acreate(
-                model="gpt-4",
+            response = await self.llm.complete(LLMRequest(
                 messages=messages,
+                model="gpt-4",
                 max_tokens=500,
-                temperature=0.7
-            )
+                temperature=0.7,
+                tier="BLACK"
+            ))
             
-            return response.choices[0].message.content
+            return response.content
             
         except Exception as e:
             logger.error(f"GPT-4 chat response failed: {e}")
@@ -6,16 +6,23 @@ Designed to match and exceed Zerodha Kite + Dhan functionality.
 """
 
 import asyncio
+import bisect
 import json
+import re
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Callable
+from typing import Dict, Iterable, List, Optional, Any, Callable, Set, Tuple
 from enum import Enum
 import numpy as np
 import pandas as pd
 from dataclasses import dataclass, field
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 
 from app.core.logging import logger
+from .render_service import ChartBars, RenderSpec, drawing_spec, get_chart_render_service
+
+# Exchange ticker shape, e.g. NIFTY, M&M, BAJAJ-AUTO
+SYMBOL_PATTERN = re.compile(r"^[A-Z0-9][A-Z0-9&\-]{0,29}$")
 
 
 class ChartType(Enum):
@@ -102,7 +109,12 @@ class ChartEngine:
     Designed to compete with Zerodha Kite and Dhan
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        instruments: Optional[Iterable[str]] = None,
+        max_feed_charts: int = 256,
+        feed_chart_ttl: float = 1800.0
+    ):
         self.charts: Dict[str, 'Chart'] = {}
         self.data_subscriptions: Dict[str, List[str]] = defaultdict(list)
         self.websocket_handlers: Dict[str, Callable] = {}
@@ -112,6 +124,20 @@ class ChartEngine:
         self.render_times: List[float] = []
         self.max_data_points = 50000  # Professional grade
         
+        # Off-loop image rendering shared with WhatsApp sharing
+        self.render_service = get_chart_render_service()
+        
+        # Symbols get_bars() may open a chart for; None accepts any well-formed symbol
+        self.instruments: Optional[Set[str]] = set(instruments) if instruments is not None else None
+        
+        # Open charts by (symbol, timeframe), and the feed charts get_bars()
+        # opened on demand, least recently used first, with their last use
+        self._chart_keys: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+        self._feed_charts: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self.max_feed_charts = max_feed_charts
+        self.feed_chart_ttl = feed_chart_ttl
+        self._feed_lock = asyncio.Lock()
+        
         logger.info("GridWorks Chart Engine initialized")
     
     async def create_chart(
@@ -133,6 +159,7 @@ class ChartEngine:
         
         # Store reference
         self.charts[chart_id] = chart
+        self._chart_keys[(config.symbol, config.timeframe.value)].add(chart_id)
         
         # Subscribe to data feed
         await self._subscribe_to_data(config.symbol, chart_id)
@@ -287,9 +314,80 @@ class ChartEngine:
             raise ValueError(f"Chart {chart_id} not found")
         
         chart = self.charts[chart_id]
+        started = asyncio.get_running_loop().time()
         image_data = await chart.render_to_image(width, height, format)
-        
+        self.render_times.append(asyncio.get_running_loop().time() - started)
+
         return image_data
+
+    async def get_bars(self, symbol: str, timeframe: str) -> List[OHLCV]:
+        """Bars of the longest open chart of `symbol` at `timeframe`
+
+        With no such chart open, a feed chart is created (loading its
+        history) and kept subscribed, so later requests are served from live
+        data. Feed charts are bounded: the least recently used, and any idle
+        for `feed_chart_ttl` seconds, are closed and unsubscribed.
+        """
+
+        try:
+            timeframe = TimeFrame(timeframe).value
+        except ValueError:
+            raise ValueError(f"Unsupported timeframe: {timeframe}")
+        if not SYMBOL_PATTERN.match(symbol) or (self.instruments is not None and symbol not in self.instruments):
+            raise ValueError(f"Unknown symbol: {symbol}")
+
+        key = (symbol, timeframe)
+        async with self._feed_lock:
+            if key in self._feed_charts:
+                self._feed_charts.move_to_end(key)
+                self._feed_charts[key] = time.monotonic()
+            elif not self._chart_keys.get(key):
+                config = ChartConfig(symbol=symbol, timeframe=TimeFrame(timeframe))
+                await self.create_chart(self._feed_chart_id(key), config)
+                self._feed_charts[key] = time.monotonic()
+            await self._evict_feed_charts(keep=key)
+
+            charts = [self.charts[chart_id] for chart_id in self._chart_keys.get(key, ())]
+            return list(max(charts, key=lambda chart: len(chart.data)).data)
+
+    async def remove_chart(self, chart_id: str):
+        """Close a chart and drop its data subscription"""
+
+        chart = self.charts.pop(chart_id, None)
+        if chart is None:
+            return
+
+        symbol = chart.config.symbol
+        key = (symbol, chart.config.timeframe.value)
+        self._chart_keys[key].discard(chart_id)
+        if not self._chart_keys[key]:
+            del self._chart_keys[key]
+
+        subscribers = self.data_subscriptions.get(symbol)
+        if subscribers is not None and chart_id in subscribers:
+            subscribers.remove(chart_id)
+            if not subscribers:
+                del self.data_subscriptions[symbol]
+                await self._stop_data_feed(symbol)
+
+        await chart.cleanup()
+
+    @staticmethod
+    def _feed_chart_id(key: Tuple[str, str]) -> str:
+        return "feed_{}_{}".format(*key)
+
+    async def _evict_feed_charts(self, keep: Tuple[str, str]):
+        """Close feed charts beyond `max_feed_charts` or idle past `feed_chart_ttl`, except `keep`"""
+
+        now = time.monotonic()
+        while self._feed_charts:
+            key, last_used = next(iter(self._feed_charts.items()))
+            if key == keep:
+                break
+            if len(self._feed_charts) <= self.max_feed_charts and now - last_used < self.feed_chart_ttl:
+                break
+            del self._feed_charts[key]
+            await self.remove_chart(self._feed_chart_id(key))
     
     def _get_chart_class(self, chart_type: ChartType):
         """Get appropriate chart class based on type"""
@@ -325,6 +423,11 @@ class ChartEngine:
         # For now, placeholder
         logger.info(f"Started data feed for {symbol}")
     
+    async def _stop_data_feed(self, symbol: str):
+        """Stop the real-time data feed for symbol"""
+        
+        logger.info(f"Stopped data feed for {symbol}")
+    
     async def _generate_zk_proof(self, data: Dict[str, Any]) -> str:
         """Generate zero-knowledge proof for chart authenticity"""
         
@@ -341,6 +444,9 @@ class ChartEngine:
         
         self.charts.clear()
         self.data_subscriptions.clear()
+        self._chart_keys.clear()
+        self._feed_charts.clear()
+        self.render_service.shutdown()
         
         logger.info("Chart engine cleaned up")
 
@@ -357,6 +463,9 @@ class Chart:
         self.drawings: Dict[str, Any] = {}
         self.alerts: Dict[str, Any] = {}
         
+        # Bars dropped from the front; sequence of self.data[i] is _evicted + i
+        self._evicted = 0
+        
         # Performance tracking
         self.last_render_time = 0
         self.data_update_callbacks: List[Callable] = []
@@ -373,6 +482,7 @@ class Chart:
         # Maintain max data points
         if len(self.data) > self.engine.max_data_points:
             self.data.pop(0)
+            self._evicted += 1
         
         # Update indicators
         await self._update_indicators()
@@ -384,6 +494,85 @@ class Chart:
         for callback in self.data_update_callbacks:
             await callback(data)
     
+    @property
+    def version(self) -> int:
+        """Data version: number of bars ever appended, i.e. the sequence of the next bar"""
+        return self._evicted + len(self.data)
+    
+    def get_window(
+        self,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        cursor: Optional[int] = None,
+        since: Optional[int] = None,
+        limit: int = 1000
+    ) -> Dict[str, Any]:
+        """
+        Columnar slice of bars with indicator series trimmed to the same window
+        
+        `start`/`end` are POSIX seconds (inclusive), `cursor` pages back from a
+        bar sequence (exclusive) and `since` asks for the bars appended after
+        data version `since`. A `since` that is no longer retained, or a delta
+        longer than `limit`, falls back to the latest window with delta=False.
+        """
+        
+        count = len(self.data)
+        version = self.version
+        delta = since is not None and self._evicted <= since <= version
+        
+        if delta:
+            lo, hi = since - self._evicted, count
+        else:
+            lo, hi = 0, count
+            if start is not None:
+                lo = bisect.bisect_left(self.data, start, key=lambda bar: bar.timestamp.timestamp())
+            if end is not None:
+                hi = bisect.bisect_right(self.data, end, key=lambda bar: bar.timestamp.timestamp())
+            if cursor is not None:
+                hi = min(hi, max(0, cursor - self._evicted))
+        
+        if hi - lo > limit:
+            lo = hi - limit
+            delta = False
+        lo = min(lo, hi)
+        
+        bars = ChartBars.from_ohlcv(self.data[lo:hi])
+        return {
+            "version": version,
+            "first_seq": self._evicted + lo,
+            "delta": delta,
+            "bars": {
+                "time": bars.timestamp.tolist(),
+                "open": bars.open.tolist(),
+                "high": bars.high.tolist(),
+                "low": bars.low.tolist(),
+                "close": bars.close.tolist(),
+                "volume": bars.volume.tolist()
+            },
+            "indicators": {
+                indicator_id: {
+                    "type": indicator["type"],
+                    "values": self._trim_series(indicator.get("values"), lo, hi, count)
+                }
+                for indicator_id, indicator in self.indicators.items()
+            }
+        }
+    
+    @staticmethod
+    def _trim_series(values: Any, lo: int, hi: int, count: int) -> Any:
+        """Indicator values for bars [lo, hi); series are aligned to the newest bar"""
+        
+        if isinstance(values, dict):
+            return {name: Chart._trim_series(series, lo, hi, count) for name, series in values.items()}
+        if values is None or not hasattr(values, "__len__"):
+            return []
+        
+        # Shorter series (warm-up excluded) end at the latest bar
+        offset = count - len(values)
+        window = values[max(0, lo - offset):max(0, hi - offset)]
+        window = window.tolist() if hasattr(window, "tolist") else list(window)
+        return [None if value != value else value for value in window]  # NaN is not valid JSON
+    
     async def add_indicator(self, indicator_type: str, params: Dict[str, Any]) -> str:
         """Add technical indicator"""
         raise NotImplementedError
@@ -409,8 +598,30 @@ class Chart:
         raise NotImplementedError
     
     async def render_to_image(self, width: int, height: int, format: str) -> bytes:
-        """Render chart to image"""
-        raise NotImplementedError
+        """Render chart to image via the shared render service"""
+        
+        spec = RenderSpec(
+            symbol=self.config.symbol,
+            timeframe=self.config.timeframe.value,
+            width=width,
+            height=height,
+            format=format,
+            theme=self.config.theme,
+            indicators=tuple(self._indicator_names()),
+            drawings=tuple(filter(None, map(drawing_spec, self.drawings.values()))),
+            show_volume=self.config.show_volume
+        )
+        return await self.engine.render_service.render(spec, ChartBars.from_ohlcv(self.data))
+    
+    def _indicator_names(self) -> List[str]:
+        """Render-cache names for attached indicators, e.g. SMA:20"""
+        
+        names = []
+        for indicator in self.indicators.values():
+            params = indicator.get("params") or {}
+            period = params.get("period", params.get("length"))
+            names.append(f"{indicator['type']}:{period}" if period else str(indicator["type"]))
+        return names
     
     async def _update_indicators(self):
         """Update all indicators with new data"""
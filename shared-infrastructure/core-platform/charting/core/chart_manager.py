@@ -13,10 +13,12 @@ from dataclasses import dataclass, field
 from enum import Enum
 
 from .chart_engine import ChartEngine, ChartConfig, ChartType, TimeFrame, OHLCV
+from .session_store import ShardedSessionStore
 from ..data_feeds.websocket_manager import WebSocketManager
 from ..layouts.layout_manager import LayoutManager
 from app.core.logging import logger
 from app.core.redis_client import redis_client
+from app.monitoring.tracing import tracer
 
 
 class ChartLayout(Enum):
@@ -49,13 +51,20 @@ class ChartManager:
     Coordinates charts, data feeds, layouts, and user sessions
     """
     
-    def __init__(self):
-        self.engine = ChartEngine()
+    # Sessions idle for longer than this are cleaned up
+    SESSION_TIMEOUT = timedelta(hours=1)
+    
+    def __init__(self, session_shards: int = 16, instruments: Optional[List[str]] = None):
+        self.engine = ChartEngine(instruments=instruments)
         self.websocket_manager = WebSocketManager(self)
         self.layout_manager = LayoutManager()
         
-        # User sessions
-        self.sessions: Dict[str, ChartSession] = {}
+        # User sessions, partitioned by consistent hash with per-shard expiry heaps
+        self.sessions: ShardedSessionStore = ShardedSessionStore(session_shards)
+        
+        # Indexes so lookups never scan sessions
+        self.chart_sessions: Dict[str, str] = {}  # chart_id -> session_id
+        self.session_symbols: Dict[str, Set[str]] = {}  # session_id -> subscribed symbols
         
         # Symbol subscriptions
         self.symbol_subscribers: Dict[str, Set[str]] = {}  # symbol -> set of session_ids
@@ -65,7 +74,8 @@ class ChartManager:
             "active_charts": 0,
             "active_sessions": 0,
             "data_points_processed": 0,
-            "average_render_time": 0
+            "average_render_time": 0,
+            "session_shards": []
         }
         
         # Background tasks
@@ -114,6 +124,10 @@ class ChartManager:
         logger.info(f"Created session {session_id} for user {user_id}")
         return session_id
     
+    def session_for_chart(self, chart_id: str) -> Optional[str]:
+        """Session that owns a chart, or None"""
+        return self.chart_sessions.get(chart_id)
+    
     async def create_chart(
         self,
         session_id: str,
@@ -145,6 +159,7 @@ class ChartManager:
         
         # Add to session
         session.charts.append(chart_id)
+        self.chart_sessions[chart_id] = session_id
         if not session.active_chart:
             session.active_chart = chart_id
         
@@ -167,24 +182,25 @@ class ChartManager:
     ):
         """Update charts with new market data"""
         
-        # Convert to OHLCV
-        ohlcv = OHLCV(
-            timestamp=datetime.fromisoformat(data["timestamp"]),
-            open=data["open"],
-            high=data["high"],
-            low=data["low"],
-            close=data["close"],
-            volume=data["volume"]
-        )
-        
-        # Update through engine
-        await self.engine.update_chart_data(symbol, ohlcv)
-        
-        # Update metrics
-        self.metrics["data_points_processed"] += 1
-        
-        # Broadcast to WebSocket clients
-        await self.websocket_manager.broadcast_data_update(symbol, data)
+        with tracer.span("chart.update", symbol=symbol):
+            # Convert to OHLCV
+            ohlcv = OHLCV(
+                timestamp=datetime.fromisoformat(data["timestamp"]),
+                open=data["open"],
+                high=data["high"],
+                low=data["low"],
+                close=data["close"],
+                volume=data["volume"]
+            )
+            
+            # Update through engine
+            await self.engine.update_chart_data(symbol, ohlcv)
+            
+            # Update metrics
+            self.metrics["data_points_processed"] += 1
+            
+            # Broadcast to WebSocket clients
+            await self.websocket_manager.broadcast_data_update(symbol, data)
     
     async def add_indicator(
         self,
@@ -499,7 +515,8 @@ class ChartManager:
         session_id: str,
         chart_id: str,
         width: int = 800,
-        height: int = 600
+        height: int = 600,
+        format: str = "png"
     ) -> bytes:
         """Get chart as image for WhatsApp"""
         
@@ -514,7 +531,7 @@ class ChartManager:
             chart_id,
             width,
             height,
-            "png"
+            format
         )
         
         return image_data
@@ -529,10 +546,13 @@ class ChartManager:
             await self.websocket_manager.subscribe_to_symbol(symbol)
         
         self.symbol_subscribers[symbol].add(session_id)
+        self.session_symbols.setdefault(session_id, set()).add(symbol)
     
     async def _unsubscribe_from_symbol(self, symbol: str, session_id: str):
         """Unsubscribe session from symbol data"""
         
+        self.session_symbols.get(session_id, set()).discard(symbol)
+        
         if symbol in self.symbol_subscribers:
             self.symbol_subscribers[symbol].discard(session_id)
             
@@ -594,13 +614,8 @@ class ChartManager:
         
         while self._running:
             try:
-                current_time = datetime.now()
-                inactive_sessions = []
-                
-                for session_id, session in self.sessions.items():
-                    # Remove sessions inactive for more than 1 hour
-                    if current_time - session.last_activity > timedelta(hours=1):
-                        inactive_sessions.append(session_id)
+                # Only sessions whose expiry is due are examined
+                inactive_sessions = await self.sessions.expired(datetime.now() - self.SESSION_TIMEOUT)
                 
                 # Cleanup inactive sessions
                 for session_id in inactive_sessions:
@@ -623,13 +638,13 @@ class ChartManager:
         
         # Cleanup charts
         for chart_id in session.charts:
-            if chart_id in self.engine.charts:
-                await self.engine.charts[chart_id].cleanup()
-                del self.engine.charts[chart_id]
+            self.chart_sessions.pop(chart_id, None)
+            await self.engine.remove_chart(chart_id)
         
         # Unsubscribe from symbols
-        for symbol in list(self.symbol_subscribers.keys()):
+        for symbol in list(self.session_symbols.get(session_id, ())):
             await self._unsubscribe_from_symbol(symbol, session_id)
+        self.session_symbols.pop(session_id, None)
         
         # Remove session
         del self.sessions[session_id]
@@ -651,6 +666,8 @@ class ChartManager:
                     self.metrics["average_render_time"] = sum(self.engine.render_times) / len(self.engine.render_times)
                     self.engine.render_times = []  # Reset
                 
+                self.metrics["session_shards"] = self.sessions.shard_sizes()
+                
                 # Log metrics
                 logger.info(f"Chart metrics: {self.metrics}")
                 
@@ -0,0 +1,487 @@
+"""
+Chart Render Service
+
+Renders candlestick chart images off the event loop. Rendering runs in a
+process pool whose workers keep pre-rasterized static layers (background,
+grid, buy/sell buttons) and fonts, so a render only draws the bars,
+price-pane indicators and drawings. Output is cached by chart state and
+size, and concurrent requests for the same image share one render.
+"""
+
+import asyncio
+import io
+import logging
+import os
+import re
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+logger = logging.getLogger(__name__)
+
+
+THEMES = {
+    "dark": {
+        "background": (17, 24, 39, 255),
+        "grid": (55, 65, 81, 255),
+        "text": (229, 231, 235, 255),
+        "up": (34, 197, 94, 255),
+        "down": (239, 68, 68, 255),
+        "volume": (75, 85, 99, 255),
+        "lines": [(59, 130, 246, 255), (245, 158, 11, 255), (168, 85, 247, 255)],
+        "drawing": (41, 98, 255, 255)
+    },
+    "light": {
+        "background": (255, 255, 255, 255),
+        "grid": (229, 231, 235, 255),
+        "text": (17, 24, 39, 255),
+        "up": (22, 163, 74, 255),
+        "down": (220, 38, 38, 255),
+        "volume": (209, 213, 219, 255),
+        "lines": [(37, 99, 235, 255), (217, 119, 6, 255), (147, 51, 234, 255)],
+        "drawing": (41, 98, 255, 255)
+    }
+}
+
+# Plot margins (pixels): title above, price labels to the right, buttons below
+MARGIN_LEFT = 10
+MARGIN_RIGHT = 70
+MARGIN_TOP = 30
+MARGIN_BOTTOM = 60
+VOLUME_PANE = 0.2  # Share of plot height given to volume
+MIN_CANDLE_PITCH = 4  # pixels per bar; older bars are dropped to fit
+
+FORMATS = {"png": "PNG", "jpg": "JPEG", "jpeg": "JPEG"}
+
+# Price-pane overlays; oscillators (RSI, MACD, ...) need their own pane and aren't drawn
+INDICATOR_PATTERN = re.compile(r"^(SMA|EMA)\D*(\d+)$", re.IGNORECASE)
+
+# Drawing types the renderer draws, and how many points each needs
+DRAWING_POINTS = {
+    "trend_line": 2, "ray": 2, "extended_line": 2, "arrow": 2, "rectangle": 2,
+    "horizontal_line": 1, "vertical_line": 1
+}
+
+# (type, ((POSIX time or None, price), ...))
+DrawingSpec = Tuple[str, Tuple[Tuple[Optional[float], float], ...]]
+
+
+def overlay_indicator(name: str) -> Optional[str]:
+    """Canonical name (e.g. "SMA:20") of an indicator drawn on the price pane, or None"""
+    match = INDICATOR_PATTERN.match(str(name).replace(":", "_"))
+    if not match or int(match.group(2)) < 1:
+        return None
+    return f"{match.group(1).upper()}:{int(match.group(2))}"
+
+
+def drawing_spec(drawing: Dict[str, Any]) -> Optional[DrawingSpec]:
+    """Hashable form of a drawing dict ({"type", "points": [{"timestamp", "price"}]}), or None if it isn't drawn"""
+    kind = str(drawing.get("type", "")).lower()
+    needed = DRAWING_POINTS.get(kind)
+    if needed is None:
+        return None
+
+    points = []
+    for point in list(drawing.get("points") or ())[:needed]:
+        timestamp = point.get("timestamp")
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        points.append((None if timestamp is None else float(timestamp), float(point.get("price", 0.0))))
+
+    if len(points) < needed:
+        return None
+    if kind != "horizontal_line" and any(timestamp is None for timestamp, _ in points):
+        return None
+    return kind, tuple(points)
+
+
+@dataclass(frozen=True)
+class RenderSpec:
+    """What to draw; together with the last bar time it identifies an image
+
+    Indicators and drawings the renderer cannot draw are dropped here, so
+    they never split the render cache.
+    """
+    symbol: str
+    timeframe: str
+    width: int = 800
+    height: int = 600
+    format: str = "png"
+    theme: str = "dark"
+    indicators: Tuple[str, ...] = ()  # e.g. ("SMA:20", "EMA:50"); SMA/EMA are drawn
+    drawings: Tuple[DrawingSpec, ...] = ()  # see drawing_spec()
+    show_volume: bool = True
+    trade_buttons: bool = False
+
+    def __post_init__(self):
+        if self.format.lower() not in FORMATS:
+            raise ValueError(f"Unsupported image format: {self.format}")
+        # Indicator order doesn't change the image, so it doesn't change the key
+        overlays = {overlay_indicator(name) for name in self.indicators} - {None}
+        object.__setattr__(self, "indicators", tuple(sorted(overlays)))
+        object.__setattr__(self, "drawings", tuple(
+            drawing for drawing in self.drawings if drawing and drawing[0] in DRAWING_POINTS
+        ))
+
+
+@dataclass
+class ChartBars:
+    """OHLCV columns, oldest first; timestamps are POSIX seconds"""
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @classmethod
+    def from_ohlcv(cls, bars: Sequence[Any]) -> "ChartBars":
+        """Columns from OHLCV-like objects (timestamp, open, high, low, close, volume attributes)"""
+        count = len(bars)
+        return cls(
+            timestamp=np.fromiter((b.timestamp.timestamp() for b in bars), dtype=float, count=count),
+            open=np.fromiter((b.open for b in bars), dtype=float, count=count),
+            high=np.fromiter((b.high for b in bars), dtype=float, count=count),
+            low=np.fromiter((b.low for b in bars), dtype=float, count=count),
+            close=np.fromiter((b.close for b in bars), dtype=float, count=count),
+            volume=np.fromiter((b.volume for b in bars), dtype=float, count=count)
+        )
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    @property
+    def last_time(self) -> float:
+        return float(self.timestamp[-1]) if len(self.timestamp) else 0.0
+
+    def tail(self, count: int) -> "ChartBars":
+        return ChartBars(*(column[-count:] for column in (
+            self.timestamp, self.open, self.high, self.low, self.close, self.volume
+        )))
+
+
+# ---------------------------------------------------------------------------
+# Rendering (runs inside pool workers; static layers are cached per process)
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=1)
+def _font() -> ImageFont.ImageFont:
+    for name in ("DejaVuSans.ttf", "arial.ttf"):
+        try:
+            return ImageFont.truetype(name, 14)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def _plot_area(width: int, height: int, show_volume: bool) -> Tuple[int, int, int, int, int]:
+    """(left, top, right, price_bottom, volume_bottom) in pixels"""
+    left, top = MARGIN_LEFT, MARGIN_TOP
+    right, bottom = width - MARGIN_RIGHT, height - MARGIN_BOTTOM
+    price_bottom = bottom - int((bottom - top) * VOLUME_PANE) if show_volume else bottom
+    return left, top, right, price_bottom, bottom
+
+
+@lru_cache(maxsize=32)
+def _background_layer(width: int, height: int, theme: str, show_volume: bool) -> Image.Image:
+    """Background, grid and pane frame"""
+    colors = THEMES[theme]
+    image = Image.new("RGBA", (width, height), colors["background"])
+    draw = ImageDraw.Draw(image)
+    left, top, right, price_bottom, bottom = _plot_area(width, height, show_volume)
+
+    for i in range(5):
+        y = top + (price_bottom - top) * i // 4
+        draw.line([(left, y), (right, y)], fill=colors["grid"])
+    for i in range(7):
+        x = left + (right - left) * i // 6
+        draw.line([(x, top), (x, bottom)], fill=colors["grid"])
+    draw.rectangle([left, top, right, bottom], outline=colors["grid"])
+    if show_volume:
+        draw.line([(left, price_bottom), (right, price_bottom)], fill=colors["grid"])
+    return image
+
+
+@lru_cache(maxsize=32)
+def _button_layer(width: int, height: int) -> Image.Image:
+    """Semi-transparent BUY/SELL buttons along the bottom edge"""
+    layer = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    font = _font()
+
+    button_height, button_width, margin = 40, 120, 10
+    top = height - button_height - margin
+    for index, (label, color) in enumerate((("BUY", (34, 197, 94, 200)), ("SELL", (239, 68, 68, 200)))):
+        left = margin + index * (button_width + margin)
+        draw.rectangle([left, top, left + button_width, top + button_height], fill=color)
+        draw.text(
+            (left + button_width // 2, top + button_height // 2), label,
+            fill=(255, 255, 255, 255), font=font, anchor="mm"
+        )
+    return layer
+
+
+def _indicator_line(closes: np.ndarray, name: str) -> Optional[np.ndarray]:
+    """SMA/EMA series aligned with `closes` (NaN until defined)"""
+    kind, period = name.split(":")
+    period = int(period)
+    if len(closes) < period:
+        return None
+
+    line = np.full(len(closes), np.nan)
+    if kind == "SMA":
+        sums = np.cumsum(np.insert(closes, 0, 0.0))
+        line[period - 1:] = (sums[period:] - sums[:-period]) / period
+    else:
+        alpha = 2 / (period + 1)
+        value = closes[:period].mean()
+        line[period - 1] = value
+        for i in range(period, len(closes)):
+            value += alpha * (closes[i] - value)
+            line[i] = value
+    return line
+
+
+def render_chart(spec: RenderSpec, bars: ChartBars) -> Tuple[bytes, float]:
+    """Draw `bars` onto the cached static layers and encode; returns (image, seconds)"""
+
+    started = time.perf_counter()
+    colors = THEMES.get(spec.theme, THEMES["dark"])
+    theme = spec.theme if spec.theme in THEMES else "dark"
+    width, height = spec.width, spec.height
+
+    image = _background_layer(width, height, theme, spec.show_volume).copy()
+    draw = ImageDraw.Draw(image)
+    font = _font()
+    left, top, right, price_bottom, bottom = _plot_area(width, height, spec.show_volume)
+
+    draw.text((left, 8), f"{spec.symbol}  {spec.timeframe}", fill=colors["text"], font=font)
+
+    # Indicators need history before the visible window
+    closes_all = bars.close
+    lines = [(name, _indicator_line(closes_all, name)) for name in spec.indicators]
+
+    visible = max(1, (right - left) // MIN_CANDLE_PITCH)
+    window = bars.tail(visible)
+    count = len(window)
+
+    if count:
+        lows, highs = window.low.min(), window.high.max()
+        visible_lines = [line[-count:] for _, line in lines if line is not None]
+        for line in visible_lines:
+            if np.isfinite(line).any():
+                lows = min(lows, np.nanmin(line))
+                highs = max(highs, np.nanmax(line))
+        span = (highs - lows) or 1.0
+
+        pitch = (right - left) / visible
+        body = max(1, int(pitch * 0.7))
+        xs = right - pitch * (count - np.arange(count)) + pitch / 2
+
+        def y(values: np.ndarray) -> np.ndarray:
+            return price_bottom - (values - lows) / span * (price_bottom - top)
+
+        y_open, y_close, y_high, y_low = y(window.open), y(window.close), y(window.high), y(window.low)
+        rising = window.close >= window.open
+
+        if spec.show_volume and window.volume.max() > 0:
+            v_height = window.volume / window.volume.max() * (bottom - price_bottom - 2)
+            for x, h in zip(xs, v_height):
+                draw.rectangle([x - body / 2, bottom - h, x + body / 2, bottom], fill=colors["volume"])
+
+        for i in range(count):
+            color = colors["up"] if rising[i] else colors["down"]
+            x = xs[i]
+            draw.line([(x, y_high[i]), (x, y_low[i])], fill=color)
+            top_y, bottom_y = min(y_open[i], y_close[i]), max(y_open[i], y_close[i])
+            draw.rectangle([x - body / 2, top_y, x + body / 2, max(bottom_y, top_y + 1)], fill=color)
+
+        for index, line in enumerate(visible_lines):
+            defined = np.isfinite(line)
+            points = list(zip(xs[defined], y(line[defined])))
+            if len(points) > 1:
+                draw.line(points, fill=colors["lines"][index % len(colors["lines"])], width=2)
+
+        def x(time: float) -> float:
+            """Pixel column of a POSIX time; extrapolated by bar spacing outside the visible bars"""
+            times = window.timestamp
+            if count == 1 or times[0] <= time <= times[-1]:
+                return float(np.interp(time, times, xs))
+            spacing = float(np.median(np.diff(times))) or 1.0
+            edge = 0 if time < times[0] else -1
+            return float(xs[edge] + (time - times[edge]) / spacing * pitch)
+
+        for kind, points in spec.drawings:
+            color = colors["drawing"]
+            if kind == "horizontal_line":
+                level = y(points[0][1])
+                draw.line([(left, level), (right, level)], fill=color, width=2)
+                continue
+            if kind == "vertical_line":
+                column = x(points[0][0])
+                draw.line([(column, top), (column, price_bottom)], fill=color, width=2)
+                continue
+
+            (t1, p1), (t2, p2) = points
+            x1, y1, x2, y2 = x(t1), y(p1), x(t2), y(p2)
+            if kind == "rectangle":
+                draw.rectangle([min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)], outline=color, width=2)
+                continue
+            if kind in ("ray", "extended_line") and x2 != x1:
+                slope = (y2 - y1) / (x2 - x1)
+                if kind == "extended_line":
+                    x1, y1 = left, y1 + slope * (left - x1)
+                x2, y2 = right, y1 + slope * (right - x1)
+            draw.line([(x1, y1), (x2, y2)], fill=color, width=2)
+
+        for i in range(5):
+            price = highs - span * i / 4
+            draw.text((right + 6, top + (price_bottom - top) * i // 4 - 7), f"{price:.2f}", fill=colors["text"], font=font)
+
+    if spec.trade_buttons:
+        image.alpha_composite(_button_layer(width, height))
+
+    output = io.BytesIO()
+    image_format = FORMATS[spec.format.lower()]
+    if image_format == "JPEG":
+        image.convert("RGB").save(output, format="JPEG", quality=85)
+    else:
+        image.save(output, format="PNG", compress_level=6)
+    return output.getvalue(), time.perf_counter() - started
+
+
+def _init_render_worker(warm_sizes: Sequence[Tuple[int, int]]):
+    """Load fonts and rasterize the common static layers before the first request"""
+    _font()
+    for width, height in warm_sizes:
+        for theme in THEMES:
+            _background_layer(width, height, theme, True)
+        _button_layer(width, height)
+
+
+# ---------------------------------------------------------------------------
+# Service
+# ---------------------------------------------------------------------------
+
+class RenderCancelledError(RuntimeError):
+    """A shared render was abandoned because the request running it was cancelled"""
+
+
+class ChartRenderService:
+    """Process-pool chart renderer with an output cache and render coalescing
+
+    Images are keyed by (spec, last bar time, bar count), so a chart is
+    re-rendered only when a bar closes or the request differs in size,
+    theme, indicators or overlay. `workers=0` renders on a thread instead
+    of a process pool, for tests and single-process deployments.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        cache_size: int = 1024,
+        warm_sizes: Sequence[Tuple[int, int]] = ((800, 600),),
+    ):
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.cache_size = cache_size
+        self.warm_sizes = tuple(warm_sizes)
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._in_flight: Dict[tuple, asyncio.Future] = {}
+        self._render_times = deque(maxlen=1000)
+
+        self.stats = {"requests": 0, "renders": 0, "cache_hits": 0, "coalesced": 0, "errors": 0}
+
+    @property
+    def executor(self) -> Optional[ProcessPoolExecutor]:
+        if self._executor is None and self.workers > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_render_worker,
+                initargs=(self.warm_sizes,)
+            )
+        return self._executor
+
+    @staticmethod
+    def cache_key(spec: RenderSpec, bars: ChartBars) -> tuple:
+        return (spec, bars.last_time, len(bars))
+
+    async def render(self, spec: RenderSpec, bars: ChartBars) -> bytes:
+        """Rendered image for `spec` over `bars`, from cache, a shared in-flight render, or the pool"""
+
+        self.stats["requests"] += 1
+        key = self.cache_key(spec, bars)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return cached
+
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._in_flight[key] = future
+
+        try:
+            if self.workers > 0:
+                image, seconds = await loop.run_in_executor(self.executor, render_chart, spec, bars)
+            else:
+                image, seconds = await asyncio.to_thread(render_chart, spec, bars)
+        except asyncio.CancelledError:
+            # Coalesced requests were not cancelled themselves; fail them with an ordinary error
+            future.set_exception(RenderCancelledError(f"Render of {spec.symbol} {spec.timeframe} was cancelled"))
+            raise
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Chart render failed for {spec.symbol} {spec.timeframe}: {e}")
+            future.set_exception(e)
+            raise
+        else:
+            self.stats["renders"] += 1
+            self._render_times.append(seconds)
+            self._cache[key] = image
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            future.set_result(image)
+            return image
+        finally:
+            self._in_flight.pop(key, None)
+
+    def metrics(self) -> Dict[str, Any]:
+        times = sorted(self._render_times)
+        return {
+            **self.stats,
+            "cached_images": len(self._cache),
+            "in_flight": len(self._in_flight),
+            "workers": self.workers,
+            "render_p50_ms": times[len(times) // 2] * 1000 if times else 0.0,
+            "render_p95_ms": times[int(len(times) * 0.95)] * 1000 if times else 0.0,
+            "render_max_ms": times[-1] * 1000 if times else 0.0
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+@lru_cache(maxsize=1)
+def get_chart_render_service() -> ChartRenderService:
+    """Process-wide render service shared by the charting API and WhatsApp sharing"""
+    return ChartRenderService()
@@ -0,0 +1,119 @@
+"""
+Sharded Chart Session Store
+
+Holds chart sessions in N partitions placed on a consistent-hash ring, each
+with its own inactivity heap, so lookups stay O(1) and expiry touches only
+sessions that are actually due rather than every session on the node.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import heapq
+from collections.abc import MutableMapping
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+def _ring_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hashing of keys onto shard indexes
+
+    Each shard owns `replicas` virtual points so load spreads evenly and
+    growing from N to N+1 shards moves only about 1/(N+1) of the keys.
+    """
+
+    def __init__(self, shards: int, replicas: int = 64):
+        points = sorted(
+            (_ring_hash(f"shard-{shard}#{replica}"), shard)
+            for shard in range(shards) for replica in range(replicas)
+        )
+        self._points = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def shard_for(self, key: str) -> int:
+        index = bisect.bisect(self._points, _ring_hash(key)) % len(self._points)
+        return self._shards[index]
+
+
+class _Shard:
+    """Sessions of one partition plus a min-heap of (last seen activity, session_id)"""
+
+    def __init__(self):
+        self.sessions: Dict[str, Any] = {}
+        self.expiry: List[Tuple[datetime, str]] = []
+
+
+class ShardedSessionStore(MutableMapping):
+    """session_id -> session mapping partitioned across shards
+
+    Behaves like the plain dict it replaces. Sessions must have a
+    `last_activity` datetime; refreshing it needs no call into the store,
+    since heap entries are re-checked lazily when they come due.
+    """
+
+    def __init__(self, shards: int = 16):
+        self.ring = HashRing(shards)
+        self._shards = [_Shard() for _ in range(shards)]
+        self._size = 0
+
+    def _shard(self, session_id: str) -> _Shard:
+        return self._shards[self.ring.shard_for(session_id)]
+
+    def __getitem__(self, session_id: str) -> Any:
+        return self._shard(session_id).sessions[session_id]
+
+    def __setitem__(self, session_id: str, session: Any):
+        shard = self._shard(session_id)
+        if session_id not in shard.sessions:
+            self._size += 1
+        shard.sessions[session_id] = session
+        heapq.heappush(shard.expiry, (session.last_activity, session_id))
+
+    def __delitem__(self, session_id: str):
+        # The heap entry goes stale and is dropped when it comes due
+        del self._shard(session_id).sessions[session_id]
+        self._size -= 1
+
+    def __contains__(self, session_id: object) -> bool:
+        return isinstance(session_id, str) and session_id in self._shard(session_id).sessions
+
+    def __iter__(self) -> Iterator[str]:
+        for shard in self._shards:
+            yield from list(shard.sessions)
+
+    def __len__(self) -> int:
+        return self._size
+
+    async def expired(self, cutoff: datetime) -> List[str]:
+        """IDs of sessions with no activity since `cutoff`, yielding to the loop between shards
+
+        Sessions are not removed; the caller releases their resources first.
+        """
+
+        expired = []
+        for shard in self._shards:
+            due = {}
+            while shard.expiry and shard.expiry[0][0] < cutoff:
+                _, session_id = heapq.heappop(shard.expiry)
+                session = shard.sessions.get(session_id)
+                if session is None:
+                    continue
+                if session.last_activity < cutoff:
+                    due[session_id] = session.last_activity
+                else:
+                    # Active since it was queued; check again when the new activity ages out
+                    heapq.heappush(shard.expiry, (session.last_activity, session_id))
+
+            # Keep an entry until the caller deletes the session, so a failed cleanup is retried
+            for session_id, seen in due.items():
+                heapq.heappush(shard.expiry, (seen, session_id))
+            expired.extend(due)
+            await asyncio.sleep(0)
+        return expired
+
+    def shard_sizes(self) -> List[int]:
+        return [len(shard.sessions) for shard in self._shards]
@@ -17,14 +17,19 @@ import numpy as np
 
 from app.core.logging import logger
 from app.core.config import settings
+from app.monitoring.tracing import tracer
 
 
 class DataAggregator:
-    """Aggregates tick data into different timeframes"""
+    """Aggregates tick data into different timeframes
     
-    def __init__(self):
+    `clock` decides when candles close; replays pass a simulated clock.
+    """
+    
+    def __init__(self, clock: Callable[[], datetime] = datetime.now):
         self.tick_buffer: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
         self.candle_data: Dict[str, Dict[str, Any]] = {}  # symbol_timeframe -> current candle
+        self.clock = clock
         
     def add_tick(self, symbol: str, tick: Dict[str, Any]):
         """Add a tick and aggregate into candles"""
@@ -88,7 +93,7 @@ class DataAggregator:
         
         # Check if current time has passed candle period
         candle_time = datetime.fromisoformat(candle["timestamp"])
-        current_time = datetime.now()
+        current_time = self.clock()
         
         return (current_time - candle_time).total_seconds() >= duration
 
@@ -276,6 +281,7 @@ class WebSocketManager:
         # Send unsubscribe to market data provider
         logger.info(f"Unsubscribed from market data for {symbol}")
     
+    @tracer.traced("ws.broadcast")
     async def broadcast_data_update(self, symbol: str, data: Dict[str, Any]):
         """Broadcast data update to subscribed clients"""
         
@@ -348,6 +354,34 @@ class WebSocketManager:
         
         logger.info("Connected to market data providers")
     
+    async def ingest_tick(self, symbol: str, tick: Dict[str, Any]):
+        """Aggregate a market data tick, broadcast it and update charts when a candle closes"""
+        
+        with tracer.span("tick.ingest", symbol=symbol):
+            # Process tick through aggregator
+            with tracer.span("tick.aggregate"):
+                candle, timeframe = self.aggregator.add_tick(symbol, tick)
+            
+            # Broadcast tick data
+            await self.broadcast_data_update(symbol, {
+                "type": "tick",
+                **tick
+            })
+            
+            # If candle completed, update charts
+            if candle:
+                candle_data = {
+                    "type": "candle",
+                    "timeframe": timeframe,
+                    **candle
+                }
+                
+                # Update chart manager
+                await self.chart_manager.update_chart_data(symbol, candle)
+                
+                # Broadcast candle update
+                await self.broadcast_data_update(symbol, candle_data)
+    
     async def _simulate_market_data(self, symbol: str):
         """Simulate market data for testing"""
         
@@ -381,28 +415,7 @@ class WebSocketManager:
                     "ask": round(last_price * 1.0005, 2)
                 }
                 
-                # Process tick through aggregator
-                candle, timeframe = self.aggregator.add_tick(symbol, tick)
-                
-                # Broadcast tick data
-                await self.broadcast_data_update(symbol, {
-                    "type": "tick",
-                    **tick
-                })
-                
-                # If candle completed, update charts
-                if candle:
-                    candle_data = {
-                        "type": "candle",
-                        "timeframe": timeframe,
-                        **candle
-                    }
-                    
-                    # Update chart manager
-                    await self.chart_manager.update_chart_data(symbol, candle)
-                    
-                    # Broadcast candle update
-                    await self.broadcast_data_update(symbol, candle_data)
+                await self.ingest_tick(symbol, tick)
                 
                 # Simulate market hours (9:15 AM - 3:30 PM IST)
                 current_time = datetime.now()
@@ -14,6 +14,7 @@ from dataclasses import dataclass
 import uuid
 
 from app.core.logging import logger
+from app.monitoring.tracing import tracer
 
 
 class IndicatorType(Enum):
@@ -173,6 +174,7 @@ class IndicatorManager:
         
         return result
     
+    @tracer.traced("indicators.update")
     async def update_all(self, new_data: Any):
         """Update all indicators with new data point"""
         
@@ -266,7 +268,11 @@ class IndicatorManager:
         """Relative Strength Index"""
         
         period = params.get("period", 14)
-        
+
+        # Not enough bars for the seed average yet
+        if len(closes) <= period:
+            return np.full(len(closes), np.nan)
+
         # Calculate price changes
         deltas = np.diff(closes)
         seed = deltas[:period + 1]
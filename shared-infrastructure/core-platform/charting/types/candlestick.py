@@ -86,6 +86,12 @@ class CandlestickChart(Chart):
         if await self._is_significant_move(data):
             await self._calculate_support_resistance()
     
+    async def _update_indicators(self):
+        """Recalculate indicators for the new bar"""
+        
+        if self.indicator_manager.indicators:
+            await self.indicator_manager.update_all(self.data[-1])
+    
     async def add_indicator(
         self,
         indicator_type: str,
@@ -289,13 +295,6 @@ class CandlestickChart(Chart):
         
         return snapshot
     
-    async def render_to_image(self, width: int, height: int, format: str) -> bytes:
-        """Render candlestick chart to image"""
-        
-        # This would use a charting library like matplotlib or plotly
-        # For now, return placeholder
-        return b"candlestick_chart_image_data"
-    
     async def _load_historical_data(self) -> List[OHLCV]:
         """Load historical data for initialization"""
         
@@ -20,13 +20,15 @@ Features:
 import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any, Union
+from typing import Dict, List, Optional, Tuple, Any, Union, Callable
 from dataclasses import dataclass, field
 from enum import Enum
 import json
 import uuid
 from collections import defaultdict, deque
 
+from .leaderboard import Leaderboard, period_key
+
 logger = logging.getLogger(__name__)
 
 
@@ -132,6 +134,15 @@ class Achievement:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class AchievementRule:
+    badge_type: BadgeType
+    events: Tuple[str, ...]  # Event types that can satisfy the rule
+    check: Callable[[User, Dict[str, Any]], bool]
+    description: str
+    points: int
+
+
 @dataclass
 class LeaderboardEntry:
     user_id: str
@@ -184,6 +195,14 @@ class ForumPost:
     last_updated: datetime
 
 
+# period -> (metric label, period label)
+LEADERBOARD_PERIODS = {
+    "daily": ("Daily Return", "Daily"),
+    "weekly": ("Weekly Return", "Weekly"),
+    "monthly": ("Monthly Return", "Monthly")
+}
+
+
 class CommunityEngine:
     """Main community features engine."""
     
@@ -199,12 +218,25 @@ class CommunityEngine:
         self.learning_content = {}
         self.forum_posts = {}
         self.quiz_results = defaultdict(list)
+        self.passed_quiz_counts = defaultdict(int)
+        
+        # Achievement rules indexed by the events that can satisfy them
+        self.achievement_rules = self._default_achievement_rules()
+        self._rules_by_event = defaultdict(list)
+        for rule in self.achievement_rules:
+            for event_type in rule.events:
+                self._rules_by_event[event_type].append(rule)
+        self.event_counts = defaultdict(int)
         
         # Active tracking
         self.active_challenges = []
-        self.daily_leaderboard = []
-        self.weekly_leaderboard = []
-        self.monthly_leaderboard = []
+        
+        # Period leaderboards are updated as portfolios change, never re-sorted
+        self.period_leaderboards = {period: Leaderboard(period) for period in LEADERBOARD_PERIODS}
+        self._period_keys = {period: period_key(period, datetime.now()) for period in LEADERBOARD_PERIODS}
+        self._period_baselines = {period: {} for period in LEADERBOARD_PERIODS}  # user_id -> value at period start
+        self.challenge_leaderboards: Dict[str, Leaderboard] = {}
+        self.user_challenges = defaultdict(set)  # user_id -> challenge_ids
         
         self.running = False
         
@@ -213,7 +245,6 @@ class CommunityEngine:
             "max_challenges_per_user": 5,
             "default_challenge_duration": 30,  # days
             "leaderboard_refresh_interval": 300,  # 5 minutes
-            "achievement_check_interval": 3600,   # 1 hour
             "max_group_size": 50,
             "min_challenge_participants": 3,
             "learning_points_multiplier": 10,
@@ -228,7 +259,6 @@ class CommunityEngine:
         # Start background tasks
         tasks = [
             asyncio.create_task(self._update_leaderboards()),
-            asyncio.create_task(self._check_achievements()),
             asyncio.create_task(self._manage_challenges()),
             asyncio.create_task(self._generate_daily_content())
         ]
@@ -263,6 +293,11 @@ class CommunityEngine:
         
         self.users[user_id] = user
         
+        # Enter current period leaderboards at a flat return
+        for period, board in self.period_leaderboards.items():
+            self._roll_period(period)
+            board.update(user_id, 0.0)
+        
         # Award first achievement
         await self._award_achievement(user_id, BadgeType.FIRST_INVESTMENT, "Welcome to GridWorks!", 100)
         
@@ -277,8 +312,15 @@ class CommunityEngine:
             user.portfolio_value = portfolio_value
             user.last_active = datetime.now()
             
+            self._record_period_performance(user_id, old_value, portfolio_value)
+            self._refresh_challenge_standings(user_id)
+            
             # Check for performance-based achievements
-            await self._check_portfolio_achievements(user_id, old_value, portfolio_value, performance)
+            await self.emit_event(user_id, "portfolio_updated", {
+                "old_value": old_value,
+                "new_value": portfolio_value,
+                "performance": performance
+            })
     
     # Challenge Management
     async def create_challenge(self, challenge_data: Dict[str, Any]) -> Challenge:
@@ -319,6 +361,10 @@ class CommunityEngine:
             return False
         
         challenge.participants.append(user_id)
+        self.user_challenges[user_id].add(challenge_id)
+        
+        board = self.challenge_leaderboards.setdefault(challenge_id, Leaderboard(challenge_id))
+        board.update(user_id, self._challenge_score(challenge, user_id))
         
         # Deduct entry fee if applicable
         if challenge.entry_fee > 0:
@@ -439,13 +485,14 @@ class CommunityEngine:
         
         points = self.config["learning_points_multiplier"] * points_multiplier[content.difficulty_level]
         user.total_score += points
+        self._refresh_challenge_standings(user_id)
         
         # Update content statistics
         content.completion_count += 1
         content.average_rating = ((content.average_rating * (content.completion_count - 1)) + rating) / content.completion_count
         
         # Check for learning achievements
-        await self._check_learning_achievements(user_id)
+        await self.emit_event(user_id, "learning_completed", {"content_id": content_id})
         
         return points
     
@@ -486,7 +533,9 @@ class CommunityEngine:
             # Award points
             user = self.users[user_id]
             user.total_score += 50  # Quiz points
-            await self._check_learning_achievements(user_id)
+            self.passed_quiz_counts[user_id] += 1
+            self._refresh_challenge_standings(user_id)
+            await self.emit_event(user_id, "quiz_passed", {"quiz_id": quiz_id, "score": score})
         
         return result
     
@@ -510,45 +559,39 @@ class CommunityEngine:
         )
         
         self.forum_posts[post_id] = post
+        await self.emit_event(user_id, "forum_post_created", {"post_id": post_id})
         return post
     
     async def like_post(self, user_id: str, post_id: str) -> bool:
         """Like a forum post."""
         if post_id in self.forum_posts:
-            self.forum_posts[post_id].likes += 1
+            post = self.forum_posts[post_id]
+            post.likes += 1
+            await self.emit_event(post.user_id, "post_liked", {"post_id": post_id, "likes": post.likes})
             return True
         return False
     
+    async def follow_user(self, follower_id: str, user_id: str) -> bool:
+        """Follow another community member."""
+        if follower_id == user_id or follower_id not in self.users or user_id not in self.users:
+            return False
+        
+        user = self.users[user_id]
+        if follower_id in user.followers:
+            return False
+        
+        user.followers.append(follower_id)
+        self.users[follower_id].following.append(user_id)
+        
+        await self.emit_event(user_id, "follower_gained", {"follower_id": follower_id})
+        return True
+    
     # Leaderboards
     async def _update_leaderboards(self):
-        """Update community leaderboards."""
+        """Roll period leaderboards over; scores are updated as portfolios change."""
         while self.running:
             try:
-                # Daily leaderboard (portfolio performance)
-                daily_entries = []
-                for user_id, user in self.users.items():
-                    # In real implementation, calculate daily performance
-                    daily_performance = 0.02  # Simulated 2% gain
-                    
-                    entry = LeaderboardEntry(
-                        user_id=user_id,
-                        username=user.username,
-                        score=daily_performance,
-                        rank=0,  # Will be set after sorting
-                        performance_metric="Daily Return",
-                        period="Daily",
-                        last_updated=datetime.now()
-                    )
-                    daily_entries.append(entry)
-                
-                # Sort and assign ranks
-                daily_entries.sort(key=lambda x: x.score, reverse=True)
-                for i, entry in enumerate(daily_entries):
-                    entry.rank = i + 1
-                
-                self.daily_leaderboard = daily_entries
-                
-                # Update weekly and monthly leaderboards similarly
+                await self._update_daily_leaderboard()
                 await self._update_weekly_leaderboard()
                 await self._update_monthly_leaderboard()
                 
@@ -558,95 +601,136 @@ class CommunityEngine:
                 logger.error(f"❌ Leaderboard update error: {e}")
                 await asyncio.sleep(60)
     
+    async def _update_daily_leaderboard(self):
+        """Update daily leaderboard."""
+        self._roll_period("daily")
+    
     async def _update_weekly_leaderboard(self):
         """Update weekly leaderboard."""
-        # Similar implementation to daily but with weekly performance
-        pass
+        self._roll_period("weekly")
     
     async def _update_monthly_leaderboard(self):
         """Update monthly leaderboard."""
-        # Similar implementation to daily but with monthly performance
-        pass
+        self._roll_period("monthly")
+    
+    def _roll_period(self, period: str):
+        """Start a fresh board when the period changes; users re-enter on their next update."""
+        key = period_key(period, datetime.now())
+        if key != self._period_keys[period]:
+            self._period_keys[period] = key
+            self.period_leaderboards[period].clear()
+            self._period_baselines[period].clear()
+            logger.info(f"📊 {period.title()} leaderboard rolled over")
+    
+    def _record_period_performance(self, user_id: str, old_value: float, new_value: float):
+        """Update the user's return for every period, relative to their value at period start."""
+        for period, board in self.period_leaderboards.items():
+            self._roll_period(period)
+            baseline = self._period_baselines[period].setdefault(user_id, old_value)
+            score = (new_value - baseline) / baseline if baseline > 0 else 0.0
+            board.update(user_id, score)
     
     async def get_leaderboard(self, period: str = "daily", limit: int = 50) -> List[LeaderboardEntry]:
         """Get leaderboard for specified period."""
-        if period.lower() == "daily":
-            return self.daily_leaderboard[:limit]
-        elif period.lower() == "weekly":
-            return self.weekly_leaderboard[:limit]
-        elif period.lower() == "monthly":
-            return self.monthly_leaderboard[:limit]
-        else:
-            return self.daily_leaderboard[:limit]
+        period = period.lower() if period.lower() in self.period_leaderboards else "daily"
+        self._roll_period(period)
+        
+        metric, label = LEADERBOARD_PERIODS[period]
+        now = datetime.now()
+        
+        return [
+            LeaderboardEntry(
+                user_id=user_id,
+                username=self.users[user_id].username if user_id in self.users else "Unknown",
+                score=score,
+                rank=rank,
+                performance_metric=metric,
+                period=label,
+                last_updated=now
+            )
+            for user_id, score, rank in self.period_leaderboards[period].top(limit)
+        ]
+    
+    async def get_user_rank(self, user_id: str, period: str = "daily") -> Optional[int]:
+        """Get a user's rank for the specified period."""
+        board = self.period_leaderboards.get(period.lower())
+        return board.rank(user_id) if board else None
     
     # Achievements & Badges
-    async def _check_achievements(self):
-        """Check and award achievements to users."""
-        while self.running:
-            try:
-                for user_id in self.users.keys():
-                    await self._check_user_achievements(user_id)
-                
-                await asyncio.sleep(self.config["achievement_check_interval"])
-                
-            except Exception as e:
-                logger.error(f"❌ Achievement check error: {e}")
-                await asyncio.sleep(300)
+    def _default_achievement_rules(self) -> List[AchievementRule]:
+        """Badge rules and the events that can satisfy them."""
+        return [
+            # In real implementation, check actual portfolio diversification
+            AchievementRule(
+                badge_type=BadgeType.DIVERSIFICATION_MASTER,
+                events=("portfolio_updated",),
+                check=lambda user, event: event["new_value"] > 100000,  # Simulated condition
+                description="Portfolio well diversified across sectors",
+                points=500
+            ),
+            AchievementRule(
+                badge_type=BadgeType.LONG_TERM_INVESTOR,
+                events=("portfolio_updated",),
+                check=lambda user, event: (
+                    (datetime.now() - user.join_date).days > 365 and
+                    event["new_value"] > event["old_value"]
+                ),
+                description="Invested for over 1 year with positive returns",
+                points=1000
+            ),
+            AchievementRule(
+                badge_type=BadgeType.LEARNING_CHAMPION,
+                events=("quiz_passed",),
+                check=lambda user, event: self.passed_quiz_counts[user.user_id] >= 10,
+                description="Completed 10 educational quizzes",
+                points=300
+            ),
+            AchievementRule(
+                badge_type=BadgeType.COMMUNITY_LEADER,
+                events=("follower_gained",),
+                check=lambda user, event: len(user.followers) >= 50,
+                description="Gained 50+ followers",
+                points=750
+            ),
+        ]
     
-    async def _check_user_achievements(self, user_id: str):
-        """Check achievements for a specific user."""
-        user = self.users[user_id]
+    async def emit_event(self, user_id: str, event_type: str, data: Optional[Dict[str, Any]] = None) -> List[Achievement]:
+        """Evaluate only the rules indexed on this event type for this user."""
+        if user_id not in self.users:
+            return []
         
-        # Check various achievement criteria
-        await self._check_portfolio_achievements(user_id, 0, user.portfolio_value, 0)
-        await self._check_activity_achievements(user_id)
-        await self._check_learning_achievements(user_id)
-        await self._check_community_achievements(user_id)
+        self.event_counts[event_type] += 1
+        return await self._evaluate_rules(user_id, self._rules_by_event.get(event_type, ()), data or {})
     
-    async def _check_portfolio_achievements(self, user_id: str, old_value: float, new_value: float, performance: float):
-        """Check portfolio-related achievements."""
+    async def _evaluate_rules(self, user_id: str, rules, data: Dict[str, Any]) -> List[Achievement]:
         user = self.users[user_id]
+        awarded = []
         
-        # Diversification Master
-        if BadgeType.DIVERSIFICATION_MASTER not in user.badges:
-            # In real implementation, check actual portfolio diversification
-            if new_value > 100000:  # Simulated condition
-                await self._award_achievement(user_id, BadgeType.DIVERSIFICATION_MASTER, "Portfolio well diversified across sectors", 500)
-        
-        # Long-term Investor
-        if BadgeType.LONG_TERM_INVESTOR not in user.badges:
-            days_since_join = (datetime.now() - user.join_date).days
-            if days_since_join > 365 and new_value > old_value:
-                await self._award_achievement(user_id, BadgeType.LONG_TERM_INVESTOR, "Invested for over 1 year with positive returns", 1000)
-    
-    async def _check_learning_achievements(self, user_id: str):
-        """Check learning-related achievements."""
-        user = self.users[user_id]
+        for rule in rules:
+            # Awarding is idempotent: owned badges are never re-checked
+            if rule.badge_type in user.badges:
+                continue
+            try:
+                if rule.check(user, data):
+                    achievement = await self._award_achievement(user_id, rule.badge_type, rule.description, rule.points)
+                    if achievement:
+                        awarded.append(achievement)
+            except Exception as e:
+                logger.error(f"❌ Achievement rule {rule.badge_type.value} failed: {e}")
         
-        # Learning Champion
-        if BadgeType.LEARNING_CHAMPION not in user.badges:
-            completed_quizzes = len([r for r in self.quiz_results[user_id] if r["passed"]])
-            if completed_quizzes >= 10:
-                await self._award_achievement(user_id, BadgeType.LEARNING_CHAMPION, "Completed 10 educational quizzes", 300)
-    
-    async def _check_activity_achievements(self, user_id: str):
-        """Check activity-related achievements."""
-        # Implementation for activity-based achievements
-        pass
+        return awarded
     
-    async def _check_community_achievements(self, user_id: str):
-        """Check community-related achievements."""
+    async def _check_user_achievements(self, user_id: str) -> List[Achievement]:
+        """Evaluate every rule for one user (e.g. backfill after adding a rule)."""
         user = self.users[user_id]
         
-        # Community Leader
-        if BadgeType.COMMUNITY_LEADER not in user.badges:
-            if len(user.followers) >= 50:
-                await self._award_achievement(user_id, BadgeType.COMMUNITY_LEADER, "Gained 50+ followers", 750)
+        snapshot = {"old_value": 0, "new_value": user.portfolio_value, "performance": 0}
+        return await self._evaluate_rules(user_id, self.achievement_rules, snapshot)
     
-    async def _award_achievement(self, user_id: str, badge_type: BadgeType, description: str, points: int):
+    async def _award_achievement(self, user_id: str, badge_type: BadgeType, description: str, points: int) -> Optional[Achievement]:
         """Award an achievement to a user."""
         if user_id not in self.users:
-            return
+            return None
         
         user = self.users[user_id]
         
@@ -664,8 +748,12 @@ class CommunityEngine:
             user.badges.append(badge_type)
             user.total_score += points
             self.achievements[user_id].append(achievement)
+            self._refresh_challenge_standings(user_id)
             
             logger.info(f"🏆 Achievement awarded to {user.username}: {achievement.title}")
+            return achievement
+        
+        return None
     
     # Challenge Management Background Tasks
     async def _manage_challenges(self):
@@ -714,36 +802,43 @@ class CommunityEngine:
         
         logger.info(f"🏁 Challenge completed: {challenge.title}")
     
+    def _challenge_score(self, challenge: Challenge, user_id: str) -> float:
+        """Score a participant according to the challenge type."""
+        user = self.users[user_id]
+        
+        if challenge.challenge_type == ChallengeType.PORTFOLIO_PERFORMANCE:
+            return 0.15  # Simulated 15% return
+        elif challenge.challenge_type == ChallengeType.LEARNING_QUIZ:
+            return len([r for r in self.quiz_results[user_id] if r["passed"]])
+        else:
+            return user.total_score
+    
+    def _refresh_challenge_standings(self, user_id: str):
+        """Re-score the user on the boards of challenges still running."""
+        for challenge_id in self.user_challenges.get(user_id, ()):
+            challenge = self.challenges.get(challenge_id)
+            if challenge is None or challenge.status == ChallengeStatus.COMPLETED:
+                continue
+            self.challenge_leaderboards[challenge_id].update(
+                user_id, self._challenge_score(challenge, user_id)
+            )
+    
     async def _calculate_challenge_results(self, challenge: Challenge) -> List[Dict]:
         """Calculate challenge results and rankings."""
-        results = []
-        
-        for user_id in challenge.participants:
-            if user_id in self.users:
-                user = self.users[user_id]
-                
-                # Calculate score based on challenge type
-                if challenge.challenge_type == ChallengeType.PORTFOLIO_PERFORMANCE:
-                    score = 0.15  # Simulated 15% return
-                elif challenge.challenge_type == ChallengeType.LEARNING_QUIZ:
-                    user_quizzes = [r for r in self.quiz_results[user_id] if r["passed"]]
-                    score = len(user_quizzes)
-                else:
-                    score = user.total_score
-                
-                results.append({
-                    "user_id": user_id,
-                    "username": user.username,
-                    "score": score,
-                    "rank": 0  # Will be set after sorting
-                })
-        
-        # Sort by score and assign ranks
-        results.sort(key=lambda x: x["score"], reverse=True)
-        for i, result in enumerate(results):
-            result["rank"] = i + 1
-        
-        return results
+        board = self.challenge_leaderboards.get(challenge.challenge_id)
+        if board is None:
+            return []
+        
+        return [
+            {
+                "user_id": user_id,
+                "username": self.users[user_id].username,
+                "score": score,
+                "rank": rank
+            }
+            for user_id, score, rank in board.top(len(board))
+            if user_id in self.users
+        ]
     
     async def _award_challenge_prize(self, user_id: str, challenge: Challenge, position: int):
         """Award prize to challenge winner."""
@@ -759,6 +854,7 @@ class CommunityEngine:
         # Award points (in real implementation, would handle actual prizes)
         bonus_points = int(prize_amount)
         user.total_score += bonus_points
+        self._refresh_challenge_standings(user_id)
         
         # Award winner badge
         if position == 1:
@@ -847,11 +943,7 @@ class CommunityEngine:
         user = self.users[user_id]
         
         # Get user's rank in daily leaderboard
-        user_rank = None
-        for entry in self.daily_leaderboard:
-            if entry.user_id == user_id:
-                user_rank = entry.rank
-                break
+        user_rank = self.period_leaderboards["daily"].rank(user_id)
         
         # Get active challenges user is participating in
         user_challenges = [
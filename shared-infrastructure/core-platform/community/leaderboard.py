@@ -0,0 +1,288 @@
+"""
+Leaderboard Ranking Service
+===========================
+
+Order-statistic leaderboards shared by community and social trading:
+- In-process boards on an indexable skiplist
+- Redis sorted-set boards for state shared across workers
+
+Both give O(log n) score updates and rank lookups and O(log n + k)
+top-k pages, so boards never need a full re-sort.
+"""
+
+import math
+import random
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Any, Iterator
+
+
+def period_key(period: str, now: datetime) -> Tuple:
+    """Calendar period containing `now`; boards roll over when it changes."""
+    if period == "daily":
+        return (now.year, now.month, now.day)
+    if period == "weekly":
+        iso = now.isocalendar()
+        return (iso[0], iso[1])
+    if period == "quarterly":
+        return (now.year, (now.month - 1) // 3 + 1)
+    return (now.year, now.month)
+
+
+class _SkipNode:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: Any, level: int):
+        self.key = key
+        self.next: List[Optional["_SkipNode"]] = [None] * level
+        # Number of level-0 steps from this node to next[i]
+        self.width: List[int] = [1] * level
+
+
+class IndexableSkipList:
+    """Sorted collection of unique keys with positional access."""
+
+    MAX_LEVEL = 32
+
+    def __init__(self, seed: Optional[int] = None):
+        self._head = _SkipNode(None, self.MAX_LEVEL)
+        self._size = 0
+        self._random = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _random_level(self) -> int:
+        level = 1
+        while level < self.MAX_LEVEL and self._random.random() < 0.5:
+            level += 1
+        return level
+
+    def _predecessors(self, key: Any) -> Tuple[List[_SkipNode], List[int]]:
+        chain = [self._head] * self.MAX_LEVEL
+        steps = [0] * self.MAX_LEVEL
+        node = self._head
+        for level in reversed(range(self.MAX_LEVEL)):
+            while node.next[level] is not None and node.next[level].key < key:
+                steps[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+        return chain, steps
+
+    def insert(self, key: Any):
+        """Insert a key (keys must be unique)."""
+        chain, steps_at_level = self._predecessors(key)
+
+        level_count = self._random_level()
+        node = _SkipNode(key, level_count)
+
+        steps = 0
+        for level in range(level_count):
+            prev = chain[level]
+            node.next[level] = prev.next[level]
+            prev.next[level] = node
+            node.width[level] = prev.width[level] - steps
+            prev.width[level] = steps + 1
+            steps += steps_at_level[level]
+
+        for level in range(level_count, self.MAX_LEVEL):
+            chain[level].width[level] += 1
+
+        self._size += 1
+
+    def remove(self, key: Any):
+        """Remove a key; raises KeyError if absent."""
+        chain, _ = self._predecessors(key)
+
+        target = chain[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+
+        for level in range(len(target.next)):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+
+        for level in range(len(target.next), self.MAX_LEVEL):
+            chain[level].width[level] -= 1
+
+        self._size -= 1
+
+    def index(self, key: Any) -> int:
+        """Zero-based position of a key; raises KeyError if absent."""
+        chain, steps = self._predecessors(key)
+
+        target = chain[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+
+        return sum(steps)
+
+    def iter_from(self, index: int) -> Iterator[Any]:
+        """Iterate keys starting at a zero-based position."""
+        if index < 0 or index >= self._size:
+            return
+
+        node = self._head
+        remaining = index + 1
+        for level in reversed(range(self.MAX_LEVEL)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+
+        while node is not None:
+            yield node.key
+            node = node.next[0]
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += self._size
+        for key in self.iter_from(index):
+            return key
+        raise IndexError(index)
+
+
+class Leaderboard:
+    """In-process leaderboard; highest score ranks first, ties broken by member."""
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._scores: Dict[str, float] = {}
+        self._index = IndexableSkipList()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def __contains__(self, member: str) -> bool:
+        return member in self._scores
+
+    def update(self, member: str, score: float):
+        """Set a member's score."""
+        old_score = self._scores.get(member)
+        if old_score is not None:
+            if old_score == score:
+                return
+            self._index.remove((-old_score, member))
+
+        self._scores[member] = score
+        self._index.insert((-score, member))
+
+    def increment(self, member: str, delta: float) -> float:
+        """Add to a member's score (starting from zero) and return the new score."""
+        score = self._scores.get(member, 0.0) + delta
+        self.update(member, score)
+        return score
+
+    def remove(self, member: str):
+        score = self._scores.pop(member, None)
+        if score is not None:
+            self._index.remove((-score, member))
+
+    def score(self, member: str) -> Optional[float]:
+        return self._scores.get(member)
+
+    def rank(self, member: str) -> Optional[int]:
+        """One-based rank, or None if the member is not on the board."""
+        score = self._scores.get(member)
+        if score is None:
+            return None
+        return self._index.index((-score, member)) + 1
+
+    def top(self, limit: int, offset: int = 0) -> List[Tuple[str, float, int]]:
+        """(member, score, rank) for `limit` members starting at `offset`."""
+        entries = []
+        for position, (neg_score, member) in enumerate(self._index.iter_from(offset)):
+            if position >= limit:
+                break
+            entries.append((member, -neg_score, offset + position + 1))
+        return entries
+
+    def clear(self):
+        self._scores.clear()
+        self._index = IndexableSkipList()
+
+
+class RedisLeaderboard:
+    """Sorted-set leaderboard shared across workers; highest score ranks first."""
+
+    def __init__(self, redis_client, key: str, ttl: Optional[int] = None):
+        self.redis = redis_client
+        self.key = key
+        self.ttl = ttl
+
+    async def update(self, member: str, score: float):
+        await self.update_many({member: score})
+
+    async def update_many(self, scores: Dict[str, float]):
+        """Set many scores in one round trip."""
+        if not scores:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zadd(self.key, scores)
+        if self.ttl:
+            pipe.expire(self.key, self.ttl)
+        await pipe.execute()
+
+    async def increment(self, member: str, delta: float) -> float:
+        return float(await self.redis.zincrby(self.key, delta, member))
+
+    async def remove(self, member: str):
+        await self.redis.zrem(self.key, member)
+
+    async def score(self, member: str) -> Optional[float]:
+        score = await self.redis.zscore(self.key, member)
+        return float(score) if score is not None else None
+
+    async def rank(self, member: str) -> Optional[int]:
+        """One-based rank, or None if the member is not on the board."""
+        rank = await self.redis.zrevrank(self.key, member)
+        return rank + 1 if rank is not None else None
+
+    async def top(self, limit: int, offset: int = 0) -> List[Tuple[str, float, int]]:
+        """(member, score, rank) for `limit` members starting at `offset`."""
+        if limit <= 0:
+            return []
+        rows = await self.redis.zrevrange(self.key, offset, offset + limit - 1, withscores=True)
+        return [
+            (member.decode() if isinstance(member, bytes) else member, float(score), offset + i + 1)
+            for i, (member, score) in enumerate(rows)
+        ]
+
+    async def size(self) -> int:
+        return await self.redis.zcard(self.key)
+
+    async def clear(self):
+        await self.redis.delete(self.key)
+
+
+class CompoundReturnLeaderboard(RedisLeaderboard):
+    """Sorted-set board ranked by compounded return.
+
+    Scores are stored as log growth, so ZINCRBY compounds successive
+    returns and ranking by the stored score ranks by compounded return.
+    Scores read back as return percentages.
+    """
+
+    # Growth floor for returns of -100% or worse, which have no logarithm
+    MIN_GROWTH = 1e-6
+
+    @classmethod
+    def log_growth(cls, return_pct: float) -> float:
+        return math.log(max(1 + return_pct / 100, cls.MIN_GROWTH))
+
+    @staticmethod
+    def return_pct(log_growth: float) -> float:
+        return math.expm1(log_growth) * 100
+
+    async def add_return(self, member: str, return_pct: float) -> float:
+        """Compound a return into the member's score; returns the new total return %."""
+        return self.return_pct(await self.increment(member, self.log_growth(return_pct)))
+
+    async def score(self, member: str) -> Optional[float]:
+        growth = await super().score(member)
+        return self.return_pct(growth) if growth is not None else None
+
+    async def top(self, limit: int, offset: int = 0) -> List[Tuple[str, float, int]]:
+        return [
+            (member, self.return_pct(growth), rank)
+            for member, growth, rank in await super().top(limit, offset)
+        ]
@@ -0,0 +1,382 @@
+"""
+Layered Cache Manager
+
+Bounded in-process L1 (see app.core.local_cache) in front of Redis, with
+single-flight loads, hedged reads and per-key-prefix hit ratios.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import defaultdict, deque
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import redis.asyncio as redis
+
+from app.core.local_cache import LocalCache
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+class CacheManager:
+    """High-performance caching system with multiple layers
+
+    L1 is a bounded in-process LRU whose entries expire with the Redis key
+    (capped at `local_ttl_seconds`, since other workers' writes and deletes
+    do not reach it). L2 is Redis. Concurrent misses on a key share one Redis
+    read, and when Redis p99 exceeds `hedge_threshold_ms` a read still
+    pending after the recent p95 is re-issued, to the replica if configured.
+
+    Every set or delete bumps the key's generation while reads of it are in
+    flight; a read that finishes in an older generation returns what it saw
+    but does not cache it, and later callers do not join it.
+    """
+    
+    LATENCY_WINDOW = 1000
+    
+    def __init__(
+        self,
+        max_local_entries: int = 10000,
+        local_ttl_seconds: int = 30,
+        hedge_reads: bool = True,
+        hedge_threshold_ms: float = 20.0,
+        redis_url: str = REDIS_URL,
+        replica_url: Optional[str] = None
+    ):
+        self.redis_client = None
+        self.redis_url = redis_url
+        self.replica_client = None
+        self.replica_url = replica_url
+        self.local_cache = LocalCache(max_entries=max_local_entries)
+        self.local_ttl_seconds = local_ttl_seconds
+        self.hedge_reads = hedge_reads
+        self.hedge_threshold_ms = hedge_threshold_ms
+        
+        self.cache_stats = {
+            'hits': 0,
+            'local_hits': 0,
+            'misses': 0,
+            'sets': 0,
+            'early_refreshes': 0,
+            'hedged_reads': 0,
+            'hedge_wins': 0
+        }
+        self.prefix_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {'local_hits': 0, 'hits': 0, 'misses': 0})
+        
+        # Redis read latency (seconds) and its cached percentiles
+        self._redis_latencies: deque = deque(maxlen=self.LATENCY_WINDOW)
+        self._latency_p95 = 0.0
+        self._latency_p99 = 0.0
+        self._in_flight: Dict[str, Tuple[asyncio.Future, int]] = {}
+        self._refreshing: Set[str] = set()
+        
+        # Outstanding reads per key, and write generations of those keys only
+        self._readers: Dict[str, int] = {}
+        self._generations: Dict[str, int] = {}
+    
+    async def initialize(self):
+        """Initialize Redis and local cache"""
+        
+        self.redis_client = redis.from_url(
+            self.redis_url,
+            encoding="utf-8",
+            decode_responses=True,
+            max_connections=100
+        )
+        if self.replica_url:
+            self.replica_client = redis.from_url(
+                self.replica_url,
+                encoding="utf-8",
+                decode_responses=True,
+                max_connections=100
+            )
+        
+        # Test connection
+        await self.redis_client.ping()
+        logger.info("✅ Cache manager initialized")
+    
+    def _record(self, key: str, outcome: str):
+        """Count a lookup as 'local_hits', 'hits' (Redis) or 'misses', overall and per key prefix"""
+        
+        self.cache_stats[outcome] += 1
+        if outcome == 'local_hits':
+            self.cache_stats['hits'] += 1
+        self.prefix_stats[key.split(':', 1)[0]][outcome] += 1
+    
+    def _record_latency(self, seconds: float):
+        self._redis_latencies.append(seconds)
+        if len(self._redis_latencies) % 100 == 0:
+            ordered = sorted(self._redis_latencies)
+            self._latency_p95 = ordered[int(len(ordered) * 0.95)]
+            self._latency_p99 = ordered[int(len(ordered) * 0.99)]
+    
+    def _begin_read(self, key: str) -> int:
+        self._readers[key] = self._readers.get(key, 0) + 1
+        return self._generations.get(key, 0)
+    
+    def _end_read(self, key: str):
+        readers = self._readers[key] - 1
+        if readers:
+            self._readers[key] = readers
+        else:
+            del self._readers[key]
+            self._generations.pop(key, None)
+    
+    def _bump(self, key: str):
+        """Record a write or delete of `key` against the reads already in flight"""
+        
+        if key in self._readers:
+            self._generations[key] = self._generations.get(key, 0) + 1
+    
+    def _local_ttl(self, pttl: int) -> float:
+        """L1 lifetime for a key with Redis PTTL `pttl` (-1: no expiry)"""
+        
+        if pttl == -1:
+            return self.local_ttl_seconds
+        return min(pttl / 1000, self.local_ttl_seconds)
+    
+    async def _fetch(self, client, key: str) -> Tuple[Optional[str], int]:
+        """Value and PTTL in one round trip"""
+        
+        pipe = client.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.pttl(key)
+        value, pttl = await pipe.execute()
+        return value, pttl
+    
+    async def _redis_get(self, key: str) -> Tuple[Optional[str], int]:
+        """Read from Redis, hedging the request while p99 is above the threshold"""
+        
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(self._fetch(self.redis_client, key))
+        
+        if self.hedge_reads and self._latency_p99 * 1000 > self.hedge_threshold_ms:
+            done, _ = await asyncio.wait({primary}, timeout=self._latency_p95)
+            if not done:
+                self.cache_stats['hedged_reads'] += 1
+                hedge = asyncio.ensure_future(self._fetch(self.replica_client or self.redis_client, key))
+                pending = {primary, hedge}
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    winner = next((task for task in done if not task.exception()), None)
+                    if winner is not None or not pending:
+                        break
+                for task in pending:
+                    task.cancel()
+                if winner is None:
+                    primary.result()  # Both failed: raise the primary error
+                if winner is hedge:
+                    self.cache_stats['hedge_wins'] += 1
+                self._record_latency(time.perf_counter() - started)
+                return winner.result()
+        
+        result = await primary
+        self._record_latency(time.perf_counter() - started)
+        return result
+    
+    async def _load(self, key: str, use_local: bool) -> Optional[str]:
+        """Redis read shared by every concurrent caller of the same key"""
+        
+        shared = self._in_flight.get(key)
+        if shared is not None and shared[1] == self._generations.get(key, 0):
+            return await asyncio.shield(shared[0])
+        
+        future = asyncio.get_running_loop().create_future()
+        generation = self._begin_read(key)
+        self._in_flight[key] = (future, generation)
+        try:
+            started = time.perf_counter()
+            value, pttl = await self._redis_get(key)
+            # A set or delete since the read began may have overtaken it
+            if value is not None and use_local and self._generations.get(key, 0) == generation:
+                self.local_cache.set(key, value, self._local_ttl(pttl), time.perf_counter() - started)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                future.exception()  # Mark retrieved when nobody else is waiting
+            else:
+                future.cancel()
+            raise
+        finally:
+            if self._in_flight.get(key, (None,))[0] is future:
+                del self._in_flight[key]
+            self._end_read(key)
+    
+    async def _refresh(self, key: str):
+        try:
+            await self._load(key, use_local=True)
+        except Exception as e:
+            logger.warning(f"Cache refresh failed for {key}: {str(e)}")
+        finally:
+            self._refreshing.discard(key)
+    
+    async def get(self, key: str, use_local: bool = True) -> Optional[str]:
+        """Get value from cache with fallback strategy"""
+        
+        # Try local cache first
+        if use_local:
+            value, refresh = self.local_cache.lookup(key)
+            if value is not None:
+                self._record(key, 'local_hits')
+                if refresh and key not in self._refreshing:
+                    self.cache_stats['early_refreshes'] += 1
+                    self._refreshing.add(key)
+                    asyncio.create_task(self._refresh(key))
+                return value
+        
+        # Try Redis
+        try:
+            value = await self._load(key, use_local)
+            if value is not None:
+                self._record(key, 'hits')
+                return value
+        except Exception as e:
+            logger.warning(f"Redis cache miss: {str(e)}")
+        
+        self._record(key, 'misses')
+        return None
+    
+    async def mget(self, keys: List[str], use_local: bool = True) -> Dict[str, Optional[str]]:
+        """Get many keys: local hits first, the rest in one Redis round trip"""
+        
+        values: Dict[str, Optional[str]] = {}
+        remote = []
+        for key in keys:
+            value = self.local_cache.get(key) if use_local else None
+            if value is not None:
+                self._record(key, 'local_hits')
+                values[key] = value
+            else:
+                remote.append(key)
+        
+        if remote:
+            generations = {key: self._begin_read(key) for key in remote}
+            try:
+                started = time.perf_counter()
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key in remote:
+                    pipe.get(key)
+                    pipe.pttl(key)
+                results = await pipe.execute()
+                elapsed = time.perf_counter() - started
+                
+                for key, value, pttl in zip(remote, results[::2], results[1::2]):
+                    values[key] = value
+                    if value is None:
+                        self._record(key, 'misses')
+                        continue
+                    self._record(key, 'hits')
+                    if use_local and self._generations.get(key, 0) == generations[key]:
+                        self.local_cache.set(key, value, self._local_ttl(pttl), elapsed)
+            except Exception as e:
+                logger.warning(f"Redis cache miss: {str(e)}")
+                for key in remote:
+                    values[key] = None
+                    self._record(key, 'misses')
+            finally:
+                for key in generations:
+                    self._end_read(key)
+        
+        return values
+    
+    async def set(
+        self,
+        key: str,
+        value: str,
+        ttl_seconds: int = 300,
+        use_local: bool = True
+    ):
+        """Set value in cache with TTL"""
+        
+        try:
+            # Set in Redis
+            self._bump(key)
+            await self.redis_client.setex(key, ttl_seconds, value)
+            self._bump(key)  # Reads that began while the write was on the wire
+            
+            # Set in local cache, expiring no later than Redis
+            if use_local:
+                self.local_cache.set(key, value, min(ttl_seconds, self.local_ttl_seconds))
+            else:
+                self.local_cache.pop(key)
+            
+            self.cache_stats['sets'] += 1
+            
+        except Exception as e:
+            logger.error(f"Cache set error: {str(e)}")
+    
+    async def mset(self, mapping: Dict[str, str], ttl_seconds: int = 300, use_local: bool = True):
+        """Set many keys with one TTL in one Redis round trip"""
+        
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                self._bump(key)
+                pipe.setex(key, ttl_seconds, value)
+            await pipe.execute()
+            
+            for key, value in mapping.items():
+                self._bump(key)
+                if use_local:
+                    self.local_cache.set(key, value, min(ttl_seconds, self.local_ttl_seconds))
+                else:
+                    self.local_cache.pop(key)
+            
+            self.cache_stats['sets'] += len(mapping)
+            
+        except Exception as e:
+            logger.error(f"Cache mset error: {str(e)}")
+    
+    async def delete(self, key: str):
+        """Delete key from all cache layers"""
+        
+        # Local first, so a failed Redis delete cannot leave this worker serving it
+        self.local_cache.pop(key)
+        self._bump(key)
+        try:
+            await self.redis_client.delete(key)
+            self._bump(key)
+        except Exception as e:
+            logger.error(f"Cache delete error: {str(e)}")
+    
+    def hit_ratios(self) -> Dict[str, float]:
+        """Hit ratio (L1 + Redis) per key prefix"""
+        
+        ratios = {}
+        for prefix, stats in self.prefix_stats.items():
+            lookups = stats['local_hits'] + stats['hits'] + stats['misses']
+            if lookups:
+                ratios[prefix] = (stats['local_hits'] + stats['hits']) / lookups
+        return ratios
+    
+    def metrics(self) -> Dict[str, Any]:
+        ratios = self.hit_ratios()
+        return {
+            **self.cache_stats,
+            'local_entries': len(self.local_cache),
+            'local_evictions': self.local_cache.evictions,
+            'local_expirations': self.local_cache.expirations,
+            'redis_p95_ms': self._latency_p95 * 1000,
+            'redis_p99_ms': self._latency_p99 * 1000,
+            'prefixes': {
+                prefix: {**stats, 'hit_ratio': ratios.get(prefix, 0.0)}
+                for prefix, stats in self.prefix_stats.items()
+            }
+        }
+    
+    async def optimize_cache_strategy(self):
+        """Optimize cache strategy based on hit rates"""
+        
+        # Expired entries are already unreachable; free their memory
+        purged = self.local_cache.purge_expired()
+        if purged:
+            logger.debug(f"Purged {purged} expired local cache entries")
+        
+        for prefix, hit_rate in self.hit_ratios().items():
+            if hit_rate < 0.8:  # If hit rate is below 80%
+                logger.info(f"Cache hit rate low for '{prefix}': {hit_rate:.2%}")
@@ -33,6 +33,8 @@ class Settings(BaseSettings):
     WHATSAPP_PHONE_NUMBER_ID: str = Field(..., env="WHATSAPP_PHONE_NUMBER_ID")
     WHATSAPP_WEBHOOK_VERIFY_TOKEN: str = Field(..., env="WHATSAPP_WEBHOOK_VERIFY_TOKEN")
     WHATSAPP_APP_SECRET: str = Field(..., env="WHATSAPP_APP_SECRET")
+    WHATSAPP_THROUGHPUT_MPS: int = Field(default=80, env="WHATSAPP_THROUGHPUT_MPS")
+    WHATSAPP_QUEUE_PATH: str = Field(default="whatsapp_queue.db", env="WHATSAPP_QUEUE_PATH")
     
     # AI/ML Configuration
     OPENAI_API_KEY: str = Field(..., env="OPENAI_API_KEY")
@@ -74,6 +76,7 @@ class Settings(BaseSettings):
     NSE_API_URL: str = Field(default="https://www.nseindia.com/api", env="NSE_API_URL")
     MARKET_DATA_API_KEY: Optional[str] = Field(default=None, env="MARKET_DATA_API_KEY")
     NEWS_API_KEY: Optional[str] = Field(default=None, env="NEWS_API_KEY")
+    CHART_INSTRUMENTS: List[str] = Field(default=[], env="CHART_INSTRUMENTS")  # Empty accepts any well-formed symbol
     
     # Background Tasks
     CELERY_BROKER_URL: str = Field(..., env="CELERY_BROKER_URL")
@@ -82,6 +85,9 @@ class Settings(BaseSettings):
     # Monitoring
     SENTRY_DSN: Optional[str] = Field(default=None, env="SENTRY_DSN")
     LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
+    TRACE_SAMPLE_RATE: float = Field(default=0.0, env="TRACE_SAMPLE_RATE")  # 0 disables span tracing
+    TRACE_EXPORT_PATH: Optional[str] = Field(default=None, env="TRACE_EXPORT_PATH")  # OTLP/JSON lines file
+    ENABLE_PROFILING: bool = Field(default=False, env="ENABLE_PROFILING")
     
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = Field(default=60, env="RATE_LIMIT_PER_MINUTE")
@@ -92,8 +98,8 @@ class Settings(BaseSettings):
     ENABLE_OPTIONS_TRADING: bool = Field(default=False, env="ENABLE_OPTIONS_TRADING")
     ENABLE_CRYPTO_TRADING: bool = Field(default=False, env="ENABLE_CRYPTO_TRADING")
     
-    @validator("ALLOWED_HOSTS", pre=True)
-    def parse_allowed_hosts(cls, v):
+    @validator("ALLOWED_HOSTS", "CHART_INSTRUMENTS", pre=True)
+    def parse_comma_separated(cls, v):
         if isinstance(v, str):
             return [host.strip() for host in v.split(",")]
         return v
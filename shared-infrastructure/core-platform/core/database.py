@@ -3,12 +3,18 @@ Core Database Configuration and Session Management
 Provides database connectivity, session management, and base models
 """
 
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, insert, select, MetaData
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
 import os
-from typing import Generator
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Dict, Generator, Iterable, List, Optional, Sequence, TypeVar, Union
+
+T = TypeVar("T")
 
 # Database configuration
 DATABASE_URL = os.getenv(
@@ -16,6 +22,17 @@ DATABASE_URL = os.getenv(
     "sqlite:///./gridworks_platform.db"
 )
 
+# Async pool sizing; one pool per worker process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "500"))  # asyncpg prepared statements
+SQLITE_POOL_SIZE = 4
+
+# Rows per statement for IN-list hydration and batched writes
+BATCH_SIZE = 500
+
 # Create SQLAlchemy engine
 if DATABASE_URL.startswith("sqlite"):
     engine = create_engine(
@@ -73,4 +90,172 @@ def get_session_local():
 
 def init_db():
     """Initialize the database with tables"""
-    create_tables()
\ No newline at end of file
+    create_tables()
+
+
+# ---------------------------------------------------------------------------
+# Async engine and sessions
+# ---------------------------------------------------------------------------
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str = DATABASE_URL) -> str:
+    """Same database as `url` through its asyncio driver (aiosqlite / asyncpg)"""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.drivername.split("+")[0])
+    if driver is None:
+        raise ValueError(f"No asyncio driver configured for {parsed.drivername}")
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    """Process-wide async engine, created on first use"""
+    
+    url = make_url(async_database_url())
+    if url.drivername.startswith("sqlite"):
+        # Each aiosqlite connection is a thread; a small pool keeps them from starving the loop of the GIL
+        return create_async_engine(
+            url,
+            poolclass=AsyncAdaptedQueuePool,
+            pool_size=SQLITE_POOL_SIZE,
+            max_overflow=0,
+            pool_timeout=DB_POOL_TIMEOUT,
+            echo=False
+        )
+    
+    return create_async_engine(
+        url.update_query_dict({"prepared_statement_cache_size": str(DB_STATEMENT_CACHE_SIZE)}),
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        query_cache_size=1200,
+        echo=False
+    )
+
+
+@lru_cache(maxsize=1)
+def get_async_sessionmaker() -> async_sessionmaker:
+    # Objects stay readable after commit without a lazy reload on the event loop
+    return async_sessionmaker(get_async_engine(), expire_on_commit=False, autoflush=False)
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Request-scoped async database session dependency for FastAPI
+    
+    Yields:
+        AsyncSession: rolled back if the handler raises, closed afterwards
+    """
+    async with get_async_sessionmaker()() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+
+
+@asynccontextmanager
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """Async session for work outside a request (background tasks, webhooks)"""
+    async with get_async_sessionmaker()() as session:
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+
+
+async def run_sync(db: Union[Session, AsyncSession], fn: Callable[..., T], *args: Any) -> T:
+    """
+    Run ORM code written against a Session without blocking the event loop
+    
+    With an AsyncSession, `fn(session, *args)` runs on the async connection
+    (SQLAlchemy's greenlet bridge), so lazy loads and queries await the
+    driver. A plain Session is passed through unchanged, which keeps sync
+    callers and tests working.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args)
+    return fn(db, *args)
+
+
+# ---------------------------------------------------------------------------
+# Batched queries (sync Session API; use through run_sync from async code)
+# ---------------------------------------------------------------------------
+
+def _chunks(values: Sequence[T], size: int = BATCH_SIZE) -> Iterable[Sequence[T]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def hydrate(session: Session, column: Any, keys: Iterable[Any], *criteria: Any) -> Dict[Any, Any]:
+    """
+    Load rows whose `column` is in `keys` with chunked IN-list queries
+    
+    Returns {key: row}, first row per key; missing keys are absent.
+    Replaces per-row `.filter(Model.id == key).first()` lookups.
+    """
+    keys = list(dict.fromkeys(keys))
+    entity = column.class_
+    rows: Dict[Any, Any] = {}
+    for chunk in _chunks(keys):
+        for row in session.scalars(select(entity).where(column.in_(chunk), *criteria)):
+            rows.setdefault(getattr(row, column.key), row)
+    return rows
+
+
+def bulk_insert(session: Session, model: Any, rows: List[Dict[str, Any]]) -> int:
+    """Insert many rows with batched executemany statements; returns the row count"""
+    for chunk in _chunks(rows):
+        session.execute(insert(model), list(chunk))
+    return len(rows)
+
+
+def bulk_upsert(
+    session: Session,
+    model: Any,
+    rows: List[Dict[str, Any]],
+    index_elements: Sequence[str],
+    update_columns: Optional[Sequence[str]] = None
+) -> int:
+    """
+    Insert rows, updating `update_columns` (default: all others) on conflict
+    
+    Uses ON CONFLICT on PostgreSQL and SQLite; other backends fall back to
+    merge, which costs a lookup per row.
+    """
+    if not rows:
+        return 0
+    
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        for row in rows:
+            session.merge(model(**row))
+        return len(rows)
+    
+    if update_columns is None:
+        update_columns = [key for key in rows[0] if key not in index_elements]
+    
+    for chunk in _chunks(rows):
+        statement = dialect_insert(model).values(list(chunk))
+        if update_columns:
+            statement = statement.on_conflict_do_update(
+                index_elements=list(index_elements),
+                set_={column: statement.excluded[column] for column in update_columns}
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=list(index_elements))
+        session.execute(statement)
+    return len(rows)
@@ -0,0 +1,96 @@
+"""
+Bounded Local Cache
+
+In-process L1 in front of Redis. Entries carry an absolute expiry that
+mirrors the Redis TTL, the cache holds at most `max_entries` (least recently
+used first out), and lookups can ask for an early refresh shortly before
+expiry so hot keys are re-fetched by one caller instead of all callers
+missing at once (probabilistic early expiration, "XFetch").
+"""
+
+import math
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+
+class LocalCache:
+    """LRU mapping of key -> (value, expires_at, fetch_seconds)"""
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        beta: float = 1.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.beta = beta  # >1 refreshes earlier, 0 disables early refresh
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    def lookup(self, key: str) -> Tuple[Optional[Any], bool]:
+        """(value, refresh): value is None if absent or expired
+
+        `refresh` becomes likelier as expiry nears, weighted by how long the
+        value took to fetch; the caller should re-fetch it in the background.
+        """
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, False
+
+        value, expires_at, fetch_seconds = entry
+        now = self.clock()
+        if now >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            return None, False
+
+        self._entries.move_to_end(key)
+        # -log(U) is exponential with mean 1, so the refresh window scales with beta * fetch time
+        refresh = now - fetch_seconds * self.beta * math.log(1.0 - random.random()) >= expires_at
+        return value, refresh
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.lookup(key)[0]
+
+    def set(self, key: str, value: Any, ttl_seconds: float, fetch_seconds: float = 0.0):
+        if ttl_seconds <= 0:
+            self._entries.pop(key, None)
+            return
+
+        self._entries[key] = (value, self.clock() + ttl_seconds, fetch_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        entry = self._entries.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def ttl(self, key: str) -> Optional[float]:
+        entry = self._entries.get(key)
+        return None if entry is None else max(0.0, entry[1] - self.clock())
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry; lookups already skip them, this frees their memory"""
+
+        now = self.clock()
+        expired = [key for key, (_, expires_at, _) in self._entries.items() if now >= expires_at]
+        for key in expired:
+            del self._entries[key]
+        self.expirations += len(expired)
+        return len(expired)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
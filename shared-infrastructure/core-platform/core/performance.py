@@ -28,6 +28,8 @@ from asyncio import Lock
 import psutil
 import threading
 
+from app.monitoring.tracing import tracer
+
 
 class CacheType(Enum):
     """Cache types for different use cases"""
@@ -603,7 +605,8 @@ class GridWorksPerformanceSystem:
                 }
                 
                 try:
-                    result = await func(*args, **kwargs)
+                    with tracer.span(operation):
+                        result = await func(*args, **kwargs)
                     
                     # Record successful execution
                     duration = (time.time() - start_time) * 1000  # ms
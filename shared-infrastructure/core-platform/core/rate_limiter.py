@@ -0,0 +1,216 @@
+"""
+Rate Limiting
+
+GCRA (generic cell rate algorithm) limiters shared by the SDK, the
+institutional API and copy trading. GCRA is a token bucket stored as a single
+"theoretical arrival time" per key: `burst` requests may go through at once,
+after which capacity refills continuously at `limit` per `period`, so there is
+no window boundary at which a second full burst is allowed.
+
+A check names a hierarchy of scopes (partner -> client -> service). Every
+level must allow the request, and it is charged against all levels or none.
+`LocalRateLimiter` keeps state in process; `RedisRateLimiter` shares it across
+workers with one Lua script call per check and one pipeline per batch.
+"""
+
+import hashlib
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from redis.exceptions import NoScriptError, RedisError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """`limit` requests per `period` seconds, with up to `burst` at once (default: limit)"""
+    limit: int
+    period: float
+    burst: Optional[int] = None
+
+    @property
+    def interval(self) -> float:
+        """Seconds of capacity one request consumes"""
+        return self.period / self.limit
+
+    @property
+    def tolerance(self) -> float:
+        """How far ahead of now the arrival time may run before requests are refused"""
+        return self.interval * (self.burst or self.limit)
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    """Outcome of a check; `remaining` and `retry_after` are for the tightest level"""
+    allowed: bool
+    remaining: int
+    retry_after: float = 0.0
+
+
+# A scope is a key path such as (partner_id, client_id, service) plus its limit.
+# Levels of one hierarchy share their first element.
+Scope = Tuple[Tuple[Hashable, ...], RateLimit]
+
+
+class BaseRateLimiter(ABC):
+    """Common interface of the local and Redis-backed limiters"""
+
+    async def check(self, scopes: Sequence[Scope], cost: int = 1) -> RateLimitDecision:
+        """Charge `cost` requests against every scope if all of them allow it
+
+        cost=0 reports remaining capacity without consuming any.
+        """
+        return (await self.check_many([scopes], cost))[0]
+
+    @abstractmethod
+    async def check_many(self, batch: Sequence[Sequence[Scope]], cost: int = 1) -> List[RateLimitDecision]:
+        """Independent checks for a fan-out, e.g. one per follower of a leader"""
+
+
+class LocalRateLimiter(BaseRateLimiter):
+    """In-process GCRA state: key path -> theoretical arrival time"""
+
+    SWEEP_THRESHOLD = 10000
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._tats: Dict[Tuple[Hashable, ...], float] = {}
+        self._sweep_at = self.SWEEP_THRESHOLD
+
+    def _check(self, scopes: Sequence[Scope], cost: int, now: float) -> RateLimitDecision:
+        allowed = True
+        remaining = None
+        retry_after = 0.0
+        updates = []
+
+        for key, limit in scopes:
+            tat = max(self._tats.get(key, now), now)
+            new_tat = tat + cost * limit.interval
+            excess = new_tat - now - limit.tolerance
+            if excess > 0:
+                allowed = False
+                retry_after = max(retry_after, excess)
+                left = 0
+            else:
+                left = int((limit.tolerance - (new_tat - now)) / limit.interval)
+            remaining = left if remaining is None else min(remaining, left)
+            updates.append((key, new_tat))
+
+        if allowed and cost:
+            self._tats.update(updates)
+        return RateLimitDecision(allowed, remaining or 0, retry_after)
+
+    def _sweep(self, now: float):
+        # An arrival time in the past is the same as no entry
+        self._tats = {key: tat for key, tat in self._tats.items() if tat > now}
+        self._sweep_at = max(self.SWEEP_THRESHOLD, 2 * len(self._tats))
+
+    async def check_many(self, batch: Sequence[Sequence[Scope]], cost: int = 1) -> List[RateLimitDecision]:
+        now = self.clock()
+        if len(self._tats) > self._sweep_at:
+            self._sweep(now)
+        return [self._check(scopes, cost, now) for scopes in batch]
+
+
+# KEYS: one per level. ARGV: cost, then interval and tolerance (ms) per key.
+# Uses the Redis clock so all workers agree on "now".
+_GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + tonumber(t[2]) / 1000
+local cost = tonumber(ARGV[1])
+local allowed = 1
+local remaining = nil
+local retry_after = 0
+local tats = {}
+
+for i, key in ipairs(KEYS) do
+    local interval = tonumber(ARGV[i * 2])
+    local tolerance = tonumber(ARGV[i * 2 + 1])
+    local tat = math.max(tonumber(redis.call('GET', key) or now), now)
+    local new_tat = tat + cost * interval
+    local excess = new_tat - now - tolerance
+    local left = 0
+    if excess > 0 then
+        allowed = 0
+        retry_after = math.max(retry_after, excess)
+    else
+        left = math.floor((tolerance - (new_tat - now)) / interval)
+    end
+    if remaining == nil or left < remaining then
+        remaining = left
+    end
+    tats[i] = new_tat
+end
+
+if allowed == 1 and cost > 0 then
+    for i, key in ipairs(KEYS) do
+        redis.call('SET', key, tostring(tats[i]), 'PX', math.max(1, math.ceil(tats[i] - now)))
+    end
+end
+return {allowed, remaining or 0, math.ceil(retry_after)}
+"""
+
+_GCRA_SHA = hashlib.sha1(_GCRA_SCRIPT.encode()).hexdigest()
+
+
+@lru_cache(maxsize=65536)
+def _redis_key(prefix: str, key: Tuple[Hashable, ...]) -> str:
+    # Hash tag on the root so every level of a hierarchy maps to one cluster slot
+    return f"{prefix}:{{{key[0]}}}" + "".join(f":{part}" for part in key[1:])
+
+
+class RedisRateLimiter(BaseRateLimiter):
+    """GCRA state in Redis, shared by every worker
+
+    If Redis is unreachable, checks go to `fallback` (per-process limits)
+    rather than blocking traffic; pass fallback=None to raise instead.
+    """
+
+    def __init__(self, redis, prefix: str = "rl", fallback: Optional[BaseRateLimiter] = None):
+        self.redis = redis
+        self.prefix = prefix
+        self.fallback = fallback
+
+    def _call_args(self, scopes: Sequence[Scope], cost: int) -> List:
+        keys = [_redis_key(self.prefix, key) for key, _ in scopes]
+        args = [cost]
+        for _, limit in scopes:
+            args.extend((limit.interval * 1000, limit.tolerance * 1000))
+        return [_GCRA_SHA, len(keys), *keys, *args]
+
+    async def _eval_many(self, calls: List[List]) -> List:
+        for attempt in range(2):
+            pipe = self.redis.pipeline(transaction=False)
+            for call in calls:
+                pipe.evalsha(*call)
+            results = await pipe.execute(raise_on_error=False)
+
+            if attempt == 0 and any(isinstance(result, NoScriptError) for result in results):
+                # First use on this server (or after SCRIPT FLUSH)
+                await self.redis.script_load(_GCRA_SCRIPT)
+                continue
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+            return results
+
+    async def check_many(self, batch: Sequence[Sequence[Scope]], cost: int = 1) -> List[RateLimitDecision]:
+        if not batch:
+            return []
+        try:
+            results = await self._eval_many([self._call_args(scopes, cost) for scopes in batch])
+        except (RedisError, OSError) as e:
+            if self.fallback is None:
+                raise
+            logger.warning(f"Redis rate limiter unavailable, using local limits: {e}")
+            return await self.fallback.check_many(batch, cost)
+
+        return [
+            RateLimitDecision(bool(int(allowed)), int(remaining), int(retry_after) / 1000)
+            for allowed, remaining, retry_after in results
+        ]
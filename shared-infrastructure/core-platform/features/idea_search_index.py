@@ -0,0 +1,268 @@
+"""
+Trading Idea Search Index
+
+In-process inverted index for marketplace search: BM25 ranking over weighted
+title/symbol/tag/description fields, facet sets for exact-match filters and
+heap-based top-k, so query cost follows the matching postings rather than the
+size of the idea catalogue.
+"""
+
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Iterable, Set, Tuple
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Field weights for BM25F-style term frequencies
+FIELD_WEIGHTS = {
+    'symbol': 5.0,
+    'title': 3.0,
+    'tags': 2.0,
+    'description': 1.0
+}
+
+FACET_FIELDS = ('category', 'idea_type', 'risk_level', 'time_horizon', 'expert_user_id', 'is_premium', 'tags')
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+@dataclass
+class IdeaDocument:
+    """Searchable projection of a trading idea"""
+    idea_id: str
+    expert_user_id: str
+    title: str
+    description: str
+    symbol: str
+    category: str
+    idea_type: str
+    risk_level: str
+    time_horizon: str
+    is_premium: bool
+    premium_price: Optional[float]
+    average_rating: float
+    created_at: datetime
+    tags: List[str] = field(default_factory=list)
+    term_weights: Dict[str, float] = field(default_factory=dict)
+    length: float = 0.0
+
+    def facet_values(self, facet: str) -> Iterable[Any]:
+        if facet == 'tags':
+            return self.tags
+        return (getattr(self, facet),)
+
+
+class IdeaSearchIndex:
+    """BM25 inverted index with facet filters over active trading ideas"""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+        self.documents: Dict[str, IdeaDocument] = {}
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._vocabulary: List[str] = []  # Sorted, for prefix expansion
+        self._facets: Dict[str, Dict[Any, Set[str]]] = {facet: defaultdict(set) for facet in FACET_FIELDS}
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def __contains__(self, idea_id: str) -> bool:
+        return idea_id in self.documents
+
+    @property
+    def average_length(self) -> float:
+        return self._total_length / len(self.documents) if self.documents else 0.0
+
+    def add(self, document: IdeaDocument):
+        """Index a document, replacing any previous version"""
+
+        self.remove(document.idea_id)
+
+        weights: Counter = Counter()
+        for field_name, weight in FIELD_WEIGHTS.items():
+            value = getattr(document, field_name)
+            text = " ".join(value) if isinstance(value, list) else value
+            for token in tokenize(text):
+                weights[token] += weight
+
+        document.term_weights = dict(weights)
+        document.length = sum(weights.values())
+
+        for token, weight in document.term_weights.items():
+            postings = self._postings[token]
+            if not postings:
+                insort(self._vocabulary, token)
+            postings[document.idea_id] = weight
+
+        for facet in FACET_FIELDS:
+            for value in document.facet_values(facet):
+                self._facets[facet][value].add(document.idea_id)
+
+        self.documents[document.idea_id] = document
+        self._total_length += document.length
+
+    def remove(self, idea_id: str):
+        document = self.documents.pop(idea_id, None)
+        if document is None:
+            return
+
+        for token in document.term_weights:
+            postings = self._postings[token]
+            postings.pop(idea_id, None)
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+        for facet in FACET_FIELDS:
+            for value in document.facet_values(facet):
+                members = self._facets[facet][value]
+                members.discard(idea_id)
+                if not members:
+                    del self._facets[facet][value]
+
+        self._total_length -= document.length
+
+    def update_rating(self, idea_id: str, average_rating: float):
+        document = self.documents.get(idea_id)
+        if document is not None:
+            document.average_rating = average_rating
+
+    def _expand_prefix(self, prefix: str) -> List[str]:
+        start = bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def _score_query(self, query: str) -> Dict[str, float]:
+        """BM25 scores for documents matching every query term.
+
+        The last term also matches as a prefix, so partially typed symbols
+        ("RELI") still find their ideas.
+        """
+
+        tokens = tokenize(query)
+        if not tokens:
+            return {}
+
+        document_count = len(self.documents)
+        average_length = self.average_length or 1.0
+        scores: Optional[Dict[str, float]] = None
+
+        for position, token in enumerate(tokens):
+            terms = self._expand_prefix(token) if position == len(tokens) - 1 else [token]
+            term_scores: Dict[str, float] = defaultdict(float)
+
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for idea_id, weight in postings.items():
+                    length = self.documents[idea_id].length
+                    norm = self.k1 * (1 - self.b + self.b * length / average_length)
+                    term_scores[idea_id] = max(
+                        term_scores[idea_id], idf * weight * (self.k1 + 1) / (weight + norm)
+                    )
+
+            if scores is None:
+                scores = dict(term_scores)
+            else:
+                scores = {
+                    idea_id: score + term_scores[idea_id]
+                    for idea_id, score in scores.items() if idea_id in term_scores
+                }
+            if not scores:
+                return {}
+
+        return scores
+
+    def _filter(self, filters: Dict[str, Any], candidates: Optional[Set[str]]) -> Set[str]:
+        for facet, value in filters.items():
+            if value is None:
+                continue
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            for item in values:  # Every listed value (e.g. every tag) must match
+                members = self._facets[facet].get(item, set())
+                candidates = set(members) if candidates is None else candidates & members
+                if not candidates:
+                    return set()
+
+        return set(self.documents) if candidates is None else candidates
+
+    def _sort_key(self, document: IdeaDocument, sort_by: str, score: float):
+        if sort_by == 'rating':
+            return document.average_rating
+        if sort_by == 'price':
+            return document.premium_price or 0.0
+        if sort_by == 'relevance' and score:
+            return score
+        return document.created_at.timestamp()
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        min_rating: Optional[float] = None,
+        sort_by: str = 'relevance',
+        sort_order: str = 'desc',
+        limit: int = 20,
+        offset: int = 0,
+        facet_counts: bool = False
+    ) -> Dict[str, Any]:
+        """Ranked page of idea ids plus total matches and, optionally, facet counts"""
+
+        scores: Dict[str, float] = {}
+        candidates: Optional[Set[str]] = None
+
+        if tokenize(query):
+            scores = self._score_query(query)
+            candidates = set(scores)
+
+        candidates = self._filter(filters or {}, candidates)
+
+        if min_rating is not None:
+            candidates = {
+                idea_id for idea_id in candidates
+                if self.documents[idea_id].average_rating >= min_rating
+            }
+
+        # Newest first breaks ties, and stands in for relevance when there is no query
+        def rank(idea_id: str) -> Tuple[float, float]:
+            document = self.documents[idea_id]
+            return (self._sort_key(document, sort_by, scores.get(idea_id, 0.0)), document.created_at.timestamp())
+
+        select = heapq.nlargest if sort_order == 'desc' else heapq.nsmallest
+        ranked = select(offset + limit, candidates, key=rank)
+
+        result = {
+            'idea_ids': ranked[offset:offset + limit],
+            'total_count': len(candidates),
+            'scores': {idea_id: scores[idea_id] for idea_id in ranked[offset:] if idea_id in scores}
+        }
+
+        if facet_counts:
+            result['facets'] = self.facet_counts(candidates)
+
+        return result
+
+    def facet_counts(self, candidates: Set[str], facets: Iterable[str] = ('category', 'idea_type', 'risk_level', 'time_horizon', 'tags')) -> Dict[str, Dict[str, int]]:
+        counts: Dict[str, Dict[str, int]] = {}
+        for facet in facets:
+            counter: Counter = Counter()
+            for idea_id in candidates:
+                counter.update(self.documents[idea_id].facet_values(facet))
+            counts[facet] = dict(counter.most_common())
+        return counts
@@ -6,6 +6,8 @@ with ZK-verified authenticity and professional trading community features.
 """
 
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, WebSocket
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Dict, List, Optional, Any, Set
 from datetime import datetime, timedelta
@@ -15,7 +17,7 @@ import uuid
 import asyncio
 from dataclasses import dataclass
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.core.auth import get_current_user
 from app.core.logging import logger
 from app.models.charts import Chart, ChartDrawing, ChartAnnotation, ChartTemplate
@@ -964,21 +966,21 @@ async def apply_for_expert_status(
 async def get_expert_profiles(
     specialization: Optional[str] = None,
     limit: int = 20,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get list of verified expert profiles"""
     
-    query = db.query(ExpertProfile).filter(
+    query = select(ExpertProfile).where(
         ExpertProfile.is_active == True,
         ExpertProfile.application_status == 'APPROVED'
     )
     
     if specialization:
-        query = query.filter(
+        query = query.where(
             ExpertProfile.specialization.contains(specialization)
         )
     
-    experts = query.limit(limit).all()
+    experts = (await db.scalars(query.limit(limit))).all()
     
     return {
         'experts': [
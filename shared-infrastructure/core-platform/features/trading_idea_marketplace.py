@@ -6,8 +6,10 @@ with verified performance tracking, subscription management, and community featu
 """
 
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query
+from sqlalchemy import func, case, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterable, Set, Union
 from datetime import datetime, timedelta
 from pydantic import BaseModel, Field
 from enum import Enum
@@ -15,7 +17,7 @@ import json
 import uuid
 from decimal import Decimal
 
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db, hydrate, run_sync
 from app.core.auth import get_current_user
 from app.core.logging import logger
 from app.models.marketplace import TradingIdea, IdeaCategory, IdeaSubscription, IdeaPerformance
@@ -25,6 +27,7 @@ from app.services.payment_processor import PaymentProcessor
 from app.services.performance_tracker import PerformanceTracker
 from app.services.notification_service import NotificationService
 from app.services.zk_verification import ZKVerificationService
+from app.features.idea_search_index import IdeaSearchIndex, IdeaDocument
 
 router = APIRouter(prefix="/api/v1/marketplace", tags=["trading-marketplace"])
 
@@ -89,10 +92,11 @@ class MarketplaceSearchRequest(BaseModel):
     is_premium: Optional[bool] = None
     expert_user_id: Optional[str] = None
     tags: Optional[List[str]] = None
-    sort_by: str = Field(default="created_at", regex="^(created_at|rating|performance|price|popularity)$")
+    sort_by: str = Field(default="relevance", regex="^(relevance|created_at|rating|performance|price|popularity)$")
     sort_order: str = Field(default="desc", regex="^(asc|desc)$")
     limit: int = Field(default=20, ge=1, le=100)
     offset: int = Field(default=0, ge=0)
+    include_facets: bool = Field(default=False)
 
 # Response Models
 class TradingIdeaResponse(BaseModel):
@@ -124,6 +128,15 @@ class TradingIdeaMarketplace:
         self.notification_service = NotificationService()
         self.zk_verification = ZKVerificationService()
         
+        # Inverted index over active ideas, kept in sync on publish/rate and
+        # rebuilt periodically to pick up writes from other workers
+        self.search_index = IdeaSearchIndex()
+        self.index_refresh_interval = timedelta(seconds=30)
+        self.index_rebuild_interval = timedelta(minutes=10)
+        self._index_refreshed_at: Optional[datetime] = None
+        self._index_rebuilt_at: Optional[datetime] = None
+        self._index_watermark: Optional[datetime] = None
+        
         # Pricing tiers for expert subscriptions
         self.subscription_pricing = {
             'MONTHLY': {
@@ -252,6 +265,8 @@ class TradingIdeaMarketplace:
             
             db.commit()
             
+            self._index_idea(trading_idea)
+            
             return {
                 'success': True,
                 'idea_id': idea_id,
@@ -271,67 +286,48 @@ class TradingIdeaMarketplace:
     
     async def search_marketplace(
         self, 
-        db: Session, 
+        db: Union[Session, AsyncSession], 
         user_id: str, 
         search_request: MarketplaceSearchRequest
     ) -> Dict[str, Any]:
         """Search trading ideas in marketplace"""
         
         try:
-            # Build query
-            query = db.query(TradingIdea).filter(
-                TradingIdea.status == 'ACTIVE'
-            )
-            
-            # Apply filters
-            if search_request.query:
-                query = query.filter(
-                    TradingIdea.title.contains(search_request.query) |
-                    TradingIdea.description.contains(search_request.query) |
-                    TradingIdea.symbol.contains(search_request.query)
-                )
-            
-            if search_request.category:
-                query = query.filter(TradingIdea.category == search_request.category)
-            
-            if search_request.idea_type:
-                query = query.filter(TradingIdea.idea_type == search_request.idea_type.value)
-            
-            if search_request.risk_level:
-                query = query.filter(TradingIdea.risk_level == search_request.risk_level.value)
-            
-            if search_request.time_horizon:
-                query = query.filter(TradingIdea.time_horizon == search_request.time_horizon.value)
+            await self._sync_search_index(db)
             
-            if search_request.expert_user_id:
-                query = query.filter(TradingIdea.expert_user_id == search_request.expert_user_id)
+            search_result = self.search_index.search(
+                query=search_request.query,
+                filters={
+                    'category': search_request.category,
+                    'idea_type': search_request.idea_type.value if search_request.idea_type else None,
+                    'risk_level': search_request.risk_level.value if search_request.risk_level else None,
+                    'time_horizon': search_request.time_horizon.value if search_request.time_horizon else None,
+                    'expert_user_id': search_request.expert_user_id,
+                    'is_premium': search_request.is_premium,
+                    'tags': search_request.tags
+                },
+                min_rating=search_request.min_rating,
+                sort_by=search_request.sort_by,
+                sort_order=search_request.sort_order,
+                limit=search_request.limit,
+                offset=search_request.offset,
+                facet_counts=search_request.include_facets
+            )
             
-            if search_request.is_premium is not None:
-                query = query.filter(TradingIdea.is_premium == search_request.is_premium)
+            total_count = search_result['total_count']
+            page_ids = search_result['idea_ids']
             
-            # Apply sorting
-            if search_request.sort_by == 'rating':
-                # Join with ratings for sorting
-                query = query.order_by(
-                    TradingIdea.average_rating.desc() if search_request.sort_order == 'desc' 
-                    else TradingIdea.average_rating.asc()
-                )
-            elif search_request.sort_by == 'created_at':
-                query = query.order_by(
-                    TradingIdea.created_at.desc() if search_request.sort_order == 'desc'
-                    else TradingIdea.created_at.asc()
-                )
-            elif search_request.sort_by == 'price':
-                query = query.order_by(
-                    TradingIdea.premium_price.desc() if search_request.sort_order == 'desc'
-                    else TradingIdea.premium_price.asc()
+            # Hydrate the page with one query per table, not per row
+            ideas_by_id = {
+                idea.id: idea
+                for idea in await run_sync(
+                    db, lambda session: session.query(TradingIdea).filter(TradingIdea.id.in_(page_ids)).all()
                 )
+            } if page_ids else {}
+            ideas = [ideas_by_id[idea_id] for idea_id in page_ids if idea_id in ideas_by_id]
             
-            # Get total count
-            total_count = query.count()
-            
-            # Apply pagination
-            ideas = query.offset(search_request.offset).limit(search_request.limit).all()
+            expert_infos = await self._get_expert_info_batch(db, {idea.expert_user_id for idea in ideas})
+            performance_by_idea = await self._get_idea_performance_batch(db, [idea.id for idea in ideas])
             
             # Get user's subscriptions
             user_subscriptions = await self._get_user_subscriptions(db, user_id)
@@ -339,8 +335,7 @@ class TradingIdeaMarketplace:
             # Format results
             formatted_ideas = []
             for idea in ideas:
-                expert_info = await self._get_expert_info(db, idea.expert_user_id)
-                performance_metrics = await self._get_idea_performance(db, idea.id)
+                document = self.search_index.documents.get(idea.id)
                 
                 is_subscribed = (
                     idea.expert_user_id in user_subscriptions or
@@ -363,15 +358,16 @@ class TradingIdeaMarketplace:
                     'expected_returns': idea.expected_returns,
                     'is_premium': idea.is_premium,
                     'premium_price': float(idea.premium_price) if idea.premium_price else None,
-                    'tags': json.loads(idea.tags),
-                    'expert_info': expert_info,
-                    'performance_metrics': performance_metrics,
+                    'tags': document.tags if document else json.loads(idea.tags or '[]'),
+                    'expert_info': expert_infos[idea.expert_user_id],
+                    'performance_metrics': performance_by_idea[idea.id],
                     'rating': float(idea.average_rating) if idea.average_rating else 0.0,
+                    'relevance': search_result['scores'].get(idea.id),
                     'created_at': idea.created_at.isoformat(),
                     'is_subscribed': is_subscribed
                 })
             
-            return {
+            response = {
                 'ideas': formatted_ideas,
                 'total_count': total_count,
                 'page_info': {
@@ -380,6 +376,11 @@ class TradingIdeaMarketplace:
                     'has_next': search_request.offset + search_request.limit < total_count
                 }
             }
+            
+            if search_request.include_facets:
+                response['facets'] = search_result['facets']
+            
+            return response
         
         except Exception as e:
             logger.error(f"Marketplace search error: {e}")
@@ -548,24 +549,13 @@ class TradingIdeaMarketplace:
             db.rollback()
             raise HTTPException(status_code=500, detail=str(e))
     
-    async def get_marketplace_stats(self, db: Session) -> Dict[str, Any]:
+    async def get_marketplace_stats(self, db: Union[Session, AsyncSession]) -> Dict[str, Any]:
         """Get marketplace statistics and featured content"""
         
         try:
-            # Basic stats
-            total_ideas = db.query(TradingIdea).filter(TradingIdea.status == 'ACTIVE').count()
-            active_experts = db.query(ExpertProfile).filter(
-                ExpertProfile.is_active == True,
-                ExpertProfile.application_status == 'APPROVED'
-            ).count()
-            total_subscriptions = db.query(IdeaSubscription).filter(
-                IdeaSubscription.status == 'ACTIVE'
-            ).count()
-            
-            # Calculate overall success rate
-            performance_records = db.query(IdeaPerformance).filter(
-                IdeaPerformance.status.in_(['COMPLETED', 'STOPPED'])
-            ).all()
+            total_ideas, active_experts, total_subscriptions, performance_records, featured_ideas = await run_sync(
+                db, self._load_marketplace_stats
+            )
             
             if performance_records:
                 successful_ideas = sum(1 for p in performance_records if p.success_achieved)
@@ -573,17 +563,13 @@ class TradingIdeaMarketplace:
             else:
                 success_rate = 0.0
             
-            # Get featured ideas (top-rated recent ideas)
-            featured_ideas = db.query(TradingIdea).filter(
-                TradingIdea.status == 'ACTIVE',
-                TradingIdea.average_rating >= 4.0,
-                TradingIdea.created_at >= datetime.utcnow() - timedelta(days=7)
-            ).order_by(TradingIdea.average_rating.desc()).limit(5).all()
+            expert_infos = await self._get_expert_info_batch(db, {idea.expert_user_id for idea in featured_ideas})
+            performance_by_idea = await self._get_idea_performance_batch(db, [idea.id for idea in featured_ideas])
             
             formatted_featured = []
             for idea in featured_ideas:
-                expert_info = await self._get_expert_info(db, idea.expert_user_id)
-                performance_metrics = await self._get_idea_performance(db, idea.id)
+                expert_info = expert_infos[idea.expert_user_id]
+                performance_metrics = performance_by_idea[idea.id]
                 
                 formatted_featured.append({
                     'idea_id': idea.id,
@@ -613,6 +599,33 @@ class TradingIdeaMarketplace:
             logger.error(f"Marketplace stats error: {e}")
             raise HTTPException(status_code=500, detail=str(e))
     
+    def _load_marketplace_stats(self, db: Session):
+        """Counts, closed performance records and featured ideas for the stats page"""
+        
+        # Basic stats
+        total_ideas = db.query(TradingIdea).filter(TradingIdea.status == 'ACTIVE').count()
+        active_experts = db.query(ExpertProfile).filter(
+            ExpertProfile.is_active == True,
+            ExpertProfile.application_status == 'APPROVED'
+        ).count()
+        total_subscriptions = db.query(IdeaSubscription).filter(
+            IdeaSubscription.status == 'ACTIVE'
+        ).count()
+        
+        # Records for the overall success rate
+        performance_records = db.query(IdeaPerformance).filter(
+            IdeaPerformance.status.in_(['COMPLETED', 'STOPPED'])
+        ).all()
+        
+        # Get featured ideas (top-rated recent ideas)
+        featured_ideas = db.query(TradingIdea).filter(
+            TradingIdea.status == 'ACTIVE',
+            TradingIdea.average_rating >= 4.0,
+            TradingIdea.created_at >= datetime.utcnow() - timedelta(days=7)
+        ).order_by(TradingIdea.average_rating.desc()).limit(5).all()
+        
+        return total_ideas, active_experts, total_subscriptions, performance_records, featured_ideas
+    
     # Private helper methods
     async def _validate_expert_user(self, db: Session, user_id: str) -> Optional[Dict[str, Any]]:
         """Validate if user is an expert and get tier info"""
@@ -700,44 +713,106 @@ class TradingIdeaMarketplace:
     async def _get_user_subscriptions(self, db: Session, user_id: str) -> Set[str]:
         """Get set of expert IDs user is subscribed to"""
         
-        subscriptions = db.query(IdeaSubscription).filter(
+        subscriptions = await run_sync(db, lambda session: session.query(IdeaSubscription).filter(
             IdeaSubscription.subscriber_user_id == user_id,
             IdeaSubscription.status == 'ACTIVE',
             IdeaSubscription.expires_at > datetime.utcnow()
-        ).all()
+        ).all())
         
         return {sub.expert_user_id for sub in subscriptions}
     
     async def _get_expert_info(self, db: Session, expert_user_id: str) -> Dict[str, Any]:
         """Get expert information for display"""
         
-        expert_profile = db.query(ExpertProfile).filter(
-            ExpertProfile.user_id == expert_user_id
-        ).first()
+        expert_infos = await self._get_expert_info_batch(db, [expert_user_id])
+        return expert_infos[expert_user_id]
+    
+    async def _get_expert_info_batch(self, db: Session, expert_user_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Get display information for many experts with one query per table"""
         
-        user_profile = db.query(UserProfile).filter(
-            UserProfile.user_id == expert_user_id
-        ).first()
+        expert_user_ids = list(set(expert_user_ids))
+        if not expert_user_ids:
+            return {}
         
-        stats = await self._get_expert_stats(db, expert_user_id)
+        expert_profiles, user_profiles, idea_counts, outcomes, follower_counts = await run_sync(
+            db, self._load_expert_info, expert_user_ids
+        )
         
-        return {
-            'expert_id': expert_user_id,
-            'name': user_profile.display_name if user_profile else 'Expert',
-            'specialization': json.loads(expert_profile.specialization) if expert_profile else [],
-            'success_rate': round(stats['success_rate'] * 100, 1),
-            'total_ideas': stats['total_ideas'],
-            'followers': stats['followers'],
-            'verified': expert_profile.application_status == 'APPROVED' if expert_profile else False
+        expert_infos = {}
+        for expert_user_id in expert_user_ids:
+            expert_profile = expert_profiles.get(expert_user_id)
+            user_profile = user_profiles.get(expert_user_id)
+            completed, successful = outcomes.get(expert_user_id, (0, 0))
+            success_rate = successful / completed if completed else 0.0
+            
+            expert_infos[expert_user_id] = {
+                'expert_id': expert_user_id,
+                'name': user_profile.display_name if user_profile else 'Expert',
+                'specialization': json.loads(expert_profile.specialization) if expert_profile else [],
+                'success_rate': round(success_rate * 100, 1),
+                'total_ideas': idea_counts.get(expert_user_id, 0),
+                'followers': follower_counts.get(expert_user_id, 0),
+                'verified': expert_profile.application_status == 'APPROVED' if expert_profile else False
+            }
+        
+        return expert_infos
+    
+    def _load_expert_info(self, db: Session, expert_user_ids: List[str]):
+        """Profiles and per-expert aggregates, one query per table"""
+        
+        expert_profiles = {
+            profile.user_id: profile
+            for profile in db.query(ExpertProfile).filter(ExpertProfile.user_id.in_(expert_user_ids)).all()
+        }
+        user_profiles = {
+            profile.user_id: profile
+            for profile in db.query(UserProfile).filter(UserProfile.user_id.in_(expert_user_ids)).all()
         }
+        
+        idea_counts = dict(
+            db.query(TradingIdea.expert_user_id, func.count(TradingIdea.id)).filter(
+                TradingIdea.expert_user_id.in_(expert_user_ids),
+                TradingIdea.status == 'ACTIVE'
+            ).group_by(TradingIdea.expert_user_id).all()
+        )
+        
+        outcomes = {
+            expert_user_id: (completed, successful or 0)
+            for expert_user_id, completed, successful in db.query(
+                TradingIdea.expert_user_id,
+                func.count(IdeaPerformance.id),
+                func.sum(case((IdeaPerformance.success_achieved == True, 1), else_=0))
+            ).join(
+                TradingIdea, IdeaPerformance.idea_id == TradingIdea.id
+            ).filter(
+                TradingIdea.expert_user_id.in_(expert_user_ids),
+                IdeaPerformance.status.in_(['COMPLETED', 'STOPPED'])
+            ).group_by(TradingIdea.expert_user_id).all()
+        }
+        
+        follower_counts = dict(
+            db.query(IdeaSubscription.expert_user_id, func.count(IdeaSubscription.id)).filter(
+                IdeaSubscription.expert_user_id.in_(expert_user_ids),
+                IdeaSubscription.status == 'ACTIVE'
+            ).group_by(IdeaSubscription.expert_user_id).all()
+        )
+        
+        return expert_profiles, user_profiles, idea_counts, outcomes, follower_counts
     
     async def _get_idea_performance(self, db: Session, idea_id: str) -> Dict[str, Any]:
         """Get performance metrics for an idea"""
         
-        performance = db.query(IdeaPerformance).filter(
-            IdeaPerformance.idea_id == idea_id
-        ).first()
+        performance_by_idea = await self._get_idea_performance_batch(db, [idea_id])
+        return performance_by_idea[idea_id]
+    
+    async def _get_idea_performance_batch(self, db: Session, idea_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get performance metrics for many ideas in one query"""
+        
+        records = await run_sync(db, hydrate, IdeaPerformance.idea_id, idea_ids) if idea_ids else {}
         
+        return {idea_id: self._format_idea_performance(records.get(idea_id)) for idea_id in idea_ids}
+    
+    def _format_idea_performance(self, performance: Optional[IdeaPerformance]) -> Dict[str, Any]:
         if not performance:
             return {'status': 'NO_DATA'}
         
@@ -751,6 +826,73 @@ class TradingIdeaMarketplace:
             'last_updated': performance.updated_at.isoformat() if performance.updated_at else None
         }
     
+    # Search index maintenance
+    def _idea_document(self, idea: TradingIdea) -> IdeaDocument:
+        return IdeaDocument(
+            idea_id=idea.id,
+            expert_user_id=idea.expert_user_id,
+            title=idea.title,
+            description=idea.description,
+            symbol=idea.symbol,
+            category=idea.category,
+            idea_type=idea.idea_type,
+            risk_level=idea.risk_level,
+            time_horizon=idea.time_horizon,
+            is_premium=bool(idea.is_premium),
+            premium_price=float(idea.premium_price) if idea.premium_price else None,
+            average_rating=float(idea.average_rating) if idea.average_rating else 0.0,
+            created_at=idea.created_at,
+            tags=json.loads(idea.tags) if idea.tags else []
+        )
+    
+    def _index_idea(self, idea: TradingIdea):
+        """Add or refresh an idea in the search index after it is committed"""
+        
+        try:
+            if idea.status == 'ACTIVE':
+                self.search_index.add(self._idea_document(idea))
+            else:
+                self.search_index.remove(idea.id)
+        except Exception as e:
+            # The periodic rebuild will pick the idea up
+            logger.warning(f"Search index update failed for idea {idea.id}: {e}")
+    
+    async def _sync_search_index(self, db: Session):
+        """Load ideas published elsewhere since the last refresh; rebuild periodically"""
+        
+        now = datetime.utcnow()
+        
+        if self._index_rebuilt_at is None or now - self._index_rebuilt_at >= self.index_rebuild_interval:
+            # Full rebuild also drops ideas deactivated or re-rated by other workers
+            index = IdeaSearchIndex(k1=self.search_index.k1, b=self.search_index.b)
+            ideas = await run_sync(
+                db, lambda session: session.query(TradingIdea).filter(TradingIdea.status == 'ACTIVE').all()
+            )
+            for idea in ideas:
+                index.add(self._idea_document(idea))
+            
+            self.search_index = index
+            self._index_rebuilt_at = self._index_refreshed_at = now
+            self._index_watermark = max((idea.created_at for idea in ideas), default=None)
+            return
+        
+        if now - self._index_refreshed_at < self.index_refresh_interval:
+            return
+        
+        def load_recent(session: Session) -> List[TradingIdea]:
+            query = session.query(TradingIdea).filter(TradingIdea.status == 'ACTIVE')
+            if self._index_watermark:
+                query = query.filter(TradingIdea.created_at >= self._index_watermark)
+            return query.all()
+        
+        for idea in await run_sync(db, load_recent):
+            if idea.id not in self.search_index:
+                self.search_index.add(self._idea_document(idea))
+            if self._index_watermark is None or idea.created_at > self._index_watermark:
+                self._index_watermark = idea.created_at
+        
+        self._index_refreshed_at = now
+    
     async def _check_idea_access(self, db: Session, user_id: str, idea_id: str) -> bool:
         """Check if user has access to view/rate an idea"""
         
@@ -788,6 +930,7 @@ class TradingIdeaMarketplace:
             if idea:
                 idea.average_rating = average_rating
                 idea.total_ratings = len(ratings)
+                self.search_index.update_rating(idea_id, float(average_rating))
     
     async def _get_idea_average_rating(self, db: Session, idea_id: str) -> float:
         """Get current average rating for an idea"""
@@ -820,7 +963,7 @@ async def publish_trading_idea(
 async def search_marketplace(
     search_request: MarketplaceSearchRequest,
     user: Dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Search trading ideas in marketplace"""
     
@@ -863,7 +1006,7 @@ async def rate_trading_idea(
 
 @router.get("/stats", response_model=MarketplaceStatsResponse)
 async def get_marketplace_stats(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get marketplace statistics and featured content"""
     
@@ -875,24 +1018,26 @@ async def get_marketplace_stats(
 @router.get("/my-ideas")
 async def get_my_ideas(
     user: Dict = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     status: Optional[str] = Query(None),
     limit: int = Query(20, ge=1, le=100)
 ):
     """Get user's published trading ideas"""
     
-    query = db.query(TradingIdea).filter(
+    query = select(TradingIdea).where(
         TradingIdea.expert_user_id == user["id"]
     )
     
     if status:
-        query = query.filter(TradingIdea.status == status)
+        query = query.where(TradingIdea.status == status)
+    
+    ideas = (await db.scalars(query.order_by(TradingIdea.created_at.desc()).limit(limit))).all()
     
-    ideas = query.order_by(TradingIdea.created_at.desc()).limit(limit).all()
+    performance_by_idea = await marketplace._get_idea_performance_batch(db, [idea.id for idea in ideas])
     
     formatted_ideas = []
     for idea in ideas:
-        performance_metrics = await marketplace._get_idea_performance(db, idea.id)
+        performance_metrics = performance_by_idea[idea.id]
         
         formatted_ideas.append({
             'idea_id': idea.id,
@@ -915,18 +1060,20 @@ async def get_my_ideas(
 @router.get("/my-subscriptions")
 async def get_my_subscriptions(
     user: Dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user's active subscriptions"""
     
-    subscriptions = db.query(IdeaSubscription).filter(
+    subscriptions = (await db.scalars(select(IdeaSubscription).where(
         IdeaSubscription.subscriber_user_id == user["id"],
         IdeaSubscription.status == 'ACTIVE'
-    ).all()
+    ))).all()
+    
+    expert_infos = await marketplace._get_expert_info_batch(db, {sub.expert_user_id for sub in subscriptions})
     
     formatted_subscriptions = []
     for sub in subscriptions:
-        expert_info = await marketplace._get_expert_info(db, sub.expert_user_id)
+        expert_info = expert_infos[sub.expert_user_id]
         
         formatted_subscriptions.append({
             'subscription_id': sub.id,
@@ -967,7 +1114,12 @@ async def marketplace_health_check():
             "performance_tracking": True,
             "zk_verification": True,
             "payment_processing": True,
-            "rating_system": True
+            "rating_system": True,
+            "full_text_search": True
+        },
+        "search_index": {
+            "indexed_ideas": len(marketplace.search_index),
+            "last_rebuild": marketplace._index_rebuilt_at.isoformat() if marketplace._index_rebuilt_at else None
         },
         "subscription_tiers": list(marketplace.subscription_pricing['MONTHLY'].keys()),
         "supported_categories": ["EQUITY", "OPTIONS", "FUTURES", "CRYPTO", "FOREX"]
@@ -13,10 +13,10 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from enum import Enum
 from dataclasses import dataclass, asdict
-import openai
-from openai import AsyncOpenAI
 import os
 
+from app.ai_support.llm_gateway import LLMGateway, LLMRequest, get_llm_gateway
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -192,9 +192,12 @@ class MultilingualTemplates:
 class GPT4FinancialCoach:
     """GPT-4 powered financial coaching system"""
     
-    def __init__(self, openai_api_key: str):
+    # Same profile and question within the hour gets the same educational answer
+    ADVICE_CACHE_TTL = 3600
+    
+    def __init__(self, openai_api_key: str, llm: Optional[LLMGateway] = None):
         """Initialize the financial coach"""
-        self.client = AsyncOpenAI(api_key=openai_api_key)
+        self.llm = llm or get_llm_gateway(openai_api_key)
         self.model = "gpt-4"
         self.compliance_validator = SEBIComplianceValidator()
         self.templates = MultilingualTemplates()
@@ -327,7 +330,7 @@ Provide helpful, educational guidance in {request.language.value} that helps the
         """Generate advice using GPT-4"""
         
         try:
-            response = await self.client.chat.completions.create(
+            response = await self.llm.complete(LLMRequest(
                 model=self.model,
                 messages=[
                     {
@@ -341,11 +344,11 @@ Provide helpful, educational guidance in {request.language.value} that helps the
                 ],
                 max_tokens=1000,
                 temperature=0.7,
-                frequency_penalty=0.3,
-                presence_penalty=0.3
-            )
+                cache_ttl=self.ADVICE_CACHE_TTL,
+                options={"frequency_penalty": 0.3, "presence_penalty": 0.3}
+            ))
             
-            advice_text = response.choices[0].message.content.strip()
+            advice_text = response.content.strip()
             return advice_text
             
         except Exception as e:
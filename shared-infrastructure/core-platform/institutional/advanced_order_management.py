@@ -18,6 +18,10 @@ from pathlib import Path
 import time
 import heapq
 
+from app.monitoring.tracing import tracer
+
+from .position_state import PositionStateEngine, position_state_engine
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -81,6 +85,8 @@ class TimeInForce(Enum):
 
 class ExecutionAlgorithm(Enum):
     """Execution algorithm types"""
+    TWAP = "twap"                     # Time Weighted Average Price
+    VWAP = "vwap"                     # Volume Weighted Average Price
     ARRIVAL_PRICE = "arrival_price"   # Target arrival price
     PARTICIPATE = "participate"       # Participation rate strategy
     IMPLEMENT_SHORTFALL = "is"        # Implementation Shortfall
@@ -192,40 +198,35 @@ class AdvancedOrder:
 
 
 class OrderValidator:
-    """Advanced order validation for institutional clients"""
+    """Advanced order validation for institutional clients
+    
+    With a PositionStateEngine, risk validation also checks the client's
+    configured limits against its current positions.
+    """
     
-    def __init__(self):
+    def __init__(self, position_state: Optional[PositionStateEngine] = None):
         """Initialize order validator"""
         self.validation_rules = {}
+        self.position_state = position_state
         self.market_hours = {
             'pre_open': ('09:00', '09:15'),
             'normal': ('09:15', '15:30'),
             'closing': ('15:30', '16:00')
         }
+        self.session_times = {
+            session: tuple(datetime.strptime(t, '%H:%M').time() for t in bounds)
+            for session, bounds in self.market_hours.items()
+        }
     
     async def validate_order(self, order: AdvancedOrder) -> Tuple[bool, List[str]]:
-        """Comprehensive order validation"""
+        """Comprehensive order validation; every check runs and all errors are reported"""
         errors = []
         
-        # Basic validation
-        if not await self._validate_basic_parameters(order, errors):
-            return False, errors
-        
-        # Market hours validation
-        if not await self._validate_market_hours(order, errors):
-            return False, errors
-        
-        # Order type specific validation
-        if not await self._validate_order_type(order, errors):
-            return False, errors
-        
-        # Risk validation
-        if not await self._validate_risk_limits(order, errors):
-            return False, errors
-        
-        # Compliance validation
-        if not await self._validate_compliance(order, errors):
-            return False, errors
+        await self._validate_basic_parameters(order, errors)
+        await self._validate_market_hours(order, errors)
+        await self._validate_order_type(order, errors)
+        await self._validate_risk_limits(order, errors)
+        await self._validate_compliance(order, errors)
         
         return len(errors) == 0, errors
     
@@ -251,16 +252,14 @@ class OrderValidator:
         
         # ATO orders only during pre-open
         if order.time_in_force == TimeInForce.ATO:
-            pre_open_start = datetime.strptime(self.market_hours['pre_open'][0], '%H:%M').time()
-            pre_open_end = datetime.strptime(self.market_hours['pre_open'][1], '%H:%M').time()
+            pre_open_start, pre_open_end = self.session_times['pre_open']
             
             if not (pre_open_start <= current_time <= pre_open_end):
                 errors.append("ATO orders can only be placed during pre-open session")
         
         # Market orders during market hours
         if order.order_type == OrderType.MARKET:
-            market_start = datetime.strptime(self.market_hours['normal'][0], '%H:%M').time()
-            market_end = datetime.strptime(self.market_hours['normal'][1], '%H:%M').time()
+            market_start, market_end = self.session_times['normal']
             
             if not (market_start <= current_time <= market_end):
                 errors.append("Market orders can only be placed during market hours")
@@ -277,7 +276,7 @@ class OrderValidator:
         elif order.order_type == OrderType.ICEBERG:
             if not order.display_quantity:
                 errors.append("Iceberg orders require display quantity")
-            if order.display_quantity >= order.quantity:
+            elif order.display_quantity >= order.quantity:
                 errors.append("Iceberg display quantity must be less than total quantity")
         
         elif order.order_type == OrderType.TWAP:
@@ -304,6 +303,17 @@ class OrderValidator:
         if order.quantity > max_quantity:
             errors.append(f"Order quantity exceeds maximum limit of {max_quantity:,}")
         
+        # Client limits against current positions
+        if self.position_state is not None and order.quantity > 0:
+            result = self.position_state.check_order(
+                order.client_id, order.symbol, order.side, order.quantity, order.price
+            )
+            if not result.priced and not result.approved:
+                errors.append(f"No market price for {order.symbol} to check client risk limits")
+            for breach in result.breaches:
+                if breach.is_hard_limit:
+                    errors.append(f"Order would breach {breach.limit_type} limit ({breach.utilization:.0%} utilized)")
+        
         return len(errors) == 0
     
     async def _validate_compliance(self, order: AdvancedOrder, errors: List[str]) -> bool:
@@ -322,13 +332,17 @@ class OrderValidator:
 class ExecutionEngine:
     """Advanced order execution engine"""
     
-    def __init__(self):
+    def __init__(self, position_state: Optional[PositionStateEngine] = None):
         """Initialize execution engine"""
         self.active_orders = {}
         self.execution_queue = []
         self.market_data_cache = {}
         self.execution_algorithms = {}
         
+        # Fills update the shared pre-trade state; one validator serves every order
+        self.position_state = position_state
+        self.validator = OrderValidator(position_state)
+        
         # Initialize execution algorithms
         self._initialize_algorithms()
     
@@ -343,33 +357,48 @@ class ExecutionEngine:
     
     async def submit_order(self, order: AdvancedOrder) -> bool:
         """Submit order for execution"""
-        try:
-            # Validate order
-            validator = OrderValidator()
-            is_valid, errors = await validator.validate_order(order)
-            
-            if not is_valid:
-                logger.error(f"Order validation failed: {errors}")
+        with tracer.span("order.submit", symbol=order.symbol, order_type=order.order_type.value) as span:
+            try:
+                # Validate order
+                with tracer.span("order.validate"):
+                    is_valid, errors = await self.validator.validate_order(order)
+                
+                if not is_valid:
+                    logger.error(f"Order validation failed: {errors}")
+                    order.status = OrderStatus.REJECTED
+                    span.set_attribute("status", order.status.value)
+                    return False
+                
+                # Update order status
+                order.status = OrderStatus.SUBMITTED
+                order.submitted_at = datetime.now()
+                
+                # Add to active orders
+                self.active_orders[order.order_id] = order
+                
+                # Route to appropriate execution handler
+                with tracer.span("order.route"):
+                    await self._route_order(order)
+                
+                logger.info(f"Order {order.order_id} submitted successfully")
+                span.set_attribute("status", order.status.value)
+                return True
+                
+            except Exception as e:
+                logger.error(f"Error submitting order {order.order_id}: {e}")
                 order.status = OrderStatus.REJECTED
+                span.set_attribute("status", order.status.value)
                 return False
-            
-            # Update order status
-            order.status = OrderStatus.SUBMITTED
-            order.submitted_at = datetime.now()
-            
-            # Add to active orders
-            self.active_orders[order.order_id] = order
-            
-            # Route to appropriate execution handler
-            await self._route_order(order)
-            
-            logger.info(f"Order {order.order_id} submitted successfully")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error submitting order {order.order_id}: {e}")
-            order.status = OrderStatus.REJECTED
-            return False
+    
+    def _record_execution(self, order: AdvancedOrder, execution: ExecutionReport):
+        """Attach an execution to its order and apply the fill to position state"""
+        with tracer.span("order.fill", quantity=execution.filled_quantity):
+            order.executions.append(execution)
+            if self.position_state is not None:
+                self.position_state.apply_fill(
+                    order.client_id, execution.symbol, execution.side,
+                    execution.filled_quantity, execution.avg_fill_price
+                )
     
     async def _route_order(self, order: AdvancedOrder):
         """Route order to appropriate execution handler"""
@@ -421,7 +450,7 @@ class ExecutionEngine:
         order.avg_fill_price = execution_price
         order.status = OrderStatus.FILLED
         order.filled_at = datetime.now()
-        order.executions.append(execution)
+        self._record_execution(order, execution)
         
         logger.info(f"Market order {order.order_id} executed at ₹{execution_price:.2f}")
     
@@ -457,7 +486,7 @@ class ExecutionEngine:
             order.avg_fill_price = execution_price
             order.status = OrderStatus.FILLED
             order.filled_at = datetime.now()
-            order.executions.append(execution)
+            self._record_execution(order, execution)
             
             logger.info(f"Limit order {order.order_id} filled at ₹{execution_price:.2f}")
         else:
@@ -513,7 +542,7 @@ class ExecutionEngine:
             )
             
             order.filled_quantity += child_qty
-            order.executions.append(execution)
+            self._record_execution(order, execution)
             remaining_qty -= child_qty
             
             # Update average fill price
@@ -576,7 +605,7 @@ class ExecutionEngine:
             )
             
             order.filled_quantity += slice_qty
-            order.executions.append(execution)
+            self._record_execution(order, execution)
             remaining_quantity -= slice_qty
             
             # Update average fill price
@@ -638,7 +667,7 @@ class ExecutionEngine:
             )
             
             order.filled_quantity += slice_qty
-            order.executions.append(execution)
+            self._record_execution(order, execution)
             remaining_quantity -= slice_qty
             
             # Update average fill price
@@ -696,7 +725,7 @@ class ExecutionEngine:
             )
             
             order.filled_quantity += slice_qty
-            order.executions.append(execution)
+            self._record_execution(order, execution)
             remaining_quantity -= slice_qty
             
             # Update average fill price
@@ -751,7 +780,7 @@ class ExecutionEngine:
             )
             
             order.filled_quantity += slice_qty
-            order.executions.append(execution)
+            self._record_execution(order, execution)
             remaining_quantity -= slice_qty
             
             # Update average fill price
@@ -785,8 +814,19 @@ class ExecutionEngine:
         logger.info(f"Order {order_id} cancelled")
         return True
     
+    def update_market_price(self, symbol: str, price: float):
+        """Record a market data price and revalue positions held in `symbol`"""
+        self.market_data_cache[symbol] = price
+        if self.position_state is not None:
+            self.position_state.mark_price(symbol, price)
+    
     async def _get_current_price(self, symbol: str) -> float:
         """Get current market price (mock implementation)"""
+        # Prices pushed by a market data feed (or replay) take precedence
+        cached = self.market_data_cache.get(symbol)
+        if cached is not None:
+            return cached
+        
         # In production, integrate with real market data feed
         base_prices = {
             'RELIANCE': 2420.0,
@@ -847,6 +887,10 @@ class ExecutionEngine:
         return brokerage + exchange_charges + gst
 
 
+# Global execution engine; its fills feed institutional_risk_manager's pre-trade state
+execution_engine = ExecutionEngine(position_state_engine)
+
+
 # Example usage and testing
 async def main():
     """Example usage of advanced order management"""
@@ -22,12 +22,14 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 import websockets
-import redis
+import redis.asyncio as aioredis
 
+from app.core.rate_limiter import LocalRateLimiter, RateLimit, RedisRateLimiter
 from .advanced_order_management import (
     AdvancedOrderManager, OrderType, OrderStatus, Order, 
     ExecutionReport, OrderPriority
 )
+from .market_data_distributor import MarketDataDistributor
 from .hni_portfolio_management import (
     HNIPortfolioManager, PortfolioType, RiskProfile, 
     Portfolio, PortfolioAnalytics
@@ -182,11 +184,17 @@ class InstitutionalAPIInterface:
         self.portfolio_manager = HNIPortfolioManager()
         
         # Redis for rate limiting and session management
-        self.redis_client = redis.Redis(host='localhost', port=6379, db=0)
+        self.redis_client = aioredis.Redis(host='localhost', port=6379, db=0)
+        self.rate_limiter = RedisRateLimiter(
+            self.redis_client, prefix="rl:institutional", fallback=LocalRateLimiter()
+        )
         
         # Active WebSocket connections
         self.active_connections: Dict[str, WebSocket] = {}
         
+        # Shared per-symbol market data feeds for WebSocket clients
+        self.market_data = MarketDataDistributor()
+        
         # API clients registry
         self.api_clients: Dict[str, APIClient] = {}
         
@@ -465,6 +473,7 @@ class InstitutionalAPIInterface:
             
             finally:
                 # Clean up connection
+                await self.market_data.disconnect(client_id)
                 if client_id in self.active_connections:
                     del self.active_connections[client_id]
                 logger.info(f"WebSocket disconnected: {client_id}")
@@ -518,23 +527,12 @@ class InstitutionalAPIInterface:
             raise HTTPException(status_code=401, detail="Invalid authentication token")
     
     async def _check_rate_limit(self, client_id: str) -> bool:
-        """Check API rate limiting"""
-        key = f"rate_limit:{client_id}"
-        current_minute = int(time.time() / 60)
-        
-        # Get current request count
-        requests = self.redis_client.get(f"{key}:{current_minute}")
+        """Check API rate limiting (sliding, shared across workers)"""
+        client = self.api_clients.get(client_id)
+        limit = client.rate_limit if client else 1000  # requests per minute
         
-        if requests and int(requests) >= 1000:  # 1000 requests per minute limit
-            return False
-        
-        # Increment counter
-        pipe = self.redis_client.pipeline()
-        pipe.incr(f"{key}:{current_minute}")
-        pipe.expire(f"{key}:{current_minute}", 60)
-        pipe.execute()
-        
-        return True
+        decision = await self.rate_limiter.check([((client_id,), RateLimit(limit, 60.0))])
+        return decision.allowed
     
     async def _validate_order(self, order_request: OrderRequest, client: APIClient):
         """Validate order request"""
@@ -615,7 +613,10 @@ class InstitutionalAPIInterface:
         if message_type == "subscribe_market_data":
             symbols = message.get("symbols", [])
             # Subscribe to market data for symbols
-            await self._subscribe_market_data(client.client_id, symbols)
+            await self._subscribe_market_data(client.client_id, symbols, message.get("encoding", "json"))
+        
+        elif message_type == "unsubscribe_market_data":
+            self.market_data.unsubscribe(client.client_id, message.get("symbols", []))
         
         elif message_type == "ping":
             # Send pong response
@@ -625,25 +626,30 @@ class InstitutionalAPIInterface:
                 "timestamp": datetime.now().isoformat()
             })
     
-    async def _subscribe_market_data(self, client_id: str, symbols: List[str]):
+    async def _subscribe_market_data(self, client_id: str, symbols: List[str], encoding: str = "json"):
         """Subscribe client to market data feed"""
-        # In production, this would connect to actual market data feeds
         logger.info(f"Client {client_id} subscribed to market data: {symbols}")
         
-        # Mock market data simulation
         websocket = self.active_connections[client_id]
+        try:
+            await self.market_data.subscribe(client_id, websocket, symbols, encoding)
+        except ValueError as e:
+            await websocket.send_json({"type": "error", "message": str(e)})
+            return
+        
+        # In production the exchange feed handlers publish into self.market_data;
+        # until then seed symbols that have no data yet with a mock quote
         for symbol in symbols:
-            await websocket.send_json({
-                "type": "market_data",
-                "symbol": symbol,
-                "price": 2450.50,  # Mock price
-                "volume": 1000,
-                "timestamp": datetime.now().isoformat(),
-                "bid": 2449.50,
-                "ask": 2451.50,
-                "bid_size": 500,
-                "ask_size": 300
-            })
+            if self.market_data.feed(symbol).last_quote is None:
+                self.market_data.publish_tick(
+                    symbol,
+                    price=2450.50,  # Mock price
+                    volume=1000,
+                    bid=2449.50,
+                    ask=2451.50,
+                    bid_size=500,
+                    ask_size=300
+                )
     
     def start_server(self, host: str = "0.0.0.0", port: int = 8000):
         """Start the API server"""
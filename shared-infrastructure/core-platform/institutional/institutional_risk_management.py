@@ -21,8 +21,9 @@ import threading
 from collections import defaultdict, deque
 import redis
 
-from .advanced_order_management import OrderType, OrderStatus, Order
-from .hni_portfolio_management import Portfolio, AssetClass, RiskProfile
+from .advanced_order_management import OrderType, OrderStatus, AdvancedOrder
+from .hni_portfolio_management import AssetClass, RiskProfile
+from .position_state import PositionStateEngine, position_state_engine
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -202,15 +203,22 @@ class VolatilityCalculator:
 
 
 class InstitutionalRiskManager:
-    """Institutional Risk Management System"""
+    """Institutional Risk Management System
     
-    def __init__(self):
+    Pass the same PositionStateEngine to the ExecutionEngine so fills keep
+    pre-trade state current without a position refresh.
+    """
+    
+    def __init__(self, position_state: Optional[PositionStateEngine] = None):
         # Risk limits storage
         self.risk_limits: Dict[str, List[RiskLimit]] = defaultdict(list)
         
         # Client positions
         self.positions: Dict[str, Dict[str, Position]] = defaultdict(dict)
         
+        # Position, exposure and limit indexes for pre-trade checks
+        self.position_state = position_state if position_state is not None else PositionStateEngine()
+        
         # Risk metrics cache
         self.risk_metrics_cache: Dict[str, RiskMetrics] = {}
         
@@ -256,6 +264,7 @@ class InstitutionalRiskManager:
         """Add risk limit for client"""
         try:
             self.risk_limits[risk_limit.client_id].append(risk_limit)
+            self.position_state.add_limit(risk_limit)
             
             # Store in Redis for persistence
             await self._store_risk_limit(risk_limit)
@@ -271,6 +280,16 @@ class InstitutionalRiskManager:
         """Update client position"""
         try:
             self.positions[position.client_id][position.symbol] = position
+            self.position_state.set_position(
+                position.client_id,
+                position.symbol,
+                position.quantity,
+                position.avg_price,
+                position.current_price,
+                market_value=position.market_value,
+                sector=position.sector,
+                realized_pnl=position.realized_pnl
+            )
             
             # Update price history for volatility calculations
             self.volatility_calculator.update_price(
@@ -292,44 +311,41 @@ class InstitutionalRiskManager:
             logger.error(f"Failed to update position: {e}")
             return False
     
-    async def validate_order_pre_trade(self, order: Order) -> Tuple[bool, Optional[str]]:
+    async def validate_order_pre_trade(self, order: AdvancedOrder) -> Tuple[bool, Optional[str]]:
         """Validate order against risk limits before execution"""
         try:
             client_id = order.client_id
             
-            # Get current positions
-            positions = self.positions.get(client_id, {})
+            # All limits evaluated together against the indexed position state
+            result = self.position_state.check_order(
+                client_id, order.symbol, order.side, order.quantity, order.price
+            )
             
-            # Calculate new position after order
-            new_position = await self._calculate_new_position(order, positions)
+            if not result.priced and not result.approved:
+                return False, f"Order rejected: no market price for {order.symbol} to check risk limits"
             
-            # Check all risk limits
-            for risk_limit in self.risk_limits.get(client_id, []):
-                if not risk_limit.is_active:
-                    continue
+            if not result.approved:
+                breach = next(check for check in result.breaches if check.is_hard_limit)
+                error_msg = f"Order rejected: {breach.limit_type} limit would be breached"
                 
-                violation = await self._check_limit_violation(new_position, risk_limit, positions)
+                # Generate alert
+                await self._generate_alert(
+                    client_id,
+                    AlertType.LIMIT_BREACHED,
+                    RiskLevel.CRITICAL,
+                    error_msg,
+                    {"order_id": order.order_id, "limit_type": breach.limit_type,
+                     "utilization": breach.utilization}
+                )
                 
-                if violation and risk_limit.is_hard_limit:
-                    error_msg = f"Order rejected: {risk_limit.limit_type.value} limit would be breached"
-                    
-                    # Generate alert
-                    await self._generate_alert(
-                        client_id,
-                        AlertType.LIMIT_BREACHED,
-                        RiskLevel.CRITICAL,
-                        error_msg,
-                        {"order_id": order.order_id, "limit_type": risk_limit.limit_type.value}
-                    )
-                    
-                    return False, error_msg
+                return False, error_msg
             
             # Check compliance rules
-            compliance_check = await self._check_compliance_rules(order, positions)
+            compliance_check = await self._check_compliance_rules(order, self.positions.get(client_id, {}))
             if not compliance_check[0]:
                 return compliance_check
             
-            logger.info(f"Order {order.order_id} passed pre-trade risk validation")
+            logger.debug(f"Order {order.order_id} passed pre-trade risk validation")
             return True, None
             
         except Exception as e:
@@ -532,88 +548,7 @@ class InstitutionalRiskManager:
         except Exception as e:
             logger.error(f"Client risk monitoring error for {client_id}: {e}")
     
-    async def _calculate_new_position(self, order: Order, current_positions: Dict[str, Position]) -> Position:
-        """Calculate position after order execution"""
-        symbol = order.symbol
-        
-        if symbol in current_positions:
-            current_pos = current_positions[symbol]
-            
-            if order.side == "BUY":
-                new_quantity = current_pos.quantity + order.quantity
-            else:  # SELL
-                new_quantity = current_pos.quantity - order.quantity
-            
-            # Calculate new average price
-            if new_quantity != 0:
-                if order.side == "BUY":
-                    total_cost = (current_pos.quantity * current_pos.avg_price + 
-                                order.quantity * order.price)
-                    new_avg_price = total_cost / (current_pos.quantity + order.quantity)
-                else:
-                    new_avg_price = current_pos.avg_price
-            else:
-                new_avg_price = 0
-            
-            new_position = Position(
-                client_id=order.client_id,
-                symbol=symbol,
-                quantity=new_quantity,
-                avg_price=new_avg_price,
-                current_price=order.price or current_pos.current_price,
-                market_value=new_quantity * (order.price or current_pos.current_price),
-                unrealized_pnl=0,  # Will be calculated
-                realized_pnl=current_pos.realized_pnl,
-                sector=current_pos.sector,
-                asset_class=current_pos.asset_class
-            )
-        else:
-            # New position
-            new_position = Position(
-                client_id=order.client_id,
-                symbol=symbol,
-                quantity=order.quantity if order.side == "BUY" else -order.quantity,
-                avg_price=order.price or 0,
-                current_price=order.price or 0,
-                market_value=(order.quantity * (order.price or 0)) if order.side == "BUY" else -(order.quantity * (order.price or 0)),
-                unrealized_pnl=0,
-                realized_pnl=0,
-                sector="Unknown",  # Would be looked up from reference data
-                asset_class=AssetClass.EQUITY
-            )
-        
-        return new_position
-    
-    async def _check_limit_violation(self, new_position: Position, risk_limit: RiskLimit, 
-                                   current_positions: Dict[str, Position]) -> bool:
-        """Check if new position would violate risk limit"""
-        
-        if risk_limit.limit_type == RiskLimitType.POSITION_LIMIT:
-            return abs(new_position.market_value) > risk_limit.limit_value
-        
-        elif risk_limit.limit_type == RiskLimitType.PORTFOLIO_LIMIT:
-            total_value = sum(pos.market_value for pos in current_positions.values())
-            total_value += new_position.market_value - current_positions.get(new_position.symbol, Position(
-                client_id="", symbol="", quantity=0, avg_price=0, current_price=0,
-                market_value=0, unrealized_pnl=0, realized_pnl=0, sector="", asset_class=AssetClass.EQUITY
-            )).market_value
-            return total_value > risk_limit.limit_value
-        
-        elif risk_limit.limit_type == RiskLimitType.CONCENTRATION_LIMIT:
-            total_portfolio = sum(pos.market_value for pos in current_positions.values())
-            total_portfolio += new_position.market_value - current_positions.get(new_position.symbol, Position(
-                client_id="", symbol="", quantity=0, avg_price=0, current_price=0,
-                market_value=0, unrealized_pnl=0, realized_pnl=0, sector="", asset_class=AssetClass.EQUITY
-            )).market_value
-            
-            if total_portfolio > 0:
-                concentration = abs(new_position.market_value) / total_portfolio
-                return concentration > risk_limit.limit_value
-        
-        # Add more limit type checks as needed
-        return False
-    
-    async def _check_compliance_rules(self, order: Order, positions: Dict[str, Position]) -> Tuple[bool, Optional[str]]:
+    async def _check_compliance_rules(self, order: AdvancedOrder, positions: Dict[str, Position]) -> Tuple[bool, Optional[str]]:
         """Check regulatory compliance rules"""
         try:
             # Example: Check margin requirements
@@ -710,7 +645,7 @@ class InstitutionalRiskManager:
 
 
 # Global risk manager instance
-institutional_risk_manager = InstitutionalRiskManager()
+institutional_risk_manager = InstitutionalRiskManager(position_state_engine)
 
 
 async def main():
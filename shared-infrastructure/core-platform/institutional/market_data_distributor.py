@@ -0,0 +1,391 @@
+"""
+Institutional Market Data Distributor
+Shared per-symbol feeds fanned out to WebSocket clients through bounded queues
+
+Every tick or depth change is sequenced and encoded once per wire format
+(JSON text or compact binary), however many clients subscribe to the symbol.
+Each client has a bounded send queue drained by its own writer task, so a
+slow consumer never blocks publishing or other clients: when its queue
+overflows the queued updates are dropped and the client is resynchronised
+with one depth snapshot per affected symbol instead.
+
+Protocol per symbol: a `depth_snapshot` carrying `seq`, then `market_data`
+ticks and `depth_update` increments with consecutive `seq` values. A gap in
+`seq` is always preceded by a fresh snapshot.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import struct
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+ENCODINGS = ("json", "binary")
+
+# Binary frames (little-endian): header, symbol, then a body per message type
+MESSAGE_TYPES = {"market_data": 1, "depth_snapshot": 2, "depth_update": 3}
+_TYPE_NAMES = {code: name for name, code in MESSAGE_TYPES.items()}
+_HEADER = struct.Struct("<BQdB")     # type, seq, timestamp (epoch s), symbol length
+_QUOTE = struct.Struct("<dQddII")    # price, volume, bid, ask, bid_size, ask_size
+_LEVELS = struct.Struct("<HH")       # bid levels, ask levels
+_LEVEL = struct.Struct("<dI")        # price, size
+
+Levels = List[Tuple[float, int]]
+
+
+def _pack_levels(bids: Levels, asks: Levels) -> bytes:
+    parts = [_LEVELS.pack(len(bids), len(asks))]
+    parts.extend(_LEVEL.pack(price, size) for price, size in bids)
+    parts.extend(_LEVEL.pack(price, size) for price, size in asks)
+    return b"".join(parts)
+
+
+def _pack_quote(quote: Optional[Dict[str, Any]]) -> bytes:
+    quote = quote or {}
+    return _QUOTE.pack(
+        quote.get("price", math.nan), quote.get("volume") or 0,
+        math.nan if quote.get("bid") is None else quote["bid"],
+        math.nan if quote.get("ask") is None else quote["ask"],
+        quote.get("bid_size") or 0, quote.get("ask_size") or 0
+    )
+
+
+def encode_message(message: Dict[str, Any], encoding: str):
+    """Wire frame for a message: `str` for JSON, `bytes` for binary"""
+
+    if encoding == "json":
+        body = dict(message, timestamp=datetime.fromtimestamp(message["timestamp"]).isoformat())
+        return json.dumps(body, separators=(",", ":"))
+
+    symbol = message["symbol"].encode()
+    parts = [
+        _HEADER.pack(MESSAGE_TYPES[message["type"]], message["seq"], message["timestamp"], len(symbol)),
+        symbol
+    ]
+    if message["type"] == "market_data":
+        parts.append(_pack_quote(message))
+    else:
+        if message["type"] == "depth_snapshot":
+            parts.append(_pack_quote(message.get("quote")))
+        parts.append(_pack_levels(message["bids"], message["asks"]))
+    return b"".join(parts)
+
+
+def decode_binary(frame: bytes) -> Dict[str, Any]:
+    """Inverse of the binary encoding (for client SDKs and tests)"""
+
+    type_code, seq, timestamp, symbol_length = _HEADER.unpack_from(frame)
+    offset = _HEADER.size
+    message = {
+        "type": _TYPE_NAMES[type_code],
+        "symbol": frame[offset:offset + symbol_length].decode(),
+        "seq": seq,
+        "timestamp": timestamp
+    }
+    offset += symbol_length
+
+    def quote():
+        nonlocal offset
+        price, volume, bid, ask, bid_size, ask_size = _QUOTE.unpack_from(frame, offset)
+        offset += _QUOTE.size
+        if math.isnan(price):
+            return None
+        return {
+            "price": price, "volume": volume,
+            "bid": None if math.isnan(bid) else bid, "ask": None if math.isnan(ask) else ask,
+            "bid_size": bid_size, "ask_size": ask_size
+        }
+
+    if message["type"] == "market_data":
+        message.update(quote())
+        return message
+
+    if message["type"] == "depth_snapshot":
+        message["quote"] = quote()
+    bid_count, ask_count = _LEVELS.unpack_from(frame, offset)
+    offset += _LEVELS.size
+    levels = [_LEVEL.unpack_from(frame, offset + i * _LEVEL.size) for i in range(bid_count + ask_count)]
+    message["bids"] = [list(level) for level in levels[:bid_count]]
+    message["asks"] = [list(level) for level in levels[bid_count:]]
+    return message
+
+
+class SymbolFeed:
+    """Sequenced state of one symbol: last quote and price -> size depth book"""
+
+    def __init__(self, symbol: str, depth_levels: int = 20):
+        self.symbol = symbol
+        self.depth_levels = depth_levels
+        self.seq = 0
+        self.timestamp = 0.0
+        self.last_quote: Optional[Dict[str, Any]] = None
+        self.bids: Dict[float, int] = {}
+        self.asks: Dict[float, int] = {}
+        self.subscribers: Set["ClientStream"] = set()
+        self._snapshot_frames: Dict[str, Any] = {}
+        self._snapshot_seq = -1
+
+    def quote(self, timestamp: float, **quote) -> Dict[str, Any]:
+        self.seq += 1
+        self.timestamp = timestamp
+        self.last_quote = quote
+        return {"type": "market_data", "symbol": self.symbol, "seq": self.seq, "timestamp": timestamp, **quote}
+
+    def depth(self, timestamp: float, bids: Levels, asks: Levels) -> Dict[str, Any]:
+        """Apply incremental levels (size 0 removes the level)"""
+
+        self.seq += 1
+        self.timestamp = timestamp
+        for book, levels in ((self.bids, bids), (self.asks, asks)):
+            for price, size in levels:
+                if size:
+                    book[price] = size
+                else:
+                    book.pop(price, None)
+        return {
+            "type": "depth_update", "symbol": self.symbol, "seq": self.seq, "timestamp": timestamp,
+            "bids": [list(level) for level in bids], "asks": [list(level) for level in asks]
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "type": "depth_snapshot", "symbol": self.symbol, "seq": self.seq, "timestamp": self.timestamp,
+            "quote": self.last_quote,
+            "bids": sorted(self.bids.items(), reverse=True)[:self.depth_levels],
+            "asks": sorted(self.asks.items())[:self.depth_levels]
+        }
+
+    def snapshot_frame(self, encoding: str):
+        """Encoded snapshot, shared by every client resyncing at the same seq"""
+
+        if self._snapshot_seq != self.seq:
+            self._snapshot_frames = {}
+            self._snapshot_seq = self.seq
+        frame = self._snapshot_frames.get(encoding)
+        if frame is None:
+            frame = self._snapshot_frames[encoding] = encode_message(self.snapshot(), encoding)
+        return frame
+
+
+class ClientStream:
+    """Bounded send queue and writer task for one WebSocket client"""
+
+    def __init__(self, distributor: "MarketDataDistributor", client_id: str, websocket, encoding: str):
+        self.distributor = distributor
+        self.client_id = client_id
+        self.websocket = websocket
+        self.encoding = encoding
+        self.symbols: Set[str] = set()
+        self.queue: Deque[Tuple[str, int, Any, float]] = deque()
+        self.resync: Dict[str, None] = {}  # Symbols awaiting a snapshot, in order
+        self.synced_seq: Dict[str, int] = {}
+        self._wakeup = asyncio.Event()
+        self._send = websocket.send_text if encoding == "json" else websocket.send_bytes
+        self.task = asyncio.create_task(self._run())
+
+    def offer(self, symbol: str, seq: int, frame: Any, published_at: float):
+        """Queue a frame without blocking; on overflow fall back to snapshots"""
+
+        if symbol in self.resync:
+            return  # The pending snapshot will include this update
+
+        if len(self.queue) >= self.distributor.max_queue:
+            stats = self.distributor.stats
+            stats["dropped"] += len(self.queue) + 1
+            stats["resyncs"] += 1
+            for queued_symbol, _, _, _ in self.queue:
+                self.resync[queued_symbol] = None
+            self.resync[symbol] = None
+            self.queue.clear()
+        else:
+            self.queue.append((symbol, seq, frame, published_at))
+        self._wakeup.set()
+
+    def request_snapshot(self, symbol: str):
+        self.resync[symbol] = None
+        self._wakeup.set()
+
+    async def _run(self):
+        distributor = self.distributor
+        try:
+            while True:
+                if self.resync:
+                    symbol = next(iter(self.resync))
+                    del self.resync[symbol]
+                    if symbol not in self.symbols:
+                        continue
+                    feed = distributor.feeds[symbol]
+                    self.synced_seq[symbol] = feed.seq
+                    await self._send(feed.snapshot_frame(self.encoding))
+                    distributor.stats["snapshots_sent"] += 1
+
+                elif self.queue:
+                    symbol, seq, frame, published_at = self.queue.popleft()
+                    if symbol not in self.symbols or seq <= self.synced_seq.get(symbol, -1):
+                        continue  # Unsubscribed, or already covered by a snapshot
+                    await self._send(frame)
+                    distributor.stats["frames_sent"] += 1
+                    distributor.latencies.append(time.perf_counter() - published_at)
+
+                else:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Market data stream for {self.client_id} closed: {e}")
+            distributor._remove(self)
+
+
+class MarketDataDistributor:
+    """Per-symbol feeds shared by every subscribed institutional client"""
+
+    LATENCY_WINDOW = 10000
+
+    def __init__(self, max_queue: int = 1000, depth_levels: int = 20):
+        self.max_queue = max_queue
+        self.depth_levels = depth_levels
+        self.feeds: Dict[str, SymbolFeed] = {}
+        self.clients: Dict[str, ClientStream] = {}
+        self.latencies: Deque[float] = deque(maxlen=self.LATENCY_WINDOW)
+        self.stats = {
+            "published": 0,
+            "encodes": 0,
+            "frames_sent": 0,
+            "snapshots_sent": 0,
+            "dropped": 0,
+            "resyncs": 0
+        }
+
+    def feed(self, symbol: str) -> SymbolFeed:
+        feed = self.feeds.get(symbol)
+        if feed is None:
+            feed = self.feeds[symbol] = SymbolFeed(symbol, self.depth_levels)
+        return feed
+
+    async def subscribe(self, client_id: str, websocket, symbols: Iterable[str], encoding: str = "json"):
+        """Add symbols to a client's stream; each starts with a depth snapshot"""
+
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unsupported market data encoding: {encoding}")
+
+        stream = self.clients.get(client_id)
+        if stream is not None and (stream.websocket is not websocket or stream.encoding != encoding):
+            await self.disconnect(client_id)
+            stream = None
+        if stream is None:
+            stream = self.clients[client_id] = ClientStream(self, client_id, websocket, encoding)
+
+        for symbol in symbols:
+            if symbol in stream.symbols:
+                continue
+            stream.symbols.add(symbol)
+            self.feed(symbol).subscribers.add(stream)
+            stream.request_snapshot(symbol)
+
+    def unsubscribe(self, client_id: str, symbols: Iterable[str]):
+        stream = self.clients.get(client_id)
+        if stream is None:
+            return
+        for symbol in symbols:
+            stream.symbols.discard(symbol)
+            stream.synced_seq.pop(symbol, None)
+            feed = self.feeds.get(symbol)
+            if feed is not None:
+                feed.subscribers.discard(stream)
+
+    def _remove(self, stream: ClientStream):
+        if self.clients.get(stream.client_id) is stream:
+            del self.clients[stream.client_id]
+        for symbol in stream.symbols:
+            feed = self.feeds.get(symbol)
+            if feed is not None:
+                feed.subscribers.discard(stream)
+        stream.symbols.clear()
+        stream.queue.clear()
+
+    async def disconnect(self, client_id: str):
+        stream = self.clients.get(client_id)
+        if stream is None:
+            return
+        self._remove(stream)
+        stream.task.cancel()
+        try:
+            await stream.task
+        except asyncio.CancelledError:
+            pass
+
+    def _fan_out(self, feed: SymbolFeed, message: Dict[str, Any]) -> int:
+        self.stats["published"] += 1
+        if not feed.subscribers:
+            return message["seq"]
+
+        published_at = time.perf_counter()
+        frames: Dict[str, Any] = {}
+        for stream in feed.subscribers:
+            frame = frames.get(stream.encoding)
+            if frame is None:
+                frame = frames[stream.encoding] = encode_message(message, stream.encoding)
+                self.stats["encodes"] += 1
+            stream.offer(feed.symbol, message["seq"], frame, published_at)
+        return message["seq"]
+
+    def publish_tick(
+        self,
+        symbol: str,
+        price: float,
+        volume: int,
+        bid: Optional[float] = None,
+        ask: Optional[float] = None,
+        bid_size: Optional[int] = None,
+        ask_size: Optional[int] = None,
+        timestamp: Optional[float] = None
+    ) -> int:
+        """Publish a trade/quote tick; returns its sequence number"""
+
+        feed = self.feed(symbol)
+        message = feed.quote(
+            timestamp or time.time(),
+            price=price, volume=volume, bid=bid, ask=ask, bid_size=bid_size, ask_size=ask_size
+        )
+        return self._fan_out(feed, message)
+
+    def publish_depth(
+        self,
+        symbol: str,
+        bids: Levels = (),
+        asks: Levels = (),
+        timestamp: Optional[float] = None
+    ) -> int:
+        """Publish incremental depth levels (size 0 removes a level); returns the sequence number"""
+
+        feed = self.feed(symbol)
+        return self._fan_out(feed, feed.depth(timestamp or time.time(), bids, asks))
+
+    def metrics(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        queued = [len(stream.queue) for stream in self.clients.values()]
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0.0
+
+        return {
+            **self.stats,
+            "clients": len(self.clients),
+            "symbols": len(self.feeds),
+            "queued_frames": sum(queued),
+            "max_queue_depth": max(queued, default=0),
+            "latency_p50_ms": percentile(0.50),
+            "latency_p99_ms": percentile(0.99)
+        }
+
+    async def close(self):
+        for client_id in list(self.clients):
+            await self.disconnect(client_id)
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+GridWorks Institutional Position State Engine
+============================================
+In-memory per-client positions, exposure and limit indexes for pre-trade checks
+
+Fills from the execution engine and position snapshots from the risk manager
+update running aggregates (portfolio value, gross exposure, sector values)
+incrementally, so validating an order is a dictionary lookup plus the delta
+the order would add, with every applicable limit evaluated in one pass.
+"""
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# RiskLimitType values handled here (see institutional_risk_management)
+POSITION_LIMIT = "position_limit"
+PORTFOLIO_LIMIT = "portfolio_limit"
+CONCENTRATION_LIMIT = "concentration_limit"
+SECTOR_LIMIT = "sector_limit"
+
+_SIDE_SIGNS = {"buy": 1, "sell": -1, "BUY": 1, "SELL": -1}
+
+
+def side_sign(side: Any) -> int:
+    """+1 for buys, -1 for sells; accepts OrderSide members or "BUY"/"SELL" strings"""
+    sign = _SIDE_SIGNS.get(getattr(side, "value", side))
+    if sign is None:
+        raise ValueError(f"Unknown order side: {side}")
+    return sign
+
+
+class PositionState:
+    """Position of one client in one symbol, valued at the last known price"""
+
+    __slots__ = ("quantity", "avg_price", "price", "value", "realized_pnl", "sector")
+
+    def __init__(self, sector: str = "Unknown"):
+        self.quantity = 0
+        self.avg_price = 0.0
+        self.price = 0.0
+        self.value = 0.0
+        self.realized_pnl = 0.0
+        self.sector = sector
+
+
+@dataclass
+class LimitCheck:
+    """Projected utilization of one limit if the order were filled"""
+    limit_id: str
+    limit_type: str
+    utilization: float
+    is_hard_limit: bool
+
+    @property
+    def breached(self) -> bool:
+        return self.utilization > 1.0
+
+
+@dataclass
+class PreTradeResult:
+    """Outcome of a pre-trade check; `checks` covers every applicable limit"""
+    approved: bool
+    checks: List[LimitCheck] = field(default_factory=list)
+    projected_position_value: float = 0.0
+    projected_portfolio_value: float = 0.0
+    priced: bool = True  # False when the order could not be valued
+
+    @property
+    def breaches(self) -> List[LimitCheck]:
+        return [check for check in self.checks if check.breached]
+
+
+class ClientState:
+    """Positions, running aggregates and limits (grouped by type) of one client"""
+
+    def __init__(self):
+        self.positions: Dict[str, PositionState] = {}
+        self.portfolio_value = 0.0
+        self.gross_exposure = 0.0
+        self.sector_values: Dict[str, float] = defaultdict(float)
+        # limit_type -> [(limit, symbols it applies to or None for all)]
+        self.limits: Dict[str, List[Tuple[Any, Optional[Set[str]]]]] = defaultdict(list)
+
+    def revalue(self, position: PositionState, value: float):
+        """Replace a position's value, keeping the aggregates in step"""
+        self.portfolio_value += value - position.value
+        self.gross_exposure += abs(value) - abs(position.value)
+        self.sector_values[position.sector] += value - position.value
+        position.value = value
+
+
+_NO_CLIENT = ClientState()
+
+
+class PositionStateEngine:
+    """Per-client position, exposure and limit-utilization indexes"""
+
+    def __init__(self):
+        self.clients: Dict[str, ClientState] = defaultdict(ClientState)
+        self.last_prices: Dict[str, float] = {}
+        self.holders: Dict[str, Set[str]] = defaultdict(set)  # symbol -> clients with a position
+        self.stats = {"checks": 0, "rejections": 0, "fills": 0}
+
+    # Limits
+
+    def add_limit(self, limit: Any):
+        """Index a RiskLimit (anything with limit_id, limit_type, limit_value, is_hard_limit, is_active)"""
+        limit_type = getattr(limit.limit_type, "value", limit.limit_type)
+        symbols = set(limit.applicable_symbols) if getattr(limit, "applicable_symbols", None) else None
+        self.clients[limit.client_id].limits[limit_type].append((limit, symbols))
+
+    def remove_limit(self, client_id: str, limit_id: str):
+        state = self.clients.get(client_id)
+        if state is None:
+            return
+        for limit_type, limits in state.limits.items():
+            state.limits[limit_type] = [(l, s) for l, s in limits if l.limit_id != limit_id]
+
+    # Updates
+
+    def apply_fill(
+        self,
+        client_id: str,
+        symbol: str,
+        side: Any,
+        quantity: int,
+        price: float,
+        sector: Optional[str] = None
+    ):
+        """Apply an execution to the client's position and aggregates"""
+
+        if quantity == 0:
+            return
+
+        state = self.clients[client_id]
+        position = state.positions.get(symbol)
+        if position is None:
+            position = state.positions[symbol] = PositionState(sector or "Unknown")
+            self.holders[symbol].add(client_id)
+
+        signed = side_sign(side) * quantity
+        old_quantity = position.quantity
+        new_quantity = old_quantity + signed
+
+        if old_quantity == 0 or (old_quantity > 0) == (signed > 0):
+            # Opening or adding: weighted average entry
+            position.avg_price = (old_quantity * position.avg_price + signed * price) / new_quantity
+        else:
+            closed = min(abs(signed), abs(old_quantity))
+            position.realized_pnl += closed * (price - position.avg_price) * (1 if old_quantity > 0 else -1)
+            if new_quantity == 0:
+                position.avg_price = 0.0
+            elif (new_quantity > 0) != (old_quantity > 0):
+                position.avg_price = price  # Flipped through flat
+
+        position.quantity = new_quantity
+        position.price = price
+        self.last_prices[symbol] = price
+        state.revalue(position, new_quantity * price)
+        self.stats["fills"] += 1
+
+    def set_position(
+        self,
+        client_id: str,
+        symbol: str,
+        quantity: int,
+        avg_price: float,
+        price: float,
+        market_value: Optional[float] = None,
+        sector: str = "Unknown",
+        realized_pnl: float = 0.0
+    ):
+        """Load a position snapshot (e.g. from the risk manager or end-of-day files)"""
+
+        state = self.clients[client_id]
+        position = state.positions.get(symbol)
+        if position is None:
+            position = state.positions[symbol] = PositionState(sector)
+            self.holders[symbol].add(client_id)
+        elif position.sector != sector:
+            state.revalue(position, 0.0)
+            position.sector = sector
+
+        position.quantity = quantity
+        position.avg_price = avg_price
+        position.price = price
+        position.realized_pnl = realized_pnl
+        self.last_prices[symbol] = price
+        state.revalue(position, quantity * price if market_value is None else market_value)
+
+    def mark_price(self, symbol: str, price: float):
+        """Revalue every client holding `symbol` at a new market price"""
+
+        self.last_prices[symbol] = price
+        for client_id in self.holders.get(symbol, ()):
+            state = self.clients[client_id]
+            position = state.positions[symbol]
+            position.price = price
+            state.revalue(position, position.quantity * price)
+
+    # Queries
+
+    def check_order(
+        self,
+        client_id: str,
+        symbol: str,
+        side: Any,
+        quantity: int,
+        price: Optional[float] = None
+    ) -> PreTradeResult:
+        """Projected utilization of every active limit if the order filled at `price`
+
+        Market orders (no price) are valued at the last known price. An order
+        that cannot be valued is rejected when the client has any limits,
+        rather than counted as zero exposure.
+        """
+
+        self.stats["checks"] += 1
+        state = self.clients.get(client_id, _NO_CLIENT)
+        position = state.positions.get(symbol)
+
+        if position is None:
+            old_quantity, old_value, sector = 0, 0.0, "Unknown"
+            price = price or self.last_prices.get(symbol, 0.0)
+        else:
+            old_quantity, old_value, sector = position.quantity, position.value, position.sector
+            price = price or position.price
+
+        if not price:
+            approved = not any(limit.is_active for entries in state.limits.values() for limit, _ in entries)
+            if not approved:
+                self.stats["rejections"] += 1
+            return PreTradeResult(approved, [], old_value, state.portfolio_value, priced=False)
+
+        new_value = (old_quantity + side_sign(side) * quantity) * price
+        portfolio = state.portfolio_value - old_value + new_value
+
+        checks = []
+        approved = True
+        limits = state.limits
+        if limits:
+            for limit_type, measure in (
+                (POSITION_LIMIT, abs(new_value)),
+                (PORTFOLIO_LIMIT, portfolio),
+                (CONCENTRATION_LIMIT, abs(new_value) / portfolio if portfolio > 0 else None),
+                (SECTOR_LIMIT, (state.sector_values.get(sector, 0.0) - old_value + new_value) / portfolio
+                 if portfolio > 0 else None)
+            ):
+                if measure is None:
+                    continue
+                for limit, symbols in limits.get(limit_type, ()):
+                    if not limit.is_active or (symbols is not None and symbol not in symbols):
+                        continue
+                    utilization = measure / limit.limit_value if limit.limit_value > 0 else float("inf")
+                    checks.append(LimitCheck(limit.limit_id, limit_type, utilization, limit.is_hard_limit))
+                    if utilization > 1.0 and limit.is_hard_limit:
+                        approved = False
+
+        if not approved:
+            self.stats["rejections"] += 1
+        return PreTradeResult(approved, checks, new_value, portfolio)
+
+    def utilization(self, client_id: str) -> Dict[str, float]:
+        """Current utilization of each active limit, keyed by limit_id"""
+
+        state = self.clients.get(client_id, _NO_CLIENT)
+        portfolio = state.portfolio_value
+        result = {}
+        for limit_type, limits in state.limits.items():
+            for limit, symbols in limits:
+                if not limit.is_active or limit.limit_value <= 0:
+                    continue
+                if limit_type == PORTFOLIO_LIMIT:
+                    measure = portfolio
+                elif limit_type == POSITION_LIMIT:
+                    measure = max((abs(p.value) for s, p in state.positions.items()
+                                   if symbols is None or s in symbols), default=0.0)
+                elif limit_type == CONCENTRATION_LIMIT:
+                    largest = max((abs(p.value) for p in state.positions.values()), default=0.0)
+                    measure = largest / portfolio if portfolio > 0 else 0.0
+                elif limit_type == SECTOR_LIMIT:
+                    measure = max(state.sector_values.values(), default=0.0) / portfolio if portfolio > 0 else 0.0
+                else:
+                    continue
+                result[limit.limit_id] = measure / limit.limit_value
+        return result
+
+    def exposure(self, client_id: str) -> Dict[str, Any]:
+        state = self.clients.get(client_id, _NO_CLIENT)
+        return {
+            "portfolio_value": state.portfolio_value,
+            "gross_exposure": state.gross_exposure,
+            "sector_values": dict(state.sector_values),
+            "positions": len(state.positions)
+        }
+
+
+# Shared by the risk manager and the execution engine so fills reach pre-trade checks
+position_state_engine = PositionStateEngine()
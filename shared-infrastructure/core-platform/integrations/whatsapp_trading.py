@@ -6,6 +6,8 @@ Integrates with WhatsApp Business API for seamless trading experience.
 """
 
 from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
@@ -15,15 +17,15 @@ import uuid
 import qrcode
 import io
 import base64
-from PIL import Image, ImageDraw, ImageFont
 
-from app.core.database import get_db
+from app.core.database import get_async_db, run_sync
 from app.core.auth import get_current_user
 from app.core.logging import logger
 from app.models.trading import Trade, TradeOrder
 from app.models.whatsapp import WhatsAppSession, WhatsAppMessage
 from app.services.trading_engine import TradingEngine
-from app.services.chart_generator import ChartImageGenerator
+from app.api.charting import chart_manager
+from app.charting.core.render_service import ChartBars, RenderSpec, drawing_spec
 from app.services.whatsapp_client import WhatsAppClient
 from app.services.risk_management import RiskManager
 
@@ -85,7 +87,8 @@ class WhatsAppTradingManager:
     def __init__(self):
         self.whatsapp_client = WhatsAppClient()
         self.trading_engine = TradingEngine()
-        self.chart_generator = ChartImageGenerator()
+        self.chart_engine = chart_manager.engine
+        self.render_service = self.chart_engine.render_service
         self.risk_manager = RiskManager()
         
         # Trading presets for quick actions
@@ -220,25 +223,24 @@ class WhatsAppTradingManager:
         """Generate chart image for WhatsApp sharing"""
         
         try:
-            # Generate chart with trading context
-            chart_config = {
-                'symbol': chart_request.symbol,
-                'timeframe': chart_request.timeframe,
-                'indicators': chart_request.indicators,
-                'drawing_tools': chart_request.drawing_tools,
-                'width': 800,
-                'height': 600,
-                'format': 'png',
-                'whatsapp_optimized': True
-            }
-            
-            chart_image = await self.chart_generator.generate_chart(chart_config)
+            # Bars of the symbol's open chart (one is opened if nobody has it up)
+            try:
+                bars = await self.chart_engine.get_bars(chart_request.symbol, chart_request.timeframe)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
             
-            # Add trading buttons overlay if requested
-            if chart_request.include_trade_buttons:
-                chart_image = await self._add_trading_buttons_overlay(
-                    chart_image, chart_request.symbol
-                )
+            # Render off the event loop; shares of the same chart around market events hit the render cache
+            spec = RenderSpec(
+                symbol=chart_request.symbol,
+                timeframe=chart_request.timeframe,
+                width=800,
+                height=600,
+                format='png',
+                indicators=tuple(chart_request.indicators),
+                drawings=tuple(filter(None, map(drawing_spec, chart_request.drawing_tools))),
+                trade_buttons=chart_request.include_trade_buttons
+            )
+            chart_image = await self.render_service.render(spec, ChartBars.from_ohlcv(bars))
             
             # Upload to cloud storage
             chart_url = await self._upload_chart_image(chart_image, user_id)
@@ -288,6 +290,8 @@ class WhatsAppTradingManager:
                 'expires_at': datetime.utcnow() + timedelta(hours=24)
             }
         
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"WhatsApp chart generation error: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -441,11 +445,11 @@ class WhatsAppTradingManager:
     ) -> WhatsAppSession:
         """Validate WhatsApp session and permissions"""
         
-        session = db.query(WhatsAppSession).filter(
+        session = await run_sync(db, lambda sync_db: sync_db.query(WhatsAppSession).filter(
             WhatsAppSession.user_id == user_id,
             WhatsAppSession.phone_number == whatsapp_number,
             WhatsAppSession.status == 'active'
-        ).first()
+        ).first())
         
         if not session:
             raise HTTPException(
@@ -465,69 +469,6 @@ class WhatsAppTradingManager:
             price=trade_request.price or 'Market Price'
         )
     
-    async def _add_trading_buttons_overlay(self, chart_image: bytes, symbol: str) -> bytes:
-        """Add trading action buttons overlay to chart image"""
-        
-        # Convert bytes to PIL Image
-        image = Image.open(io.BytesIO(chart_image))
-        draw = ImageDraw.Draw(image)
-        
-        # Add semi-transparent overlay for buttons
-        overlay = Image.new('RGBA', image.size, (0, 0, 0, 0))
-        overlay_draw = ImageDraw.Draw(overlay)
-        
-        # Draw button backgrounds
-        button_height = 40
-        button_width = 120
-        margin = 10
-        
-        # Buy button (green)
-        buy_button_rect = [
-            margin, 
-            image.height - button_height - margin,
-            margin + button_width, 
-            image.height - margin
-        ]
-        overlay_draw.rectangle(buy_button_rect, fill=(34, 197, 94, 200))
-        
-        # Sell button (red)
-        sell_button_rect = [
-            margin * 2 + button_width, 
-            image.height - button_height - margin,
-            margin * 2 + button_width * 2, 
-            image.height - margin
-        ]
-        overlay_draw.rectangle(sell_button_rect, fill=(239, 68, 68, 200))
-        
-        # Composite overlay onto original image
-        image = Image.alpha_composite(image.convert('RGBA'), overlay)
-        
-        # Add button text
-        try:
-            font = ImageFont.truetype("arial.ttf", 14)
-        except:
-            font = ImageFont.load_default()
-        
-        # Draw button text
-        draw = ImageDraw.Draw(image)
-        draw.text(
-            (margin + button_width//2 - 15, image.height - button_height//2 - margin - 5),
-            "BUY", 
-            fill='white', 
-            font=font
-        )
-        draw.text(
-            (margin * 2 + button_width + button_width//2 - 20, image.height - button_height//2 - margin - 5),
-            "SELL", 
-            fill='white', 
-            font=font
-        )
-        
-        # Convert back to bytes
-        output = io.BytesIO()
-        image.convert('RGB').save(output, format='PNG')
-        return output.getvalue()
-    
     async def _upload_chart_image(self, image_data: bytes, user_id: str) -> str:
         """Upload chart image to cloud storage and return URL"""
         
@@ -641,7 +582,7 @@ whatsapp_trading = WhatsAppTradingManager()
 async def execute_whatsapp_trade(
     trade_request: WhatsAppTradeRequest,
     user: Dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Execute trade from WhatsApp message"""
     
@@ -662,7 +603,7 @@ async def execute_whatsapp_trade(
 async def generate_whatsapp_chart(
     chart_request: WhatsAppChartRequest,
     user: Dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Generate chart for WhatsApp sharing"""
     
@@ -682,7 +623,7 @@ async def generate_whatsapp_chart(
 async def execute_quick_trade(
     quick_trade_request: WhatsAppQuickTradeRequest,
     user: Dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Execute predefined quick trade"""
     
@@ -697,7 +638,7 @@ async def execute_quick_trade(
 async def setup_whatsapp_alert(
     alert_request: WhatsAppAlertRequest,
     user: Dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Setup WhatsApp price/pattern alert"""
     
@@ -711,7 +652,7 @@ async def setup_whatsapp_alert(
 @router.post("/callback")
 async def handle_whatsapp_callback(
     callback_data: Dict[str, Any],
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Handle WhatsApp callbacks and responses"""
     
@@ -742,14 +683,14 @@ async def get_trade_presets():
 async def get_whatsapp_session(
     phone_number: str,
     user: Dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get WhatsApp session status"""
     
-    session = db.query(WhatsAppSession).filter(
+    session = await db.scalar(select(WhatsAppSession).where(
         WhatsAppSession.user_id == user["id"],
         WhatsAppSession.phone_number == phone_number
-    ).first()
+    ).limit(1))
     
     if not session:
         return {'verified': False, 'status': 'not_found'}
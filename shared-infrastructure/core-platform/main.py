@@ -13,8 +13,12 @@ import logging
 from app.core.config import settings
 from app.core.database import init_db
 from app.api.v1.api import api_router
-from app.whatsapp.webhook import whatsapp_router
+from app.whatsapp.webhook import inbound_queue, whatsapp_router
+from app.whatsapp.dispatcher import close_dispatchers
 from app.core.logging import setup_logging
+from app.monitoring.tracing import configure_tracing
+from app.api.profiling import router as profiling_router
+from app.ai_moderator.moderator_engine import shutdown_language_pools
 
 # Setup logging
 setup_logging()
@@ -28,11 +32,17 @@ async def lifespan(app: FastAPI):
     logger.info("🚀 GridWorks starting up...")
     await init_db()
     logger.info("✅ Database initialized")
+    await inbound_queue.start()
+    configure_tracing(settings.TRACE_SAMPLE_RATE, settings.TRACE_EXPORT_PATH, settings.APP_NAME.lower())
     
     yield
     
     # Shutdown
     logger.info("📴 GridWorks shutting down...")
+    configure_tracing(0.0)  # Flushes and closes the span exporter
+    shutdown_language_pools()
+    await inbound_queue.stop()  # Unfinished items resume on next start
+    await close_dispatchers()
 
 
 def create_application() -> FastAPI:
@@ -61,6 +71,8 @@ def create_application() -> FastAPI:
     # Include routers
     app.include_router(api_router, prefix="/api/v1")
     app.include_router(whatsapp_router, prefix="/whatsapp")
+    if settings.ENABLE_PROFILING:
+        app.include_router(profiling_router)
     
     @app.get("/")
     async def root():
@@ -25,6 +25,8 @@ import psutil
 import aioredis
 import aiohttp
 
+from app.monitoring.tracing import tracer
+
 
 class AlertSeverity(Enum):
     """Alert severity levels"""
@@ -832,7 +834,8 @@ def monitor_performance(operation_name: str):
             start_time = time.time()
             
             try:
-                result = await func(*args, **kwargs)
+                with tracer.span(operation_name):
+                    result = await func(*args, **kwargs)
                 
                 # Record performance metric
                 duration = (time.time() - start_time) * 1000  # Convert to milliseconds
@@ -17,6 +17,7 @@ import psutil
 import aioredis
 from contextlib import asynccontextmanager
 
+from app.monitoring.metrics_rollup import MetricRollupWriter
 from app.core.database import get_db
 from app.core.auth import get_current_user
 from app.core.logging import logger
@@ -83,6 +84,7 @@ class PerformanceMonitor:
     
     def __init__(self):
         self.redis = None
+        self.rollups: Optional[MetricRollupWriter] = None
         self.notification_service = NotificationService()
         self.alert_configs = {}
         self.running = False
@@ -108,9 +110,11 @@ class PerformanceMonitor:
         """Initialize monitoring system"""
         try:
             self.redis = await aioredis.from_url("redis://localhost:6379")
+            self.rollups = MetricRollupWriter(self.redis, namespace="perf")
             self.running = True
             
             # Start background monitoring tasks
+            asyncio.create_task(self.rollups.run())
             asyncio.create_task(self.system_metrics_collector())
             asyncio.create_task(self.alert_processor())
             
@@ -192,33 +196,25 @@ class PerformanceMonitor:
             raise
     
     async def _cache_performance_metric(self, metric: PerformanceMetricRequest):
-        """Cache performance metric in Redis"""
+        """Fold performance metric into the Redis rollups"""
         
-        if not self.redis:
+        if not self.rollups:
             return
         
         try:
-            # Store in time-series format
-            key = f"perf:{metric.metric_name}:{datetime.utcnow().strftime('%Y%m%d%H%M')}"
-            
-            await self.redis.zadd(
-                key,
-                {json.dumps({
-                    'value': metric.value,
-                    'timestamp': time.time(),
-                    'context': metric.context
-                }): time.time()}
+            # Buffered locally; flushed to Redis as pre-aggregated buckets
+            timestamp = metric.timestamp.timestamp() if metric.timestamp else time.time()
+            self.rollups.record(
+                metric.metric_name,
+                metric.value,
+                timestamp=timestamp,
+                thresholds=(self.thresholds[metric.metric_name],)
+                if metric.metric_name in self.thresholds else (),
+                session_id=metric.session_id
             )
             
-            # Set expiration (24 hours)
-            await self.redis.expire(key, 86400)
-            
             # Update real-time stats
-            await self.redis.hset(
-                "perf:current",
-                metric.metric_name,
-                metric.value
-            )
+            self.rollups.set_gauge("perf:current", metric.metric_name, metric.value)
         
         except Exception as e:
             logger.error(f"Error caching performance metric: {e}")
@@ -226,24 +222,21 @@ class PerformanceMonitor:
     async def _cache_user_interaction(self, interaction: UserInteractionRequest):
         """Cache user interaction in Redis"""
         
-        if not self.redis:
+        if not self.rollups:
             return
         
         try:
             # Count interactions by feature
-            await self.redis.hincrby(
+            self.rollups.incr_counter(
                 "interactions:count",
-                f"{interaction.feature}:{interaction.interaction_type}",
-                1
+                f"{interaction.feature}:{interaction.interaction_type}"
             )
             
             # Track errors
             if not interaction.success:
-                await self.redis.hincrby(
-                    "interactions:errors",
-                    interaction.feature,
-                    1
-                )
+                self.rollups.incr_counter("interactions:errors", interaction.feature)
+            
+            self.rollups.track_session(interaction.session_id)
         
         except Exception as e:
             logger.error(f"Error caching user interaction: {e}")
@@ -359,6 +352,7 @@ class PerformanceMonitor:
         try:
             # Get current metrics
             current_metrics = await self.redis.hgetall("perf:current")
+            window_seconds = time_window_minutes * 60
             
             # Get interaction counts
             interactions = await self.redis.hgetall("interactions:count")
@@ -369,22 +363,25 @@ class PerformanceMonitor:
             total_errors = sum(int(count) for count in errors.values())
             error_rate = (total_errors / total_interactions * 100) if total_interactions > 0 else 0
             
+            stats = {}
+            for stat_name, metric_name in [
+                ('chart_load_time', 'chart_load_time'),
+                ('indicator_calculation_time', 'indicator_calculation'),
+                ('websocket_latency', 'websocket_latency')
+            ]:
+                summary = await self.rollups.read_window(metric_name, window_seconds)
+                stats[stat_name] = {
+                    'current': float(current_metrics.get(metric_name, 0)),
+                    'average': round(summary.mean, 2),
+                    'p95': round(summary.quantile(0.95), 2),
+                    'threshold': self.thresholds[metric_name]
+                }
+            
             return {
-                'chart_load_time': {
-                    'current': float(current_metrics.get('chart_load_time', 0)),
-                    'threshold': self.thresholds['chart_load_time']
-                },
-                'indicator_calculation_time': {
-                    'current': float(current_metrics.get('indicator_calculation', 0)),
-                    'threshold': self.thresholds['indicator_calculation']
-                },
-                'websocket_latency': {
-                    'current': float(current_metrics.get('websocket_latency', 0)),
-                    'threshold': self.thresholds['websocket_latency']
-                },
+                **stats,
                 'user_interactions': dict(interactions),
                 'error_rate': round(error_rate, 2),
-                'active_sessions': len(await self.redis.keys("session:*"))
+                'active_sessions': await self.rollups.count_active_sessions()
             }
         
         except Exception as e:
@@ -554,6 +551,8 @@ async def startup_monitoring():
 async def shutdown_monitoring():
     """Shutdown monitoring system"""
     perf_monitor.running = False
+    if perf_monitor.rollups:
+        await perf_monitor.rollups.stop()
     if perf_monitor.redis:
         await perf_monitor.redis.close()
     logger.info("Performance monitoring system stopped")
\ No newline at end of file
@@ -0,0 +1,355 @@
+"""
+GridWorks Span Tracing & Sampling Profiler
+==========================================
+Lightweight hot-path tracing shared by the charting and trading pipelines
+
+Spans nest through a ContextVar, so a span opened in a coroutine is the
+parent of spans opened in tasks it creates (asyncio copies the context into
+every task). Sampling is decided once per trace at the root span; unsampled
+traces and a disabled tracer hand out a shared no-op span, so instrumented
+code costs a couple of attribute lookups when tracing is off.
+
+Finished spans are aggregated per name and, when an export path is
+configured, written in batches as OTLP/JSON lines (one
+ExportTraceServiceRequest per line) that the OpenTelemetry collector's file
+receiver and most trace viewers can load.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _NoopSpan:
+    """Stands in for a span when tracing is disabled or the trace is unsampled"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+# Innermost open span of the current task; _NOOP inside an unsampled trace
+_current_span: ContextVar[Any] = ContextVar("gridworks_current_span", default=None)
+
+
+class _UnsampledTrace(_NoopSpan):
+    """Root of an unsampled trace: marks the context so nested spans are no-ops too"""
+
+    __slots__ = ("_token",)
+
+    def __enter__(self):
+        self._token = _current_span.set(_NOOP)
+        return _NOOP
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+class Span:
+    """A timed operation within a trace"""
+
+    __slots__ = (
+        "tracer", "name", "trace_id", "span_id", "parent_id", "attributes",
+        "start_unix_ns", "duration_ns", "error", "_start", "_token"
+    )
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_id: Optional[str],
+                 attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.duration_ns = 0
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        self.start_unix_ns = time.time_ns()
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration_ns = time.perf_counter_ns() - self._start
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        self.tracer._finish(self)
+        return False
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return self.__exit__(exc_type, exc, tb)
+
+
+class OTLPJsonFileExporter:
+    """Appends span batches to a file as OTLP/JSON lines"""
+
+    def __init__(self, path: str, service_name: str = "gridworks"):
+        self.path = path
+        self.resource = {"attributes": [_otlp_attribute("service.name", service_name)]}
+        self._file = None
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]):
+        request = {
+            "resourceSpans": [{
+                "resource": self.resource,
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [self._encode(span) for span in spans]
+                }]
+            }]
+        }
+        line = json.dumps(request, separators=(",", ":"), default=str)
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.path, "a")
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    @staticmethod
+    def _encode(span: Span) -> Dict[str, Any]:
+        encoded = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(span.start_unix_ns),
+            "endTimeUnixNano": str(span.start_unix_ns + span.duration_ns),
+            "attributes": [_otlp_attribute(key, value) for key, value in span.attributes.items()],
+            "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+        }
+        if span.parent_id:
+            encoded["parentSpanId"] = span.parent_id
+        return encoded
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class Tracer:
+    """Creates spans, samples traces and aggregates finished spans by name"""
+
+    def __init__(self, sample_rate: float = 0.0, exporter: Optional[OTLPJsonFileExporter] = None,
+                 batch_size: int = 512, recent: int = 1000):
+        self.sample_rate = sample_rate
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.recent: deque = deque(maxlen=recent)
+        self.stats: Dict[str, List[int]] = {}  # name -> [count, total_ns, max_ns, errors]
+        self._pending: List[Span] = []
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def span(self, name: str, **attributes):
+        """Context manager (sync or async) timing `name` as a child of the current span"""
+
+        if self.sample_rate <= 0:
+            return _NOOP
+
+        parent = _current_span.get()
+        if parent is None:
+            if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                return _UnsampledTrace()
+            return Span(self, name, "%032x" % random.getrandbits(128), None, attributes)
+        if parent is _NOOP:
+            return _NOOP
+        return Span(self, name, parent.trace_id, parent.span_id, attributes)
+
+    def traced(self, name: Optional[str] = None, **attributes):
+        """Decorator wrapping each call of a function or coroutine function in a span"""
+
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            if asyncio.iscoroutinefunction(func):
+                @wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(span_name, **attributes):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, **attributes):
+                    return func(*args, **kwargs)
+            return wrapper
+
+        return decorator
+
+    def current_span(self) -> Optional[Span]:
+        span = _current_span.get()
+        return span if isinstance(span, Span) else None
+
+    def _finish(self, span: Span):
+        with self._lock:
+            stats = self.stats.get(span.name)
+            if stats is None:
+                stats = self.stats[span.name] = [0, 0, 0, 0]
+            stats[0] += 1
+            stats[1] += span.duration_ns
+            stats[2] = max(stats[2], span.duration_ns)
+            if span.error:
+                stats[3] += 1
+            self.recent.append(span)
+
+            if self.exporter is None:
+                return
+            self._pending.append(span)
+            if len(self._pending) < self.batch_size:
+                return
+            batch, self._pending = self._pending, []
+        self._export(batch)
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self._export(batch)
+
+    def _export(self, batch: List[Span]):
+        try:
+            self.exporter.export(batch)
+        except Exception as e:
+            logger.error(f"Span export failed, dropped {len(batch)} spans: {e}")
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-span-name count, mean and max duration (ms) and error count"""
+        with self._lock:
+            return {
+                name: {
+                    "count": count,
+                    "mean_ms": total / count / 1e6,
+                    "max_ms": longest / 1e6,
+                    "errors": errors
+                }
+                for name, (count, total, longest, errors) in self.stats.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+            self.recent.clear()
+
+
+# Process-wide tracer; disabled until configure_tracing() is called
+tracer = Tracer()
+
+
+def configure_tracing(sample_rate: float, export_path: Optional[str] = None,
+                      service_name: str = "gridworks") -> Tracer:
+    """Reconfigure the process-wide tracer in place, so existing imports see the change"""
+
+    if not 0.0 <= sample_rate <= 1.0:
+        raise ValueError("Trace sample rate must be between 0 and 1")
+
+    tracer.flush()
+    if tracer.exporter is not None:
+        tracer.exporter.close()
+    tracer.exporter = OTLPJsonFileExporter(export_path, service_name) if export_path else None
+    tracer.sample_rate = sample_rate
+    return tracer
+
+
+class SamplingProfiler:
+    """On-demand wall-clock sampler of every thread's Python stack
+
+    Output is folded stacks ("outer;inner;leaf" -> samples), the input
+    format of flame graph tools. Run it off the event loop (e.g. with
+    asyncio.to_thread) so the loop's own stack is what gets sampled.
+    """
+
+    def __init__(self, max_depth: int = 64):
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(self, seconds: float, interval: float = 0.005, top: int = 200) -> Dict[str, Any]:
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            own_thread = threading.get_ident()
+            stacks: Counter = Counter()
+            samples = 0
+            deadline = time.perf_counter() + seconds
+
+            while time.perf_counter() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_thread:
+                        continue
+                    stack = []
+                    while frame is not None and len(stack) < self.max_depth:
+                        code = frame.f_code
+                        stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                        frame = frame.f_back
+                    stacks[";".join(reversed(stack))] += 1
+                samples += 1
+                time.sleep(interval)
+
+            return {
+                "seconds": seconds,
+                "interval_ms": interval * 1000,
+                "samples": samples,
+                "stacks": [{"stack": stack, "count": count} for stack, count in stacks.most_common(top)]
+            }
+        finally:
+            self._lock.release()
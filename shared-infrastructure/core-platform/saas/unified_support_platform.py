@@ -536,8 +536,7 @@ class TradeMateUnifiedSupportPlatform:
         Handle WhatsApp message delivery with partner branding
         """
         
-        whatsapp_client = WhatsAppBusinessAPI(partner_config.whatsapp_config)
-        await whatsapp_client.initialize()
+        whatsapp_client = await self.whatsapp_support.get_whatsapp_client(partner_config.whatsapp_config)
         
         # Format response with partner branding
         branded_response = f"""
@@ -554,8 +553,6 @@ class TradeMateUnifiedSupportPlatform:
             branded_response
         )
         
-        await whatsapp_client.session.close()
-        
         return {
             "success": delivery_result.get("success", False),
             "message_id": delivery_result.get("message_id"),
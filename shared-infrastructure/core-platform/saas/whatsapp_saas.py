@@ -10,9 +10,11 @@ from typing import Dict, List, Optional, Any, Union, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
-import aiohttp
 from datetime import datetime
 
+from app.whatsapp.dispatcher import get_dispatcher
+from app.ai_support.intent_matcher import VERNACULAR_PATTERNS, get_message_classifier
+
 # WhatsApp SaaS Components
 class MessageType(Enum):
     TEXT = "text"
@@ -78,22 +80,44 @@ class PartnerWhatsAppConfig:
 class WhatsAppBusinessAPI:
     """
     WhatsApp Business API integration for SaaS partners
+    
+    Sends through the process-wide dispatcher for the partner's number, so
+    every conversation reuses one pooled connection and one rate limiter.
     """
     
     def __init__(self, partner_config: PartnerWhatsAppConfig):
         self.partner_config = partner_config
-        self.base_url = "https://graph.facebook.com/v18.0"
-        self.session = None
+        self.dispatcher = None
         
     async def initialize(self):
-        """Initialize HTTP session for API calls"""
-        self.session = aiohttp.ClientSession(
-            headers={
-                "Authorization": f"Bearer {self.partner_config.access_token}",
-                "Content-Type": "application/json"
-            }
+        """Attach to the shared connection pool for the partner's number"""
+        self.dispatcher = get_dispatcher(
+            self.partner_config.whatsapp_business_number,
+            self.partner_config.access_token
         )
     
+    async def _send(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send payload and normalise the Cloud API result"""
+        
+        if self.dispatcher is None:
+            await self.initialize()
+        
+        result = await self.dispatcher.send(payload)
+        
+        if "error" not in result:
+            return {
+                "success": True,
+                "message_id": result.get("messages", [{}])[0].get("id"),
+                "status": "sent"
+            }
+        else:
+            error = result["error"]
+            return {
+                "success": False,
+                "error": error.get("error", error) if isinstance(error, dict) else error,
+                "status": "failed"
+            }
+    
     async def send_text_message(self, 
                               to_number: str, 
                               message: str,
@@ -114,23 +138,7 @@ class WhatsAppBusinessAPI:
         if context_id:
             payload["context"] = {"message_id": context_id}
         
-        url = f"{self.base_url}/{self.partner_config.whatsapp_business_number}/messages"
-        
-        async with self.session.post(url, json=payload) as response:
-            result = await response.json()
-            
-            if response.status == 200:
-                return {
-                    "success": True,
-                    "message_id": result.get("messages", [{}])[0].get("id"),
-                    "status": "sent"
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": result.get("error", {}),
-                    "status": "failed"
-                }
+        return await self._send(payload)
     
     async def send_interactive_message(self, 
                                      to_number: str, 
@@ -146,23 +154,7 @@ class WhatsAppBusinessAPI:
             "interactive": interactive_content
         }
         
-        url = f"{self.base_url}/{self.partner_config.whatsapp_business_number}/messages"
-        
-        async with self.session.post(url, json=payload) as response:
-            result = await response.json()
-            
-            if response.status == 200:
-                return {
-                    "success": True,
-                    "message_id": result.get("messages", [{}])[0].get("id"),
-                    "status": "sent"
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": result.get("error", {}),
-                    "status": "failed"
-                }
+        return await self._send(payload)
     
     async def send_media_message(self, 
                                to_number: str, 
@@ -185,15 +177,9 @@ class WhatsAppBusinessAPI:
         if caption:
             payload[media_type]["caption"] = caption
         
-        url = f"{self.base_url}/{self.partner_config.whatsapp_business_number}/messages"
-        
-        async with self.session.post(url, json=payload) as response:
-            result = await response.json()
-            return {
-                "success": response.status == 200,
-                "message_id": result.get("messages", [{}])[0].get("id") if response.status == 200 else None,
-                "status": "sent" if response.status == 200 else "failed"
-            }
+        result = await self._send(payload)
+        result.pop("error", None)
+        return result
 
 class VernacularMessageProcessor:
     """
@@ -201,36 +187,8 @@ class VernacularMessageProcessor:
     """
     
     def __init__(self):
-        self.language_patterns = {
-            "Hindi": {
-                "greetings": ["नमस्ते", "नमस्कार", "हेलो", "हाय"],
-                "help_requests": ["मदद", "सहायता", "हेल्प", "समस्या"],
-                "account_queries": ["खाता", "अकाउंट", "बैलेंस", "पैसा"],
-                "trading_queries": ["ट्रेड", "शेयर", "स्टॉक", "खरीदना", "बेचना"],
-                "gratitude": ["धन्यवाद", "शुक्रिया", "थैंक यू"]
-            },
-            "Bengali": {
-                "greetings": ["নমস্কার", "হ্যালো", "হাই"],
-                "help_requests": ["সাহায্য", "হেল্প", "সমস্যা"],
-                "account_queries": ["অ্যাকাউন্ট", "ব্যালেন্স", "টাকা"],
-                "trading_queries": ["ট্রেড", "শেয়ার", "স্টক", "কেনা", "বেচা"],
-                "gratitude": ["ধন্যবাদ", "থ্যাংক ইউ"]
-            },
-            "Tamil": {
-                "greetings": ["வணக்கம்", "ஹலோ", "ஹாய்"],
-                "help_requests": ["உதவி", "ஹெல்ப்", "பிரச்சனை"],
-                "account_queries": ["கணக்கு", "பேலன்ஸ்", "பணம்"],
-                "trading_queries": ["ட்ரேட்", "ஷேர்", "ஸ்டாக்", "வாங்க", "விற்க"],
-                "gratitude": ["நன்றி", "தேங்க் யூ"]
-            },
-            "Telugu": {
-                "greetings": ["నమస్కారం", "హలో", "హాయ్"],
-                "help_requests": ["సహాయం", "హెల్ప్", "సమస్య"],
-                "account_queries": ["ఖాతా", "బ్యాలెన్స్", "డబ్బు"],
-                "trading_queries": ["ట్రేడ్", "షేర్", "స్టాక్", "కొనుగోలు", "అమ్మకం"],
-                "gratitude": ["ధన్యవాదాలు", "థాంక్ యూ"]
-            }
-        }
+        self.language_patterns = VERNACULAR_PATTERNS
+        self.classifier = get_message_classifier()
         
         self.financial_terms = {
             "Hindi": {
@@ -261,21 +219,12 @@ class VernacularMessageProcessor:
         """
         
         detected_language = "English"  # Default
-        intent_scores = {}
+        
+        # One pass over every language's vocabulary
+        analysis = self.classifier.analyze(message_text)
         
         # Language detection
-        for language, patterns in self.language_patterns.items():
-            language_score = 0
-            total_patterns = 0
-            
-            for category, words in patterns.items():
-                total_patterns += len(words)
-                for word in words:
-                    if word in message_text:
-                        language_score += 1
-            
-            if total_patterns > 0:
-                intent_scores[language] = language_score / total_patterns
+        intent_scores = analysis.vernacular_scores()
         
         if intent_scores:
             detected_language = max(intent_scores.items(), key=lambda x: x[1])[0]
@@ -283,18 +232,7 @@ class VernacularMessageProcessor:
         # Intent detection
         intent = "general_query"
         if detected_language in self.language_patterns:
-            patterns = self.language_patterns[detected_language]
-            
-            if any(word in message_text for word in patterns.get("account_queries", [])):
-                intent = "account_query"
-            elif any(word in message_text for word in patterns.get("trading_queries", [])):
-                intent = "trading_query"
-            elif any(word in message_text for word in patterns.get("help_requests", [])):
-                intent = "help_request"
-            elif any(word in message_text for word in patterns.get("greetings", [])):
-                intent = "greeting"
-            elif any(word in message_text for word in patterns.get("gratitude", [])):
-                intent = "gratitude"
+            intent = analysis.vernacular_intent(detected_language)
         
         return {
             "language": detected_language,
@@ -313,6 +251,7 @@ class WhatsAppSupportSaaS:
         self.message_processor = VernacularMessageProcessor()
         self.active_conversations = {}  # phone_number -> conversation_context
         self.message_logs = {}  # partner_id -> message_history
+        self.whatsapp_clients = {}  # partner_id -> WhatsAppBusinessAPI
         
     async def register_partner_whatsapp(self, partner_data: Dict) -> PartnerWhatsAppConfig:
         """
@@ -387,9 +326,8 @@ class WhatsAppSupportSaaS:
             if not partner_config:
                 return {"status": "partner_not_found"}
             
-            # Create WhatsApp client
-            whatsapp_client = WhatsAppBusinessAPI(partner_config)
-            await whatsapp_client.initialize()
+            # Reuse the partner's WhatsApp client (and its pooled connection)
+            whatsapp_client = await self.get_whatsapp_client(partner_config)
             
             # Handle different message types
             if message.message_type == MessageType.TEXT:
@@ -416,8 +354,6 @@ class WhatsAppSupportSaaS:
             # Log interaction
             await self._log_message_interaction(partner_id, message, language_result, response)
             
-            await whatsapp_client.session.close()
-            
             return {
                 "status": "processed",
                 "message_id": message.message_id,
@@ -430,6 +366,18 @@ class WhatsAppSupportSaaS:
             logging.error(f"Error handling WhatsApp message: {str(e)}")
             return {"status": "error", "error": str(e)}
     
+    async def get_whatsapp_client(self, partner_config: PartnerWhatsAppConfig) -> WhatsAppBusinessAPI:
+        """
+        Get the cached WhatsApp client for a partner
+        """
+        
+        whatsapp_client = self.whatsapp_clients.get(partner_config.partner_id)
+        if whatsapp_client is None or whatsapp_client.partner_config is not partner_config:
+            whatsapp_client = WhatsAppBusinessAPI(partner_config)
+            await whatsapp_client.initialize()
+            self.whatsapp_clients[partner_config.partner_id] = whatsapp_client
+        return whatsapp_client
+    
     async def _handle_text_message(self, 
                                  message: WhatsAppMessage,
                                  language_result: Dict,
@@ -5,7 +5,8 @@ Unified interface for all AI services with enterprise integration capabilities
 
 import asyncio
 import json
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Set, Tuple, Union
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass, asdict
 from enum import Enum
@@ -17,6 +18,7 @@ from decimal import Decimal
 from app.ai_support import UniversalAISupport, TierUXRenderer, WhatsAppSupportHandler
 from app.ai_intelligence import AIIntelligenceService, GlobalMorningPulse, UserTier as IntelligenceTier
 from app.ai_moderator import AIModerator, ExpertVerificationEngine, GroupManager
+from app.core.rate_limiter import BaseRateLimiter, LocalRateLimiter, RateLimit, Scope
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +51,7 @@ class ClientConfiguration:
     tier_mapping: Optional[Dict[str, str]] = None
     rate_limits: Optional[Dict[str, int]] = None
     billing_config: Optional[Dict[str, Any]] = None
+    partner_id: Optional[str] = None
 
 
 @dataclass
@@ -80,7 +83,7 @@ class GridWorksSDK:
         self.billing_tracker = {}
         
         # Rate limiting
-        self.rate_limiter = RateLimiter(client_config.rate_limits or {})
+        self.rate_limiter = RateLimiter(client_config.rate_limits or {}, partner_id=client_config.partner_id)
         
         logger.info(f"Initialized GridWorks SDK for client: {client_config.client_name}")
     
@@ -546,7 +549,7 @@ class GridWorksSDK:
                 "services_used": list(client_data.get("services_used", [])),
                 "last_request": client_data.get("last_request", {}).isoformat() if client_data.get("last_request") else None
             },
-            "rate_limits": self.rate_limiter.get_current_usage(self.client_id),
+            "rate_limits": await self.rate_limiter.get_current_usage(self.client_id),
             "service_health": await self._check_service_health()
         }
     
@@ -589,50 +592,67 @@ class GridWorksSDK:
 
 
 class RateLimiter:
-    """Rate limiting for API requests"""
-    
-    def __init__(self, rate_limits: Dict[str, int]):
+    """Rate limiting for API requests, hierarchical partner -> client -> service
+
+    `rate_limits` are requests per hour keyed by service (default 1000).
+    Optional "partner" and "client" entries cap the totals across services.
+    """
+    
+    def __init__(
+        self,
+        rate_limits: Dict[str, int],
+        partner_id: Optional[str] = None,
+        limiter: Optional[BaseRateLimiter] = None
+    ):
         self.rate_limits = rate_limits
-        self.request_counts = {}
-        self.last_reset = datetime.now()
+        self.partner_id = partner_id
+        self.limiter = limiter or LocalRateLimiter()
+        self._scopes: Dict[Tuple[str, str], List[Scope]] = {}
+        self._services: Dict[str, Set[str]] = defaultdict(set)
+    
+    def _limit(self, name: str) -> RateLimit:
+        return RateLimit(self.rate_limits.get(name, 1000), 3600.0)
+    
+    def _service_scopes(self, client_id: str, service: str) -> List[Scope]:
+        """Scopes checked for a request, built once per client and service"""
+        
+        scopes = self._scopes.get((client_id, service))
+        if scopes is None:
+            root = (self.partner_id,) if self.partner_id else ()
+            client = root + (client_id,)
+            scopes = []
+            if root and "partner" in self.rate_limits:
+                scopes.append((root, self._limit("partner")))
+            if "client" in self.rate_limits:
+                scopes.append((client, self._limit("client")))
+            scopes.append((client + (service,), self._limit(service)))
+            self._scopes[(client_id, service)] = scopes
+            self._services[client_id].add(service)
+        return scopes
     
     async def check_rate_limit(self, client_id: str, service: str) -> bool:
         """Check if request is within rate limits"""
         
-        # Reset counts every hour
-        now = datetime.now()
-        if now - self.last_reset > timedelta(hours=1):
-            self.request_counts = {}
-            self.last_reset = now
-        
-        # Get limits for service
-        service_limit = self.rate_limits.get(service, 1000)  # Default 1000/hour
-        
-        # Check current count
-        key = f"{client_id}_{service}"
-        current_count = self.request_counts.get(key, 0)
-        
-        if current_count >= service_limit:
-            return False
-        
-        # Increment count
-        self.request_counts[key] = current_count + 1
-        return True
+        decision = await self.limiter.check(self._service_scopes(client_id, service))
+        return decision.allowed
     
-    def get_current_usage(self, client_id: str) -> Dict[str, Any]:
+    async def get_current_usage(self, client_id: str) -> Dict[str, Any]:
         """Get current usage statistics"""
         
-        usage = {}
+        services = sorted(self._services.get(client_id, ()))
+        # cost=0 reads capacity without consuming it
+        decisions = await self.limiter.check_many(
+            [self._service_scopes(client_id, service)[-1:] for service in services], cost=0
+        )
         
-        for key, count in self.request_counts.items():
-            if key.startswith(f"{client_id}_"):
-                service = key.split("_", 1)[1]
-                limit = self.rate_limits.get(service, 1000)
-                usage[service] = {
-                    "current": count,
-                    "limit": limit,
-                    "remaining": limit - count
-                }
+        usage = {}
+        for service, decision in zip(services, decisions):
+            limit = self.rate_limits.get(service, 1000)
+            usage[service] = {
+                "current": limit - decision.remaining,
+                "limit": limit,
+                "remaining": decision.remaining
+            }
         
         return usage
 
@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+"""
+GridWorks Market Replay
+=======================
+Deterministic replay of recorded tick sessions through the real market data
+path (DataAggregator -> ChartManager -> IndicatorManager ->
+AlgorithmicAlertsEngine, orders through ExecutionEngine) on a simulated
+clock, with per-stage latency histograms and a baseline comparison so a
+release that slows down the opening-bell path fails the benchmark.
+
+Recordings are gzip-compressed JSON lines: a header object, then one event
+per line, either a tick ["t", offset_ms, symbol, price, volume] or an order
+["o", offset_ms, client_id, symbol, side, quantity, limit_price].
+
+    python -m app.testing.market_replay generate opening_bell.jsonl.gz --seconds 900
+    python -m app.testing.market_replay run opening_bell.jsonl.gz --speed 100 \\
+        --baseline market_replay.json
+
+Latencies are only comparable on the machine that recorded the baseline;
+baselines carry a host fingerprint and are not checked in.
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import math
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+FORMAT = "gridworks-replay"
+FORMAT_VERSION = 1
+
+STAGES = ("aggregate", "chart", "indicators", "alerts", "execution", "tick")
+
+SESSION_OPEN = datetime(2024, 1, 15, 9, 15)  # NSE normal session open
+
+DEFAULT_SYMBOLS = (
+    "NIFTY", "BANKNIFTY", "FINNIFTY", "RELIANCE", "TCS", "HDFCBANK", "INFY", "ICICIBANK",
+    "SBIN", "BHARTIARTL", "ITC", "KOTAKBANK", "LT", "AXISBANK", "HINDUNILVR", "BAJFINANCE",
+    "MARUTI", "ASIANPAINT", "TATAMOTORS", "SUNPHARMA"
+)
+
+DEFAULT_INDICATORS = (
+    ("SMA", {"period": 20}),
+    ("EMA", {"period": 9}),
+    ("RSI", {"period": 14}),
+    ("BOLLINGER", {"period": 20, "stddev": 2})
+)
+
+
+# Recordings
+
+def generate_session(
+    path: str,
+    symbols: Sequence[str] = DEFAULT_SYMBOLS,
+    seconds: float = 900,
+    ticks_per_second: float = 200,
+    orders_per_second: float = 5,
+    start: datetime = SESSION_OPEN,
+    seed: int = 42
+) -> int:
+    """Write a synthetic opening-bell session; the same arguments give a byte-identical file
+
+    Ticks arrive as a Poisson process whose rate starts at five times
+    `ticks_per_second` and decays to it over the first few minutes. Prices
+    follow a geometric random walk per symbol. Returns the number of events.
+    """
+
+    rng = random.Random(seed)
+    prices = {symbol: round(rng.uniform(100, 4000), 2) for symbol in symbols}
+    header = {
+        "format": FORMAT,
+        "version": FORMAT_VERSION,
+        "start": start.isoformat(),
+        "symbols": list(symbols),
+        "seconds": seconds,
+        "seed": seed
+    }
+
+    events = 0
+    offset_ms = 0.0
+    end_ms = seconds * 1000
+    with open(path, "wb") as raw, gzip.GzipFile(filename="", fileobj=raw, mode="wb", mtime=0) as out:
+        out.write((json.dumps(header) + "\n").encode())
+        while True:
+            rate = ticks_per_second * (1 + 4 * math.exp(-offset_ms / 180_000))
+            offset_ms += rng.expovariate(rate) * 1000
+            if offset_ms >= end_ms:
+                break
+
+            symbol = rng.choice(symbols)
+            price = prices[symbol] = round(prices[symbol] * math.exp(rng.gauss(0, 0.0005)), 2)
+            lines = [["t", round(offset_ms, 3), symbol, price, rng.randint(1, 500)]]
+
+            if rng.random() < orders_per_second / rate:
+                side = rng.choice(("BUY", "SELL"))
+                limit_price = round(price * (1 + rng.uniform(-0.001, 0.001)), 2)
+                lines.append(["o", round(offset_ms, 3), f"inst-{rng.randrange(20)}", symbol, side,
+                              rng.randint(1, 50) * 10, limit_price])
+
+            for line in lines:
+                out.write((json.dumps(line, separators=(",", ":")) + "\n").encode())
+            events += len(lines)
+
+    return events
+
+
+class Recording:
+    """A recorded session: header fields plus a stream of events, read lazily"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with gzip.open(path, "rt") as f:
+            self.header = json.loads(f.readline())
+        if self.header.get("format") != FORMAT or self.header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a {FORMAT} v{FORMAT_VERSION} recording")
+        self.start = datetime.fromisoformat(self.header["start"])
+        self.symbols: List[str] = self.header["symbols"]
+
+    def __iter__(self) -> Iterator[list]:
+        with gzip.open(self.path, "rt") as f:
+            f.readline()
+            for line in f:
+                yield json.loads(line)
+
+
+class SimulatedClock:
+    """Replay time, advanced by each event rather than by the wall clock"""
+
+    def __init__(self, start: datetime):
+        self.start = start
+        self.offset_ms = 0.0
+
+    def advance(self, offset_ms: float):
+        self.offset_ms = offset_ms
+
+    def now(self) -> datetime:
+        return self.start + timedelta(milliseconds=self.offset_ms)
+
+    __call__ = now
+
+
+# Measurement
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram (8 buckets per power of two, <10% error)"""
+
+    SUB_BUCKETS = 8
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns: int):
+        index = int(math.log2(ns) * self.SUB_BUCKETS) if ns > 1 else 0
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total_ns += ns
+        self.max_ns = max(self.max_ns, ns)
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile, in nanoseconds"""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(2 ** ((index + 1) / self.SUB_BUCKETS), self.max_ns)
+        return float(self.max_ns)
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_us": self.total_ns / self.count / 1000 if self.count else 0.0,
+            "p50_us": self.percentile(50) / 1000,
+            "p95_us": self.percentile(95) / 1000,
+            "p99_us": self.percentile(99) / 1000,
+            "max_us": self.max_ns / 1000
+        }
+
+
+# Pipeline
+
+class ReplayPipeline:
+    """The live market data path, assembled from the real components
+
+    Ticks are aggregated into candles; each closed candle of `timeframe`
+    updates the symbol's chart and indicators and is scanned for alerts.
+    Orders go through the execution engine, priced off the latest tick.
+    """
+
+    def __init__(
+        self,
+        clock: SimulatedClock,
+        symbols: Sequence[str],
+        timeframe: str = "1m",
+        indicators: Sequence = DEFAULT_INDICATORS
+    ):
+        # Imported here so recordings can be generated and compared without the chart stack
+        from app.analytics.algorithmic_alerts import AlgorithmicAlertsEngine
+        from app.charting.core.chart_manager import ChartManager
+        from app.charting.data_feeds.websocket_manager import DataAggregator
+        from app.institutional.advanced_order_management import ExecutionEngine
+        from app.institutional.position_state import PositionStateEngine
+
+        self.clock = clock
+        self.symbols = list(symbols)
+        self.timeframe = timeframe
+        self.indicator_specs = list(indicators)
+
+        self.aggregator = DataAggregator(clock=clock)
+        self.chart_manager = ChartManager()
+        self.indicator_managers: Dict[str, Any] = {}
+        self.alerts = AlgorithmicAlertsEngine({"symbols": self.symbols})
+        self.position_state = PositionStateEngine()
+        self.execution = ExecutionEngine(self.position_state)
+
+        self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+        self.outputs = {"ticks": 0, "candles": 0, "alert_scans": 0, "orders": 0, "fills": 0, "rejections": 0}
+        self.digest = hashlib.sha256()
+
+    async def start(self):
+        from app.charting.core.chart_engine import ChartConfig, TimeFrame
+        from app.charting.indicators.manager import IndicatorManager
+        from app.institutional.advanced_order_management import (
+            AdvancedOrder, OrderSide, OrderStatus, OrderType
+        )
+        self._order_types = (AdvancedOrder, OrderSide, OrderStatus, OrderType)
+
+        for symbol in self.symbols:
+            chart = await self.chart_manager.engine.create_chart(
+                f"replay-{symbol}", ChartConfig(symbol=symbol, timeframe=TimeFrame(self.timeframe))
+            )
+            indicators = IndicatorManager(chart)
+            for indicator_type, params in self.indicator_specs:
+                await indicators.add_indicator(indicator_type, params, chart.data)
+            self.indicator_managers[symbol] = indicators
+
+    async def on_tick(self, symbol: str, price: float, volume: int):
+        started = time.perf_counter_ns()
+        self.outputs["ticks"] += 1
+        self.execution.update_market_price(symbol, price)
+
+        candle, timeframe = self.aggregator.add_tick(
+            symbol, {"timestamp": self.clock().isoformat(), "price": price, "volume": volume}
+        )
+        self.histograms["aggregate"].record(time.perf_counter_ns() - started)
+
+        if candle is not None and timeframe == self.timeframe:
+            await self._on_candle(symbol, candle)
+
+        self.histograms["tick"].record(time.perf_counter_ns() - started)
+
+    async def _on_candle(self, symbol: str, candle: Dict[str, Any]):
+        self.outputs["candles"] += 1
+        self.digest.update(
+            f"{symbol}|{candle['timestamp']}|{candle['open']}|{candle['high']}|{candle['low']}|"
+            f"{candle['close']}|{candle['volume']}\n".encode()
+        )
+
+        started = time.perf_counter_ns()
+        await self.chart_manager.update_chart_data(symbol, candle)
+        charted = time.perf_counter_ns()
+        self.histograms["chart"].record(charted - started)
+
+        await self.indicator_managers[symbol].update_all(candle)
+        indicated = time.perf_counter_ns()
+        self.histograms["indicators"].record(indicated - charted)
+
+        bar = (
+            datetime.fromisoformat(candle["timestamp"]).timestamp(),
+            candle["open"], candle["high"], candle["low"], candle["close"], candle["volume"]
+        )
+        self.outputs["alert_scans"] += await self.alerts.ingest_bars({symbol: [bar]})
+        self.histograms["alerts"].record(time.perf_counter_ns() - indicated)
+
+    async def on_order(self, client_id: str, symbol: str, side: str, quantity: int, limit_price: float):
+        AdvancedOrder, OrderSide, OrderStatus, OrderType = self._order_types
+        self.outputs["orders"] += 1
+        order = AdvancedOrder(
+            order_id=f"replay-{self.outputs['orders']}",
+            client_id=client_id,
+            strategy_id=None,
+            symbol=symbol,
+            side=OrderSide[side],
+            quantity=quantity,
+            order_type=OrderType.LIMIT,
+            status=OrderStatus.PENDING,
+            price=limit_price
+        )
+
+        started = time.perf_counter_ns()
+        accepted = await self.execution.submit_order(order)
+        self.histograms["execution"].record(time.perf_counter_ns() - started)
+
+        if not accepted:
+            self.outputs["rejections"] += 1
+        elif order.status == OrderStatus.FILLED:
+            self.outputs["fills"] += 1
+        self.digest.update(f"{order.order_id}|{order.status.value}|{order.avg_fill_price}\n".encode())
+
+    async def close(self):
+        # Chart engine cleanup would shut down the process-wide render service
+        self.alerts.stop_monitoring()
+
+
+class MarketReplay:
+    """Drives a recording through a pipeline at `speed` times real time
+
+    `speed=None` replays as fast as the pipeline allows. Paced replays report
+    how far they fell behind schedule (`max_lag_ms`).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        speed: Optional[float] = None,
+        pipeline_factory: Callable[[SimulatedClock, Sequence[str]], Any] = ReplayPipeline
+    ):
+        if speed is not None and speed <= 0:
+            raise ValueError("Replay speed must be positive")
+        self.recording = Recording(path)
+        self.speed = speed
+        self.pipeline_factory = pipeline_factory
+
+    async def run(self) -> Dict[str, Any]:
+        clock = SimulatedClock(self.recording.start)
+        pipeline = self.pipeline_factory(clock, self.recording.symbols)
+        await pipeline.start()
+
+        events = 0
+        max_lag = 0.0
+        started = time.perf_counter()
+        try:
+            for event in self.recording:
+                kind, offset_ms = event[0], event[1]
+                if self.speed:
+                    ahead = offset_ms / 1000 / self.speed - (time.perf_counter() - started)
+                    if ahead > 0.001:
+                        await asyncio.sleep(ahead)
+                    else:
+                        max_lag = max(max_lag, -ahead)
+
+                clock.advance(offset_ms)
+                if kind == "t":
+                    await pipeline.on_tick(*event[2:])
+                elif kind == "o":
+                    await pipeline.on_order(*event[2:])
+                else:
+                    raise ValueError(f"Unknown replay event type: {kind}")
+                events += 1
+        finally:
+            await pipeline.close()
+        elapsed = time.perf_counter() - started
+
+        return {
+            "recording": {k: self.recording.header[k] for k in ("start", "seconds", "seed")},
+            "symbols": len(self.recording.symbols),
+            "speed": self.speed,
+            "events": events,
+            "elapsed_seconds": elapsed,
+            "throughput_eps": events / elapsed if elapsed > 0 else 0.0,
+            "max_lag_ms": max_lag * 1000,
+            "stages": {stage: histogram.summary() for stage, histogram in pipeline.histograms.items()},
+            "outputs": dict(pipeline.outputs),
+            "digest": pipeline.digest.hexdigest()
+        }
+
+
+# Baselines
+
+def host_fingerprint() -> str:
+    """Short hash of the CPU, OS and Python build, identifying where a baseline was recorded"""
+    host = "|".join((
+        platform.system(), platform.machine(), platform.processor(), str(os.cpu_count()),
+        platform.python_implementation(), platform.python_version()
+    ))
+    return hashlib.blake2b(host.encode(), digest_size=6).hexdigest()
+
+
+def save_baseline(report: Dict[str, Any], path: str):
+    baseline = {
+        "host": host_fingerprint(),
+        "recording": report["recording"],
+        "events": report["events"],
+        "throughput_eps": report["throughput_eps"],
+        "stages": {
+            stage: {key: summary[key] for key in ("count", "p50_us", "p99_us")}
+            for stage, summary in report["stages"].items()
+        },
+        "digest": report["digest"]
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.25) -> List[str]:
+    """Regressions against a baseline: stage p50/p99 latency up, or throughput down, by more than `tolerance`
+
+    Throughput is only compared for unthrottled replays of the same recording.
+    """
+
+    regressions = []
+    for stage, base in baseline.get("stages", {}).items():
+        current = report["stages"].get(stage)
+        if not current or not current["count"] or not base["count"]:
+            continue
+        for metric in ("p50_us", "p99_us"):
+            limit = base[metric] * (1 + tolerance)
+            if current[metric] > limit:
+                regressions.append(
+                    f"{stage} {metric} {current[metric]:.1f} exceeds {limit:.1f} (baseline {base[metric]:.1f})"
+                )
+
+    if report["speed"] is None and report["recording"] == baseline.get("recording"):
+        floor = baseline["throughput_eps"] * (1 - tolerance)
+        if report["throughput_eps"] < floor:
+            regressions.append(
+                f"throughput {report['throughput_eps']:,.0f}/s below {floor:,.0f}/s "
+                f"(baseline {baseline['throughput_eps']:,.0f}/s)"
+            )
+
+    return regressions
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"{report['events']} events ({report['symbols']} symbols) in {report['elapsed_seconds']:.2f}s: "
+        f"{report['throughput_eps']:,.0f} events/s, speed {report['speed'] or 'max'}, "
+        f"max lag {report['max_lag_ms']:.1f} ms"
+    ]
+    for stage, summary in report["stages"].items():
+        lines.append(
+            f"  {stage:<11} n={summary['count']:<7} p50 {summary['p50_us']:>9.1f} us  "
+            f"p95 {summary['p95_us']:>9.1f} us  p99 {summary['p99_us']:>9.1f} us  max {summary['max_us']:>9.1f} us"
+        )
+    lines.append(f"  outputs {report['outputs']}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="GridWorks market replay and latency benchmark")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="write a synthetic opening-bell recording")
+    generate.add_argument("path")
+    generate.add_argument("--seconds", type=float, default=900)
+    generate.add_argument("--ticks-per-second", type=float, default=200)
+    generate.add_argument("--orders-per-second", type=float, default=5)
+    generate.add_argument("--symbols", type=lambda s: s.split(","), default=list(DEFAULT_SYMBOLS))
+    generate.add_argument("--seed", type=int, default=42)
+
+    run = commands.add_parser("run", help="replay a recording and report per-stage latency")
+    run.add_argument("path")
+    run.add_argument("--speed", type=float, default=None, help="times real time (omit for as fast as possible)")
+    run.add_argument("--baseline", help="baseline JSON to compare against")
+    run.add_argument("--tolerance", type=float, default=0.25)
+    run.add_argument("--update-baseline", action="store_true", help="write this run as the new baseline")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        events = generate_session(
+            args.path, symbols=args.symbols, seconds=args.seconds, ticks_per_second=args.ticks_per_second,
+            orders_per_second=args.orders_per_second, seed=args.seed
+        )
+        print(f"Wrote {events} events to {args.path}")
+        return 0
+
+    report = asyncio.run(MarketReplay(args.path, speed=args.speed).run())
+    print(format_report(report))
+
+    if args.baseline and args.update_baseline:
+        save_baseline(report, args.baseline)
+        print(f"Baseline written to {args.baseline}")
+    elif args.baseline:
+        baseline = load_baseline(args.baseline)
+        if baseline.get("host") != host_fingerprint():
+            print(f"Warning: {args.baseline} was recorded on another host; latencies may not be comparable")
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+Copy Trade Fan-out Helpers
+Vectorized follower sizing and bounded-concurrency gathering for SocialTradingEngine
+"""
+
+import asyncio
+from typing import Any, List
+
+import numpy as np
+
+
+def size_copy_quantities(
+    original_quantity: int,
+    price: float,
+    copy_ratios: np.ndarray,
+    max_copy_amounts: np.ndarray
+) -> np.ndarray:
+    """Copy quantity per follower: ratio of the leader's size, capped by amount
+    
+    The epsilon keeps float rounding (e.g. 100 * 0.58) from truncating
+    one share below the exact Decimal result.
+    """
+    
+    eps = 1e-9
+    quantities = np.floor(original_quantity * copy_ratios + eps)
+    
+    # Enforce maximum copy amount
+    over_cap = quantities * price > max_copy_amounts
+    quantities[over_cap] = np.floor(max_copy_amounts[over_cap] / price + eps)
+    
+    return quantities.astype(np.int64)
+
+
+async def gather_bounded(coroutines: List[Any], limit: int) -> List[Any]:
+    """Await coroutines with at most `limit` in flight; results keep input order
+    
+    Exceptions are returned in place, like gather(return_exceptions=True).
+    """
+    
+    results: List[Any] = [None] * len(coroutines)
+    queue: asyncio.Queue = asyncio.Queue()
+    for item in enumerate(coroutines):
+        queue.put_nowait(item)
+    
+    async def worker():
+        while True:
+            try:
+                index, coroutine = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                results[index] = await coroutine
+            except Exception as e:
+                results[index] = e
+    
+    await asyncio.gather(*[worker() for _ in range(min(limit, len(coroutines)))])
+    return results
@@ -5,7 +5,9 @@ High-performance, secure implementation with comprehensive risk management
 
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional, Set
+import time
+from collections import defaultdict, deque
+from typing import Dict, Any, List, Optional, Set, Tuple
 from datetime import datetime, timedelta
 from decimal import Decimal, ROUND_HALF_UP
 import uuid
@@ -13,9 +15,15 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import hashlib
 import hmac
+import json
+import numpy as np
+import redis.asyncio as aioredis
 
 from app.core.database import get_async_session
 from app.core.config import settings
+from app.core.rate_limiter import LocalRateLimiter, RateLimit, RedisRateLimiter
+from app.community.leaderboard import CompoundReturnLeaderboard, period_key
+from app.trading.copy_fanout import gather_bounded, size_copy_quantities
 from app.trading.risk_engine import RiskEngine
 from app.trading.order_manager import OrderManager
 from app.whatsapp.client import WhatsAppClient
@@ -36,6 +44,54 @@ class CopyTradeStatus(Enum):
     CANCELLED = "cancelled"
 
 
+# Leaderboard timeframe (calendar period) -> days a period's board is kept
+LEADERBOARD_TIMEFRAMES = {
+    "daily": 2,
+    "weekly": 14,
+    "monthly": 62,
+    "quarterly": 184
+}
+
+# Display fields stored next to a leader's rank
+LEADER_PROFILE_FIELDS = (
+    "display_name", "followers_count", "success_rate", "total_trades",
+    "avg_holding_period", "risk_score", "specialization"
+)
+
+
+def apply_leader_fill(
+    quantity: int,
+    avg_price: float,
+    action: str,
+    fill_quantity: int,
+    price: float
+) -> Tuple[int, float, Optional[float]]:
+    """Apply a fill to a leader's position in one symbol
+
+    Returns the new quantity and average price, plus the realized return %
+    on the closed quantity when the fill reduces or flips the position.
+    """
+    
+    if fill_quantity == 0:
+        return quantity, avg_price, None
+    
+    signed = fill_quantity if action.lower() == "buy" else -fill_quantity
+    new_quantity = quantity + signed
+    
+    if quantity == 0 or (quantity > 0) == (signed > 0):
+        # Opening or adding: weighted average entry
+        avg_price = (abs(quantity) * avg_price + abs(signed) * price) / abs(new_quantity)
+        return new_quantity, avg_price, None
+    
+    direction = 1 if quantity > 0 else -1
+    realized_return = direction * (price - avg_price) / avg_price * 100
+    if new_quantity == 0:
+        avg_price = 0.0
+    elif (new_quantity > 0) != (quantity > 0):
+        avg_price = price  # Flipped: the remainder opens at the fill price
+    return new_quantity, avg_price, realized_return
+
+
 class LeadershipTier(Enum):
     BRONZE = "bronze"
     SILVER = "silver" 
@@ -59,6 +115,7 @@ class CopyTradeRequest:
     risk_score: float
     timestamp: datetime
     signature: str
+    broker: str = "default"
     
     def __post_init__(self):
         """Validate and secure copy trade request"""
@@ -97,16 +154,27 @@ class SocialTradingEngine:
         self._leader_cache: Dict[str, TradingLeader] = {}
         self._follower_cache: Dict[str, List[str]] = {}  # follower_id -> [leader_ids]
         self._active_copies: Set[str] = set()  # Track active copy operations
+        self._background_tasks: Set[asyncio.Task] = set()
         
-        # Security: Rate limiting
-        self._copy_attempts: Dict[str, List[datetime]] = {}
+        # Security: Rate limiting (shared across workers via Redis)
+        self.redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+        # Degrades to per-process limits rather than blocking copies if Redis is down
+        self.copy_rate_limiter = RedisRateLimiter(self.redis, prefix="rl:copy", fallback=LocalRateLimiter())
         self.max_copies_per_minute = 10
         
+        # Fan-out: in-flight copy executions per broker, concurrent risk checks
+        self.broker_concurrency = 200
+        self.risk_check_concurrency = 500
+        
         # Performance metrics
+        self._copy_latencies: deque = deque(maxlen=10000)  # leader fill -> follower fill, seconds
         self._performance_tracker = {
             'copy_trades_processed': 0,
             'avg_processing_time': 0.0,
-            'success_rate': 0.0
+            'success_rate': 0.0,
+            'copy_latency_p50': 0.0,
+            'copy_latency_p95': 0.0,
+            'copy_latency_p99': 0.0
         }
     
     async def process_leader_trade(
@@ -117,6 +185,8 @@ class SocialTradingEngine:
         """Process trade from leader and trigger copy trades"""
         
         start_time = datetime.utcnow()
+        # Latency is measured from the leader's fill when the feed provides it
+        leader_fill_time = trade_data.get('executed_at_epoch', time.time())
         
         try:
             # Security: Validate leader credentials
@@ -124,6 +194,9 @@ class SocialTradingEngine:
             if not leader or not leader.is_active:
                 raise ValueError(f"Invalid or inactive leader: {leader_id}")
             
+            # Rank the leader as soon as a closing trade lands, followers or not
+            await self._record_leader_trade_performance(leader_id, leader, trade_data)
+            
             # Get all followers for this leader
             followers = await self._get_active_followers(leader_id)
             
@@ -138,10 +211,10 @@ class SocialTradingEngine:
                 followers=followers
             )
             
-            # Process copy trades concurrently for performance
-            copy_results = await asyncio.gather(
-                *[self._process_copy_trade(request) for request in copy_requests],
-                return_exceptions=True
+            # Execute in bounded-concurrency batches per broker
+            copy_results = await self._execute_copy_requests(copy_requests, leader_fill_time)
+            latency = self._latency_percentiles(
+                [r['latency'] for r in copy_results if isinstance(r, dict) and 'latency' in r]
             )
             
             # Analyze results
@@ -149,7 +222,7 @@ class SocialTradingEngine:
             failed_copies = [r for r in copy_results if isinstance(r, Exception) or (isinstance(r, dict) and r.get('status') != 'executed')]
             
             # Update performance metrics
-            self._update_performance_metrics(
+            await self._update_performance_metrics(
                 processing_time=(datetime.utcnow() - start_time).total_seconds(),
                 success_count=len(successful_copies),
                 total_count=len(copy_requests)
@@ -173,7 +246,8 @@ class SocialTradingEngine:
                 "total_followers": len(followers),
                 "successful_copies": len(successful_copies),
                 "failed_copies": len(failed_copies),
-                "processing_time": (datetime.utcnow() - start_time).total_seconds()
+                "processing_time": (datetime.utcnow() - start_time).total_seconds(),
+                "copy_latency": latency
             }
             
         except Exception as e:
@@ -186,53 +260,73 @@ class SocialTradingEngine:
         trade_data: Dict[str, Any],
         followers: List[Dict[str, Any]]
     ) -> List[CopyTradeRequest]:
-        """Generate secure copy trade requests with risk assessment"""
+        """Generate secure copy trade requests with risk assessment
+        
+        All followers are sized in one vectorized pass, rate limits are
+        checked in a single Redis pipeline and risk is assessed in bulk.
+        """
+        
+        if not followers:
+            return []
+        
+        price = Decimal(str(trade_data['price']))
+        symbol = trade_data['symbol']
+        action = trade_data['action']
+        
+        # Calculate copy quantity based on settings (all followers at once)
+        copy_ratios = np.array(
+            [float(f['copy_settings'].get('copy_ratio', 0.1)) for f in followers]
+        )
+        max_copy_amounts = np.array(
+            [float(f['copy_settings'].get('max_copy_amount', 10000)) for f in followers]
+        )
+        quantities = self._size_copy_quantities(
+            trade_data['quantity'], float(price), copy_ratios, max_copy_amounts
+        )
+        
+        # Skip if copy quantity is too small
+        sized = np.flatnonzero(quantities >= 1).tolist()
+        if not sized:
+            return []
+        
+        # Security: Rate limiting check (one round trip)
+        allowed = await self._check_copy_rate_limits([followers[i]['user_id'] for i in sized])
+        eligible = []
+        for i, ok in zip(sized, allowed):
+            if ok:
+                eligible.append(i)
+            else:
+                logger.warning(f"⚠️ Rate limit hit for follower {followers[i]['user_id']}")
+        
+        # Risk assessment
+        risk_scores = await self._assess_copy_risks(
+            [(followers[i]['user_id'], int(quantities[i])) for i in eligible], symbol, action
+        )
         
         copy_requests = []
+        risk_skips = []
         
-        for follower_data in followers:
+        for i, risk_score in zip(eligible, risk_scores):
+            follower_data = followers[i]
             try:
                 follower_id = follower_data['user_id']
                 copy_settings = follower_data['copy_settings']
+                copy_quantity = int(quantities[i])
                 
-                # Security: Rate limiting check
-                if not await self._check_copy_rate_limit(follower_id):
-                    logger.warning(f"⚠️ Rate limit hit for follower {follower_id}")
-                    continue
-                
-                # Calculate copy quantity based on settings
-                original_quantity = trade_data['quantity']
-                copy_ratio = Decimal(str(copy_settings.get('copy_ratio', 0.1)))
-                max_copy_amount = Decimal(str(copy_settings.get('max_copy_amount', 10000)))
-                
-                # Calculate actual copy quantity
-                copy_quantity = int(original_quantity * copy_ratio)
-                copy_value = copy_quantity * Decimal(str(trade_data['price']))
-                
-                # Enforce maximum copy amount
-                if copy_value > max_copy_amount:
-                    copy_quantity = int(max_copy_amount / Decimal(str(trade_data['price'])))
-                    copy_value = copy_quantity * Decimal(str(trade_data['price']))
-                
-                # Skip if copy quantity is too small
-                if copy_quantity < 1:
-                    continue
-                
-                # Risk assessment
-                risk_score = await self.risk_engine.assess_copy_trade_risk(
-                    follower_id=follower_id,
-                    symbol=trade_data['symbol'],
-                    quantity=copy_quantity,
-                    action=trade_data['action']
-                )
+                if isinstance(risk_score, Exception):
+                    raise risk_score
                 
                 # Skip high-risk trades based on follower settings
-                if risk_score > copy_settings.get('max_risk_score', 7.0):
-                    await self._notify_follower_risk_skip(
-                        follower_id=follower_id,
-                        trade_data=trade_data,
-                        risk_score=risk_score
-                    )
+                max_risk_score = copy_settings.get('max_risk_score', 7.0)
+                if risk_score > max_risk_score:
+                    risk_skips.append({
+                        "phone_number": follower_id,
+                        "social_data": {
+                            "type": "risk_skip",
+                            "message": f"⚠️ Copy trade skipped: {action.upper()} {symbol} scored "
+                                       f"{risk_score:.1f}/10 risk, above your limit of {max_risk_score}."
+                        }
+                    })
                     continue
                 
                 # Generate secure signature
@@ -248,15 +342,16 @@ class SocialTradingEngine:
                     follower_id=follower_id,
                     leader_id=leader_id,
                     original_trade_id=trade_data['trade_id'],
-                    symbol=trade_data['symbol'],
-                    action=trade_data['action'],
+                    symbol=symbol,
+                    action=action,
                     quantity=copy_quantity,
-                    price=Decimal(str(trade_data['price'])),
-                    copy_ratio=copy_ratio,
-                    max_copy_amount=max_copy_amount,
+                    price=price,
+                    copy_ratio=Decimal(str(copy_settings.get('copy_ratio', 0.1))),
+                    max_copy_amount=Decimal(str(copy_settings.get('max_copy_amount', 10000))),
                     risk_score=risk_score,
                     timestamp=datetime.utcnow(),
-                    signature=signature
+                    signature=signature,
+                    broker=follower_data.get('broker') or copy_settings.get('broker', 'default')
                 )
                 
                 copy_requests.append(copy_request)
@@ -265,8 +360,81 @@ class SocialTradingEngine:
                 logger.error(f"❌ Error generating copy request for follower {follower_data.get('user_id')}: {str(e)}")
                 continue
         
+        # Risk-skip notices go out as one paced batch and don't hold up execution
+        if risk_skips:
+            task = asyncio.create_task(self.whatsapp_client.send_social_trading_update_bulk(risk_skips))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+        
         return copy_requests
     
+    # Vectorized sizing and bounded fan-out (see app.trading.copy_fanout)
+    _size_copy_quantities = staticmethod(size_copy_quantities)
+    _gather_bounded = staticmethod(gather_bounded)
+    
+    async def _assess_copy_risks(
+        self,
+        candidates: List[Tuple[str, int]],
+        symbol: str,
+        action: str
+    ) -> List[Any]:
+        """Risk score per (follower_id, quantity), exceptions returned in place"""
+        
+        if not candidates:
+            return []
+        
+        return await self._gather_bounded(
+            [
+                self.risk_engine.assess_copy_trade_risk(
+                    follower_id=follower_id,
+                    symbol=symbol,
+                    quantity=quantity,
+                    action=action
+                )
+                for follower_id, quantity in candidates
+            ],
+            self.risk_check_concurrency
+        )
+    
+    async def _execute_copy_requests(
+        self,
+        copy_requests: List[CopyTradeRequest],
+        leader_fill_time: float
+    ) -> List[Any]:
+        """Execute copies grouped by broker, `broker_concurrency` in flight per broker"""
+        
+        by_broker: Dict[str, List[CopyTradeRequest]] = defaultdict(list)
+        for request in copy_requests:
+            by_broker[request.broker].append(request)
+        
+        async def execute(request: CopyTradeRequest) -> Dict[str, Any]:
+            result = await self._process_copy_trade(request)
+            if result.get('status') == 'executed':
+                result['latency'] = time.time() - leader_fill_time
+            return result
+        
+        broker_results = await asyncio.gather(*[
+            self._gather_bounded([execute(r) for r in requests], self.broker_concurrency)
+            for requests in by_broker.values()
+        ])
+        
+        return [result for results in broker_results for result in results]
+    
+    def _latency_percentiles(self, latencies: List[float]) -> Dict[str, float]:
+        """p50/p95/p99 for this fan-out; also folded into the rolling tracker"""
+        
+        if not latencies:
+            return {}
+        
+        self._copy_latencies.extend(latencies)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        
+        rolling = np.percentile(np.fromiter(self._copy_latencies, dtype=float), [50, 95, 99])
+        for key, value in zip(('copy_latency_p50', 'copy_latency_p95', 'copy_latency_p99'), rolling):
+            self._performance_tracker[key] = float(value)
+        
+        return {"p50": float(p50), "p95": float(p95), "p99": float(p99), "count": len(latencies)}
+    
     async def _process_copy_trade(self, copy_request: CopyTradeRequest) -> Dict[str, Any]:
         """Process individual copy trade with full security and performance optimization"""
         
@@ -407,6 +575,80 @@ class SocialTradingEngine:
             logger.info(f"⏰ Auto-executing copy trade for follower {copy_request.follower_id}")
             return {"confirmed": True}
     
+    def _leaderboard(self, timeframe: str, now: Optional[datetime] = None) -> CompoundReturnLeaderboard:
+        """Sorted set for the current calendar period of a timeframe"""
+        
+        if timeframe not in LEADERBOARD_TIMEFRAMES:
+            timeframe = "quarterly"
+        period = "-".join(str(part) for part in period_key(timeframe, now or datetime.utcnow()))
+        
+        return CompoundReturnLeaderboard(
+            self.redis,
+            f"social_leaderboard:{timeframe}:{period}",
+            ttl=LEADERBOARD_TIMEFRAMES[timeframe] * 86400
+        )
+    
+    async def _realize_leader_trade(self, leader_id: str, trade_data: Dict[str, Any]) -> Optional[float]:
+        """Track the leader's position in the symbol; realized return % if the trade closes any of it"""
+        
+        key = f"social_leader_positions:{leader_id}"
+        symbol = trade_data['symbol']
+        
+        stored = await self.redis.hget(key, symbol)
+        quantity, avg_price = json.loads(stored) if stored else (0, 0.0)
+        quantity, avg_price, realized_return = apply_leader_fill(
+            quantity, avg_price, trade_data['action'], int(trade_data['quantity']), float(trade_data['price'])
+        )
+        
+        if quantity:
+            await self.redis.hset(key, symbol, json.dumps([quantity, avg_price]))
+        else:
+            await self.redis.hdel(key, symbol)
+        return realized_return
+    
+    async def _record_leader_trade_performance(
+        self,
+        leader_id: str,
+        leader: TradingLeader,
+        trade_data: Dict[str, Any]
+    ):
+        """Compound a closing trade's realized return into every timeframe (O(log n) per board)"""
+        
+        try:
+            realized_return = await self._realize_leader_trade(leader_id, trade_data)
+            if realized_return is None:
+                return
+            
+            growth = CompoundReturnLeaderboard.log_growth(realized_return)
+            pipe = self.redis.pipeline(transaction=False)
+            for timeframe in LEADERBOARD_TIMEFRAMES:
+                board = self._leaderboard(timeframe)
+                pipe.zincrby(board.key, growth, leader_id)
+                pipe.expire(board.key, board.ttl)
+            await pipe.execute()
+            
+            await self.update_leader_profile(leader_id, self._leader_profile(leader))
+        
+        except Exception as e:
+            logger.warning(f"⚠️ Leaderboard update failed for leader {leader_id}: {str(e)}")
+    
+    @staticmethod
+    def _leader_profile(leader: TradingLeader) -> Dict[str, Any]:
+        return {
+            field: getattr(leader, field)
+            for field in LEADER_PROFILE_FIELDS
+            if getattr(leader, field, None) is not None
+        }
+    
+    async def update_leader_profile(self, leader_id: str, profile: Dict[str, Any]):
+        """Store the display fields shown next to a leader's rank"""
+        
+        if profile:
+            await self.redis.hset(
+                f"social_leader:{leader_id}",
+                mapping={key: str(value) for key, value in profile.items()}
+            )
+    
     async def get_social_trading_leaderboard(
         self,
         timeframe: str = "monthly",
@@ -415,37 +657,34 @@ class SocialTradingEngine:
         """Get top performing traders for social trading"""
         
         try:
-            # Calculate date range
-            if timeframe == "daily":
-                start_date = datetime.utcnow() - timedelta(days=1)
-            elif timeframe == "weekly":
-                start_date = datetime.utcnow() - timedelta(weeks=1)
-            elif timeframe == "monthly":
-                start_date = datetime.utcnow() - timedelta(days=30)
-            else:
-                start_date = datetime.utcnow() - timedelta(days=90)
-            
-            # Get top performers from database
-            async with get_async_session() as session:
-                # This would be implemented with actual database queries
-                # For now, return mock data structure
-                leaderboard = [
-                    {
-                        "leader_id": f"leader_{i}",
-                        "display_name": f"Trader_{i}",
-                        "return_percentage": 15.5 - (i * 0.8),
-                        "followers_count": 1000 - (i * 20),
-                        "success_rate": 85.5 - (i * 1.2),
-                        "total_trades": 150 + (i * 5),
-                        "avg_holding_period": f"{7 + i} days",
-                        "risk_score": 4.5 + (i * 0.2),
-                        "leadership_tier": self._calculate_leadership_tier(1000 - (i * 20)),
-                        "copy_fee": 0.05 if i < 5 else 0.0,  # Top 5 charge fees
-                        "specialization": ["Growth Stocks", "Momentum Trading", "Value Investing"][i % 3],
-                        "verified": i < 10  # Top 10 are verified
-                    }
-                    for i in range(limit)
-                ]
+            # Top-k straight from the sorted set, then one round trip for profiles
+            top_leaders = await self._leaderboard(timeframe).top(limit)
+            if not top_leaders:
+                return []
+            
+            pipe = self.redis.pipeline(transaction=False)
+            for leader_id, _, _ in top_leaders:
+                pipe.hgetall(f"social_leader:{leader_id}")
+            profiles = await pipe.execute()
+            
+            leaderboard = []
+            for (leader_id, return_percentage, rank), profile in zip(top_leaders, profiles):
+                followers_count = int(profile.get('followers_count', 0))
+                leaderboard.append({
+                    "rank": rank,
+                    "leader_id": leader_id,
+                    "display_name": profile.get('display_name', leader_id),
+                    "return_percentage": round(return_percentage, 2),
+                    "followers_count": followers_count,
+                    "success_rate": float(profile.get('success_rate', 0.0)),
+                    "total_trades": int(profile.get('total_trades', 0)),
+                    "avg_holding_period": profile.get('avg_holding_period', ""),
+                    "risk_score": float(profile.get('risk_score', 0.0)),
+                    "leadership_tier": await self._calculate_leadership_tier(followers_count),
+                    "copy_fee": 0.05 if rank <= 5 else 0.0,  # Top 5 charge fees
+                    "specialization": profile.get('specialization', ""),
+                    "verified": rank <= 10  # Top 10 are verified
+                })
             
             return leaderboard
             
@@ -671,23 +910,16 @@ Use 'share trade [symbol]' to share your positions with the group."""
     async def _check_copy_rate_limit(self, follower_id: str) -> bool:
         """Check if follower is within copy rate limits"""
         
-        now = datetime.utcnow()
-        if follower_id not in self._copy_attempts:
-            self._copy_attempts[follower_id] = []
-        
-        # Clean old attempts (older than 1 minute)
-        self._copy_attempts[follower_id] = [
-            attempt for attempt in self._copy_attempts[follower_id]
-            if (now - attempt).total_seconds() < 60
-        ]
-        
-        # Check if under limit
-        if len(self._copy_attempts[follower_id]) >= self.max_copies_per_minute:
-            return False
+        return (await self._check_copy_rate_limits([follower_id]))[0]
+    
+    async def _check_copy_rate_limits(self, follower_ids: List[str]) -> List[bool]:
+        """Rate-limit many followers in one Redis round trip (sliding one-minute limit)"""
         
-        # Add current attempt
-        self._copy_attempts[follower_id].append(now)
-        return True
+        limit = RateLimit(self.max_copies_per_minute, 60.0)
+        decisions = await self.copy_rate_limiter.check_many(
+            [[((follower_id,), limit)] for follower_id in follower_ids]
+        )
+        return [decision.allowed for decision in decisions]
     
     # Helper methods (implementations would be added based on database schema)
     async def _get_verified_leader(self, leader_id: str) -> Optional[TradingLeader]:
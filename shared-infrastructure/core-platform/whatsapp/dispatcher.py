@@ -0,0 +1,253 @@
+"""
+WhatsApp Cloud API Outbound Dispatcher
+Pooled HTTP/2 connections, token-bucket pacing and retries per phone number ID
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Dict, Any, List, Optional, Callable
+import httpx
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+GRAPH_API_BASE_URL = "https://graph.facebook.com/v18.0"
+
+# Meta's default business-initiated throughput is 80 messages/second per
+# phone number; numbers upgraded by Meta get up to 1000.
+DEFAULT_THROUGHPUT_MPS = 80
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Failures before the request reached Meta; anything later (e.g. a read
+# timeout) may have delivered the message, so sends are not retried
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}
+
+
+class TokenBucket:
+    """Async token bucket; waiters are served in arrival order"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1):
+        """Wait until `tokens` are available and take them"""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    def penalize(self, seconds: float):
+        """Drain the bucket so no tokens are issued for `seconds`"""
+        self._refill()
+        self._tokens = min(self._tokens, 0) - seconds * self.rate
+
+
+class OutboundDispatcher:
+    """Rate-limited sender for a single WhatsApp phone number ID
+
+    One pooled (HTTP/2 when available) client is shared by every caller
+    sending from the same number, and every request is paced through a
+    token bucket sized to the number's throughput tier. 429 and 5xx
+    responses and connection failures are retried with jittered
+    exponential backoff; a 429 also drains the bucket so concurrent
+    senders back off together. Other transport errors are retried only
+    for idempotent methods, so a message is never sent twice.
+    """
+
+    def __init__(
+        self,
+        phone_number_id: str,
+        access_token: str,
+        throughput_mps: float = DEFAULT_THROUGHPUT_MPS,
+        max_retries: int = 4,
+        base_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        max_connections: int = 100,
+        base_url: str = GRAPH_API_BASE_URL,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.phone_number_id = phone_number_id
+        self.access_token = access_token
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_connections = max_connections
+        self.bucket = TokenBucket(throughput_mps)
+
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+        self.stats = {"sent": 0, "failed": 0, "retried": 0, "rate_limited": 0}
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.access_token}",
+            "Content-Type": "application/json"
+        }
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared pooled client, created on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE and self._transport is None,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+                timeout=httpx.Timeout(30.0, connect=10.0),
+                transport=self._transport
+            )
+        return self._client
+
+    @property
+    def messages_url(self) -> str:
+        return f"{self.base_url}/{self.phone_number_id}/messages"
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After"""
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+
+    async def request(self, method: str, url: str, paced: bool = True, **kwargs) -> httpx.Response:
+        """Issue a request through the pool, retrying 429/5xx and unsent requests"""
+
+        headers = kwargs.pop("headers", self.headers)
+
+        for attempt in range(self.max_retries + 1):
+            if paced:
+                await self.bucket.acquire()
+
+            try:
+                response = await self.client.request(method, url, headers=headers, **kwargs)
+            except httpx.TransportError as e:
+                unsent = isinstance(e, UNSENT_ERRORS) or method.upper() in IDEMPOTENT_METHODS
+                if not unsent or attempt == self.max_retries:
+                    raise
+                logger.warning(f"⚠️ WhatsApp transport error, retrying: {e}")
+                self.stats["retried"] += 1
+                await asyncio.sleep(self._backoff(attempt))
+                continue
+
+            if response.status_code not in RETRYABLE_STATUS_CODES or attempt == self.max_retries:
+                return response
+
+            delay = self._backoff(attempt, response.headers.get("Retry-After"))
+            if response.status_code == 429:
+                self.stats["rate_limited"] += 1
+                self.bucket.penalize(delay)
+
+            self.stats["retried"] += 1
+            logger.warning(f"⚠️ WhatsApp API {response.status_code}, retrying in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+        return response
+
+    async def send(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one message payload to the Cloud API"""
+
+        try:
+            response = await self.request("POST", self.messages_url, json=payload)
+
+            if response.status_code == 200:
+                self.stats["sent"] += 1
+                return response.json()
+
+            self.stats["failed"] += 1
+            error_data = response.json() if response.content else {"error": "Unknown error"}
+            logger.error(f"❌ WhatsApp API Error: {response.status_code} - {error_data}")
+            return {"error": error_data, "status_code": response.status_code}
+
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.error(f"❌ WhatsApp dispatch error: {str(e)}")
+            return {"error": str(e)}
+
+    async def send_bulk(
+        self,
+        payloads: List[Dict[str, Any]],
+        max_in_flight: int = 64
+    ) -> List[Dict[str, Any]]:
+        """Send many payloads through a bounded worker pool; results keep input order"""
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(payloads)
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in enumerate(payloads):
+            queue.put_nowait(item)
+
+        async def worker():
+            while True:
+                try:
+                    index, payload = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                results[index] = await self.send(payload)
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(max_in_flight, len(payloads)))]
+        await asyncio.gather(*workers)
+
+        sent = sum(1 for r in results if r and "error" not in r)
+        logger.info(f"📤 Bulk send complete: {sent}/{len(payloads)} delivered")
+        return results
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_dispatchers: Dict[str, OutboundDispatcher] = {}
+
+
+def get_dispatcher(
+    phone_number_id: str,
+    access_token: str,
+    throughput_mps: float = DEFAULT_THROUGHPUT_MPS,
+    **kwargs
+) -> OutboundDispatcher:
+    """Process-wide dispatcher (and connection pool) for a phone number ID"""
+
+    dispatcher = _dispatchers.get(phone_number_id)
+    if dispatcher is None:
+        dispatcher = OutboundDispatcher(phone_number_id, access_token, throughput_mps, **kwargs)
+        _dispatchers[phone_number_id] = dispatcher
+    else:
+        # Tokens rotate; the pool and pacing state are kept
+        dispatcher.access_token = access_token
+    return dispatcher
+
+
+async def close_dispatchers():
+    """Close every pooled connection (application shutdown)"""
+    for dispatcher in list(_dispatchers.values()):
+        await dispatcher.close()
+    _dispatchers.clear()
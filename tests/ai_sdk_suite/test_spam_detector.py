@@ -0,0 +1,75 @@
+"""
+Test Suite for the AI Moderator Spam Detector
+Tests when the sentence coherence check runs and language pool shutdown
+"""
+
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from app.ai_moderator.moderator_engine import (
+    AIModerator,
+    GroupMessage,
+    SpamDetector,
+    shutdown_language_pools
+)
+
+
+def group_message(content: str) -> GroupMessage:
+    return GroupMessage(
+        message_id="msg-1",
+        user_id="user-1",
+        username="trader",
+        content=content,
+        timestamp=datetime.now(timezone.utc),
+        group_id="group-1"
+    )
+
+
+class TestSentenceQualityGate:
+    """The coherence penalty is computed whenever it could change a decision"""
+
+    @pytest.fixture
+    def detector(self):
+        detector = SpamDetector(language_workers=0)
+        detector.parsed = []
+
+        async def sentence_quality(content):
+            detector.parsed.append(content)
+            return 0.1
+
+        detector._sentence_quality = sentence_quality
+        return detector
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("base_score,parsed", [
+        (0.1, False),
+        (0.35, True),   # Medium risk boundary
+        (0.55, True),   # Spam and human review threshold
+        (0.65, False),
+        (0.75, True),   # Auto-delete threshold
+        (0.9, False),
+    ])
+    async def test_parses_only_near_thresholds(self, detector, base_score, parsed):
+        with patch("app.ai_moderator.moderator_engine.TradingCallParser"):
+            AIModerator({"group_id": "group-1"}, spam_detector=detector)
+        message = group_message("Nifty holding 22000, watching the close")
+
+        score = await detector._analyze_language_quality(message, base_score)
+
+        assert bool(detector.parsed) == parsed
+        assert score == (0.1 if parsed else 0.0)
+
+
+class TestLanguagePool:
+    """Test the language worker pool lifecycle"""
+
+    @pytest.mark.asyncio
+    async def test_shutdown_language_pools(self):
+        detector = SpamDetector(language_workers=1)
+        assert await detector._sentence_quality("Reliance closed higher today. Volumes were strong.") == 0.0
+        assert detector._language_pool is not None
+
+        shutdown_language_pools()
+
+        assert detector._language_pool is None
@@ -0,0 +1,123 @@
+"""
+Test Suite for AI Moderator Spam Signatures
+Tests MinHash near-duplicate detection, the LSH window index and per-user activity windows
+"""
+
+import pytest
+from datetime import datetime, timedelta
+
+from app.ai_moderator.spam_signatures import (
+    MinHasher,
+    SignatureIndex,
+    SignatureEntry,
+    UserActivityWindow
+)
+
+
+PROMO = "join my premium group for sure shot calls guaranteed profit every single day no loss"
+
+
+def jaccard(first: str, second: str) -> float:
+    words1, words2 = set(first.lower().split()), set(second.lower().split())
+    return len(words1 & words2) / len(words1 | words2)
+
+
+class TestMinHasher:
+    """Test signature similarity estimates"""
+
+    @pytest.fixture
+    def hasher(self):
+        return MinHasher(num_perm=128)
+
+    def test_identical_and_case_insensitive(self, hasher):
+        assert hasher.similarity(hasher.signature(PROMO), hasher.signature(PROMO.upper())) == 1.0
+
+    def test_estimates_jaccard(self, hasher):
+        """Estimates stay close to the exact word-set Jaccard it replaces"""
+        variants = [
+            PROMO + " today",
+            PROMO.replace("premium", "vip"),
+            "RELIANCE looking strong above 2450, watching for breakout",
+            "join my group"
+        ]
+
+        for text in variants:
+            estimate = hasher.similarity(hasher.signature(PROMO), hasher.signature(text))
+            assert estimate == pytest.approx(jaccard(PROMO, text), abs=0.15)
+
+    def test_empty_text(self, hasher):
+        assert hasher.signature("   ") is None
+
+
+class TestSignatureIndex:
+    """Test the sliding-window LSH index"""
+
+    def test_finds_near_duplicates_across_groups(self):
+        index = SignatureIndex()
+        now = datetime(2024, 1, 1, 10, 0)
+
+        for i, text in enumerate([PROMO, PROMO + " today", "what is the view on banking stocks after rbi policy"]):
+            index.add(SignatureEntry(f"m{i}", f"user{i}", f"group{i}", now, index.hasher.signature(text)))
+
+        matches = index.query(index.hasher.signature(PROMO + " now"), threshold=0.8)
+
+        assert {entry.group_id for entry, _ in matches} == {"group0", "group1"}
+
+    def test_entries_expire_with_window(self):
+        index = SignatureIndex(window=timedelta(hours=1))
+        start = datetime(2024, 1, 1, 10, 0)
+        signature = index.hasher.signature(PROMO)
+
+        index.add(SignatureEntry("old", "user1", "group1", start, signature))
+        index.add(SignatureEntry("new", "user2", "group2", start + timedelta(minutes=30), signature))
+        index.expire(start + timedelta(minutes=61))
+
+        assert len(index) == 1
+        assert [entry.message_id for entry, _ in index.query(signature)] == ["new"]
+
+        index.expire(start + timedelta(hours=2))
+        assert len(index) == 0
+        assert index._buckets == {}
+
+    def test_bucket_size_is_bounded(self):
+        index = SignatureIndex(max_bucket_size=10)
+        now = datetime(2024, 1, 1, 10, 0)
+        signature = index.hasher.signature(PROMO)
+
+        for i in range(50):
+            index.add(SignatureEntry(f"m{i}", "flooder", "group1", now, signature))
+
+        matches = index.query(signature)
+        assert len(matches) == 10
+        assert {entry.message_id for entry, _ in matches} == {f"m{i}" for i in range(40, 50)}
+
+
+class TestUserActivityWindow:
+    """Test per-user sliding windows against the list filters they replace"""
+
+    def test_window_counts_match_filters(self):
+        window = UserActivityWindow()
+        start = datetime(2024, 1, 1)
+        timestamps = [start + timedelta(minutes=7 * i) for i in range(400)]
+
+        for i, timestamp in enumerate(timestamps):
+            window.record(timestamp, "group1", None)
+            seen = timestamps[:i + 1]
+            assert len(window.day) == len([t for t in seen if t > timestamp - timedelta(hours=24)])
+            assert len(window.hour) == len([t for t in seen if t > timestamp - timedelta(hours=1)])
+
+        assert window.total_messages == 400
+
+    def test_recent_signatures(self):
+        window = UserActivityWindow()
+        hasher = MinHasher()
+        now = datetime(2024, 1, 1)
+
+        texts = ["first message", "", "third message", "fourth message"]
+        for i, text in enumerate(texts):
+            window.record(now + timedelta(seconds=i), "group1", hasher.signature(text))
+
+        recent = window.recent_signatures(3)
+
+        assert len(recent) == 2  # Empty message has no signature
+        assert hasher.similarity(recent[-1], hasher.signature("fourth message")) == 1.0
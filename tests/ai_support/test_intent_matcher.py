@@ -0,0 +1,132 @@
+"""
+GridWorks Intent Matcher Test Suite
+Testing the compiled keyword automaton against the substring rules it replaces
+"""
+
+import pytest
+
+from app.ai_support.intent_matcher import (
+    KeywordAutomaton, MessageClassifier, SUPPORT_QUERY_PATTERNS, URGENCY_KEYWORDS,
+    VERNACULAR_PATTERNS, COMPLEXITY_TERMS
+)
+from app.ai_support.models import QueryCategory, UrgencyLevel
+
+
+SUPPORT_MESSAGES = [
+    "My order #1234 for RELIANCE failed, urgent help! ₹5,000 stuck",
+    "How do I add money via UPI? Payment pending since morning",
+    "KYC rejected, need to upload PAN documents again",
+    "App crash on login, OTP not received",
+    "What is the nifty outlook and market analysis for HDFCBANK?",
+    "Show my portfolio pnl and holdings",
+    "Just wanted to say thanks",
+    "",
+]
+
+
+def naive_category(text):
+    scores = {
+        category: sum(1 for keyword in patterns["keywords"] if keyword in text)
+        for category, patterns in SUPPORT_QUERY_PATTERNS.items()
+    }
+    best = max(scores, key=scores.get)
+    return best if scores[best] > 0 else QueryCategory.GENERAL_INQUIRY
+
+
+def naive_intent(text, category):
+    if category not in SUPPORT_QUERY_PATTERNS:
+        return "general_inquiry"
+    intents = SUPPORT_QUERY_PATTERNS[category]["intents"]
+    for intent in intents:
+        if any(word in text for word in intent.split("_")):
+            return intent
+    return intents[0]
+
+
+def naive_urgency(text):
+    for level, keywords in URGENCY_KEYWORDS.items():
+        if any(keyword in text for keyword in keywords):
+            return level
+    return UrgencyLevel.MEDIUM
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return MessageClassifier()
+
+
+class TestKeywordAutomaton:
+
+    def test_overlapping_and_nested_keywords(self):
+        """Keywords inside or overlapping other keywords are all reported"""
+        automaton = KeywordAutomaton([
+            ("hdfc", "symbol", "HDFC", False),
+            ("hdfcbank", "symbol", "HDFCBANK", False),
+            ("bank", "category", "payment", False),
+        ])
+
+        hits = automaton.scan("sell hdfcbank")
+
+        assert set(hits["symbol"]) == {"HDFC", "HDFCBANK"}
+        assert hits["category"]["payment"] == {"bank"}
+
+    def test_whole_word_keywords(self):
+        automaton = KeywordAutomaton([("hi", "conversation", "greeting", True)])
+
+        assert automaton.scan("this is high") == {}
+        assert automaton.scan("hi there") == {"conversation": {"greeting": {"hi"}}}
+
+    def test_empty_automaton(self):
+        assert KeywordAutomaton([]).scan("anything") == {}
+
+
+class TestMessageClassifier:
+
+    @pytest.mark.parametrize("message", SUPPORT_MESSAGES)
+    def test_matches_substring_rules(self, classifier, message):
+        """One pass gives the same answers as the per-keyword scans"""
+        analysis = classifier.analyze(message)
+        text = message.lower()
+
+        category = naive_category(text)
+        assert analysis.category == category
+        assert analysis.intent_for(category) == naive_intent(text, category)
+        assert analysis.urgency == naive_urgency(text)
+        assert analysis.has_complex_terms == any(term in text for term in COMPLEXITY_TERMS)
+
+    def test_entities(self, classifier):
+        analysis = classifier.analyze("Cancel order #98765 for HDFCBANK")
+
+        entities = analysis.entities_for(QueryCategory.ORDER_MANAGEMENT)
+
+        assert entities["order_id"] == "98765"
+        assert entities["symbol"] == "HDFC"  # First listed symbol wins, as before
+
+    def test_vernacular_language_and_intent(self, classifier):
+        analysis = classifier.analyze("नमस्ते, मेरे खाता में बैलेंस कितना है?")
+
+        scores = analysis.vernacular_scores()
+        total = sum(len(words) for words in VERNACULAR_PATTERNS["Hindi"].values())
+
+        assert scores["Hindi"] == pytest.approx(3 / total)
+        assert max(scores, key=scores.get) == "Hindi"
+        assert analysis.vernacular_intent("Hindi") == "account_query"
+
+    @pytest.mark.parametrize("message,intent", [
+        ("Buy 10 shares of Reliance", "buy_stock"),
+        ("What's my portfolio value?", "check_portfolio"),
+        ("Market status today", "market_status"),
+        ("I want to learn about trading", "learn_trading"),
+        ("Sell all my TCS holdings", None),  # Ambiguous, left to the model
+        ("How do P/E ratios work?", None),
+        ("Why did my buy order fail?", None),  # Complaint, not a buy
+        ("Should I buy Reliance?", None),
+        ("Cancel my sell order", None),
+    ])
+    def test_conversation_fast_path(self, classifier, message, intent):
+        assert classifier.analyze(message).conversation_intent == intent
+
+    def test_conversation_candidates_hint_the_model(self, classifier):
+        analysis = classifier.analyze("Why did my buy order fail?")
+        assert analysis.conversation_candidates == ["buy_stock"]
+        assert classifier.analyze("Sell all my TCS holdings").conversation_candidates == ["check_portfolio", "sell_stock"]
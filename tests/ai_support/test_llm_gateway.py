@@ -0,0 +1,208 @@
+"""
+LLM Gateway Test Suite
+Tests caching, coalescing, tier limits and provider fallbacks
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.ai_support.llm_gateway import (
+    FakeLLMProvider, LLMGateway, LLMRequest, LLMUnavailableError, OpenAIProvider, TierLimits
+)
+
+
+def faq(question: str, **kwargs) -> LLMRequest:
+    return LLMRequest(
+        messages=[
+            {"role": "system", "content": "You are GridWorks support."},
+            {"role": "user", "content": question}
+        ],
+        **kwargs
+    )
+
+
+class TestLLMGateway:
+    """Test the shared gateway in front of the model provider"""
+
+    @pytest.mark.asyncio
+    async def test_semantic_cache_hit(self):
+        provider = FakeLLMProvider("T+1 settlement")
+        gateway = LLMGateway(provider)
+
+        first = await gateway.complete(faq("What is the settlement cycle?", cache_ttl=60))
+        second = await gateway.complete(faq("Hi, please tell me: what is the SETTLEMENT cycle", cache_ttl=60))
+        uncached = await gateway.complete(faq("What is the settlement cycle?"))
+
+        assert first.content == second.content == uncached.content == "T+1 settlement"
+        assert second.cached and not first.cached and not uncached.cached
+        assert len(provider.calls) == 2
+        assert gateway.stats["cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cache_entries_expire(self):
+        now = [0.0]
+        provider = FakeLLMProvider("answer")
+        gateway = LLMGateway(provider, clock=lambda: now[0])
+
+        await gateway.complete(faq("How do I add funds?", cache_ttl=30))
+        now[0] = 31.0
+        response = await gateway.complete(faq("How do I add funds?", cache_ttl=30))
+
+        assert not response.cached
+        assert len(provider.calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_identical_in_flight_requests_coalesce(self):
+        provider = FakeLLMProvider("answer", latency=0.05)
+        gateway = LLMGateway(provider)
+
+        responses = await asyncio.gather(*(gateway.complete(faq("Why was my order rejected?")) for _ in range(5)))
+
+        assert len(provider.calls) == 1
+        assert sum(r.coalesced for r in responses) == 4
+        assert {r.content for r in responses} == {"answer"}
+
+    @pytest.mark.asyncio
+    async def test_coalesced_callers_share_failures(self):
+        provider = FakeLLMProvider(latency=0.02, error=RuntimeError("boom"))
+        gateway = LLMGateway(provider)
+
+        results = await asyncio.gather(
+            *(gateway.complete(faq("Is the market open?")) for _ in range(3)), return_exceptions=True
+        )
+
+        assert len(provider.calls) == 1
+        assert all(isinstance(r, LLMUnavailableError) and r.reason == "provider_error" for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_fails_followers_as_unavailable(self):
+        provider = FakeLLMProvider("answer", latency=0.1)
+        gateway = LLMGateway(provider)
+
+        leader = asyncio.create_task(gateway.complete(faq("Where is my refund?")))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(gateway.complete(faq("Where is my refund?")))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        with pytest.raises(LLMUnavailableError) as error:
+            await follower
+        assert error.value.reason == "cancelled"
+        assert leader.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_tiers_do_not_coalesce(self):
+        provider = FakeLLMProvider("answer", latency=0.02)
+        gateway = LLMGateway(provider)
+
+        await asyncio.gather(
+            gateway.complete(faq("Is the market open?", tier="free")),
+            gateway.complete(faq("Is the market open?", tier="black"))
+        )
+
+        assert {request.tier for request in provider.calls} == {"free", "black"}
+        assert gateway.stats["coalesced"] == 0
+
+    @pytest.mark.asyncio
+    async def test_tier_concurrency_limit(self):
+        class TrackingProvider(FakeLLMProvider):
+            active = peak = 0
+
+            async def complete(self, request):
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+                try:
+                    return await super().complete(request)
+                finally:
+                    self.active -= 1
+
+        provider = TrackingProvider("ok", latency=0.01)
+        gateway = LLMGateway(
+            provider,
+            tier_limits={"LITE": TierLimits(max_concurrency=2, tokens_per_minute=1_000_000, timeout=5.0)}
+        )
+
+        await asyncio.gather(*(gateway.complete(faq(f"Question {i}", tier="LITE")) for i in range(8)))
+
+        assert provider.peak == 2
+
+    @pytest.mark.asyncio
+    async def test_token_budget_refuses_when_exhausted(self):
+        now = [0.0]
+        gateway = LLMGateway(
+            FakeLLMProvider("x" * 1600),  # ~400 completion tokens
+            tier_limits={"LITE": TierLimits(max_concurrency=4, tokens_per_minute=600, timeout=5.0)},
+            clock=lambda: now[0]
+        )
+
+        await gateway.complete(faq("First question", tier="LITE", max_tokens=400))
+        with pytest.raises(LLMUnavailableError) as error:
+            await gateway.complete(faq("Second question", tier="LITE", max_tokens=400))
+        assert error.value.reason == "over_budget"
+
+        # Budget refills over the minute
+        now[0] = 60.0
+        await gateway.complete(faq("Third question", tier="LITE", max_tokens=400))
+        assert gateway.stats["over_budget"] == 1
+
+    @pytest.mark.asyncio
+    async def test_timeout_raises_unavailable(self):
+        gateway = LLMGateway(FakeLLMProvider("late", latency=0.5))
+
+        with pytest.raises(LLMUnavailableError) as error:
+            await gateway.complete(faq("Slow question", timeout=0.02))
+
+        assert error.value.reason == "timeout"
+        assert gateway.stats["timeouts"] == 1
+
+
+class TestOpenAIProvider:
+    """Test the pooled HTTP provider against a mock transport"""
+
+    @pytest.mark.asyncio
+    async def test_chat_completion_request(self):
+        seen = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["url"] = str(request.url)
+            seen["auth"] = request.headers["Authorization"]
+            seen["body"] = json.loads(request.content)
+            return httpx.Response(200, json={
+                "model": "gpt-4-turbo",
+                "choices": [{"message": {"role": "assistant", "content": "{\"message\": \"Done\"}"}}],
+                "usage": {"prompt_tokens": 12, "completion_tokens": 5}
+            })
+
+        provider = OpenAIProvider(api_key="sk-test", transport=httpx.MockTransport(handler))
+        gateway = LLMGateway(provider)
+
+        response = await gateway.complete(faq(
+            "Cancel my order", model="gpt-4-turbo", options={"response_format": {"type": "json_object"}}
+        ))
+        await gateway.aclose()
+
+        assert seen["url"].endswith("/chat/completions")
+        assert seen["auth"] == "Bearer sk-test"
+        assert seen["body"]["response_format"] == {"type": "json_object"}
+        assert response.content == "{\"message\": \"Done\"}"
+        assert response.total_tokens == 17
+
+    @pytest.mark.asyncio
+    async def test_provider_errors_surface_as_unavailable(self, monkeypatch):
+        provider = OpenAIProvider(
+            api_key="sk-test",
+            transport=httpx.MockTransport(lambda request: httpx.Response(503, text="overloaded"))
+        )
+        gateway = LLMGateway(provider)
+
+        with pytest.raises(LLMUnavailableError) as error:
+            await gateway.complete(faq("Hello"))
+        assert error.value.reason == "provider_error"
+
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        with pytest.raises(LLMUnavailableError) as error:
+            await LLMGateway(OpenAIProvider()).complete(faq("Hello"))
+        assert error.value.reason == "no_credentials"
@@ -0,0 +1,156 @@
+"""
+Tiered Priority Scheduler Test Suite
+Tests weighted-fair dispatch, deadlines, admission control and shedding
+"""
+
+import asyncio
+
+import pytest
+
+from app.ai_support.models import SupportTier
+from app.ai_support.priority_scheduler import PriorityScheduler, SchedulerOverloaded, TierPolicy
+
+
+POLICIES = {
+    SupportTier.BLACK: TierPolicy(weight=8, deadline=5.0),
+    SupportTier.ELITE: TierPolicy(weight=4, deadline=10.0),
+    SupportTier.PRO: TierPolicy(weight=2, deadline=15.0),
+    SupportTier.LITE: TierPolicy(weight=1, deadline=30.0, sheddable=True),
+}
+
+
+class TestPriorityScheduler:
+    """Test dispatch order and overload behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_black_not_starved_by_lite_backlog(self):
+        scheduler = PriorityScheduler(POLICIES, workers=1)
+        served = []
+        gate = asyncio.Event()
+
+        async def job(name):
+            await gate.wait()
+            served.append(name)
+            return name
+
+        tasks = [asyncio.create_task(scheduler.submit(SupportTier.LITE, lambda i=i: job(f"lite{i}"))) for i in range(20)]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(scheduler.submit(SupportTier.BLACK, lambda i=i: job(f"black{i}"))) for i in range(4)]
+        await asyncio.sleep(0)
+
+        gate.set()
+        await asyncio.gather(*tasks)
+        await scheduler.stop()
+
+        # The first LITE job was already running; every BLACK job follows it
+        assert served[:5] == ["lite0", "black0", "black1", "black2", "black3"]
+
+    @pytest.mark.asyncio
+    async def test_weighted_share_while_backlogged(self):
+        scheduler = PriorityScheduler(POLICIES, workers=1)
+        served = []
+        gate = asyncio.Event()
+
+        async def job(tier):
+            await gate.wait()
+            served.append(tier)
+
+        tasks = [
+            asyncio.create_task(scheduler.submit(tier, lambda tier=tier: job(tier)))
+            for _ in range(40) for tier in (SupportTier.LITE, SupportTier.PRO, SupportTier.BLACK)
+        ]
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(*tasks)
+        await scheduler.stop()
+
+        first = served[1:23]
+        assert first.count(SupportTier.BLACK) == 16
+        assert first.count(SupportTier.PRO) == 4
+        assert first.count(SupportTier.LITE) == 2
+
+    @pytest.mark.asyncio
+    async def test_priority_orders_within_lane(self):
+        scheduler = PriorityScheduler(POLICIES, workers=1)
+        served = []
+        gate = asyncio.Event()
+
+        async def job(name):
+            await gate.wait()
+            served.append(name)
+
+        tasks = [asyncio.create_task(scheduler.submit(SupportTier.PRO, lambda: job("blocker")))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(scheduler.submit(SupportTier.PRO, lambda: job("normal"), priority=3)))
+        tasks.append(asyncio.create_task(scheduler.submit(SupportTier.PRO, lambda: job("urgent"), priority=4)))
+        await asyncio.sleep(0)
+
+        gate.set()
+        await asyncio.gather(*tasks)
+        await scheduler.stop()
+
+        assert served == ["blocker", "urgent", "normal"]
+
+    @pytest.mark.asyncio
+    async def test_lite_shed_above_watermark(self):
+        scheduler = PriorityScheduler(POLICIES, workers=1, shed_watermark=3)
+        gate = asyncio.Event()
+
+        tasks = [asyncio.create_task(scheduler.submit(SupportTier.LITE, gate.wait))]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(scheduler.submit(SupportTier.LITE, gate.wait)) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(SchedulerOverloaded) as error:
+            await scheduler.submit(SupportTier.LITE, gate.wait)
+        assert error.value.reason == "shedding load"
+
+        black = asyncio.create_task(scheduler.submit(SupportTier.BLACK, gate.wait))
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(black, *tasks)
+
+        metrics = scheduler.metrics()
+        assert metrics["lanes"]["LITE"]["rejected"] == 1
+        assert metrics["lanes"]["BLACK"]["completed"] == 1
+        await scheduler.stop()
+
+    @pytest.mark.asyncio
+    async def test_expired_lite_jobs_dropped_and_deadlines_preempt(self):
+        now = [0.0]
+        scheduler = PriorityScheduler(POLICIES, workers=1, clock=lambda: now[0])
+        served = []
+        gate = asyncio.Event()
+
+        async def job(name, duration=0.0):
+            await gate.wait()
+            now[0] += duration
+            served.append(name)
+
+        blocker = asyncio.create_task(scheduler.submit(SupportTier.ELITE, lambda: job("elite0", 4.0)))
+        await asyncio.sleep(0)
+        stale = asyncio.create_task(scheduler.submit(SupportTier.LITE, lambda: job("lite0")))
+        elite = asyncio.create_task(scheduler.submit(SupportTier.ELITE, lambda: job("elite1")))
+        await asyncio.sleep(0)
+
+        # ELITE's head is within one service time of its deadline, so it goes first even off-turn
+        now[0] = 3.0
+        gate.set()
+        await asyncio.gather(blocker, elite)
+        assert served == ["elite0", "elite1", "lite0"]
+        await stale
+
+        # LITE past its deadline is shed rather than served late
+        now[0] = 100.0
+        gate.clear()
+        late = []
+        for _ in range(2):
+            late.append(asyncio.create_task(scheduler.submit(SupportTier.LITE, lambda: job("late"))))
+            await asyncio.sleep(0.01)
+        now[0] = 200.0
+        gate.set()
+        results = await asyncio.gather(*late, return_exceptions=True)
+
+        assert sum(isinstance(r, SchedulerOverloaded) for r in results) == 1
+        assert scheduler.metrics()["lanes"]["LITE"]["shed"] == 1
+        await scheduler.stop()
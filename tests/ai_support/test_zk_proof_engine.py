@@ -0,0 +1,129 @@
+"""
+GridWorks ZK Proof Engine Test Suite
+Testing the append-only Merkle accumulator and root checkpoints
+"""
+
+import hashlib
+import json
+import pytest
+
+from app.ai_support.zk_proof_engine import MerkleTree, ZKSupportProofEngine
+
+
+def leaf(i: int) -> str:
+    return hashlib.sha256(str(i).encode()).hexdigest()
+
+
+def rebuild(leaves):
+    """Reference full rebuild, odd nodes paired with themselves"""
+    level = leaves[:]
+    tree = [level]
+    while len(level) > 1:
+        level = [
+            hashlib.sha256(f"{level[i]}{level[i + 1] if i + 1 < len(level) else level[i]}".encode()).hexdigest()
+            for i in range(0, len(level), 2)
+        ]
+        tree.append(level)
+    return tree
+
+
+def verify_path(leaf_hash, index, size, path, root):
+    """Fold a proof path back up to the root"""
+    node = leaf_hash
+    siblings = iter(path)
+    width = size
+    while width > 1:
+        sibling_index = index ^ 1
+        sibling = next(siblings) if sibling_index < width else node
+        node = hashlib.sha256(
+            (f"{node}{sibling}" if index % 2 == 0 else f"{sibling}{node}").encode()
+        ).hexdigest()
+        index //= 2
+        width = (width + 1) // 2
+    return node == root
+
+
+class TestMerkleTree:
+
+    def test_incremental_matches_rebuild(self):
+        tree = MerkleTree()
+        leaves = [leaf(i) for i in range(37)]
+
+        for count, data_hash in enumerate(leaves, start=1):
+            tree.add_leaf(data_hash)
+            assert tree.get_root() == rebuild(leaves[:count])[-1][0]
+
+    def test_batch_append_matches_single_appends(self):
+        leaves = [leaf(i) for i in range(100)]
+        single = MerkleTree()
+        for data_hash in leaves:
+            single.add_leaf(data_hash)
+
+        batched = MerkleTree()
+        for start in range(0, 100, 7):
+            batched.add_leaves(leaves[start:start + 7])
+
+        assert batched.get_root() == single.get_root()
+        assert batched.tree == single.tree
+
+    def test_proof_paths_verify(self):
+        tree = MerkleTree()
+        leaves = [leaf(i) for i in range(21)]
+        tree.add_leaves(leaves)
+
+        for index, data_hash in enumerate(leaves):
+            assert tree.index_of(data_hash) == index
+            path = tree.get_proof_path(data_hash)
+            assert verify_path(data_hash, index, len(leaves), path, tree.get_root())
+
+    def test_historic_roots_and_paths(self):
+        """Proofs can be served against a root the tree had earlier"""
+        tree = MerkleTree()
+        leaves = [leaf(i) for i in range(50)]
+        tree.add_leaves(leaves)
+
+        for size in (1, 2, 13, 32, 33, 49):
+            root = rebuild(leaves[:size])[-1][0]
+            assert tree.get_root_at(size) == root
+            for index in (0, size // 2, size - 1):
+                path = tree.get_proof_path(leaves[index], size)
+                assert verify_path(leaves[index], index, size, path, root)
+
+    def test_unknown_leaf(self):
+        tree = MerkleTree()
+        tree.add_leaf(leaf(0))
+
+        assert tree.get_proof_path("missing") == []
+        assert tree.get_root_at(5) is None
+
+
+class TestMerkleCheckpoints:
+
+    @pytest.mark.asyncio
+    async def test_checkpoints_persisted_and_cover_proofs(self, tmp_path):
+        checkpoint_file = tmp_path / "checkpoints.jsonl"
+        engine = ZKSupportProofEngine(
+            secret_key="test", checkpoint_interval=4, checkpoint_path=str(checkpoint_file)
+        )
+
+        proofs = []
+        for i in range(10):
+            proofs.append(await engine.generate_interaction_proof(
+                ticket_id=f"T{i}", user_id=f"user{i}", issue_description="issue", resolution="done"
+            ))
+
+        persisted = [json.loads(line) for line in checkpoint_file.read_text().splitlines()]
+        assert [c["leaf_count"] for c in persisted] == [4, 8]
+        assert persisted[0]["root"] == engine.merkle_tree.get_root_at(4)
+
+        covered = engine._merkle_inclusion(proofs[5].proof_id)
+        assert covered["status"] == "CHECKPOINTED"
+        assert covered["checkpoint"]["leaf_count"] == 8
+        assert verify_path(
+            covered["leaf_hash"], covered["leaf_index"], 8,
+            covered["proof_path"], covered["checkpoint"]["root"]
+        )
+
+        pending = engine._merkle_inclusion(proofs[9].proof_id)
+        assert pending["status"] == "PENDING_CHECKPOINT"
+        assert pending["root"] == engine.merkle_tree.get_root()
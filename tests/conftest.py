@@ -13,10 +13,11 @@ import json
 import uuid
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 
-from app.core.database import Base, get_db
+from app.core.database import Base, get_async_db, get_db
 from app.main import app
 from app.charting.core.chart_engine import OHLCV, ChartConfig, TimeFrame
 from app.models.charts import Chart, ChartDrawing, ChartAnnotation
@@ -28,6 +29,8 @@ from app.models.marketplace import TradingIdea, IdeaSubscription
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
 
 @pytest.fixture(scope="session")
 def event_loop():
@@ -56,7 +59,12 @@ def test_client(db_session):
         finally:
             pass
     
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     client = TestClient(app)
     yield client
     app.dependency_overrides.clear()
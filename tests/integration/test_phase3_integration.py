@@ -435,7 +435,7 @@ class TestCommunityFeaturesIntegration:
         
         # Should have at least the welcome achievement
         assert len(user.badges) >= initial_badge_count
-    
+
     @pytest.mark.asyncio
     async def test_community_dashboard(self, community_engine):
         """Test community dashboard functionality."""
@@ -0,0 +1,133 @@
+"""
+Database Event-Loop Stall Benchmark
+===================================
+Runs concurrent request handlers against the same SQLite file, once through
+blocking Session objects (the old get_db path) and once through AsyncSession
+with run_sync (get_async_db), while a heartbeat task measures how late the
+event loop wakes it. Stall time is heartbeat lateness; the async path should
+keep it near zero while doing the same database work.
+
+    python -m pytest tests/load/test_db_event_loop_stall.py -s
+"""
+
+import asyncio
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+import pytest
+from sqlalchemy import Column, Float, Integer, String, create_engine, func
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.database import SQLITE_POOL_SIZE, bulk_insert, run_sync
+
+
+Base = declarative_base()
+
+HANDLERS = 40
+QUERIES_PER_HANDLER = 5
+HEARTBEAT_INTERVAL = 0.005  # seconds
+
+
+class Trade(Base):
+    __tablename__ = "benchmark_trades"
+
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String, index=True)
+    price = Column(Float)
+    quantity = Column(Integer)
+
+
+def symbol_summary(db: Session, symbol: str) -> Dict[str, Any]:
+    """Handler body: an aggregate heavy enough to take a few milliseconds"""
+    count, notional = db.query(
+        func.count(Trade.id), func.sum(Trade.price * Trade.quantity)
+    ).filter(Trade.symbol.like(f"%{symbol}%")).one()
+    return {"symbol": symbol, "trades": count, "notional": notional}
+
+
+async def measure(handlers: List[Callable[[], Any]]) -> Dict[str, float]:
+    """Run handlers concurrently and report heartbeat lateness (ms)"""
+
+    lateness: List[float] = []
+    done = asyncio.Event()
+
+    async def heartbeat():
+        while not done.is_set():
+            expected = time.perf_counter() + HEARTBEAT_INTERVAL
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            lateness.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(HEARTBEAT_INTERVAL * 2)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(handler() for handler in handlers))
+    elapsed = time.perf_counter() - started
+
+    done.set()
+    await beat
+
+    lateness.sort()
+    return {
+        "elapsed_s": elapsed,
+        "stall_max_ms": lateness[-1],
+        "stall_p95_ms": lateness[int(len(lateness) * 0.95)],
+        "stall_mean_ms": statistics.mean(lateness),
+        "stall_total_ms": sum(lateness),
+    }
+
+
+@pytest.mark.load
+@pytest.mark.performance
+class TestDatabaseEventLoopStall:
+    """Compare event-loop stall of blocking vs async sessions under load"""
+
+    @pytest.mark.asyncio
+    async def test_async_sessions_do_not_stall_event_loop(self, tmp_path):
+        path = tmp_path / "benchmark.db"
+        sync_engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(sync_engine)
+
+        with Session(sync_engine) as db:
+            bulk_insert(db, Trade, [
+                {"symbol": f"SYM{i % 500}", "price": 100.0 + i % 97, "quantity": 1 + i % 13}
+                for i in range(100_000)
+            ])
+            db.commit()
+
+        SyncSessionLocal = sessionmaker(bind=sync_engine)
+        # Same pool bounds as get_async_engine() uses for SQLite
+        async_engine = create_async_engine(
+            f"sqlite+aiosqlite:///{path}",
+            poolclass=AsyncAdaptedQueuePool, pool_size=SQLITE_POOL_SIZE, max_overflow=0
+        )
+        AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+        async def blocking_handler(n: int):
+            db = SyncSessionLocal()
+            try:
+                for q in range(QUERIES_PER_HANDLER):
+                    symbol_summary(db, f"SYM{(n + q) % 500}")
+            finally:
+                db.close()
+
+        async def async_handler(n: int):
+            async with AsyncSessionLocal() as db:
+                for q in range(QUERIES_PER_HANDLER):
+                    await run_sync(db, symbol_summary, f"SYM{(n + q) % 500}")
+
+        before = await measure([lambda n=n: blocking_handler(n) for n in range(HANDLERS)])
+        after = await measure([lambda n=n: async_handler(n) for n in range(HANDLERS)])
+        await async_engine.dispose()
+
+        print("\nEvent-loop stall, {} handlers x {} queries".format(HANDLERS, QUERIES_PER_HANDLER))
+        for name, result in (("blocking Session", before), ("AsyncSession", after)):
+            print("  {:<17} max {stall_max_ms:8.1f} ms  p95 {stall_p95_ms:7.1f} ms  "
+                  "total {stall_total_ms:8.1f} ms  wall {elapsed_s:5.2f} s".format(name, **result))
+
+        # Blocking handlers hold the loop for the whole run; async ones only for driver callbacks
+        assert after["stall_max_ms"] < before["stall_max_ms"] / 10
+        assert after["stall_p95_ms"] < 50
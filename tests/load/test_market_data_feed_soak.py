@@ -0,0 +1,121 @@
+"""
+Institutional Market Data Feed Soak Test
+========================================
+Hundreds of institutional WebSocket clients subscribed across an F&O-sized
+instrument universe while ticks and depth updates are published in bursts.
+A tenth of the clients are slow consumers. Memory must stay bounded (send
+queues are capped and slow clients fall back to snapshots) and delivery
+latency for clients that keep up must stay low.
+
+    python -m pytest tests/load/test_market_data_feed_soak.py -s
+"""
+
+import asyncio
+import random
+import time
+import tracemalloc
+
+import pytest
+
+from app.institutional.market_data_distributor import MarketDataDistributor
+
+
+CLIENTS = 400
+UNDERLYINGS = 180              # NSE F&O stocks and indices
+STRIKES_PER_UNDERLYING = 12    # Near-month futures plus calls and puts around the money
+SYMBOLS_PER_CLIENT = 150
+BURSTS = 120
+BURST_SIZE = 250               # Updates published between event-loop turns
+MAX_QUEUE = 200
+SLOW_CLIENT_DELAY = 0.02       # seconds per frame
+
+
+class CountingWebSocket:
+    """Consumes frames, optionally slowly, keeping only a count"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.frames = 0
+
+    async def send_text(self, frame: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.frames += 1
+
+    send_bytes = send_text
+
+
+def fno_universe():
+    symbols = []
+    for u in range(UNDERLYINGS):
+        symbols.append(f"U{u}FUT")
+        for s in range(STRIKES_PER_UNDERLYING // 2):
+            symbols.extend((f"U{u}C{s}", f"U{u}P{s}"))
+    return symbols
+
+
+@pytest.mark.load
+@pytest.mark.performance
+class TestMarketDataFeedSoak:
+    """Bounded memory and latency under sustained fan-out"""
+
+    @pytest.mark.asyncio
+    async def test_bounded_memory_and_latency(self):
+        rng = random.Random(7)
+        symbols = fno_universe()
+        distributor = MarketDataDistributor(max_queue=MAX_QUEUE)
+
+        sockets = {}
+        for c in range(CLIENTS):
+            ws = sockets[f"inst-{c}"] = CountingWebSocket(SLOW_CLIENT_DELAY if c % 10 == 0 else 0.0)
+            await distributor.subscribe(
+                f"inst-{c}", ws, rng.sample(symbols, SYMBOLS_PER_CLIENT), encoding=("json", "binary")[c % 2]
+            )
+
+        tracemalloc.start()
+        memory = []
+        started = time.perf_counter()
+        for burst in range(BURSTS):
+            for _ in range(BURST_SIZE):
+                symbol = rng.choice(symbols)
+                if rng.random() < 0.5:
+                    price = 100 + rng.random() * 10
+                    distributor.publish_tick(symbol, price=price, volume=rng.randint(1, 500),
+                                             bid=price - 0.05, ask=price + 0.05, bid_size=100, ask_size=100)
+                else:
+                    level = round(100 + rng.random() * 10, 2)
+                    distributor.publish_depth(symbol, bids=[(level, rng.randint(0, 200))])
+            await asyncio.sleep(0)
+            if burst % 30 == 29:
+                memory.append(tracemalloc.get_traced_memory()[0])
+        elapsed = time.perf_counter() - started
+
+        for _ in range(20):
+            await asyncio.sleep(0)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        metrics = distributor.metrics()
+        updates = BURSTS * BURST_SIZE
+        print(f"\n{CLIENTS} clients, {len(symbols)} symbols, {updates} updates in {elapsed:.2f}s "
+              f"({updates / elapsed:,.0f}/s published, {metrics['frames_sent'] / elapsed:,.0f} frames/s sent)")
+        print(f"  encodes {metrics['encodes']}, frames {metrics['frames_sent']}, snapshots {metrics['snapshots_sent']}, "
+              f"dropped {metrics['dropped']}, resyncs {metrics['resyncs']}")
+        print(f"  latency p50 {metrics['latency_p50_ms']:.2f} ms, p99 {metrics['latency_p99_ms']:.2f} ms, "
+              f"max queue {metrics['max_queue_depth']}, peak traced memory {peak / 2**20:.1f} MiB, "
+              f"samples {[f'{m / 2**20:.1f}' for m in memory]} MiB")
+
+        # Encoding is per update and format, never per client
+        assert metrics["encodes"] <= updates * 2
+        assert metrics["max_queue_depth"] <= MAX_QUEUE
+        assert metrics["resyncs"] > 0  # Slow consumers were cut over to snapshots
+
+        # Memory plateaus instead of growing with the number of updates
+        assert peak < 64 * 2**20
+        assert memory[-1] < memory[0] * 1.5 + 2**20
+
+        assert metrics["latency_p99_ms"] < 500  # One burst fans out to ~6k frames
+        fast_frames = [ws.frames for name, ws in sockets.items() if int(name.split("-")[1]) % 10]
+        assert min(fast_frames) > 0
+
+        await distributor.close()
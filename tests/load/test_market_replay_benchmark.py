@@ -0,0 +1,93 @@
+"""
+Opening-Bell Market Replay Benchmark
+====================================
+Replays a synthetic opening-bell session (generated per run from a fixed
+seed) through DataAggregator, ChartManager, IndicatorManager,
+AlgorithmicAlertsEngine and ExecutionEngine and compares per-stage latency
+and throughput against a baseline recorded on the same machine.
+
+Baselines are kept per host under tests/load/baselines/ (ignored by git),
+named by a CPU/OS/Python fingerprint, so runners never compare against
+another machine's numbers. The first run on a host, or any run with
+REPLAY_UPDATE_BASELINE=1, writes its baseline instead of comparing.
+REPLAY_BASELINE points at a specific file; one recorded elsewhere is
+skipped. REPLAY_TOLERANCE widens or narrows the allowed regression
+(default 0.5, i.e. 50% slower fails).
+
+    python -m pytest tests/load/test_market_replay_benchmark.py -s
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from app.testing.market_replay import (
+    MarketReplay,
+    compare_to_baseline,
+    format_report,
+    generate_session,
+    host_fingerprint,
+    load_baseline,
+    save_baseline,
+)
+
+
+BASELINE = Path(os.environ.get(
+    "REPLAY_BASELINE", Path(__file__).parent / "baselines" / f"market_replay-{host_fingerprint()}.json"
+))
+TOLERANCE = float(os.environ.get("REPLAY_TOLERANCE", "0.5"))
+
+SESSION_SECONDS = 600          # First ten minutes after the open
+TICKS_PER_SECOND = 40          # Base rate; the opening burst is five times this
+ORDERS_PER_SECOND = 5
+
+
+@pytest.fixture(scope="module")
+def opening_bell(tmp_path_factory):
+    path = tmp_path_factory.mktemp("replay") / "opening_bell.jsonl.gz"
+    generate_session(str(path), seconds=SESSION_SECONDS, ticks_per_second=TICKS_PER_SECOND,
+                     orders_per_second=ORDERS_PER_SECOND, seed=42)
+    return str(path)
+
+
+@pytest.mark.load
+@pytest.mark.performance
+class TestMarketReplayBenchmark:
+    """Opening-bell path latency against this host's baseline"""
+
+    @pytest.mark.asyncio
+    async def test_replay_is_deterministic(self, opening_bell):
+        first = await MarketReplay(opening_bell).run()
+        second = await MarketReplay(opening_bell).run()
+
+        assert first["outputs"] == second["outputs"]
+        assert first["digest"] == second["digest"]
+        assert first["outputs"]["candles"] >= (SESSION_SECONDS // 60 - 2) * first["symbols"]
+        assert first["outputs"]["orders"] > 0 and first["outputs"]["fills"] > 0
+
+    @pytest.mark.asyncio
+    async def test_no_regression_against_baseline(self, opening_bell):
+        report = await MarketReplay(opening_bell).run()
+        print("\n" + format_report(report))
+
+        if os.environ.get("REPLAY_UPDATE_BASELINE") or not BASELINE.exists():
+            BASELINE.parent.mkdir(parents=True, exist_ok=True)
+            save_baseline(report, str(BASELINE))
+            pytest.skip(f"Baseline written to {BASELINE}")
+
+        baseline = load_baseline(str(BASELINE))
+        if baseline.get("host") != host_fingerprint():
+            pytest.skip(f"{BASELINE} was recorded on another host")
+
+        regressions = compare_to_baseline(report, baseline, TOLERANCE)
+        assert not regressions, "Opening-bell replay regressed:\n" + "\n".join(regressions)
+
+    @pytest.mark.asyncio
+    async def test_pipeline_keeps_up_at_100x(self, opening_bell):
+        report = await MarketReplay(opening_bell, speed=100).run()
+        print("\n" + format_report(report))
+
+        # Six seconds of wall time for ten minutes of market; the pipeline must not fall behind
+        assert report["elapsed_seconds"] >= SESSION_SECONDS / 100 * 0.99
+        assert report["max_lag_ms"] < 250
@@ -0,0 +1,82 @@
+"""
+Institutional Pre-Trade Check Latency Benchmark
+===============================================
+Pre-trade limit checks against a book of institutional clients with hundreds
+of positions each, interleaved with fills and price marks. Checks read the
+in-memory indexes, so latency must not grow with positions per client.
+
+    python -m pytest tests/load/test_pre_trade_latency.py -s
+"""
+
+import random
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pytest
+
+from app.institutional.position_state import PositionStateEngine
+
+
+CLIENTS = 50
+POSITIONS_PER_CLIENT = 400
+ORDERS = 20000
+FILL_EVERY = 3                 # One fill per this many checks
+MARK_EVERY = 10                # One price mark per this many checks
+
+
+@dataclass
+class Limit:
+    limit_id: str
+    client_id: str
+    limit_type: str
+    limit_value: float
+    is_hard_limit: bool = True
+    is_active: bool = True
+    applicable_symbols: list = None
+
+
+@pytest.mark.load
+@pytest.mark.performance
+class TestPreTradeLatency:
+    """Pre-trade checks stay in microseconds under interleaved fills"""
+
+    def test_check_latency(self):
+        rng = random.Random(11)
+        engine = PositionStateEngine()
+        symbols = [f"SYM{i}" for i in range(2000)]
+        sectors = ["Financials", "IT", "Energy", "FMCG", "Pharma", "Auto"]
+        clients = [f"inst-{c}" for c in range(CLIENTS)]
+
+        for client in clients:
+            for symbol in rng.sample(symbols, POSITIONS_PER_CLIENT):
+                engine.set_position(client, symbol, rng.randint(10, 2000), 100.0, 100 + rng.random() * 10,
+                                    sector=sectors[int(symbol[3:]) % len(sectors)])
+            engine.add_limit(Limit(f"{client}-pos", client, "position_limit", 200_000))
+            engine.add_limit(Limit(f"{client}-book", client, "portfolio_limit", 50_000_000))
+            engine.add_limit(Limit(f"{client}-conc", client, "concentration_limit", 0.1))
+            engine.add_limit(Limit(f"{client}-sector", client, "sector_limit", 0.4, is_hard_limit=False))
+
+        latencies = np.empty(ORDERS)
+        for i in range(ORDERS):
+            client, symbol = rng.choice(clients), rng.choice(symbols)
+            side = "BUY" if rng.random() < 0.5 else "SELL"
+            quantity, price = rng.randint(1, 500), 100 + rng.random() * 10
+
+            started = time.perf_counter_ns()
+            result = engine.check_order(client, symbol, side, quantity, price)
+            latencies[i] = time.perf_counter_ns() - started
+
+            if i % FILL_EVERY == 0 and result.approved:
+                engine.apply_fill(client, symbol, side, quantity, price)
+            if i % MARK_EVERY == 0:
+                engine.mark_price(rng.choice(symbols), 100 + rng.random() * 10)
+
+        p50, p99 = np.percentile(latencies, [50, 99]) / 1000
+        print(f"\n{CLIENTS} clients x {POSITIONS_PER_CLIENT} positions, {ORDERS} checks: "
+              f"p50 {p50:.1f} us, p99 {p99:.1f} us, rejections {engine.stats['rejections']}, "
+              f"fills {engine.stats['fills']}")
+
+        assert engine.stats["checks"] == ORDERS
+        assert 0 < engine.stats["rejections"] < ORDERS
+        assert p99 < 200
@@ -33,6 +33,7 @@ from app.ai_analytics.chart_pattern_detection import (
     MarketCondition,
     ChartData
 )
+from app.ai_analytics.pattern_engine import IncrementalPatternEngine
 
 from app.ai_analytics.voice_alerts_system import (
     VoiceAlertEngine,
@@ -283,6 +284,115 @@ class TestChartPatternDetection:
         assert 'pattern_type_summary' in summary
         assert 'patterns' in summary
         assert summary['total_patterns'] >= 1
+    
+    @staticmethod
+    def _random_walk_chart(bars: int, seed: int = 7) -> ChartData:
+        rng = np.random.default_rng(seed)
+        closes = 2400 + np.cumsum(rng.normal(0, 10, bars))
+        start = datetime(2024, 1, 1, 9, 15)
+        
+        return ChartData(
+            symbol="RELIANCE",
+            timeframe="5m",
+            timestamps=[start + timedelta(minutes=5 * i) for i in range(bars)],
+            open_prices=list(closes),
+            high_prices=list(closes + rng.random(bars) * 8),
+            low_prices=list(closes - rng.random(bars) * 8),
+            close_prices=list(closes),
+            volumes=[1000000.0] * bars
+        )
+    
+    @staticmethod
+    def _first_bars(chart: ChartData, bars: int) -> ChartData:
+        return ChartData(
+            chart.symbol, chart.timeframe, chart.timestamps[:bars], chart.open_prices[:bars],
+            chart.high_prices[:bars], chart.low_prices[:bars], chart.close_prices[:bars], chart.volumes[:bars]
+        )
+    
+    @staticmethod
+    async def _full_window_patterns(detector: TraditionalPatternDetector, chart: ChartData) -> List[Dict]:
+        df = chart.to_dataframe()
+        return [
+            pattern for pattern in [
+                await detector.detect_head_and_shoulders(df),
+                await detector.detect_double_top(df)
+            ] if pattern
+        ] + await detector.detect_triangle_patterns(df)
+    
+    @pytest.mark.asyncio
+    async def test_incremental_engine_matches_full_window(self):
+        """Pivot state fed bar by bar scores each request's window like the full-window detectors"""
+        detector = TraditionalPatternDetector()
+        engine = IncrementalPatternEngine(detector, max_bars=60)
+        chart = self._random_walk_chart(250)
+        
+        for bars in range(1, 251, 3):
+            request = self._first_bars(chart, bars)
+            state = engine.update(request)
+            
+            # Every retained bar of the request, and a shorter trailing window of it
+            for window_bars in (min(bars, len(state)), 45):
+                window_chart = request.tail(window_bars)
+                window = state.window(window_chart.timestamps)
+                assert window is not None
+                assert state.geometric_patterns(window) == await self._full_window_patterns(detector, window_chart)
+        
+        assert len(state) <= 120  # Buffer compacts back to max_bars
+        assert list(state.closes) == chart.close_prices[-len(state):]
+        assert state.window(chart.timestamps) is None  # Older bars were dropped
+    
+    @pytest.mark.asyncio
+    async def test_analysis_cached_until_new_bar(self):
+        """Repeat scans reuse results; a new bar invalidates them"""
+        analyzer = ChartPatternAnalyzer()
+        chart = self._random_walk_chart(120)
+        earlier = self._first_bars(chart, 100)
+        
+        first = await analyzer.analyze_chart(chart)
+        second = await analyzer.analyze_chart(chart)
+        assert [p.pattern_id for p in first] == [p.pattern_id for p in second]
+        
+        state = analyzer.engine.series("RELIANCE", "5m")
+        version = state.version
+        stale = await analyzer.analyze_chart(earlier)  # Stale request adds no bars
+        assert state.version == version
+        
+        # ...and is scored on its own bars, not the newer retained window
+        expected = await ChartPatternAnalyzer().analyze_chart(earlier)
+        assert [(p.pattern_type, p.confidence) for p in stale] == [(p.pattern_type, p.confidence) for p in expected]
+        
+        # Bars the shared state dropped are scanned directly
+        small = ChartPatternAnalyzer(IncrementalPatternEngine(TraditionalPatternDetector(), max_bars=30))
+        await small.analyze_chart(chart)
+        assert small.engine.series("RELIANCE", "5m").window(chart.timestamps) is None
+        assert [(p.pattern_type, p.confidence) for p in await small.analyze_chart(chart)] == \
+            [(p.pattern_type, p.confidence) for p in first]
+        
+        chart.timestamps.append(chart.timestamps[-1] + timedelta(minutes=5))
+        for prices in (chart.open_prices, chart.high_prices, chart.low_prices, chart.close_prices, chart.volumes):
+            prices.append(prices[-1])
+        
+        third = await analyzer.analyze_chart(chart)
+        assert state.version == version + 1
+        assert not {p.pattern_id for p in third} & {p.pattern_id for p in first}
+        
+        results = await analyzer.analyze_charts([chart, self._random_walk_chart(40, seed=3)])
+        assert len(results) == 2
+        assert len(analyzer.engine) == 1  # Same symbol and timeframe share one state
+    
+    def test_candidate_interval_index(self):
+        """Recorded candidates are found by the time span of their key points"""
+        engine = IncrementalPatternEngine(TraditionalPatternDetector())
+        chart = self._random_walk_chart(300, seed=11)
+        state = engine.update(chart)
+        
+        everything = state.candidates_between(chart.timestamps[0], chart.timestamps[-1])
+        assert len(everything) == len(state.candidates) > 0
+        
+        midpoint = chart.timestamps[150]
+        overlapping = state.candidates_between(midpoint, midpoint)
+        assert all(c.start <= 150 <= c.end for c in overlapping)
+        assert len(overlapping) == len([c for c in everything if c.start <= 150 <= c.end])
 
 
 class TestVoiceAlertsSystem:
@@ -0,0 +1,69 @@
+"""
+Algorithmic Alerts Scanner Test Suite
+Tests incremental bar-window indicators and the sharded pattern scanner
+"""
+
+import asyncio
+from typing import List
+
+import numpy as np
+import pytest
+
+from app.analytics.algorithmic_alerts import BarWindow, PatternType, ShardedPatternScanner, TechnicalIndicators
+
+
+class TestBarWindow:
+    """Test per-symbol columnar windows"""
+
+    def test_bar_window_incremental_indicators(self):
+        """Window indicators advance per bar and match a full recompute"""
+        prices = [100 + 5 * np.sin(i / 7) + (i % 3) for i in range(120)]
+        window = BarWindow("TCS", capacity=50)
+
+        for i, price in enumerate(prices):
+            assert window.append(float(i), price, price + 1, price - 1, price, 10000)
+        assert not window.append(10.0, 1, 1, 1, 1, 1)  # Already-seen bar
+
+        assert len(window) == 50
+        assert list(window.series().close) == prices[-50:]
+
+        indicators = window.indicators()
+        macd, signal, _ = TechnicalIndicators.macd(prices)
+        sma, upper, _ = TechnicalIndicators.bollinger_bands(prices)
+        assert indicators["rsi"] == pytest.approx(TechnicalIndicators.rsi(prices))
+        assert indicators["macd"] == pytest.approx(macd)
+        assert indicators["macd_signal"] == pytest.approx(signal)
+        assert indicators["bb_middle"] == pytest.approx(sma)
+        assert indicators["bb_upper"] == pytest.approx(upper)
+
+
+class TestShardedPatternScanner:
+    """Test sharded scanning across process pools"""
+
+    @pytest.mark.asyncio
+    async def test_sharded_scan_only_new_bars(self):
+        """Shards publish breakouts once and skip symbols without new bars"""
+        def bars(breakout: bool) -> List[tuple]:
+            rows = [(float(i), 100 + i * 0.01, 100.5 + i * 0.01, 99.5 + i * 0.01, 100 + i * 0.01, 10000) for i in range(40)]
+            if breakout:
+                rows.append((40.0, 100, 104, 100, 104, 40000))  # Closes on its high
+            return rows
+
+        updates = {f"SYM{i}": bars(breakout=i % 2 == 0) for i in range(6)}
+        scanner = ShardedPatternScanner(workers=2)
+        results = asyncio.Queue()
+        try:
+            await scanner.scan(updates, results)
+            published = [results.get_nowait() for _ in range(results.qsize())]
+
+            assert {r.symbol for r in published} == {"SYM0", "SYM2", "SYM4"}
+            assert all(
+                PatternType.BREAKOUT in {p.pattern_type for p in r.patterns} and
+                r.patterns[0].metadata["current_price"] == 104
+                for r in published
+            )
+
+            # Re-sending the same bars evaluates nothing
+            assert await scanner.scan(updates, results) == 0
+        finally:
+            scanner.shutdown()
@@ -0,0 +1,26 @@
+"""
+Application Lifespan Test Suite
+Tests background services started and stopped with the application
+"""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.main import app
+from app.whatsapp.webhook import inbound_queue
+
+
+class TestApplicationLifespan:
+    """Test the startup and shutdown hooks"""
+
+    @pytest.mark.asyncio
+    async def test_inbound_queue_runs_for_app_lifetime(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("app.main.init_db", AsyncMock())
+        monkeypatch.setattr(inbound_queue, "db_path", str(tmp_path / "queue.db"))
+
+        async with app.router.lifespan_context(app):
+            assert inbound_queue.running
+
+        assert not inbound_queue.running
+        assert inbound_queue._workers == []
@@ -0,0 +1,88 @@
+"""
+Async Database Layer Test Suite
+Tests async URL mapping, the run_sync bridge and batched query helpers
+"""
+
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from app.core.database import async_database_url, bulk_insert, bulk_upsert, hydrate, run_sync
+
+
+Base = declarative_base()
+
+
+class Quote(Base):
+    __tablename__ = "quotes"
+
+    symbol = Column(String, primary_key=True)
+    exchange = Column(String, nullable=False)
+    price = Column(Integer, nullable=False)
+
+
+@pytest.fixture
+async def async_db(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/quotes.db")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+class TestAsyncDatabaseUrl:
+    """Test driver mapping"""
+
+    def test_drivers(self):
+        assert async_database_url("sqlite:///./gridworks.db") == "sqlite+aiosqlite:///./gridworks.db"
+        assert async_database_url("postgresql://u:p@db:5432/gw") == "postgresql+asyncpg://u:p@db:5432/gw"
+        assert async_database_url("postgresql+psycopg2://db/gw") == "postgresql+asyncpg://db/gw"
+
+        with pytest.raises(ValueError):
+            async_database_url("mysql://db/gw")
+
+
+class TestBatchedHelpers:
+    """Test bulk writes and IN-list hydration through both session types"""
+
+    @pytest.mark.asyncio
+    async def test_bulk_insert_and_hydrate_in_chunks(self, async_db):
+        rows = [{"symbol": f"SYM{i}", "exchange": "NSE", "price": i} for i in range(1200)]
+
+        assert await run_sync(async_db, bulk_insert, Quote, rows) == 1200
+        await async_db.commit()
+
+        keys = [f"SYM{i}" for i in range(0, 1200, 2)] + ["MISSING", "SYM0"]
+        found = await run_sync(async_db, hydrate, Quote.symbol, keys)
+
+        assert len(found) == 600
+        assert found["SYM998"].price == 998
+        assert "MISSING" not in found
+
+    @pytest.mark.asyncio
+    async def test_bulk_upsert_updates_existing_rows(self, async_db):
+        await run_sync(async_db, bulk_insert, Quote, [{"symbol": "TCS", "exchange": "NSE", "price": 3500}])
+
+        await run_sync(async_db, bulk_upsert, Quote, [
+            {"symbol": "TCS", "exchange": "BSE", "price": 3550},
+            {"symbol": "INFY", "exchange": "NSE", "price": 1500}
+        ], ["symbol"], ["price"])
+        await async_db.commit()
+
+        quotes = {q.symbol: q for q in (await async_db.scalars(select(Quote))).all()}
+        assert quotes["TCS"].price == 3550
+        assert quotes["TCS"].exchange == "NSE"  # Not in update_columns
+        assert quotes["INFY"].price == 1500
+
+    @pytest.mark.asyncio
+    async def test_run_sync_passes_plain_sessions_through(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path}/sync.db")
+        Base.metadata.create_all(engine)
+
+        with Session(engine) as session:
+            bulk_insert(session, Quote, [{"symbol": "HDFC", "exchange": "NSE", "price": 1600}])
+            count = await run_sync(session, lambda db: db.scalar(select(func.count()).select_from(Quote)))
+
+        assert count == 1
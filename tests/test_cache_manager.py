@@ -0,0 +1,147 @@
+"""
+Cache Manager Test Suite
+Tests single-flight loads, hedged reads, batched reads/writes, per-prefix
+metrics and write/delete ordering against in-flight reads, on fakeredis
+"""
+
+import asyncio
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+
+from app.core.cache_manager import CacheManager
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def cache(server):
+    cache = CacheManager()
+    cache.redis_client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    return cache
+
+
+def gate_fetches(cache: CacheManager) -> asyncio.Event:
+    """Hold every Redis read until the returned event is set; counts reads in cache.fetches"""
+    release = asyncio.Event()
+    fetch = cache._fetch
+    cache.fetches = 0
+
+    async def gated(client, key):
+        cache.fetches += 1
+        result = await fetch(client, key)
+        await release.wait()
+        return result
+
+    cache._fetch = gated
+    return release
+
+
+class TestCacheManager:
+    """Test the L1/Redis cache layers"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_read(self, cache):
+        await cache.redis_client.setex("quote:RELIANCE", 60, "2450.5")
+        release = gate_fetches(cache)
+
+        readers = [asyncio.create_task(cache.get("quote:RELIANCE")) for _ in range(20)]
+        await asyncio.sleep(0.01)
+        release.set()
+
+        assert await asyncio.gather(*readers) == ["2450.5"] * 20
+        assert cache.fetches == 1
+        assert cache.local_cache.get("quote:RELIANCE") == "2450.5"
+        assert cache.local_cache.ttl("quote:RELIANCE") <= 30
+        assert not cache._in_flight and not cache._readers
+
+    @pytest.mark.asyncio
+    async def test_delete_during_read_keeps_stale_value_out_of_l1(self, cache):
+        await cache.redis_client.setex("kyc:user-1", 60, "pending")
+        release = gate_fetches(cache)
+
+        reader = asyncio.create_task(cache.get("kyc:user-1"))
+        await asyncio.sleep(0.01)
+        await cache.delete("kyc:user-1")
+
+        # A caller arriving after the delete does not join the stale read
+        late = asyncio.create_task(cache.get("kyc:user-1"))
+        await asyncio.sleep(0.01)
+        release.set()
+
+        assert await reader == "pending"
+        assert await late is None
+        assert cache.fetches == 2
+        assert cache.local_cache.get("kyc:user-1") is None
+        assert await cache.get("kyc:user-1") is None
+
+    @pytest.mark.asyncio
+    async def test_set_during_read_wins(self, cache):
+        await cache.redis_client.setex("kyc:user-2", 60, "pending")
+        release = gate_fetches(cache)
+
+        reader = asyncio.create_task(cache.get("kyc:user-2"))
+        await asyncio.sleep(0.01)
+        await cache.set("kyc:user-2", "verified", ttl_seconds=60)
+        release.set()
+        await reader
+
+        assert cache.local_cache.get("kyc:user-2") == "verified"
+        assert await cache.get("kyc:user-2") == "verified"
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_read_is_hedged(self, cache, server):
+        await cache.redis_client.setex("chain:NIFTY", 60, "snapshot")
+        cache.replica_client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+        cache._latency_p95, cache._latency_p99 = 0.005, 0.05  # Redis p99 well over the 20ms threshold
+
+        fetch = cache._fetch
+
+        async def slow_primary(client, key):
+            if client is cache.redis_client:
+                await asyncio.sleep(0.2)
+            return await fetch(client, key)
+
+        cache._fetch = slow_primary
+        assert await cache.get("chain:NIFTY") == "snapshot"
+        assert cache.cache_stats['hedged_reads'] == 1
+        assert cache.cache_stats['hedge_wins'] == 1
+
+        # Under the threshold reads are never hedged
+        cache._latency_p99 = 0.001
+        assert await cache.get("chain:NIFTY", use_local=False) == "snapshot"
+        assert cache.cache_stats['hedged_reads'] == 1
+
+    @pytest.mark.asyncio
+    async def test_mset_and_mget(self, cache):
+        await cache.mset({"quote:TCS": "3500", "quote:INFY": "1500"}, ttl_seconds=120, use_local=False)
+        assert await cache.redis_client.ttl("quote:TCS") == 120
+        assert len(cache.local_cache) == 0
+
+        await cache.set("quote:HDFC", "1600")
+        values = await cache.mget(["quote:HDFC", "quote:TCS", "quote:INFY", "quote:WIPRO"])
+
+        assert values == {"quote:HDFC": "1600", "quote:TCS": "3500", "quote:INFY": "1500", "quote:WIPRO": None}
+        assert cache.cache_stats['local_hits'] == 1
+        assert cache.cache_stats['misses'] == 1
+        assert cache.local_cache.get("quote:INFY") == "1500"  # Filled from the batch read
+        assert not cache._readers
+
+    @pytest.mark.asyncio
+    async def test_per_prefix_metrics(self, cache):
+        await cache.set("quote:TCS", "3500")
+        await cache.redis_client.setex("kyc:user-1", 60, "verified")
+
+        await cache.get("quote:TCS")             # L1 hit
+        await cache.get("kyc:user-1")            # Redis hit
+        await cache.get("kyc:user-2")            # Miss
+        await cache.get("quote:TCS", use_local=False)
+
+        metrics = cache.metrics()
+        assert metrics['hits'] == 3 and metrics['local_hits'] == 1 and metrics['misses'] == 1
+        assert metrics['prefixes']['quote'] == {'local_hits': 1, 'hits': 1, 'misses': 0, 'hit_ratio': 1.0}
+        assert metrics['prefixes']['kyc']['hit_ratio'] == 0.5
@@ -0,0 +1,153 @@
+"""
+Chart Data Window Test Suite
+Tests range queries, delta sync and indicator trimming on Chart.get_window,
+and the per-symbol bar lookup behind chart sharing
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from app.charting.core.chart_engine import Chart, ChartConfig, ChartEngine, OHLCV, TimeFrame
+
+
+START = datetime(2024, 1, 2, 9, 15)
+
+
+def bar(i: int) -> OHLCV:
+    return OHLCV(
+        timestamp=START + timedelta(minutes=5 * i),
+        open=100 + i, high=101 + i, low=99 + i, close=100.5 + i, volume=1000 + i
+    )
+
+
+@pytest.fixture
+def chart():
+    engine = ChartEngine()
+    engine.max_data_points = 100
+    chart = Chart("chart_1", ChartConfig(symbol="NIFTY", timeframe=TimeFrame.M5), engine)
+    yield chart
+    engine.render_service.shutdown()
+
+
+class TestChartWindow:
+    """Test the columnar window API"""
+
+    @pytest.mark.asyncio
+    async def test_time_range_and_cursor(self, chart):
+        for i in range(50):
+            await chart.add_data_point(bar(i))
+
+        window = chart.get_window(
+            start=bar(10).timestamp.timestamp(), end=bar(19).timestamp.timestamp()
+        )
+        assert window["first_seq"] == 10
+        assert window["bars"]["close"] == [100.5 + i for i in range(10, 20)]
+        assert window["delta"] is False
+
+        older = chart.get_window(cursor=10, limit=5)
+        assert older["first_seq"] == 5
+        assert older["bars"]["open"] == [105.0, 106.0, 107.0, 108.0, 109.0]
+
+    @pytest.mark.asyncio
+    async def test_delta_since_version(self, chart):
+        for i in range(30):
+            await chart.add_data_point(bar(i))
+        version = chart.version
+
+        for i in range(30, 33):
+            await chart.add_data_point(bar(i))
+        delta = chart.get_window(since=version)
+
+        assert delta["delta"] is True
+        assert delta["version"] == 33
+        assert delta["bars"]["time"] == [bar(i).timestamp.timestamp() for i in range(30, 33)]
+        assert chart.get_window(since=33)["bars"]["close"] == []
+
+    @pytest.mark.asyncio
+    async def test_evicted_version_falls_back_to_full_window(self, chart):
+        for i in range(120):
+            await chart.add_data_point(bar(i))
+
+        window = chart.get_window(since=5, limit=50)
+
+        assert window["delta"] is False
+        assert window["first_seq"] == 70
+        assert len(window["bars"]["close"]) == 50
+
+    @pytest.mark.asyncio
+    async def test_indicator_series_trimmed_to_window(self, chart):
+        for i in range(40):
+            await chart.add_data_point(bar(i))
+        closes = np.array([b.close for b in chart.data])
+        sma = np.convolve(closes, np.ones(10) / 10, mode="valid")  # 31 values, ends at the latest bar
+        chart.indicators["sma_10"] = {"type": "SMA", "params": {"period": 10}, "values": sma}
+
+        window = chart.get_window(cursor=12, limit=5)
+
+        # Bars 7..11: bars before 9 have no SMA value
+        assert window["indicators"]["sma_10"]["values"] == pytest.approx(list(sma[:3]))
+        assert len(chart.get_window(since=35)["indicators"]["sma_10"]["values"]) == 5
+
+
+class TestEngineBars:
+    """Test the per-symbol bar lookup used by chart sharing"""
+
+    @pytest.mark.asyncio
+    async def test_longest_open_chart_served_and_missing_chart_opened(self):
+        engine = ChartEngine()
+        try:
+            short = await engine.create_chart("s1_NIFTY_5m", ChartConfig(symbol="NIFTY", timeframe=TimeFrame.M5))
+            long = await engine.create_chart("s2_NIFTY_5m", ChartConfig(symbol="NIFTY", timeframe=TimeFrame.M5))
+            for i in range(10):
+                await long.add_data_point(bar(i))
+            await short.add_data_point(bar(9))
+
+            assert [b.close for b in await engine.get_bars("NIFTY", "5m")] == [b.close for b in long.data]
+
+            assert await engine.get_bars("BANKNIFTY", "15m") == []
+            assert "feed_BANKNIFTY_15m" in engine.charts
+            assert "feed_BANKNIFTY_15m" in engine.data_subscriptions["BANKNIFTY"]
+
+            with pytest.raises(ValueError):
+                await engine.get_bars("NIFTY", "7m")
+        finally:
+            engine.render_service.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_unknown_symbols_rejected(self):
+        engine = ChartEngine(instruments=["NIFTY", "M&M"])
+        try:
+            assert await engine.get_bars("M&M", "5m") == []
+
+            for symbol in ["NIFTTY", "nifty", "NIFTY 50; DROP"]:
+                with pytest.raises(ValueError, match="Unknown symbol"):
+                    await engine.get_bars(symbol, "5m")
+            assert set(engine.charts) == {"feed_M&M_5m"}
+        finally:
+            engine.render_service.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_feed_charts_bounded_and_unsubscribed(self):
+        engine = ChartEngine(max_feed_charts=2)
+        try:
+            await engine.get_bars("NIFTY", "5m")
+            await engine.get_bars("BANKNIFTY", "5m")
+            await engine.get_bars("NIFTY", "5m")  # Most recently used
+            await engine.get_bars("FINNIFTY", "5m")
+
+            assert set(engine.charts) == {"feed_NIFTY_5m", "feed_FINNIFTY_5m"}
+            assert "BANKNIFTY" not in engine.data_subscriptions
+
+            # Idle feed charts expire; charts opened by users are kept
+            await engine.create_chart("u1_NIFTY_5m", ChartConfig(symbol="NIFTY", timeframe=TimeFrame.M5))
+            engine.feed_chart_ttl = 0.0
+            await engine.get_bars("NIFTY", "5m")
+
+            assert set(engine.charts) == {"feed_NIFTY_5m", "u1_NIFTY_5m"}
+            assert await engine.get_bars("BANKNIFTY", "5m") == []
+            assert set(engine.charts) == {"feed_BANKNIFTY_5m", "u1_NIFTY_5m"}
+            assert engine.data_subscriptions["NIFTY"] == ["u1_NIFTY_5m"]
+        finally:
+            engine.render_service.shutdown()
@@ -0,0 +1,173 @@
+"""
+Chart Render Service Test Suite
+Tests image output, render caching, coalescing and the process pool
+"""
+
+import asyncio
+import io
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.charting.core import render_service
+from app.charting.core.render_service import (
+    ChartBars,
+    ChartRenderService,
+    RenderCancelledError,
+    RenderSpec,
+    drawing_spec,
+    render_chart
+)
+
+
+def make_bars(count: int = 200, start: float = 1_700_000_000.0) -> ChartBars:
+    rng = np.random.default_rng(7)
+    close = 2500 + np.cumsum(rng.normal(0, 5, count))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    return ChartBars(
+        timestamp=start + 300 * np.arange(count, dtype=float),
+        open=open_,
+        high=np.maximum(open_, close) + 3,
+        low=np.minimum(open_, close) - 3,
+        close=close,
+        volume=rng.integers(1000, 5000, count).astype(float)
+    )
+
+
+class TestRenderChart:
+    """Test the worker-side renderer"""
+
+    def test_png_and_jpeg_output(self):
+        bars = make_bars()
+
+        png, seconds = render_chart(RenderSpec(symbol="NIFTY", timeframe="5m", width=640, height=480), bars)
+        jpg, _ = render_chart(RenderSpec(symbol="NIFTY", timeframe="5m", format="jpg", theme="light"), bars)
+
+        assert Image.open(io.BytesIO(png)).size == (640, 480)
+        assert Image.open(io.BytesIO(jpg)).format == "JPEG"
+        assert seconds > 0
+
+    def test_moving_averages_drawn(self):
+        bars = make_bars()
+
+        plain, _ = render_chart(RenderSpec(symbol="NIFTY", timeframe="5m"), bars)
+        with_sma, _ = render_chart(RenderSpec(symbol="NIFTY", timeframe="5m", indicators=("SMA:20",)), bars)
+        with_rsi, _ = render_chart(RenderSpec(symbol="NIFTY", timeframe="5m", indicators=("RSI:14",)), bars)
+
+        assert with_sma != plain
+        assert with_rsi == plain  # Only SMA/EMA are drawn
+
+    def test_unsupported_format_rejected(self):
+        with pytest.raises(ValueError):
+            RenderSpec(symbol="NIFTY", timeframe="5m", format="svg")
+
+    def test_indicator_order_does_not_change_key(self):
+        bars = make_bars()
+        first = RenderSpec(symbol="NIFTY", timeframe="5m", indicators=("EMA:50", "SMA:20"))
+        second = RenderSpec(symbol="NIFTY", timeframe="5m", indicators=("SMA:20", "EMA:50", "SMA:20"))
+
+        assert ChartRenderService.cache_key(first, bars) == ChartRenderService.cache_key(second, bars)
+
+    def test_undrawable_indicators_dropped_from_key(self):
+        bars = make_bars()
+        spec = RenderSpec(symbol="NIFTY", timeframe="5m", indicators=("RSI:14", "MACD", "sma20", "EMA"))
+
+        assert spec.indicators == ("SMA:20",)
+        assert ChartRenderService.cache_key(spec, bars) == \
+            ChartRenderService.cache_key(RenderSpec(symbol="NIFTY", timeframe="5m", indicators=("SMA:20",)), bars)
+
+    def test_drawings_drawn(self):
+        bars = make_bars()
+        trend = drawing_spec({"type": "trend_line", "points": [
+            {"timestamp": bars.timestamp[-60], "price": 2480.0},
+            {"timestamp": bars.timestamp[-1], "price": 2520.0}
+        ]})
+        support = drawing_spec({"type": "horizontal_line", "points": [{"price": float(bars.low.min())}]})
+
+        assert trend == ("trend_line", ((bars.timestamp[-60], 2480.0), (bars.timestamp[-1], 2520.0)))
+        assert drawing_spec({"type": "gann_fan", "points": []}) is None
+        assert drawing_spec({"type": "trend_line", "points": [{"price": 2480.0}, {"price": 2500.0}]}) is None
+
+        plain, _ = render_chart(RenderSpec(symbol="NIFTY", timeframe="5m"), bars)
+        drawn, _ = render_chart(RenderSpec(symbol="NIFTY", timeframe="5m", drawings=(trend, support)), bars)
+        assert drawn != plain
+
+
+class TestChartRenderService:
+    """Test caching and coalescing in front of the pool"""
+
+    @pytest.mark.asyncio
+    async def test_cached_until_new_bar(self):
+        service = ChartRenderService(workers=0)
+        spec = RenderSpec(symbol="RELIANCE", timeframe="15m")
+        bars = make_bars()
+
+        first = await service.render(spec, bars)
+        second = await service.render(spec, bars)
+        await service.render(spec, make_bars(count=201))
+
+        assert first == second
+        assert service.stats["renders"] == 2
+        assert service.stats["cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_render(self):
+        service = ChartRenderService(workers=0)
+        spec = RenderSpec(symbol="RELIANCE", timeframe="15m", trade_buttons=True)
+        bars = make_bars()
+
+        images = await asyncio.gather(*(service.render(spec, bars) for _ in range(10)))
+
+        assert len(set(images)) == 1
+        assert service.stats["renders"] == 1
+        assert service.stats["coalesced"] == 9
+        metrics = service.metrics()
+        assert metrics["in_flight"] == 0
+        assert metrics["render_p95_ms"] > 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_fails_followers_cleanly(self, monkeypatch):
+        def slow_render(spec, bars):
+            time.sleep(0.05)
+            return render_chart(spec, bars)
+
+        monkeypatch.setattr(render_service, "render_chart", slow_render)
+        service = ChartRenderService(workers=0)
+        spec = RenderSpec(symbol="SBIN", timeframe="5m")
+        bars = make_bars()
+
+        leader = asyncio.create_task(service.render(spec, bars))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(service.render(spec, bars))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        with pytest.raises(RenderCancelledError):
+            await follower
+        assert leader.cancelled()
+        assert service.metrics()["in_flight"] == 0
+
+        # The next request renders afresh
+        assert await service.render(spec, bars)
+
+    @pytest.mark.asyncio
+    async def test_cache_bounded(self):
+        service = ChartRenderService(workers=0, cache_size=2)
+        bars = make_bars(count=50)
+
+        for width in (400, 500, 600):
+            await service.render(RenderSpec(symbol="TCS", timeframe="1h", width=width), bars)
+
+        assert service.metrics()["cached_images"] == 2
+
+    @pytest.mark.asyncio
+    async def test_process_pool_render(self):
+        service = ChartRenderService(workers=1)
+        try:
+            image = await service.render(RenderSpec(symbol="INFY", timeframe="1d"), make_bars())
+        finally:
+            service.shutdown()
+
+        assert Image.open(io.BytesIO(image)).size == (800, 600)
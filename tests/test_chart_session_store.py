@@ -0,0 +1,85 @@
+"""
+Chart Session Store Test Suite
+Tests consistent-hash sharding and heap-based inactivity expiry
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.charting.core.session_store import HashRing, ShardedSessionStore
+
+
+NOW = datetime(2024, 1, 2, 10, 0)
+
+
+@dataclass
+class Session:
+    session_id: str
+    last_activity: datetime = field(default=NOW)
+
+
+class TestHashRing:
+    """Test key placement"""
+
+    def test_balanced_and_stable_when_growing(self):
+        keys = [f"session-{i}" for i in range(20000)]
+        ring = HashRing(16)
+        placement = {key: ring.shard_for(key) for key in keys}
+
+        counts = [list(placement.values()).count(shard) for shard in range(16)]
+        assert min(counts) > 0.6 * len(keys) / 16
+
+        grown = HashRing(17)
+        moved = sum(grown.shard_for(key) != shard for key, shard in placement.items())
+        assert moved < len(keys) / 8  # ~1/17 expected; a modulo hash would move ~16/17
+
+
+class TestShardedSessionStore:
+    """Test dict behaviour and expiry"""
+
+    def test_mapping_interface(self):
+        store = ShardedSessionStore(shards=4)
+        for i in range(100):
+            store[f"s{i}"] = Session(f"s{i}")
+
+        assert len(store) == 100
+        assert "s42" in store and "missing" not in store
+        assert store["s7"].session_id == "s7"
+        assert sorted(store) == sorted(f"s{i}" for i in range(100))
+        assert sum(store.shard_sizes()) == 100
+
+        del store["s7"]
+        assert "s7" not in store
+        assert len(store) == 99
+        assert store.get("s7") is None
+
+    @pytest.mark.asyncio
+    async def test_only_idle_sessions_expire(self):
+        store = ShardedSessionStore(shards=4)
+        for i in range(10):
+            store[f"s{i}"] = Session(f"s{i}")
+
+        # Half the sessions stay active
+        for i in range(5):
+            store[f"s{i}"].last_activity = NOW + timedelta(minutes=50)
+
+        # Cutoff is "now - timeout": idle since before NOW + 30m
+        expired = await store.expired(NOW + timedelta(minutes=30))
+        assert sorted(expired) == [f"s{i}" for i in range(5, 10)]
+
+        for session_id in expired:
+            del store[session_id]
+
+        assert await store.expired(NOW + timedelta(minutes=30)) == []
+        assert sorted(await store.expired(NOW + timedelta(minutes=51))) == [f"s{i}" for i in range(5)]
+
+    @pytest.mark.asyncio
+    async def test_undeleted_sessions_reported_again(self):
+        store = ShardedSessionStore(shards=2)
+        store["s1"] = Session("s1")
+
+        cutoff = NOW + timedelta(hours=2)
+        assert await store.expired(cutoff) == ["s1"]
+        assert await store.expired(cutoff) == ["s1"]
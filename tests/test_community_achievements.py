@@ -0,0 +1,40 @@
+"""
+Community Achievements Test Suite
+Tests event-driven achievement evaluation in the community engine
+"""
+
+import pytest
+
+from app.community.community_features import BadgeType, CommunityEngine
+
+
+class TestEventDrivenAchievements:
+    """Test achievements are evaluated from the events that can satisfy them"""
+
+    @pytest.fixture
+    async def community_engine(self):
+        engine = CommunityEngine()
+        yield engine
+        engine.stop_community_engine()
+
+    @pytest.mark.asyncio
+    async def test_follower_events_award_badge_once(self, community_engine):
+        leader = await community_engine.register_user({
+            "username": "leader",
+            "email": "leader@example.com"
+        })
+
+        for i in range(50):
+            follower = await community_engine.register_user({
+                "username": f"follower{i}",
+                "email": f"follower{i}@example.com"
+            })
+            assert await community_engine.follow_user(follower.user_id, leader.user_id)
+
+        assert BadgeType.COMMUNITY_LEADER in leader.badges
+        assert community_engine.event_counts["follower_gained"] == 50
+
+        # Already-owned badges are not awarded twice
+        awarded = await community_engine.emit_event(leader.user_id, "follower_gained")
+        assert awarded == []
+        assert not await community_engine.follow_user(follower.user_id, leader.user_id)
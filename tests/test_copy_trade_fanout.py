@@ -0,0 +1,60 @@
+"""
+Copy Trade Fan-out Test Suite
+Tests vectorized follower sizing and bounded-concurrency gathering
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.trading.copy_fanout import gather_bounded, size_copy_quantities
+
+
+class TestSizeCopyQuantities:
+    """Test follower sizing"""
+
+    def test_ratio_and_amount_caps(self):
+        quantities = size_copy_quantities(
+            100,
+            2450.0,
+            np.array([0.1, 0.5, 1.0, 0.25]),
+            np.array([50000.0, 50000.0, 1e9, 10000.0])
+        )
+
+        # 10 shares; 50 capped to 20 by amount; full size; 25 capped to 4
+        assert quantities.tolist() == [10, 20, 100, 4]
+        assert quantities.dtype == np.int64
+
+    def test_float_ratio_not_truncated(self):
+        # 100 * 0.58 is 57.99999... in floating point
+        assert size_copy_quantities(100, 10.0, np.array([0.58]), np.array([1e9]))[0] == 58
+
+
+class TestGatherBounded:
+    """Test bounded-concurrency gathering"""
+
+    @pytest.mark.asyncio
+    async def test_limit_order_and_exceptions(self):
+        running = 0
+        peak = 0
+
+        async def job(index):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01 * (index % 3))
+            running -= 1
+            if index == 7:
+                raise ValueError("broker rejected")
+            return index
+
+        results = await gather_bounded([job(i) for i in range(20)], limit=4)
+
+        assert peak == 4
+        assert [r for i, r in enumerate(results) if i != 7] == [i for i in range(20) if i != 7]
+        assert isinstance(results[7], ValueError)
+
+    @pytest.mark.asyncio
+    async def test_empty(self):
+        assert await gather_bounded([], limit=10) == []
@@ -20,6 +20,7 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 # Import Financial Planning Suite components
+from app.ai_support.llm_gateway import LLMGateway, FakeLLMProvider
 from app.financial_planning.gpt4_financial_coach import (
     GPT4FinancialCoach,
     RiskProfile,
@@ -72,15 +73,11 @@ class TestGPT4FinancialCoach:
     
     @pytest.fixture
     def mock_openai_client(self):
-        """Mock OpenAI client for testing"""
-        with patch('app.financial_planning.gpt4_financial_coach.AsyncOpenAI') as mock:
-            mock_client = AsyncMock()
-            mock_response = AsyncMock()
-            mock_response.choices = [Mock()]
-            mock_response.choices[0].message.content = "This is a sample financial advice with market risks disclosure."
-            mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
-            mock.return_value = mock_client
-            yield mock_client
+        """Mock model gateway for testing"""
+        provider = FakeLLMProvider("This is a sample financial advice with market risks disclosure.")
+        with patch('app.financial_planning.gpt4_financial_coach.get_llm_gateway') as mock:
+            mock.return_value = LLMGateway(provider)
+            yield provider
     
     @pytest.fixture
     def sample_user_profile(self):
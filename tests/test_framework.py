@@ -13,6 +13,7 @@ from unittest.mock import AsyncMock, Mock, patch
 from datetime import datetime, timedelta
 import aiohttp
 from decimal import Decimal
+import numpy as np
 
 # Testing libraries
 import pytest_asyncio
@@ -394,15 +395,26 @@ class TestSocialTradingEngine:
             "symbol": "RELIANCE"
         }
         
-        for scenario in follower_scenarios:
-            # Test position sizing logic
+        quantities = social_trading_engine._size_copy_quantities(
+            leader_trade["quantity"],
+            float(leader_trade["price"]),
+            np.array([scenario["copy_ratio"] for scenario in follower_scenarios]),
+            np.array([float(scenario["max_copy"]) for scenario in follower_scenarios])
+        )
+        
+        for scenario, quantity in zip(follower_scenarios, quantities):
+            # All followers are sized in one vectorized pass
             expected_quantity = min(
                 int(leader_trade["quantity"] * scenario["copy_ratio"]),
                 int(scenario["max_copy"] / leader_trade["price"])
             )
             
-            # This would test actual position sizing implementation
-            assert expected_quantity >= 0
+            assert quantity == expected_quantity
+        
+        # Float ratios must not truncate below the exact Decimal result
+        assert social_trading_engine._size_copy_quantities(
+            100, 10.0, np.array([0.58]), np.array([1e9])
+        )[0] == 58
     
     @pytest.mark.asyncio
     async def test_social_trading_security(self, social_trading_engine):
@@ -0,0 +1,116 @@
+"""
+Test suite for the Trading Idea search index
+Tests BM25 ranking, facet filters, sorting and index maintenance
+"""
+
+import pytest
+from datetime import datetime, timedelta
+
+from app.features.idea_search_index import IdeaSearchIndex, IdeaDocument, tokenize
+
+
+BASE_TIME = datetime(2024, 1, 1, 9, 15)
+
+
+def make_document(idea_id, title, symbol, minutes=0, **overrides):
+    fields = dict(
+        idea_id=idea_id,
+        expert_user_id='expert_1',
+        title=title,
+        description=f"{title} with volume confirmation and clear risk levels",
+        symbol=symbol,
+        category='EQUITY',
+        idea_type='TRADE_SIGNAL',
+        risk_level='MEDIUM',
+        time_horizon='SHORT_TERM',
+        is_premium=False,
+        premium_price=None,
+        average_rating=0.0,
+        created_at=BASE_TIME + timedelta(minutes=minutes),
+        tags=[]
+    )
+    fields.update(overrides)
+    return IdeaDocument(**fields)
+
+
+@pytest.fixture
+def index():
+    index = IdeaSearchIndex()
+    index.add(make_document('idea_1', 'RELIANCE Buy Signal', 'RELIANCE', 0, tags=['breakout', 'volume']))
+    index.add(make_document('idea_2', 'TCS breakout above resistance', 'TCS', 1, risk_level='HIGH', average_rating=4.5))
+    index.add(make_document('idea_3', 'Banking outlook after RBI policy', 'HDFCBANK', 2,
+                            idea_type='MARKET_OUTLOOK', is_premium=True, premium_price=199.0, average_rating=3.0))
+    index.add(make_document('idea_4', 'Nifty options strategy for expiry', 'NIFTY', 3,
+                            category='OPTIONS', expert_user_id='expert_2', tags=['breakout']))
+    return index
+
+
+class TestIdeaSearch:
+    """Test ranked and filtered search"""
+
+    def test_tokenize(self):
+        assert tokenize("RELIANCE: buy @2,450!") == ['reliance', 'buy', '2', '450']
+        assert tokenize(None) == []
+
+    def test_symbol_match_ranks_first(self, index):
+        """An idea about the symbol outranks one merely mentioning the word"""
+        index.add(make_document('idea_5', 'Sector rotation notes', 'ITC', 4,
+                                description='Reliance mentioned once among many other stocks today'))
+
+        result = index.search(query='reliance')
+
+        assert result['idea_ids'] == ['idea_1', 'idea_5']
+        assert result['scores']['idea_1'] > result['scores']['idea_5']
+
+    def test_all_terms_required_and_prefix(self, index):
+        assert index.search(query='breakout resistance')['idea_ids'] == ['idea_2']
+        assert index.search(query='RELI')['idea_ids'] == ['idea_1']
+        assert index.search(query='unknownterm')['total_count'] == 0
+
+    def test_facet_filters(self, index):
+        result = index.search(filters={'category': 'EQUITY', 'is_premium': False})
+        assert set(result['idea_ids']) == {'idea_1', 'idea_2'}
+
+        result = index.search(query='breakout', filters={'tags': ['breakout'], 'expert_user_id': 'expert_2'})
+        assert result['idea_ids'] == ['idea_4']
+
+        assert index.search(min_rating=4.0)['idea_ids'] == ['idea_2']
+
+    def test_sorting_and_pagination(self, index):
+        assert index.search()['idea_ids'] == ['idea_4', 'idea_3', 'idea_2', 'idea_1']  # Newest first
+        assert index.search(sort_by='rating', limit=2)['idea_ids'] == ['idea_2', 'idea_3']
+        assert index.search(sort_by='created_at', sort_order='asc', offset=1, limit=2)['idea_ids'] == ['idea_2', 'idea_3']
+
+        result = index.search(limit=3, offset=3)
+        assert result['idea_ids'] == ['idea_1']
+        assert result['total_count'] == 4
+
+    def test_facet_counts(self, index):
+        facets = index.search(query='breakout', facet_counts=True)['facets']
+
+        assert facets['category'] == {'EQUITY': 2, 'OPTIONS': 1}
+        assert facets['tags']['breakout'] == 2
+
+
+class TestIndexMaintenance:
+    """Test incremental updates keep postings and facets consistent"""
+
+    def test_reindex_and_remove(self, index):
+        index.add(make_document('idea_1', 'INFY results preview', 'INFY', 0))
+
+        assert index.search(query='reliance')['total_count'] == 0
+        assert index.search(query='infy')['idea_ids'] == ['idea_1']
+
+        for idea_id in list(index.documents):
+            index.remove(idea_id)
+
+        assert len(index) == 0
+        assert index._vocabulary == []
+        assert all(not values for values in index._facets.values())
+        assert index.average_length == 0.0
+
+    def test_update_rating(self, index):
+        index.update_rating('idea_1', 5.0)
+        index.update_rating('missing', 5.0)
+
+        assert index.search(sort_by='rating', limit=1)['idea_ids'] == ['idea_1']
@@ -0,0 +1,132 @@
+"""
+Leaderboard Test Suite
+Tests order-statistic ranking, calendar periods, compounded-return boards
+and the community period leaderboards
+"""
+
+import random
+from datetime import datetime
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+
+from app.community.community_features import CommunityEngine
+from app.community.leaderboard import CompoundReturnLeaderboard, Leaderboard, period_key
+
+
+class TestLeaderboardRanking:
+    """Test the order-statistic leaderboard"""
+
+    def test_ranks_match_full_sort(self):
+        board = Leaderboard("test")
+        scores = {}
+        rng = random.Random(7)
+
+        for _ in range(5000):
+            member = f"user_{rng.randint(0, 200)}"
+            if rng.random() < 0.1:
+                board.remove(member)
+                scores.pop(member, None)
+            else:
+                score = float(rng.randint(-100, 100))
+                board.update(member, score)
+                scores[member] = score
+
+        expected = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+
+        assert [(member, score) for member, score, _ in board.top(len(board))] == expected
+        for position, (member, _) in enumerate(expected):
+            assert board.rank(member) == position + 1
+
+        page = board.top(10, offset=20)
+        assert [rank for _, _, rank in page] == list(range(21, 31))
+        assert [member for member, _, _ in page] == [member for member, _ in expected[20:30]]
+
+    def test_unknown_member(self):
+        board = Leaderboard()
+        board.increment("a", 5)
+
+        assert board.rank("missing") is None
+        assert board.score("a") == 5
+        assert board.top(10, offset=5) == []
+
+
+class TestPeriods:
+    """Test calendar period keys"""
+
+    def test_periods_follow_the_calendar(self):
+        sunday, monday = datetime(2024, 3, 31, 23, 59), datetime(2024, 4, 1, 0, 1)
+
+        for period in ["daily", "weekly", "monthly", "quarterly"]:
+            assert period_key(period, sunday) != period_key(period, monday)
+
+        # Same ISO week, different months
+        assert period_key("weekly", datetime(2024, 1, 31)) == period_key("weekly", datetime(2024, 2, 2))
+        assert period_key("quarterly", datetime(2024, 1, 1)) == period_key("quarterly", datetime(2024, 3, 31))
+
+
+class TestCompoundReturnLeaderboard:
+    """Test compounded-return ranking on a Redis sorted set"""
+
+    @pytest.fixture
+    def board(self):
+        redis = fakeredis.aioredis.FakeRedis(server=fakeredis.FakeServer(), decode_responses=True)
+        return CompoundReturnLeaderboard(redis, "returns")
+
+    @pytest.mark.asyncio
+    async def test_returns_compound(self, board):
+        await board.add_return("steady", 10.0)
+        total = await board.add_return("steady", 10.0)
+        await board.add_return("swing", 50.0)
+        await board.add_return("swing", -40.0)
+
+        assert total == pytest.approx(21.0)
+        assert await board.score("swing") == pytest.approx(-10.0)  # Not the +10 a plain sum gives
+
+        top = await board.top(2)
+        assert [(member, rank) for member, _, rank in top] == [("steady", 1), ("swing", 2)]
+        assert top[0][1] == pytest.approx(21.0)
+
+    @pytest.mark.asyncio
+    async def test_total_loss_is_floored(self, board):
+        await board.add_return("wiped", -100.0)
+        await board.add_return("flat", 0.0)
+
+        assert await board.score("wiped") == pytest.approx(-100.0, abs=1e-3)
+        assert await board.rank("flat") == 1
+        assert await board.score("missing") is None
+
+
+class TestCommunityPeriodLeaderboards:
+    """Test community leaderboards follow portfolio updates"""
+
+    @pytest.fixture
+    async def community_engine(self):
+        engine = CommunityEngine()
+        yield engine
+        engine.stop_community_engine()
+
+    @pytest.mark.asyncio
+    async def test_period_leaderboards(self, community_engine):
+        users = []
+        for i in range(4):
+            user_data = {
+                "username": f"ranked_user_{i}",
+                "email": f"ranked{i}@example.com",
+                "portfolio_value": 100000
+            }
+            users.append(await community_engine.register_user(user_data))
+
+        for i, user in enumerate(users):
+            await community_engine.update_user_portfolio(user.user_id, 100000 * (1 + i / 100), i / 100)
+
+        for period in ["daily", "weekly", "monthly"]:
+            leaderboard = await community_engine.get_leaderboard(period, limit=2)
+            assert [entry.username for entry in leaderboard] == ["ranked_user_3", "ranked_user_2"]
+            assert [entry.rank for entry in leaderboard] == [1, 2]
+
+        # A single update moves one user without touching the rest
+        await community_engine.update_user_portfolio(users[0].user_id, 110000, 0.1)
+        assert await community_engine.get_user_rank(users[0].user_id, "weekly") == 1
+        assert await community_engine.get_user_rank(users[3].user_id, "weekly") == 2
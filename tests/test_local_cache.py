@@ -0,0 +1,72 @@
+"""
+Local Cache Test Suite
+Tests TTL expiry, LRU bounds and probabilistic early refresh of the L1 cache
+"""
+
+from app.core.local_cache import LocalCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLocalCache:
+    """Test the bounded, TTL-respecting L1"""
+
+    def test_entries_expire_with_their_ttl(self):
+        clock = FakeClock()
+        cache = LocalCache(clock=clock)
+        cache.set("kyc:user-1", "verified", ttl_seconds=5)
+        cache.set("consent:user-1", "granted", ttl_seconds=60)
+
+        assert cache.get("kyc:user-1") == "verified"
+        clock.now += 5
+        assert cache.get("kyc:user-1") is None
+        assert cache.get("consent:user-1") == "granted"
+        assert cache.expirations == 1
+
+        cache.set("consent:user-1", "revoked", ttl_seconds=0)
+        assert "consent:user-1" not in cache
+
+    def test_bounded_least_recently_used_first(self):
+        cache = LocalCache(max_entries=3)
+        for key in ("a", "b", "c"):
+            cache.set(key, key, ttl_seconds=60)
+
+        cache.get("a")
+        cache.set("d", "d", ttl_seconds=60)
+
+        assert len(cache) == 3
+        assert "b" not in cache
+        assert all(key in cache for key in ("a", "c", "d"))
+        assert cache.evictions == 1
+
+    def test_purge_frees_expired_entries(self):
+        clock = FakeClock()
+        cache = LocalCache(clock=clock)
+        for i in range(100):
+            cache.set(f"quote:{i}", str(i), ttl_seconds=1 if i % 2 else 10)
+
+        clock.now += 2
+        assert cache.purge_expired() == 50
+        assert len(cache) == 50
+
+    def test_early_refresh_only_near_expiry(self):
+        clock = FakeClock()
+        cache = LocalCache(clock=clock)
+        cache.set("hot", "value", ttl_seconds=10, fetch_seconds=0.5)
+
+        early = [cache.lookup("hot")[1] for _ in range(1000)]
+        assert not any(early)  # 10s from expiry, e^-20 chance per lookup
+
+        clock.now += 9.9
+        late = [cache.lookup("hot") for _ in range(1000)]
+        assert all(value == "value" for value, _ in late)
+        assert sum(refresh for _, refresh in late) > 500  # P(refresh) = e^-0.2 ~ 0.82
+
+        cache.beta = 0
+        assert not cache.lookup("hot")[1]
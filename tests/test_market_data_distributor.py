@@ -0,0 +1,123 @@
+"""
+Market Data Distributor Test Suite
+Tests shared per-symbol encoding, sequencing and drop-to-snapshot recovery
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from app.institutional.market_data_distributor import MarketDataDistributor, decode_binary
+
+
+class FakeWebSocket:
+    """Records frames; `gate` lets a test stall the consumer"""
+
+    def __init__(self):
+        self.frames = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def send_text(self, frame: str):
+        await self.gate.wait()
+        self.frames.append(json.loads(frame))
+
+    async def send_bytes(self, frame: bytes):
+        await self.gate.wait()
+        self.frames.append(decode_binary(frame))
+
+
+async def drain():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestMarketDataDistributor:
+    """Test fan-out to WebSocket clients"""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_then_sequenced_updates_in_both_encodings(self):
+        distributor = MarketDataDistributor()
+        distributor.publish_depth("NIFTY24JANFUT", bids=[(21500.0, 50), (21499.5, 75)], asks=[(21500.5, 25)])
+
+        json_ws, binary_ws = FakeWebSocket(), FakeWebSocket()
+        await distributor.subscribe("fund-a", json_ws, ["NIFTY24JANFUT"])
+        await distributor.subscribe("fund-b", binary_ws, ["NIFTY24JANFUT"], encoding="binary")
+        await drain()
+
+        distributor.publish_tick("NIFTY24JANFUT", price=21500.25, volume=150, bid=21500.0, ask=21500.5)
+        distributor.publish_depth("NIFTY24JANFUT", bids=[(21499.5, 0)])
+        await drain()
+
+        for ws in (json_ws, binary_ws):
+            snapshot, tick, update = ws.frames
+            assert snapshot["type"] == "depth_snapshot" and snapshot["seq"] == 1
+            assert snapshot["bids"] == [[21500.0, 50], [21499.5, 75]]
+            assert (tick["type"], tick["seq"], tick["price"]) == ("market_data", 2, 21500.25)
+            assert (update["type"], update["seq"], update["bids"]) == ("depth_update", 3, [[21499.5, 0]])
+
+        # Each message encoded once per wire format, not once per client
+        assert distributor.stats["encodes"] == 4
+        await distributor.close()
+
+    @pytest.mark.asyncio
+    async def test_slow_client_resyncs_from_snapshot(self):
+        distributor = MarketDataDistributor(max_queue=10)
+        fast, slow = FakeWebSocket(), FakeWebSocket()
+        await distributor.subscribe("fast", fast, ["BANKNIFTY", "FINNIFTY"])
+        await distributor.subscribe("slow", slow, ["BANKNIFTY", "FINNIFTY"])
+        await drain()
+
+        slow.gate.clear()
+        for i in range(50):
+            distributor.publish_tick("BANKNIFTY", price=48000.0 + i, volume=i)
+            distributor.publish_depth("FINNIFTY", bids=[(21000.0 - i, 10)])
+            await asyncio.sleep(0)  # Fast consumer keeps up
+        await drain()
+
+        assert len(fast.frames) == 2 + 100
+        assert len(distributor.clients["slow"].queue) <= 10
+        assert distributor.stats["resyncs"] >= 1
+
+        slow.gate.set()
+        await drain()
+
+        # Updates after a snapshot continue from its seq with no gaps
+        last_seq = {}
+        for frame in slow.frames:
+            if frame["type"] != "depth_snapshot":
+                assert frame["seq"] == last_seq[frame["symbol"]] + 1
+            last_seq[frame["symbol"]] = frame["seq"]
+
+        resync = [f for f in slow.frames if f["type"] == "depth_snapshot" and f["symbol"] == "BANKNIFTY"][-1]
+        assert resync["quote"]["price"] == 48049.0
+        assert last_seq == {"BANKNIFTY": 50, "FINNIFTY": 50}
+        assert len(slow.frames) < len(fast.frames)
+        await distributor.close()
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_and_failed_client_removed(self):
+        distributor = MarketDataDistributor()
+        ws, broken = FakeWebSocket(), FakeWebSocket()
+
+        async def fail(frame):
+            raise ConnectionError("client went away")
+
+        broken.send_text = fail
+        await distributor.subscribe("ok", ws, ["RELIANCE", "TCS"])
+        await distributor.subscribe("broken", broken, ["RELIANCE"])
+        await drain()
+
+        distributor.unsubscribe("ok", ["TCS"])
+        distributor.publish_tick("TCS", price=3500.0, volume=10)
+        distributor.publish_tick("RELIANCE", price=2450.5, volume=10)
+        await drain()
+
+        assert [f["symbol"] for f in ws.frames if f["type"] == "market_data"] == ["RELIANCE"]
+        assert "broken" not in distributor.clients
+        assert distributor.feeds["RELIANCE"].subscribers == {distributor.clients["ok"]}
+
+        with pytest.raises(ValueError):
+            await distributor.subscribe("ok", ws, ["INFY"], encoding="xml")
+        await distributor.close()
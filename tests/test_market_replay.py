@@ -0,0 +1,123 @@
+"""
+Market Replay Test Suite
+Tests recording generation, simulated-clock pacing, latency histograms and baseline comparison
+"""
+
+import hashlib
+from datetime import timedelta
+
+import pytest
+
+from app.testing.market_replay import (
+    STAGES,
+    LatencyHistogram,
+    MarketReplay,
+    Recording,
+    compare_to_baseline,
+    generate_session,
+)
+
+
+class RecordingPipeline:
+    """Stands in for ReplayPipeline, noting the simulated time of each event"""
+
+    def __init__(self, clock, symbols):
+        self.clock = clock
+        self.seen = []
+        self.histograms = {stage: LatencyHistogram() for stage in STAGES}
+        self.outputs = {"ticks": 0, "orders": 0}
+        self.digest = hashlib.sha256()
+
+    async def start(self):
+        pass
+
+    async def on_tick(self, symbol, price, volume):
+        self.outputs["ticks"] += 1
+        self.seen.append(("t", symbol, self.clock()))
+        self.histograms["tick"].record(1000)
+
+    async def on_order(self, client_id, symbol, side, quantity, limit_price):
+        self.outputs["orders"] += 1
+        self.seen.append(("o", symbol, self.clock()))
+
+    async def close(self):
+        RecordingPipeline.last = self
+
+
+class TestMarketReplay:
+    """Test deterministic replay tooling"""
+
+    def test_generated_sessions_are_reproducible(self, tmp_path):
+        paths = [tmp_path / name for name in ("a.jsonl.gz", "b.jsonl.gz", "c.jsonl.gz")]
+        counts = [
+            generate_session(str(paths[0]), symbols=["NIFTY", "TCS"], seconds=30, ticks_per_second=50, seed=1),
+            generate_session(str(paths[1]), symbols=["NIFTY", "TCS"], seconds=30, ticks_per_second=50, seed=1),
+            generate_session(str(paths[2]), symbols=["NIFTY", "TCS"], seconds=30, ticks_per_second=50, seed=2)
+        ]
+
+        assert paths[0].read_bytes() == paths[1].read_bytes()
+        assert paths[0].read_bytes() != paths[2].read_bytes()
+
+        recording = Recording(str(paths[0]))
+        events = list(recording)
+        assert len(events) == counts[0]
+        assert recording.symbols == ["NIFTY", "TCS"]
+
+        offsets = [event[1] for event in events]
+        assert offsets == sorted(offsets) and offsets[-1] < 30_000
+        # Opening burst: the first ten seconds are busier than the last ten
+        assert sum(o < 10_000 for o in offsets) > sum(o >= 20_000 for o in offsets)
+        assert any(event[0] == "o" for event in events)
+
+    @pytest.mark.asyncio
+    async def test_paced_replay_follows_the_simulated_clock(self, tmp_path):
+        path = str(tmp_path / "session.jsonl.gz")
+        events = generate_session(path, symbols=["BANKNIFTY"], seconds=5, ticks_per_second=20, seed=3)
+
+        report = await MarketReplay(path, speed=100, pipeline_factory=RecordingPipeline).run()
+
+        recording = Recording(path)
+        expected = [recording.start + timedelta(milliseconds=event[1]) for event in recording]
+        assert [seen[2] for seen in RecordingPipeline.last.seen] == expected
+        assert report["events"] == events
+        # Paced at 100x; events due within a millisecond are not slept for
+        assert report["elapsed_seconds"] >= (expected[-1] - recording.start).total_seconds() / 100 - 0.002
+        assert report["stages"]["tick"]["count"] == report["outputs"]["ticks"]
+
+        with pytest.raises(ValueError):
+            MarketReplay(path, speed=0)
+
+    def test_histogram_percentiles_within_bucket_error(self):
+        histogram = LatencyHistogram()
+        for us in range(1, 1001):
+            histogram.record(us * 1000)
+
+        summary = histogram.summary()
+        assert summary["count"] == 1000
+        assert summary["p50_us"] == pytest.approx(500, rel=0.1)
+        assert summary["p99_us"] == pytest.approx(990, rel=0.1)
+        assert summary["max_us"] == 1000
+        assert LatencyHistogram().percentile(99) == 0.0
+
+    def test_baseline_comparison_flags_regressions(self):
+        def report(p99_chart, throughput, speed=None):
+            return {
+                "recording": {"start": "2024-01-15T09:15:00", "seconds": 900, "seed": 42},
+                "speed": speed,
+                "throughput_eps": throughput,
+                "stages": {
+                    "chart": {"count": 300, "p50_us": 40.0, "p99_us": p99_chart},
+                    "execution": {"count": 0, "p50_us": 0.0, "p99_us": 0.0}
+                }
+            }
+
+        baseline = report(100.0, 50_000)
+        assert compare_to_baseline(report(120.0, 45_000), baseline) == []
+
+        regressions = compare_to_baseline(report(180.0, 30_000), baseline)
+        assert len(regressions) == 2
+        assert regressions[0].startswith("chart p99_us")
+        assert regressions[1].startswith("throughput")
+
+        # Paced replays are not compared on throughput
+        assert compare_to_baseline(report(100.0, 1_000, speed=10), baseline) == []
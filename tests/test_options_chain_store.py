@@ -0,0 +1,101 @@
+"""
+Options Chain Store Test Suite
+Tests rolling per-contract statistics, contract keys, pruning and vectorized flow detection
+"""
+
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.analytics.options_chain_store import OptionsChainStore
+from app.analytics.options_flow_analyzer import OptionsContract, OptionsFlowAnalyzer
+
+
+def chain(expiry, volume=500, iv=0.25, open_interest=10000):
+    """Weekly chain of calls and puts around 18000"""
+    return [
+        OptionsContract(
+            symbol="NIFTY", strike=18000 + offset * 50, expiry=expiry, option_type=option_type,
+            last_price=100, volume=volume, open_interest=open_interest, implied_volatility=iv,
+            delta=0.5, gamma=0.1, theta=-0.05, vega=0.3
+        )
+        for offset in range(-5, 6) for option_type in ("CALL", "PUT")
+    ]
+
+
+class TestOptionsChainStore:
+    """Test the columnar chain statistics"""
+
+    def test_rolling_statistics(self):
+        """Decayed means and variances match pandas' exponentially weighted moments"""
+        store = OptionsChainStore(halflife=5)
+        expiry = datetime.now() + timedelta(days=7)
+        volumes = np.random.RandomState(7).randint(100, 1000, size=40)
+
+        for volume in volumes:
+            contracts = chain(expiry, volume=int(volume))
+            store.update(store.frame(contracts))
+
+        series = pd.Series(volumes, dtype=float)
+        frame = store.frame(chain(expiry))
+        assert len(store) == 22
+        assert frame.observations[0] == 40
+        assert frame.mean_volume[0] == pytest.approx(series.ewm(halflife=5, adjust=False).mean().iloc[-1])
+        assert frame.std_volume[0] ** 2 == pytest.approx(
+            series.ewm(halflife=5, adjust=False).var(bias=True).iloc[-1], rel=1e-6
+        )
+
+        assert store.prune(expiry + timedelta(days=1)) == 22
+        assert len(store) == 0
+
+    def test_expiry_time_of_day_ignored(self):
+        """Feeds stamping expiry at midnight, close or as a date share one row per contract"""
+        store = OptionsChainStore()
+        expiries = [datetime(2024, 1, 25), datetime(2024, 1, 25, 15, 30), date(2024, 1, 25)]
+
+        for expiry in expiries:
+            store.update(store.frame(chain(expiry)), timestamp=datetime(2024, 1, 22, 10))
+
+        frame = store.frame(chain(datetime(2024, 1, 25, 9, 15)), create=False)
+        assert len(store) == 22
+        assert (frame.rows >= 0).all()
+        assert (frame.observations == 3).all()
+
+    def test_contracts_live_through_expiry_day(self):
+        store = OptionsChainStore()
+        store.update(store.frame(chain(date(2024, 1, 25))), timestamp=datetime(2024, 1, 25, 9, 15))
+
+        assert store.prune(datetime(2024, 1, 25, 15, 0)) == 0
+        assert store.prune(datetime(2024, 1, 26, 9, 15)) == 22
+
+
+class TestVectorizedChainDetection:
+    """Test flow detection against the chain's own history"""
+
+    def test_spikes_after_warm_up(self):
+        analyzer = OptionsFlowAnalyzer()
+        expiry = datetime.now() + timedelta(days=7)
+        store = analyzer.chain_stores["NIFTY"]
+
+        for _ in range(analyzer.config["min_observations"]):
+            contracts = chain(expiry)
+            store.update(store.frame(contracts))
+
+        contracts = chain(expiry)
+        contracts[3].volume = 5000  # 10x normal
+        contracts[8].implied_volatility = 0.5  # Doubled IV
+        contracts[12].open_interest = 15000  # +50% OI
+        frame = store.frame(contracts)
+
+        volume_alerts = analyzer._detect_unusual_volume("NIFTY", contracts, frame)
+        iv_alerts = analyzer._detect_iv_anomalies("NIFTY", contracts, frame)
+        oi_alerts = analyzer._detect_unusual_oi("NIFTY", contracts, frame)
+        sweep_alerts = analyzer._detect_option_sweeps("NIFTY", contracts, frame)
+
+        assert [alert.contracts[0] for alert in volume_alerts] == [contracts[3]]
+        assert volume_alerts[0].unusual_factor == pytest.approx(10.0)
+        assert [alert.contracts[0] for alert in iv_alerts] == [contracts[8]]
+        assert [alert.contracts[0] for alert in oi_alerts] == [contracts[12]]
+        assert [alert.contracts for alert in sweep_alerts] == [[contracts[3]]]
@@ -0,0 +1,146 @@
+"""
+Position State Engine Test Suite
+Tests incremental position aggregates and single-pass pre-trade limit checks
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional
+
+import pytest
+
+from app.institutional.advanced_order_management import (
+    AdvancedOrder,
+    ExecutionEngine,
+    OrderSide,
+    OrderStatus,
+    OrderType,
+    execution_engine
+)
+from app.institutional.institutional_risk_management import institutional_risk_manager
+from app.institutional.position_state import PositionStateEngine, position_state_engine
+
+
+@dataclass
+class Limit:
+    """Shape of institutional_risk_management.RiskLimit used by the engine"""
+    limit_id: str
+    client_id: str
+    limit_type: str
+    limit_value: float
+    is_hard_limit: bool = True
+    is_active: bool = True
+    applicable_symbols: Optional[List[str]] = None
+
+
+class TestPositionStateEngine:
+    """Test position indexes and pre-trade checks"""
+
+    def test_fills_update_position_and_aggregates(self):
+        engine = PositionStateEngine()
+        engine.apply_fill("fund-a", "RELIANCE", "BUY", 100, 2400.0, sector="Energy")
+        engine.apply_fill("fund-a", "RELIANCE", "BUY", 100, 2500.0)
+        engine.apply_fill("fund-a", "TCS", "BUY", 50, 3500.0, sector="IT")
+        engine.apply_fill("fund-a", "RELIANCE", "SELL", 50, 2600.0)
+
+        position = engine.clients["fund-a"].positions["RELIANCE"]
+        assert position.quantity == 150
+        assert position.avg_price == pytest.approx(2450.0)
+        assert position.realized_pnl == pytest.approx(50 * 150.0)
+
+        exposure = engine.exposure("fund-a")
+        assert exposure["portfolio_value"] == pytest.approx(150 * 2600.0 + 50 * 3500.0)
+        assert exposure["sector_values"] == pytest.approx({"Energy": 390000.0, "IT": 175000.0})
+
+        engine.apply_fill("fund-a", "TCS", "SELL", 80, 3400.0)
+        tcs = engine.clients["fund-a"].positions["TCS"]
+        assert (tcs.quantity, tcs.avg_price) == (-30, 3400.0)
+        assert engine.exposure("fund-a")["gross_exposure"] == pytest.approx(390000.0 + 102000.0)
+
+    def test_zero_quantity_fill_is_ignored(self):
+        engine = PositionStateEngine()
+        engine.apply_fill("fund-a", "RELIANCE", "BUY", 0, 2400.0, sector="Energy")
+
+        assert "RELIANCE" not in engine.clients["fund-a"].positions
+        assert engine.exposure("fund-a")["portfolio_value"] == 0.0
+
+    def test_every_applicable_limit_reported(self):
+        engine = PositionStateEngine()
+        engine.set_position("fund-a", "HDFCBANK", 1000, 1500.0, 1600.0, sector="Financials")
+        engine.set_position("fund-a", "INFY", 500, 1400.0, 1500.0, sector="IT")
+        engine.add_limit(Limit("pos", "fund-a", "position_limit", 2_000_000))
+        engine.add_limit(Limit("conc", "fund-a", "concentration_limit", 0.6))
+        engine.add_limit(Limit("sector", "fund-a", "sector_limit", 0.7, is_hard_limit=False))
+        engine.add_limit(Limit("infy-only", "fund-a", "position_limit", 100, applicable_symbols=["INFY"]))
+
+        result = engine.check_order("fund-a", "HDFCBANK", "BUY", 500, 1600.0)
+
+        assert not result.approved
+        assert {c.limit_id for c in result.checks} == {"pos", "conc", "sector"}
+        assert {c.limit_id for c in result.breaches} == {"pos", "conc", "sector"}
+        assert result.projected_position_value == pytest.approx(2_400_000.0)
+        assert engine.stats["rejections"] == 1
+
+        # Reducing the position stays within every limit
+        assert engine.check_order("fund-a", "HDFCBANK", "SELL", 500, 1600.0).approved
+
+        engine.remove_limit("fund-a", "pos")
+        engine.remove_limit("fund-a", "conc")
+        result = engine.check_order("fund-a", "HDFCBANK", "BUY", 500, 1600.0)
+        assert result.approved and [c.limit_id for c in result.breaches] == ["sector"]
+
+    def test_mark_price_revalues_every_holder(self):
+        engine = PositionStateEngine()
+        engine.apply_fill("fund-a", "NIFTY24JANFUT", "BUY", 50, 21500.0)
+        engine.apply_fill("fund-b", "NIFTY24JANFUT", "SELL", 25, 21500.0)
+        engine.add_limit(Limit("book", "fund-a", "portfolio_limit", 1_100_000))
+
+        engine.mark_price("NIFTY24JANFUT", 22000.0)
+
+        assert engine.exposure("fund-a")["portfolio_value"] == pytest.approx(1_100_000.0)
+        assert engine.exposure("fund-b")["portfolio_value"] == pytest.approx(-550_000.0)
+        assert engine.utilization("fund-a") == {"book": pytest.approx(1.0)}
+
+        # Market orders are valued at the marked price
+        result = engine.check_order("fund-a", "NIFTY24JANFUT", "BUY", 1)
+        assert result.projected_portfolio_value == pytest.approx(51 * 22000.0)
+        assert not result.approved
+
+    def test_unpriced_market_order_rejected_by_limits(self):
+        engine = PositionStateEngine()
+        engine.add_limit(Limit("pos", "fund-a", "position_limit", 1_000_000))
+
+        result = engine.check_order("fund-a", "NEWLISTING", "BUY", 100_000)
+
+        assert not result.approved and not result.priced
+        assert engine.stats["rejections"] == 1
+
+        # A client without limits has nothing to breach
+        assert engine.check_order("fund-b", "NEWLISTING", "BUY", 100_000).approved
+
+        engine.mark_price("NEWLISTING", 50.0)
+        result = engine.check_order("fund-a", "NEWLISTING", "BUY", 100_000)
+        assert result.priced and not result.approved
+        assert result.breaches[0].utilization == pytest.approx(5.0)
+
+    @pytest.mark.asyncio
+    async def test_market_prices_feed_validation(self):
+        engine = ExecutionEngine(PositionStateEngine())
+        engine.position_state.add_limit(Limit("pos", "fund-a", "position_limit", 1_000_000))
+        order = AdvancedOrder(
+            order_id="ord-1", client_id="fund-a", strategy_id=None, symbol="NEWLISTING",
+            side=OrderSide.BUY, quantity=10_000, order_type=OrderType.MARKET, status=OrderStatus.PENDING
+        )
+
+        errors = []
+        assert not await engine.validator._validate_risk_limits(order, errors)
+        assert "No market price" in errors[0]
+
+        engine.update_market_price("NEWLISTING", 50.0)
+        errors = []
+        assert await engine.validator._validate_risk_limits(order, errors)
+        assert engine.market_data_cache["NEWLISTING"] == 50.0
+
+    def test_risk_manager_and_execution_engine_share_state(self):
+        assert institutional_risk_manager.position_state is position_state_engine
+        assert execution_engine.position_state is position_state_engine
+        assert execution_engine.validator.position_state is position_state_engine
@@ -0,0 +1,134 @@
+"""
+Rate Limiter Test Suite
+Tests GCRA limits, hierarchical scopes and batched checks on both backends
+"""
+
+import pytest
+from fakeredis import aioredis as fakeredis
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.core.rate_limiter import LocalRateLimiter, RateLimit, RedisRateLimiter
+
+
+PER_MINUTE = RateLimit(60, 60.0, burst=5)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class BrokenRedis:
+    """Stand-in for a Redis server that is down"""
+
+    def pipeline(self, transaction=True):
+        raise RedisConnectionError("Connection refused")
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+async def redis():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    yield client
+    await client.aclose()
+
+
+class TestLocalRateLimiter:
+    """Test GCRA behaviour with a controlled clock"""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_steady_refill(self, clock):
+        limiter = LocalRateLimiter(clock)
+        scopes = [(("client-1",), PER_MINUTE)]
+
+        decisions = [await limiter.check(scopes) for _ in range(6)]
+        assert [d.allowed for d in decisions] == [True] * 5 + [False]
+        assert decisions[4].remaining == 0
+        assert decisions[5].retry_after == pytest.approx(1.0)
+
+        # One request per second refills; no window boundary hands out a second burst
+        clock.now += 1.0
+        assert (await limiter.check(scopes)).allowed
+        assert not (await limiter.check(scopes)).allowed
+
+        clock.now += 60.0
+        assert (await limiter.check(scopes, cost=0)).remaining == 5
+
+    @pytest.mark.asyncio
+    async def test_hierarchy_charged_all_or_nothing(self, clock):
+        limiter = LocalRateLimiter(clock)
+        partner = (("partner-1",), RateLimit(3, 60.0))
+
+        def service(client, name):
+            return [partner, (("partner-1", client, name), RateLimit(100, 60.0))]
+
+        assert (await limiter.check(service("a", "support"))).allowed
+        assert (await limiter.check(service("b", "support"))).allowed
+        assert (await limiter.check(service("b", "intelligence"))).allowed
+
+        # Partner cap exhausted across clients; the refused request charges nothing
+        refused = await limiter.check(service("c", "support"))
+        assert not refused.allowed
+        assert (await limiter.check([service("c", "support")[1]], cost=0)).remaining == 100
+
+    @pytest.mark.asyncio
+    async def test_check_many_and_sweep(self, clock):
+        limiter = LocalRateLimiter(clock)
+        limit = RateLimit(1, 60.0)
+
+        first = await limiter.check_many([[((f"f{i}",), limit)] for i in range(20)])
+        second = await limiter.check_many([[((f"f{i}",), limit)] for i in range(20)])
+        assert all(d.allowed for d in first)
+        assert not any(d.allowed for d in second)
+
+        limiter.SWEEP_THRESHOLD = limiter._sweep_at = 10
+        clock.now += 61.0
+        await limiter.check([(("other",), limit)])
+        assert len(limiter._tats) == 1
+
+
+class TestRedisRateLimiter:
+    """Test the Lua implementation against a local Redis stand-in"""
+
+    @pytest.mark.asyncio
+    async def test_matches_local_semantics(self, redis):
+        limiter = RedisRateLimiter(redis)
+        scopes = [(("partner-1",), RateLimit(1000, 60.0)), (("partner-1", "client-1"), PER_MINUTE)]
+
+        decisions = [await limiter.check(scopes) for _ in range(6)]
+        assert [d.allowed for d in decisions] == [True] * 5 + [False]
+        assert decisions[0].remaining == 4
+        assert 0 < decisions[5].retry_after <= 1.0
+
+        # Hash-tagged keys with an expiry, so idle clients cost nothing
+        assert sorted(await redis.keys("rl:*")) == ["rl:{partner-1}", "rl:{partner-1}:client-1"]
+        assert 0 < await redis.pttl("rl:{partner-1}:client-1") <= 5000
+
+    @pytest.mark.asyncio
+    async def test_batch_reloads_flushed_script(self, redis):
+        limiter = RedisRateLimiter(redis, prefix="rl:copy")
+        limit = RateLimit(2, 60.0)
+        batch = [[((f"follower-{i}",), limit)] for i in range(50)]
+
+        assert all(d.allowed for d in await limiter.check_many(batch))
+        await redis.script_flush()
+        assert all(d.allowed for d in await limiter.check_many(batch))
+        assert not any(d.allowed for d in await limiter.check_many(batch))
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_local_limits(self, clock):
+        limiter = RedisRateLimiter(BrokenRedis(), fallback=LocalRateLimiter(clock))
+        scopes = [(("client-1",), RateLimit(1, 60.0))]
+
+        assert (await limiter.check(scopes)).allowed
+        assert not (await limiter.check(scopes)).allowed
+
+        with pytest.raises(RedisConnectionError):
+            await RedisRateLimiter(BrokenRedis()).check(scopes)
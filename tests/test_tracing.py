@@ -0,0 +1,117 @@
+"""
+Tracing Test Suite
+Tests contextvar span propagation, trace sampling, OTLP/JSON export and the sampling profiler
+"""
+
+import asyncio
+import json
+import random
+import threading
+
+import pytest
+
+from app.monitoring.tracing import OTLPJsonFileExporter, SamplingProfiler, Tracer
+
+
+class TestTracer:
+    """Test span tracing"""
+
+    def test_disabled_tracer_records_nothing(self):
+        tracer = Tracer()
+        with tracer.span("tick.ingest", symbol="NIFTY") as span:
+            span.set_attribute("candle", True)
+
+        assert not tracer.enabled
+        assert tracer.current_span() is None
+        assert tracer.summary() == {}
+
+    @pytest.mark.asyncio
+    async def test_spans_propagate_into_tasks(self):
+        tracer = Tracer(sample_rate=1.0)
+
+        @tracer.traced("order.validate")
+        async def validate():
+            await asyncio.sleep(0)
+
+        async def route(leg):
+            with tracer.span("order.route", leg=leg):
+                await asyncio.sleep(0)
+
+        with tracer.span("order.submit") as root:
+            await validate()
+            await asyncio.gather(route(1), route(2))
+
+        spans = {span.name: span for span in tracer.recent}
+        routes = [span for span in tracer.recent if span.name == "order.route"]
+        assert len(routes) == 2
+        for child in routes + [spans["order.validate"]]:
+            assert child.trace_id == root.trace_id
+            assert child.parent_id == root.span_id
+        assert root.parent_id is None and tracer.current_span() is None
+        assert tracer.summary()["order.route"]["count"] == 2
+
+    def test_sampling_is_per_trace(self):
+        random.seed(5)
+        tracer = Tracer(sample_rate=0.25)
+        for _ in range(400):
+            with tracer.span("tick.ingest"):
+                with tracer.span("tick.aggregate"):
+                    pass
+
+        summary = tracer.summary()
+        assert 60 < summary["tick.ingest"]["count"] < 140
+        # Children are kept exactly when their root is
+        assert summary["tick.aggregate"]["count"] == summary["tick.ingest"]["count"]
+        recorded = {span.span_id for span in tracer.recent}
+        assert all(span.parent_id in recorded for span in tracer.recent if span.parent_id)
+
+    def test_otlp_json_export(self, tmp_path):
+        path = tmp_path / "spans.jsonl"
+        tracer = Tracer(sample_rate=1.0, exporter=OTLPJsonFileExporter(str(path), "charting"), batch_size=2)
+
+        with pytest.raises(ValueError):
+            with tracer.span("chart.update", symbol="BANKNIFTY", bars=1):
+                with tracer.span("indicators.update"):
+                    raise ValueError("bad bar")
+        with tracer.span("ws.broadcast"):
+            pass
+        tracer.flush()
+        tracer.exporter.close()
+
+        requests = [json.loads(line) for line in path.read_text().splitlines()]
+        assert len(requests) == 2
+        resource = requests[0]["resourceSpans"][0]["resource"]
+        assert resource["attributes"] == [{"key": "service.name", "value": {"stringValue": "charting"}}]
+
+        spans = [s for r in requests for s in r["resourceSpans"][0]["scopeSpans"][0]["spans"]]
+        indicators, chart, broadcast = spans
+        assert indicators["parentSpanId"] == chart["spanId"] and "parentSpanId" not in chart
+        assert chart["status"] == {"code": 2, "message": "ValueError: bad bar"}
+        assert broadcast["status"] == {"code": 1}
+        assert {"key": "bars", "value": {"intValue": "1"}} in chart["attributes"]
+        assert int(chart["endTimeUnixNano"]) >= int(chart["startTimeUnixNano"])
+
+
+def spin_for_profiler(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestSamplingProfiler:
+    """Test the on-demand stack sampler"""
+
+    def test_profile_captures_busy_thread(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=spin_for_profiler, args=(stop,))
+        worker.start()
+        try:
+            profiler = SamplingProfiler()
+            profile = profiler.profile(seconds=0.2, interval=0.002)
+        finally:
+            stop.set()
+            worker.join()
+
+        assert profile["samples"] > 10
+        busy = [s for s in profile["stacks"] if s["stack"].endswith("spin_for_profiler")]
+        assert busy and busy[0]["count"] > profile["samples"] // 4
+        assert not profiler.running
@@ -302,39 +302,47 @@ class TestMarketplaceSearch:
                 premium_price=Decimal('99.00'),
                 tags='["breakout", "volume"]',
                 average_rating=Decimal('4.5'),
+                status='ACTIVE',
                 created_at=datetime.utcnow()
             )
         ]
+        marketplace._index_idea(mock_ideas[0])
         
         with patch.object(db_session, 'query') as mock_query:
-            mock_query.return_value.filter.return_value.order_by.return_value.count.return_value = 1
-            mock_query.return_value.filter.return_value.order_by.return_value.offset.return_value.limit.return_value.all.return_value = mock_ideas
+            mock_query.return_value.filter.return_value.all.return_value = mock_ideas
             
-            with patch.object(marketplace, '_get_user_subscriptions', return_value=set()):
-                with patch.object(marketplace, '_get_expert_info',
-                                 return_value={'expert_id': 'expert_1', 'name': 'Expert Trader'}):
-                    with patch.object(marketplace, '_get_idea_performance',
-                                     return_value={'status': 'ACTIVE', 'pnl_percentage': 5.2}):
-                        
-                        search_request = MarketplaceSearchRequest(
-                            query="RELIANCE",
-                            category="EQUITY",
-                            risk_level=RiskLevel.MEDIUM,
-                            limit=20
-                        )
-                        
-                        result = await marketplace.search_marketplace(
-                            db_session, test_user.id, search_request
-                        )
-                        
-                        assert len(result['ideas']) == 1
-                        assert result['total_count'] == 1
-                        
-                        idea = result['ideas'][0]
-                        assert idea['idea_id'] == 'idea_1'
-                        assert idea['symbol'] == 'RELIANCE'
-                        assert idea['is_premium'] is True
-                        assert idea['is_subscribed'] is False  # Not subscribed
+            with patch.object(marketplace, '_sync_search_index', new_callable=AsyncMock), \
+                 patch.object(marketplace, '_get_user_subscriptions', return_value=set()), \
+                 patch.object(marketplace, '_get_expert_info_batch',
+                              return_value={'expert_1': {'expert_id': 'expert_1', 'name': 'Expert Trader'}}) as expert_batch, \
+                 patch.object(marketplace, '_get_idea_performance_batch',
+                              return_value={'idea_1': {'status': 'ACTIVE', 'pnl_percentage': 5.2}}) as performance_batch:
+                
+                search_request = MarketplaceSearchRequest(
+                    query="RELIANCE",
+                    category="EQUITY",
+                    risk_level=RiskLevel.MEDIUM,
+                    limit=20
+                )
+                
+                result = await marketplace.search_marketplace(
+                    db_session, test_user.id, search_request
+                )
+                
+                assert len(result['ideas']) == 1
+                assert result['total_count'] == 1
+                
+                idea = result['ideas'][0]
+                assert idea['idea_id'] == 'idea_1'
+                assert idea['symbol'] == 'RELIANCE'
+                assert idea['is_premium'] is True
+                assert idea['is_subscribed'] is False  # Not subscribed
+                assert idea['tags'] == ['breakout', 'volume']
+                assert idea['relevance'] > 0
+                
+                # Page hydration is batched, not per row
+                expert_batch.assert_called_once()
+                performance_batch.assert_called_once()
     
     @pytest.mark.asyncio
     async def test_search_with_subscription_access(self, db_session, test_user):
@@ -348,6 +356,9 @@ class TestMarketplaceSearch:
                 title='Premium Signal',
                 description='Full premium content should be visible',
                 idea_type='TRADE_SIGNAL',
+                category='EQUITY',
+                risk_level='MEDIUM',
+                time_horizon='SHORT_TERM',
                 symbol='NIFTY',
                 is_premium=True,
                 premium_price=Decimal('199.00'),
@@ -355,43 +366,47 @@ class TestMarketplaceSearch:
                 stop_loss=18200.0,
                 entry_price=18300.0,
                 tags='["premium", "signal"]',
+                average_rating=None,
+                status='ACTIVE',
                 created_at=datetime.utcnow()
             )
         ]
+        marketplace._index_idea(mock_ideas[0])
         
         with patch.object(db_session, 'query') as mock_query:
-            mock_query.return_value.filter.return_value.order_by.return_value.count.return_value = 1
-            mock_query.return_value.filter.return_value.order_by.return_value.offset.return_value.limit.return_value.all.return_value = mock_ideas
+            mock_query.return_value.filter.return_value.all.return_value = mock_ideas
             
-            with patch.object(marketplace, '_get_user_subscriptions', 
-                             return_value={'expert_1'}):  # User is subscribed
-                with patch.object(marketplace, '_get_expert_info',
-                                 return_value={'expert_id': 'expert_1', 'name': 'Expert'}):
-                    with patch.object(marketplace, '_get_idea_performance',
-                                     return_value={'status': 'ACTIVE'}):
-                        
-                        search_request = MarketplaceSearchRequest(
-                            symbol="NIFTY",
-                            is_premium=True
-                        )
-                        
-                        result = await marketplace.search_marketplace(
-                            db_session, test_user.id, search_request
-                        )
-                        
-                        idea = result['ideas'][0]
-                        assert idea['is_subscribed'] is True
-                        assert idea['target_price'] == 18500.0  # Full content visible
-                        assert idea['stop_loss'] == 18200.0
-                        assert "Full premium content" in idea['description']
+            with patch.object(marketplace, '_sync_search_index', new_callable=AsyncMock), \
+                 patch.object(marketplace, '_get_user_subscriptions', return_value={'expert_1'}), \
+                 patch.object(marketplace, '_get_expert_info_batch',
+                              return_value={'expert_1': {'expert_id': 'expert_1', 'name': 'Expert'}}), \
+                 patch.object(marketplace, '_get_idea_performance_batch',
+                              return_value={'idea_1': {'status': 'ACTIVE'}}):
+                
+                search_request = MarketplaceSearchRequest(
+                    query="NIFTY",
+                    is_premium=True
+                )
+                
+                result = await marketplace.search_marketplace(
+                    db_session, test_user.id, search_request
+                )
+                
+                idea = result['ideas'][0]
+                assert idea['is_subscribed'] is True
+                assert idea['target_price'] == 18500.0  # Full content visible
+                assert idea['stop_loss'] == 18200.0
+                assert "Full premium content" in idea['description']
     
     @pytest.mark.asyncio
     async def test_search_filtering(self, db_session, test_user):
         """Test search with various filters"""
         marketplace = TradingIdeaMarketplace()
         
-        with patch.object(db_session, 'query') as mock_query:
-            mock_filter = mock_query.return_value.filter
+        with patch.object(marketplace, '_sync_search_index', new_callable=AsyncMock), \
+             patch.object(marketplace.search_index, 'search',
+                          return_value={'idea_ids': [], 'total_count': 0, 'scores': {}}) as index_search, \
+             patch.object(marketplace, '_get_user_subscriptions', return_value=set()):
             
             search_request = MarketplaceSearchRequest(
                 query="breakout",
@@ -401,39 +416,52 @@ class TestMarketplaceSearch:
                 time_horizon=TimeHorizon.SHORT_TERM,
                 expert_user_id="expert_123",
                 is_premium=True,
+                tags=["volume"],
+                min_rating=4.0,
                 sort_by="rating",
                 sort_order="desc"
             )
             
             await marketplace.search_marketplace(db_session, test_user.id, search_request)
             
-            # Verify filters were applied (mock was called with filters)
-            assert mock_filter.call_count > 0
+            # Verify filters were passed to the index
+            kwargs = index_search.call_args.kwargs
+            assert kwargs['query'] == "breakout"
+            assert kwargs['filters'] == {
+                'category': "EQUITY",
+                'idea_type': "TRADE_SIGNAL",
+                'risk_level': "HIGH",
+                'time_horizon': "SHORT_TERM",
+                'expert_user_id': "expert_123",
+                'is_premium': True,
+                'tags': ["volume"]
+            }
+            assert kwargs['min_rating'] == 4.0
+            assert kwargs['sort_by'] == "rating"
     
     @pytest.mark.asyncio
     async def test_search_pagination(self, db_session, test_user):
         """Test search pagination"""
         marketplace = TradingIdeaMarketplace()
         
-        with patch.object(db_session, 'query') as mock_query:
-            mock_query.return_value.filter.return_value.order_by.return_value.count.return_value = 50
-            mock_query.return_value.filter.return_value.order_by.return_value.offset.return_value.limit.return_value.all.return_value = []
+        with patch.object(marketplace, '_sync_search_index', new_callable=AsyncMock), \
+             patch.object(marketplace.search_index, 'search',
+                          return_value={'idea_ids': [], 'total_count': 50, 'scores': {}}), \
+             patch.object(marketplace, '_get_user_subscriptions', return_value=set()):
             
-            with patch.object(marketplace, '_get_user_subscriptions', return_value=set()):
-                
-                search_request = MarketplaceSearchRequest(
-                    offset=20,
-                    limit=10
-                )
-                
-                result = await marketplace.search_marketplace(
-                    db_session, test_user.id, search_request
-                )
-                
-                assert result['total_count'] == 50
-                assert result['page_info']['offset'] == 20
-                assert result['page_info']['limit'] == 10
-                assert result['page_info']['has_next'] is True  # 20 + 10 < 50
+            search_request = MarketplaceSearchRequest(
+                offset=20,
+                limit=10
+            )
+            
+            result = await marketplace.search_marketplace(
+                db_session, test_user.id, search_request
+            )
+            
+            assert result['total_count'] == 50
+            assert result['page_info']['offset'] == 20
+            assert result['page_info']['limit'] == 10
+            assert result['page_info']['has_next'] is True  # 20 + 10 < 50
 
 
 class TestExpertSubscriptions:
@@ -0,0 +1,210 @@
+"""
+Test suite for the pooled, rate-limited WhatsApp outbound dispatcher
+"""
+
+import asyncio
+import importlib.util
+import json
+import time
+from pathlib import Path
+import pytest
+import httpx
+
+from app.whatsapp.client import WhatsAppClient
+from app.whatsapp.dispatcher import OutboundDispatcher, TokenBucket, get_dispatcher
+
+LITE_DISPATCHER_PATH = (
+    Path(__file__).resolve().parents[1]
+    / "business-entity-2-trading-apps" / "lite-whatsapp" / "whatsapp" / "dispatcher.py"
+)
+
+
+def load_lite_dispatcher():
+    """The Lite app's standalone copy of the dispatcher module"""
+    spec = importlib.util.spec_from_file_location("lite_whatsapp_dispatcher", LITE_DISPATCHER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_dispatcher(handler, dispatcher_class=OutboundDispatcher, **kwargs):
+    """Dispatcher whose requests are served by an in-process handler"""
+    kwargs.setdefault("base_backoff", 0.001)
+    return dispatcher_class(
+        "1234567890",
+        "test-token",
+        transport=httpx.MockTransport(handler),
+        **kwargs
+    )
+
+
+def message_payload(to: str):
+    return {"messaging_product": "whatsapp", "to": to, "type": "text", "text": {"body": "hi"}}
+
+
+class TestTokenBucket:
+
+    @pytest.mark.asyncio
+    async def test_paces_beyond_capacity(self):
+        """Requests beyond the burst capacity wait for refill"""
+        bucket = TokenBucket(rate=100, capacity=10)
+
+        start = time.monotonic()
+        for _ in range(30):
+            await bucket.acquire()
+        elapsed = time.monotonic() - start
+
+        assert elapsed >= 0.15  # 20 tokens at 100/s
+
+    @pytest.mark.asyncio
+    async def test_penalize_blocks_issuance(self):
+        """A rate-limit penalty delays the next token"""
+        bucket = TokenBucket(rate=1000, capacity=1000)
+        bucket.penalize(0.1)
+
+        start = time.monotonic()
+        await bucket.acquire()
+
+        assert time.monotonic() - start >= 0.09
+
+
+@pytest.fixture(params=["core", "lite"])
+def dispatcher_class(request):
+    """Both the platform dispatcher and the Lite app's copy"""
+    if request.param == "lite":
+        return load_lite_dispatcher().OutboundDispatcher
+    return OutboundDispatcher
+
+
+class TestOutboundDispatcher:
+
+    @pytest.mark.asyncio
+    async def test_send_success(self):
+        def handler(request):
+            assert request.headers["Authorization"] == "Bearer test-token"
+            return httpx.Response(200, json={"messages": [{"id": "wamid.1"}]})
+
+        dispatcher = make_dispatcher(handler)
+        result = await dispatcher.send(message_payload("919876543210"))
+
+        assert result["messages"][0]["id"] == "wamid.1"
+        assert dispatcher.stats["sent"] == 1
+
+    @pytest.mark.asyncio
+    async def test_retries_rate_limit_then_succeeds(self):
+        """429 and 5xx responses are retried with backoff"""
+        responses = iter([
+            httpx.Response(429, json={"error": {"code": 130429}}),
+            httpx.Response(503, json={"error": "unavailable"}),
+            httpx.Response(200, json={"messages": [{"id": "wamid.2"}]}),
+        ])
+        dispatcher = make_dispatcher(lambda request: next(responses))
+
+        result = await dispatcher.send(message_payload("919876543210"))
+
+        assert "error" not in result
+        assert dispatcher.stats["retried"] == 2
+        assert dispatcher.stats["rate_limited"] == 1
+
+    @pytest.mark.asyncio
+    async def test_client_errors_not_retried(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(400, json={"error": {"message": "bad number"}})
+
+        dispatcher = make_dispatcher(handler)
+        result = await dispatcher.send(message_payload("invalid"))
+
+        assert result["status_code"] == 400
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_connect_errors_retried(self, dispatcher_class):
+        attempts = []
+
+        def handler(request):
+            attempts.append(request)
+            if len(attempts) == 1:
+                raise httpx.ConnectError("connection refused", request=request)
+            return httpx.Response(200, json={"messages": [{"id": "wamid.3"}]})
+
+        dispatcher = make_dispatcher(handler, dispatcher_class)
+        result = await dispatcher.send(message_payload("919876543210"))
+
+        assert result["messages"][0]["id"] == "wamid.3"
+        assert len(attempts) == 2
+
+    @pytest.mark.asyncio
+    async def test_read_timeout_not_resent(self, dispatcher_class):
+        """The message may already have been delivered"""
+        attempts = []
+
+        def handler(request):
+            attempts.append(request)
+            raise httpx.ReadTimeout("no response", request=request)
+
+        dispatcher = make_dispatcher(handler, dispatcher_class)
+        result = await dispatcher.send(message_payload("919876543210"))
+
+        assert "error" in result
+        assert len(attempts) == 1
+        assert dispatcher.stats["retried"] == 0
+
+    @pytest.mark.asyncio
+    async def test_bulk_send_bounded_and_ordered(self):
+        """Bulk sends keep input order and cap in-flight requests"""
+        in_flight = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            to = json.loads(request.content)["to"]
+            return httpx.Response(200, json={"messages": [{"id": f"wamid.{to}"}]})
+
+        dispatcher = make_dispatcher(handler, throughput_mps=10000)
+        phones = [f"9198765{i:05d}" for i in range(200)]
+
+        results = await dispatcher.send_bulk([message_payload(p) for p in phones], max_in_flight=8)
+
+        assert [r["messages"][0]["id"] for r in results] == [f"wamid.{p}" for p in phones]
+        assert peak <= 8
+
+    def test_dispatcher_shared_per_phone_number(self):
+        """All clients on one number share a dispatcher (and pool)"""
+        first = get_dispatcher("555000111", "token-a")
+        second = get_dispatcher("555000111", "token-b")
+
+        assert first is second
+        assert second.access_token == "token-b"
+
+
+class TestWhatsAppClientBulk:
+    """Test client broadcasts go through the dispatcher's bulk path"""
+
+    @pytest.mark.asyncio
+    async def test_social_trading_updates_sent_as_one_batch(self):
+        sent = []
+
+        def handler(request):
+            sent.append(json.loads(request.content))
+            return httpx.Response(200, json={"messages": [{"id": f"wamid.{len(sent)}"}]})
+
+        client = WhatsAppClient()
+        client.dispatcher = make_dispatcher(handler, throughput_mps=10000)
+        phones = [f"9198765{i:05d}" for i in range(20)]
+
+        results = await client.send_social_trading_update_bulk([
+            {"phone_number": phone, "social_data": {"type": "risk_skip", "message": "Copy trade skipped"}}
+            for phone in phones
+        ])
+
+        assert len(results) == 20 and all("error" not in result for result in results)
+        assert sorted(payload["to"] for payload in sent) == phones
+        assert all(payload["type"] == "interactive" for payload in sent)
+        assert "Copy trade skipped" in json.dumps(sent[0])
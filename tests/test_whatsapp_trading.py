@@ -8,9 +8,11 @@ import asyncio
 from datetime import datetime, timedelta
 from decimal import Decimal
 from unittest.mock import AsyncMock, Mock, patch
+import io
 import json
 import uuid
 
+from PIL import Image
 from fastapi.testclient import TestClient
 from fastapi import HTTPException
 
@@ -21,6 +23,20 @@ from app.integrations.whatsapp_trading import (
     WhatsAppQuickTradeRequest,
     WhatsAppAlertRequest
 )
+from app.charting.core.chart_engine import OHLCV
+from app.charting.core.render_service import ChartBars, RenderSpec, render_chart
+
+
+def sample_bars(count: int = 30):
+    """Rising 15-minute bars for chart rendering"""
+    start = datetime(2024, 1, 2, 9, 15)
+    return [
+        OHLCV(
+            timestamp=start + timedelta(minutes=15 * i),
+            open=2500 + i, high=2506 + i, low=2497 + i, close=2503 + i, volume=10000 + 100 * i
+        )
+        for i in range(count)
+    ]
 
 
 class TestWhatsAppTradingManagerInit:
@@ -32,7 +48,7 @@ class TestWhatsAppTradingManagerInit:
         
         assert manager.whatsapp_client is not None
         assert manager.trading_engine is not None
-        assert manager.chart_generator is not None
+        assert manager.chart_engine is not None
         assert manager.risk_manager is not None
         
         # Check trade presets
@@ -365,10 +381,10 @@ class TestWhatsAppChartSharing:
         manager = WhatsAppTradingManager()
         manager.whatsapp_client = mock_whatsapp_client
         
-        with patch.object(manager.chart_generator, 'generate_chart',
-                         return_value=b'fake_chart_image') as mock_chart:
-            with patch.object(manager, '_add_trading_buttons_overlay',
-                             return_value=b'chart_with_buttons') as mock_overlay:
+        with patch.object(manager.chart_engine, 'get_bars',
+                         return_value=sample_bars()) as mock_bars:
+            with patch.object(manager.render_service, 'render',
+                             return_value=b'chart_with_buttons') as mock_render:
                 with patch.object(manager, '_upload_chart_image',
                                  return_value='https://charts.example.com/chart123.png') as mock_upload:
                     with patch.object(manager, '_generate_chart_analysis',
@@ -377,7 +393,15 @@ class TestWhatsAppChartSharing:
                         chart_request = WhatsAppChartRequest(
                             symbol="RELIANCE",
                             timeframe="15m",
-                            indicators=["RSI", "MACD"],
+                            indicators=["EMA:9", "RSI", "SMA:20"],
+                            drawing_tools=[
+                                {"type": "trend_line", "points": [
+                                    {"timestamp": "2024-01-02T09:15:00", "price": 2497},
+                                    {"timestamp": "2024-01-02T15:00:00", "price": 2520}
+                                ]},
+                                {"type": "horizontal_line", "points": [{"price": 2530}]},
+                                {"type": "gann_fan", "points": []}
+                            ],
                             whatsapp_number="+919876543210",
                             include_trade_buttons=True,
                             analysis_notes="Custom analysis notes"
@@ -393,16 +417,17 @@ class TestWhatsAppChartSharing:
                         assert len(result['trade_buttons']) == 3  # Buy, Sell, Alert
                         assert result['analysis'] == 'Strong bullish momentum detected'
                         
-                        # Verify chart generation was called with correct config
-                        mock_chart.assert_called_once()
-                        chart_config = mock_chart.call_args[0][0]
-                        assert chart_config['symbol'] == "RELIANCE"
-                        assert chart_config['timeframe'] == "15m"
-                        assert chart_config['indicators'] == ["RSI", "MACD"]
-                        assert chart_config['whatsapp_optimized'] is True
-                        
-                        # Verify buttons overlay was applied
-                        mock_overlay.assert_called_once_with(b'fake_chart_image', "RELIANCE")
+                        # Verify the render spec carries the request and the buttons layer
+                        mock_bars.assert_called_once_with("RELIANCE", "15m")
+                        spec, bars = mock_render.call_args[0]
+                        assert spec.symbol == "RELIANCE"
+                        assert spec.timeframe == "15m"
+                        assert spec.indicators == ("EMA:9", "SMA:20")  # RSI has no price-pane overlay
+                        assert [kind for kind, _ in spec.drawings] == ["trend_line", "horizontal_line"]
+                        assert spec.drawings[0][1][0] == (datetime(2024, 1, 2, 9, 15).timestamp(), 2497.0)
+                        assert spec.trade_buttons is True
+                        assert len(bars) == 30
+                        mock_upload.assert_called_once_with(b'chart_with_buttons', test_user.id)
                         
                         # Verify WhatsApp message was sent
                         mock_whatsapp_client.send_image.assert_called_once()
@@ -418,8 +443,10 @@ class TestWhatsAppChartSharing:
         manager = WhatsAppTradingManager()
         manager.whatsapp_client = mock_whatsapp_client
         
-        with patch.object(manager.chart_generator, 'generate_chart',
-                         return_value=b'fake_chart_image'):
+        with patch.object(manager.chart_engine, 'get_bars',
+                         return_value=sample_bars()), \
+             patch.object(manager.render_service, 'render',
+                         return_value=b'chart_image') as mock_render:
             with patch.object(manager, '_upload_chart_image',
                              return_value='https://charts.example.com/chart123.png'):
                 with patch.object(manager, '_generate_chart_analysis',
@@ -438,45 +465,20 @@ class TestWhatsAppChartSharing:
                     
                     assert result['success'] is True
                     assert len(result['trade_buttons']) == 0  # No buttons
+                    assert mock_render.call_args[0][0].trade_buttons is False
     
-    @pytest.mark.asyncio
-    async def test_trading_buttons_overlay_generation(self):
-        """Test trading buttons overlay generation"""
-        manager = WhatsAppTradingManager()
-        
-        # Mock PIL operations
-        with patch('app.integrations.whatsapp_trading.Image') as mock_image:
-            with patch('app.integrations.whatsapp_trading.ImageDraw') as mock_draw:
-                with patch('app.integrations.whatsapp_trading.ImageFont') as mock_font:
-                    
-                    # Setup mocks
-                    mock_img = Mock()
-                    mock_img.size = (800, 600)
-                    mock_img.height = 600
-                    mock_image.open.return_value = mock_img
-                    mock_image.new.return_value = Mock()
-                    mock_image.alpha_composite.return_value = mock_img
-                    
-                    mock_draw_obj = Mock()
-                    mock_draw.Draw.return_value = mock_draw_obj
-                    
-                    mock_font.truetype.return_value = Mock()
-                    
-                    # Mock BytesIO
-                    with patch('app.integrations.whatsapp_trading.io.BytesIO') as mock_bytesio:
-                        mock_output = Mock()
-                        mock_output.getvalue.return_value = b'image_with_buttons'
-                        mock_bytesio.return_value = mock_output
-                        
-                        result = await manager._add_trading_buttons_overlay(
-                            b'original_image', 'RELIANCE'
-                        )
-                        
-                        assert result == b'image_with_buttons'
-                        
-                        # Verify drawing operations
-                        assert mock_draw_obj.rectangle.call_count == 2  # Buy and Sell buttons
-                        assert mock_draw_obj.text.call_count == 2  # Button text
+    def test_trading_buttons_rendered_into_chart(self):
+        """Test the buy/sell buttons are drawn by the renderer"""
+        bars = ChartBars.from_ohlcv(sample_bars())
+        
+        plain, _ = render_chart(RenderSpec(symbol="RELIANCE", timeframe="15m"), bars)
+        with_buttons, _ = render_chart(RenderSpec(symbol="RELIANCE", timeframe="15m", trade_buttons=True), bars)
+        
+        # Inside the BUY button, clear of its label
+        pixel = (15, 600 - 45)
+        assert Image.open(io.BytesIO(plain)).convert('RGB').getpixel(pixel) != \
+            Image.open(io.BytesIO(with_buttons)).convert('RGB').getpixel(pixel)
+        assert Image.open(io.BytesIO(with_buttons)).convert('RGB').getpixel(pixel)[1] > 150  # green
     
     @pytest.mark.asyncio
     async def test_chart_analysis_generation(self):
@@ -1008,8 +1010,8 @@ class TestWhatsAppErrorHandling:
         """Test handling of chart generation failures"""
         manager = WhatsAppTradingManager()
         
-        # Mock chart generator to raise exception
-        manager.chart_generator.generate_chart = AsyncMock(
+        # Mock the chart data source to raise exception
+        manager.chart_engine.get_bars = AsyncMock(
             side_effect=Exception("Chart generation failed")
         )
         
@@ -1146,7 +1148,8 @@ class TestWhatsAppIntegration:
         manager = WhatsAppTradingManager()
         manager.whatsapp_client = mock_whatsapp_client
         
-        with patch.object(manager.chart_generator, 'generate_chart', return_value=b'chart'):
+        with patch.object(manager.chart_engine, 'get_bars', return_value=sample_bars()), \
+             patch.object(manager.render_service, 'render', return_value=b'chart'):
             with patch.object(manager, '_upload_chart_image', return_value='https://chart.url'):
                 with patch.object(manager, '_generate_chart_analysis', return_value='Analysis'):
                     with patch.object(manager, '_handle_quick_buy') as mock_quick_buy:
@@ -0,0 +1,187 @@
+"""
+Test suite for the durable WhatsApp inbound work queue
+"""
+
+import asyncio
+import pytest
+
+from app.whatsapp.work_queue import InboundWorkQueue
+
+
+def message_item(message_id: str, phone: str, message_type: str = "text", body: str = "hi"):
+    return {
+        "key": message_id,
+        "phone": phone,
+        "type": message_type,
+        "payload": {"id": message_id, "from": phone, "type": message_type, "text": {"body": body}}
+    }
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "queue.db")
+
+
+class TestInboundWorkQueue:
+
+    @pytest.mark.asyncio
+    async def test_duplicate_message_ids_ignored(self, db_path):
+        """Redelivered webhooks are not processed twice"""
+        handled = []
+
+        async def handler(item_type, payload):
+            handled.append(payload["id"])
+
+        queue = InboundWorkQueue(handler, db_path=db_path, num_shards=4)
+        await queue.start()
+        try:
+            assert await queue.enqueue([message_item("wamid.1", "919800000001")]) == 1
+            assert await queue.enqueue([message_item("wamid.1", "919800000001")]) == 0
+            await queue.drain()
+        finally:
+            await queue.stop()
+
+        assert handled == ["wamid.1"]
+        assert queue.stats["duplicates"] == 1
+
+    @pytest.mark.asyncio
+    async def test_per_user_ordering(self, db_path):
+        """A user's messages are handled in arrival order"""
+        handled = []
+
+        async def handler(item_type, payload):
+            # Later messages finish faster; ordering must still hold
+            await asyncio.sleep(0.005 if payload["text"]["body"] == "0" else 0)
+            handled.append((payload["from"], payload["text"]["body"]))
+
+        queue = InboundWorkQueue(handler, db_path=db_path, num_shards=4)
+        await queue.start()
+        try:
+            items = [
+                message_item(f"wamid.{user}.{n}", f"91980000000{user}", body=str(n))
+                for n in range(5) for user in range(3)
+            ]
+            await queue.enqueue(items)
+            await queue.drain()
+        finally:
+            await queue.stop()
+
+        for user in range(3):
+            bodies = [body for phone, body in handled if phone == f"91980000000{user}"]
+            assert bodies == ["0", "1", "2", "3", "4"]
+
+    @pytest.mark.asyncio
+    async def test_type_concurrency_bounded(self, db_path):
+        """Slow message types are capped across shards"""
+        running = 0
+        peak = 0
+
+        async def handler(item_type, payload):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        queue = InboundWorkQueue(
+            handler, db_path=db_path, num_shards=16, type_concurrency={"audio": 2}
+        )
+        await queue.start()
+        try:
+            await queue.enqueue([
+                message_item(f"wamid.a{i}", f"9198000{i:05d}", message_type="audio")
+                for i in range(20)
+            ])
+            await queue.drain()
+        finally:
+            await queue.stop()
+
+        assert peak <= 2
+
+    @pytest.mark.asyncio
+    async def test_failed_items_retried_then_parked(self, db_path):
+        attempts = []
+
+        async def handler(item_type, payload):
+            attempts.append(payload["id"])
+            raise RuntimeError("handler down")
+
+        queue = InboundWorkQueue(
+            handler, db_path=db_path, num_shards=2, max_attempts=3, retry_backoff=0
+        )
+        await queue.start()
+        try:
+            await queue.enqueue([message_item("wamid.bad", "919800000009")])
+            await queue.drain()
+            depth = await queue.depth()
+        finally:
+            await queue.stop()
+
+        assert len(attempts) == 3
+        assert depth == {"failed": 1}
+
+    @pytest.mark.asyncio
+    async def test_items_survive_restart(self, db_path):
+        """Enqueued items are processed by the next process if never started"""
+        handled = []
+
+        async def handler(item_type, payload):
+            handled.append(payload["id"])
+
+        first = InboundWorkQueue(handler, db_path=db_path, num_shards=2)
+        await first.enqueue([message_item("wamid.persisted", "919800000010")])
+        await first.stop()
+
+        second = InboundWorkQueue(handler, db_path=db_path, num_shards=2)
+        await second.start()
+        try:
+            await second.drain()
+        finally:
+            await second.stop()
+
+        assert handled == ["wamid.persisted"]
+
+    @pytest.mark.asyncio
+    async def test_only_expired_leases_reclaimed(self, db_path):
+        """Rows held by a live process are left alone; a dead process's rows come back"""
+        handled = []
+
+        async def handler(item_type, payload):
+            handled.append(payload["id"])
+
+        first = InboundWorkQueue(handler, db_path=db_path, num_shards=1, lease_seconds=0.2)
+        await first.enqueue([message_item("wamid.leased", "919800000020")])
+        assert len(await first._run(first._claim, 0)) == 1  # Claimed, never finished
+
+        second = InboundWorkQueue(handler, db_path=db_path, num_shards=1, lease_seconds=0.2, poll_interval=0.05)
+        await second.start()
+        try:
+            await asyncio.sleep(0.1)
+            assert handled == []
+            assert await second.depth() == {"processing": 1}
+
+            await asyncio.sleep(0.2)
+            await second.drain()
+        finally:
+            await second.stop()
+            await first.stop()
+
+        assert handled == ["wamid.leased"]
+
+    @pytest.mark.asyncio
+    async def test_claims_do_not_overlap(self, db_path):
+        async def handler(item_type, payload):
+            pass
+
+        first = InboundWorkQueue(handler, db_path=db_path, num_shards=1, batch_size=3)
+        second = InboundWorkQueue(handler, db_path=db_path, num_shards=1, batch_size=3)
+        await first.enqueue([message_item(f"wamid.{i}", "919800000030") for i in range(5)])
+        await second._run(second._connect)
+
+        claimed = await asyncio.gather(first._run(first._claim, 0), second._run(second._claim, 0))
+        await first.stop()
+        await second.stop()
+
+        seqs = [row[0] for rows in claimed for row in rows]
+        assert sorted(seqs) == [1, 2, 3, 4, 5]
+        assert all(rows == sorted(rows) for rows in claimed)